@@ -16,8 +16,9 @@ from helpers import (
     context as context_helper,
     dirty_json,
     subagents,
+    prompt_cache,
 )
-from helpers import extension
+from helpers import admission, context_signals, extension, loop_monitor
 from helpers.print_style import PrintStyle
 
 from langchain_core.prompts import (
@@ -27,7 +28,7 @@ from langchain_core.messages import SystemMessage, BaseMessage
 
 import helpers.log as Log
 from helpers.dirty_json import DirtyJson
-from helpers.defer import DeferredTask
+from helpers.defer import DeferredTask, EventLoopPool
 from typing import Callable
 from helpers.localization import Localization
 from helpers import extension
@@ -39,6 +40,13 @@ class AgentContextType(Enum):
     BACKGROUND = "background"
 
 
+_ADMISSION_SOURCES = {
+    AgentContextType.USER: admission.SOURCE_UI,
+    AgentContextType.TASK: admission.SOURCE_SCHEDULER,
+    AgentContextType.BACKGROUND: admission.SOURCE_BACKGROUND,
+}
+
+
 class AgentContext:
 
     _contexts: dict[str, "AgentContext"] = {}
@@ -158,6 +166,7 @@ class AgentContext:
             context = AgentContext._contexts.pop(id, None)
         if context and context.task:
             context.task.kill()
+        EventLoopPool.get(AgentContext.__name__).release(id)
         return context
 
     def get_data(self, key: str, recursive: bool = True):
@@ -228,11 +237,24 @@ class AgentContext:
     @extension.extensible
     def reset(self):
         self.kill_process()
+        self._drop_fan_outs()
         self.log.reset()
         self.agent0 = Agent(0, self.config, self)
         self.streaming_agent = None
         self.paused = False
 
+    def _drop_fan_outs(self):
+        # unfinished call_subordinate fan-outs must not be resumed after a reset
+        agents = [self.agent0]
+        while agents:
+            agent = agents.pop()
+            fan_out = agent.data.pop(Agent.DATA_NAME_SUBORDINATES, None)
+            if fan_out:
+                agents.extend(sibling.agent for sibling in fan_out.siblings)
+            subordinate = agent.data.get(Agent.DATA_NAME_SUBORDINATE, None)
+            if subordinate:
+                agents.append(subordinate)
+
     @extension.extensible
     def nudge(self):
         self.kill_process()
@@ -271,17 +293,45 @@ class AgentContext:
     def run_task(
         self, func: Callable[..., Coroutine[Any, Any, Any]], *args: Any, **kwargs: Any
     ):
+        # take a global run slot or a place in the queue before starting;
+        # raises admission.AdmissionRejected when the queue is full
+        controller = admission.get_controller()
+        ticket = controller.request(
+            admission.current_source(_ADMISSION_SOURCES[self.type])
+        )
+        if not ticket.granted:
+            self.log.log(
+                type="info",
+                heading="Waiting for a free agent slot",
+                content=f"{controller.position(ticket)} run(s) ahead in the queue.",
+            )
         if not self.task:
+            # contexts are sharded over the A0_AGENT_LOOPS loop threads and
+            # stay pinned to the one they were assigned
             self.task = DeferredTask(
-                thread_name=self.__class__.__name__,
+                thread_name=EventLoopPool.get(AgentContext.__name__).assign(self.id),
             )
-        self.task.start_task(func, *args, **kwargs)
+        self.task.start_task(admission.run_admitted, ticket, func, *args, **kwargs)
+        context_signals.emit(self.id, context_signals.RUN)
+        self.task.add_done_callback(
+            lambda _: context_signals.emit(self.id, context_signals.RUN)
+        )
+        # a run killed before it got going never reaches its own release
+        self.task.add_done_callback(lambda _: controller.release(ticket))
         return self.task
 
     # this wrapper ensures that superior agents are called back if the chat was loaded from file and original callstack is gone
     @extension.extensible
     async def _process_chain(self, agent: "Agent", msg: "UserMessage|str", user=True):
         try:
+            # a nudge restarts the superior of a call_subordinate fan-out that was
+            # cut short: finish the remaining siblings and hand back their results
+            # before the new message
+            fan_out = agent.data.get(Agent.DATA_NAME_SUBORDINATES, None)
+            if fan_out:
+                agent.hist_add_tool_result(
+                    tool_name="call_subordinate", tool_result=await fan_out.run()
+                )
             msg_template = (
                 agent.hist_add_user_message(msg)  # type: ignore
                 if user
@@ -345,6 +395,7 @@ class Agent:
 
     DATA_NAME_SUPERIOR = "_superior"
     DATA_NAME_SUBORDINATE = "_subordinate"
+    DATA_NAME_SUBORDINATES = "_subordinates"  # unfinished call_subordinate fan-out
     DATA_NAME_CTX_WINDOW = "ctx_window"
 
     @extension.extensible
@@ -385,7 +436,8 @@ class Agent:
                 # let the agent run message loop until he stops it with a response tool
                 while True:
 
-                    self.context.streaming_agent = self  # mark self as current streamer
+                    # mark self as current streamer (the superior for fan-out siblings)
+                    self.context.streaming_agent = self.streaming_target()
                     self.loop_data.iteration += 1
                     self.loop_data.params_temporary = {}  # clear temporary params
                     last_response_stream_full = ""
@@ -527,13 +579,27 @@ class Agent:
             except Exception as e:
                 await self.handle_exception("monologue", e)
             finally:
-                self.context.streaming_agent = None  # unset current streamer
+                if self.context.streaming_agent is self:
+                    self.context.streaming_agent = None  # unset current streamer
                 # call monologue_end extensions
                 if self.context.task and self.context.task.is_alive(): # don't call extensions post mortem
                     await extension.call_extensions_async(
                         "monologue_end", self, loop_data=self.loop_data
                     )  # type: ignore
 
+    def streaming_target(self) -> "Agent":
+        """The agent the context reports as streaming while this one runs.
+
+        Siblings of a call_subordinate fan-out run side by side, so their
+        superior stays the streaming agent and receives the interventions
+        until the whole fan-out has finished.
+        """
+        superior = self.data.get(Agent.DATA_NAME_SUPERIOR, None)
+        fan_out = superior.data.get(Agent.DATA_NAME_SUBORDINATES, None) if superior else None
+        if fan_out and fan_out.get(self):
+            return superior
+        return self
+
     @extension.extensible
     async def prepare_prompt(self, loop_data: LoopData) -> list[BaseMessage]:
         self.context.log.set_progress("Building prompt")
@@ -555,27 +621,34 @@ class Agent:
         # concatenate system prompt
         system_text = "\n\n".join(loop_data.system)
 
-        # join extras
+        # join extras, most stable first so per-iteration values come last
         extras = history.Message(  # type: ignore[abstract]
             False,
             content=self.read_prompt(
                 "agent.context.extras.md",
                 extras=dirty_json.stringify(
-                    {**loop_data.extras_persistent, **loop_data.extras_temporary}
+                    prompt_cache.order_extras(
+                        loop_data.extras_persistent, loop_data.extras_temporary
+                    )
                 ),
             ),
         ).output()
         loop_data.extras_temporary.clear()
 
-        # convert history + extras to LLM format
+        # convert history and extras to LLM format separately, extras stay out of the cached prefix
         history_langchain: list[BaseMessage] = history.output_langchain(
-            loop_data.history_output + extras
+            loop_data.history_output
         )
+        extras_langchain: list[BaseMessage] = [
+            prompt_cache.mark_volatile(message)
+            for message in history.output_langchain(extras)
+        ]
 
-        # build full prompt from system prompt, message history and extrS
+        # build full prompt from system prompt, message history and extras
         full_prompt: list[BaseMessage] = [
             SystemMessage(content=system_text),
             *history_langchain,
+            *extras_langchain,
         ]
         full_text = ChatPromptTemplate.from_messages(full_prompt).format()
 
@@ -808,11 +881,15 @@ class Agent:
             "reasoning_callback": reasoning_callback,
             "background": background,
             "explicit_caching": explicit_caching,
+            "usage": None,
         }
         await extension.call_extensions_async(
             "chat_model_call_before", self, call_data=call_data
         )
 
+        async def usage_callback(usage: prompt_cache.PromptCacheUsage):
+            call_data["usage"] = usage
+
         # call model
         response, reasoning = await call_data["model"].unified_call(
             messages=call_data["messages"],
@@ -821,6 +898,7 @@ class Agent:
             rate_limiter_callback=(
                 self.rate_limiter_callback if not call_data["background"] else None
             ),
+            usage_callback=usage_callback,
             explicit_caching=call_data["explicit_caching"],
         )
 
@@ -917,39 +995,40 @@ class Agent:
 
             if tool:
                 self.loop_data.current_tool = tool  # type: ignore
-                try:
-                    await self.handle_intervention()
+                with loop_monitor.activity(tool=tool_name, context=self.context.id):
+                    try:
+                        await self.handle_intervention()
 
-                    # Call tool hooks for compatibility
-                    await tool.before_execution(**tool_args)
-                    await self.handle_intervention()
+                        # Call tool hooks for compatibility
+                        await tool.before_execution(**tool_args)
+                        await self.handle_intervention()
 
-                    # Allow extensions to preprocess tool arguments
-                    await extension.call_extensions_async(
-                        "tool_execute_before",
-                        self,
-                        tool_args=tool_args or {},
-                        tool_name=tool_name,
-                    )
+                        # Allow extensions to preprocess tool arguments
+                        await extension.call_extensions_async(
+                            "tool_execute_before",
+                            self,
+                            tool_args=tool_args or {},
+                            tool_name=tool_name,
+                        )
 
-                    response = await tool.execute(**tool_args)
-                    await self.handle_intervention()
+                        response = await tool.execute(**tool_args)
+                        await self.handle_intervention()
 
-                    # Allow extensions to postprocess tool response
-                    await extension.call_extensions_async(
-                        "tool_execute_after",
-                        self,
-                        response=response,
-                        tool_name=tool_name,
-                    )
+                        # Allow extensions to postprocess tool response
+                        await extension.call_extensions_async(
+                            "tool_execute_after",
+                            self,
+                            response=response,
+                            tool_name=tool_name,
+                        )
 
-                    await tool.after_execution(response)
-                    await self.handle_intervention()
+                        await tool.after_execution(response)
+                        await self.handle_intervention()
 
-                    if response.break_loop:
-                        return response.message
-                finally:
-                    self.loop_data.current_tool = None
+                        if response.break_loop:
+                            return response.message
+                    finally:
+                        self.loop_data.current_tool = None
             else:
                 error_detail = (
                     f"Tool '{raw_tool_name}' not found or could not be initialized."
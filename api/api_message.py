@@ -4,7 +4,7 @@ import uuid
 from datetime import datetime, timezone
 from agent import AgentContext, UserMessage, AgentContextType
 from helpers.api import ApiHandler, Request, Response
-from helpers import files, projects
+from helpers import admission, files, projects
 from helpers.print_style import PrintStyle
 from helpers.projects import activate_project
 from helpers.security import safe_filename
@@ -150,7 +150,8 @@ class ApiMessage(ApiHandler):
             )
 
             # Send message to agent
-            task = context.communicate(UserMessage(message=message, attachments=attachment_paths, id=msg_id))
+            with admission.source(admission.SOURCE_API):
+                task = context.communicate(UserMessage(message=message, attachments=attachment_paths, id=msg_id))
             result = await task.result()
 
             return {
@@ -158,6 +159,8 @@ class ApiMessage(ApiHandler):
                 "response": result
             }
 
+        except admission.AdmissionRejected:
+            raise  # answered with 429 and Retry-After by ApiHandler
         except Exception as e:
             PrintStyle.error(f"External API error: {e}")
             return Response(f'{{"error": "{str(e)}"}}', status=500, mimetype="application/json")
@@ -0,0 +1,33 @@
+from helpers.api import ApiHandler, Request, Response
+from helpers import admission, defer
+
+
+class EventLoops(ApiHandler):
+
+    @classmethod
+    def get_methods(cls) -> list[str]:
+        return ["GET", "POST"]
+
+    @classmethod
+    def supports_native_asgi(cls) -> bool:
+        return True
+
+    async def process(self, input: dict, request: Request) -> dict | Response:
+        timeout = float(input.get("timeout", 1.0))
+        pool = defer.EventLoopPool.get("AgentContext")
+        pooled = await pool.diagnostics(timeout)
+        names = {loop["name"] for loop in pooled}
+        others = [
+            await defer.loop_stats(name, timeout)
+            for name in defer.loop_thread_names()
+            if name not in names
+        ]
+        return {
+            "agent_loops": {
+                "size": pool.size,
+                "assignment": pool.assignment,
+                "loops": pooled,
+            },
+            "other_loops": others,
+            "admission": admission.get_controller().snapshot(),
+        }
@@ -1,9 +1,14 @@
+import asyncio
 import os
 from helpers.api import ApiHandler, Input, Output, Request, Response
 from helpers import files, runtime
 from typing import TypedDict
 
 class FileInfoApi(ApiHandler):
+    @classmethod
+    def supports_native_asgi(cls) -> bool:
+        return True
+
     async def process(self, input: Input, request: Request) -> Output:
         path = input.get("path", "")
         info = await runtime.call_development_function(get_file_info, path)
@@ -26,6 +31,10 @@ class FileInfo(TypedDict):
     message: str
 
 async def get_file_info(path: str) -> FileInfo:
+    # the stat calls run off the event loop serving native handlers
+    return await asyncio.to_thread(_get_file_info, path)
+
+def _get_file_info(path: str) -> FileInfo:
     abs_path = files.get_abs_path(path)
     exists = os.path.exists(abs_path)
     message = ""
@@ -1,9 +1,14 @@
+import asyncio
 from helpers.api import ApiHandler, Request, Response
 from helpers.file_browser import FileBrowser
 from helpers import runtime, files
 
 class GetWorkDirFiles(ApiHandler):
 
+    @classmethod
+    def supports_native_asgi(cls) -> bool:
+        return True
+
     @classmethod
     def get_methods(cls):
         return ["GET"]
@@ -17,13 +22,27 @@ class GetWorkDirFiles(ApiHandler):
             #     current_path = "root"
             current_path = "/a0"
 
+        # paging, sort and filter are optional; without "limit" the whole
+        # directory is returned in one response
+        params = {
+            key: request.args[key]
+            for key in ("cursor", "limit", "sort", "order", "query")
+            if request.args.get(key)
+        }
+        if "limit" in params:
+            try:
+                params["limit"] = int(params["limit"])
+            except ValueError:
+                return Response("limit must be an integer", status=400)
+
         # browser = FileBrowser()
         # result = browser.get_files(current_path)
-        result = await runtime.call_development_function(get_files, current_path)
+        result = await runtime.call_development_function(get_files, current_path, **params)
 
         return {"data": result}
 
 
-async def get_files(path):
+async def get_files(path, **params):
+    # scandir, stat and sort run off the event loop serving native handlers
     browser = FileBrowser()
-    return browser.get_files(path)
+    return await asyncio.to_thread(browser.get_files, path, **params)
@@ -0,0 +1,18 @@
+from helpers.api import ApiHandler, Request, Response
+from helpers import loop_monitor
+
+
+class LoopMonitor(ApiHandler):
+
+    @classmethod
+    def get_methods(cls) -> list[str]:
+        return ["GET", "POST"]
+
+    @classmethod
+    def supports_native_asgi(cls) -> bool:
+        return True
+
+    async def process(self, input: dict, request: Request) -> dict | Response:
+        if input.get("reset"):
+            loop_monitor.reset_stats()
+        return {"enabled": loop_monitor.enabled(), **loop_monitor.get_stats()}
@@ -2,12 +2,17 @@ from agent import AgentContext, UserMessage
 from helpers.api import ApiHandler, Request, Response
 
 from helpers import files, extension, message_queue as mq
+import asyncio
 import os
 from helpers.security import safe_filename
 from helpers.defer import DeferredTask
 
 
 class Message(ApiHandler):
+    @classmethod
+    def supports_native_asgi(cls) -> bool:
+        return True
+
     async def process(self, input: dict, request: Request) -> dict | Response:
         task, context = await self.communicate(input=input, request=request)
         return await self.respond(task, context)
@@ -19,6 +24,26 @@ class Message(ApiHandler):
             "context": context.id,
         }
 
+    @staticmethod
+    def save_attachments(attachments: list) -> list[str]:
+        attachment_paths = []
+
+        upload_folder_int = "/a0/usr/uploads"
+        upload_folder_ext = files.get_abs_path("usr/uploads") # for development environment
+
+        if attachments:
+            os.makedirs(upload_folder_ext, exist_ok=True)
+            for attachment in attachments:
+                if attachment.filename is None:
+                    continue
+                filename = safe_filename(attachment.filename)
+                if not filename:
+                    continue
+                save_path = files.get_abs_path(upload_folder_ext, filename)
+                attachment.save(save_path)
+                attachment_paths.append(os.path.join(upload_folder_int, filename))
+        return attachment_paths
+
     async def communicate(self, input: dict, request: Request):
         # Handle both JSON and multipart/form-data
         if request.content_type.startswith("multipart/form-data"):
@@ -26,22 +51,8 @@ class Message(ApiHandler):
             ctxid = request.form.get("context", "")
             message_id = request.form.get("message_id", None)
             attachments = request.files.getlist("attachments")
-            attachment_paths = []
-
-            upload_folder_int = "/a0/usr/uploads"
-            upload_folder_ext = files.get_abs_path("usr/uploads") # for development environment
-
-            if attachments:
-                os.makedirs(upload_folder_ext, exist_ok=True)
-                for attachment in attachments:
-                    if attachment.filename is None:
-                        continue
-                    filename = safe_filename(attachment.filename)
-                    if not filename:
-                        continue
-                    save_path = files.get_abs_path(upload_folder_ext, filename)
-                    attachment.save(save_path)
-                    attachment_paths.append(os.path.join(upload_folder_int, filename))
+            # file writes must not block the event loop on the native ASGI path
+            attachment_paths = await asyncio.to_thread(self.save_attachments, attachments)
         else:
             # Handle JSON request as before
             input_data = request.get_json()
@@ -53,8 +64,10 @@ class Message(ApiHandler):
         # Now process the message
         message = text
 
-        # Obtain agent context
-        context = self.use_context(ctxid)
+        # Obtain agent context; use_context waits on the handlers' thread lock
+        context = await asyncio.to_thread(self.use_context, ctxid)
+        # the worker thread ran in a copy of this task's contextvars
+        AgentContext.set_current(context.id)
 
         # call extension point, alow it to modify data
         data = { "message": message, "attachment_paths": attachment_paths }
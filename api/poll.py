@@ -5,10 +5,15 @@ from helpers.state_snapshot import build_snapshot
 
 class Poll(ApiHandler):
 
+    @classmethod
+    def supports_native_asgi(cls) -> bool:
+        return True
+
     async def process(self, input: dict, request: Request) -> dict | Response:
         return await build_snapshot(
             context=input.get("context"),
             log_from=input.get("log_from", 0),
             notifications_from=input.get("notifications_from", 0),
             timezone=input.get("timezone"),
+            log_deltas=input.get("log_deltas", False),
         )
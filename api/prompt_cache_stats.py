@@ -0,0 +1,22 @@
+from helpers.api import ApiHandler, Request, Response
+from helpers import prompt_cache, prompt_sections
+
+
+class PromptCacheStats(ApiHandler):
+
+    @classmethod
+    def get_methods(cls) -> list[str]:
+        return ["GET", "POST"]
+
+    @classmethod
+    def supports_native_asgi(cls) -> bool:
+        return True
+
+    async def process(self, input: dict, request: Request) -> dict | Response:
+        if input.get("reset"):
+            prompt_cache.reset_stats()
+            prompt_sections.reset_stats()
+        return {
+            "models": prompt_cache.get_stats(),
+            "sections": prompt_sections.get_stats(),
+        }
@@ -0,0 +1,71 @@
+import asyncio
+from typing import ClassVar
+
+from helpers import kokoro_tts
+from helpers.errors import format_error
+from helpers.print_style import PrintStyle
+from helpers.ws import WsHandler
+
+
+class WsSynthesize(WsHandler):
+    """Streams Kokoro speech to the client sentence by sentence.
+
+    ``synthesize_start`` (``stream`` id chosen by the client, ``text``)
+    starts synthesis; every sentence comes back as a ``synthesize_event``
+    of type ``audio`` (base64 WAV) as soon as it is ready, then ``done`` or
+    ``error``. ``synthesize_cancel`` stops it, as does a disconnect.
+    """
+
+    _tasks: ClassVar[dict[str, dict[str, asyncio.Task]]] = {}
+
+    async def process(self, event: str, data: dict, sid: str) -> dict | None:
+        stream_id = str(data.get("stream", ""))
+        if event == "synthesize_start":
+            if not stream_id:
+                return {"ok": False, "error": "missing stream id"}
+            self._cancel(sid, stream_id)
+            sentences = kokoro_tts.split_sentences(str(data.get("text", "")))
+            task = asyncio.create_task(self._forward(sid, stream_id, sentences))
+            self._tasks.setdefault(sid, {})[stream_id] = task
+            task.add_done_callback(lambda _: self._drop(sid, stream_id, task))
+            return {"ok": True, "stream": stream_id}
+        if event == "synthesize_cancel":
+            self._cancel(sid, stream_id)
+        return None
+
+    async def on_disconnect(self, sid: str) -> None:
+        for task in self._tasks.pop(sid, {}).values():
+            task.cancel()
+
+    async def _forward(self, sid: str, stream_id: str, sentences: list[str]) -> None:
+        try:
+            try:
+                async for chunk in kokoro_tts.synthesize_stream(sentences):
+                    await self.emit_to(
+                        sid, "synthesize_event", {"stream": stream_id, "type": "audio", **chunk}
+                    )
+                await self.emit_to(sid, "synthesize_event", {"stream": stream_id, "type": "done"})
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                await self.emit_to(
+                    sid,
+                    "synthesize_event",
+                    {"stream": stream_id, "type": "error", "error": str(e)},
+                )
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            PrintStyle.error(f"Speech stream error: {format_error(e)}")
+
+    def _cancel(self, sid: str, stream_id: str) -> None:
+        task = self._tasks.get(sid, {}).get(stream_id)
+        if task is not None:
+            task.cancel()
+
+    def _drop(self, sid: str, stream_id: str, task: asyncio.Task) -> None:
+        tasks = self._tasks.get(sid)
+        if tasks is not None and tasks.get(stream_id) is task:
+            del tasks[stream_id]
+            if not tasks:
+                del self._tasks[sid]
@@ -0,0 +1,89 @@
+import asyncio
+import base64
+from typing import ClassVar
+
+from helpers import settings, whisper
+from helpers.errors import format_error
+from helpers.print_style import PrintStyle
+from helpers.whisper_worker import TranscriptionError, TranscriptionStream, WorkerBusy
+from helpers.ws import WsHandler
+
+
+class WsTranscribe(WsHandler):
+    """Streams microphone audio into the transcription worker.
+
+    ``transcribe_start`` opens a stream, ``transcribe_chunk`` carries base64
+    16 kHz mono PCM16, ``transcribe_end`` asks for the final result and
+    ``transcribe_cancel`` drops it. Segments come back as
+    ``transcribe_event`` (``partial``, ``final``, ``done`` or ``error``).
+    Streams of a disconnected client are cancelled.
+    """
+
+    _streams: ClassVar[dict[str, dict[str, TranscriptionStream]]] = {}
+    _forwarders: ClassVar[set[asyncio.Task]] = set()
+
+    async def process(self, event: str, data: dict, sid: str) -> dict | None:
+        if event == "transcribe_start":
+            return await self._start(sid)
+
+        stream = self._streams.get(sid, {}).get(str(data.get("stream", "")))
+        if stream is None:
+            if event in ("transcribe_chunk", "transcribe_end"):
+                return {"ok": False, "error": "unknown stream"}
+            return None
+
+        try:
+            if event == "transcribe_chunk":
+                await stream.feed(base64.b64decode(data.get("audio", "")))
+            elif event == "transcribe_end":
+                await stream.finish()
+                return {"ok": True, "stream": stream.id}
+            elif event == "transcribe_cancel":
+                self._drop(sid, stream)
+                stream.cancel()
+        except WorkerBusy as e:
+            self._drop(sid, stream)
+            stream.cancel()
+            return {"ok": False, "error": str(e)}
+        return None
+
+    async def on_disconnect(self, sid: str) -> None:
+        for stream in self._streams.pop(sid, {}).values():
+            stream.cancel()
+
+    async def _start(self, sid: str) -> dict:
+        set = settings.get_settings()
+        try:
+            stream = await whisper.open_stream(
+                set["stt_model_size"],
+                silence_threshold=set.get("stt_silence_threshold"),
+            )
+        except WorkerBusy as e:
+            return {"ok": False, "error": str(e)}
+        self._streams.setdefault(sid, {})[stream.id] = stream
+        task = asyncio.create_task(self._forward(sid, stream))
+        self._forwarders.add(task)
+        task.add_done_callback(self._forwarders.discard)
+        return {"ok": True, "stream": stream.id}
+
+    async def _forward(self, sid: str, stream: TranscriptionStream) -> None:
+        try:
+            try:
+                async for event in stream.events():
+                    await self.emit_to(sid, "transcribe_event", {"stream": stream.id, **event})
+            except TranscriptionError as e:
+                await self.emit_to(
+                    sid, "transcribe_event", {"stream": stream.id, "type": "error", "error": str(e)}
+                )
+        except Exception as e:
+            PrintStyle.error(f"Transcription stream error: {format_error(e)}")
+            stream.cancel()
+        finally:
+            self._drop(sid, stream)
+
+    def _drop(self, sid: str, stream: TranscriptionStream) -> None:
+        streams = self._streams.get(sid)
+        if streams is not None and streams.get(stream.id) is stream:
+            del streams[stream.id]
+            if not streams:
+                del self._streams[sid]
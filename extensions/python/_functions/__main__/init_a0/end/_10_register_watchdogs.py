@@ -6,6 +6,8 @@ class RegisterWatchDogs(Extension):
     def execute(self, **kwargs):
         from helpers.plugins import register_watchdogs as register_plugins_watchdogs
         from helpers.api import register_watchdogs as register_api_watchdogs
+        from helpers.file_browser import register_watchdogs as register_file_browser_watchdogs
 
         register_plugins_watchdogs()
-        register_api_watchdogs()
\ No newline at end of file
+        register_api_watchdogs()
+        register_file_browser_watchdogs()
\ No newline at end of file
@@ -0,0 +1,18 @@
+from helpers.extension import Extension
+from tools.call_subordinate import FanOut
+from agent import Agent, LoopData
+
+
+class SubordinateBudget(Extension):
+
+    async def execute(self, loop_data: LoopData = LoopData(), **kwargs):
+        if not self.agent or not self.agent.number:
+            return
+
+        # charge fan-out siblings' prompts against their shared token budget,
+        # the fan-out cancels the siblings once it is spent
+        fan_out = FanOut.of(self.agent)
+        if not fan_out:
+            return
+        ctx_window = self.agent.get_data(Agent.DATA_NAME_CTX_WINDOW) or {}
+        fan_out.charge(self.agent, int(ctx_window.get("tokens", 0)))
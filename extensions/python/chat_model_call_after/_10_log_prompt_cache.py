@@ -0,0 +1,18 @@
+from helpers.extension import Extension
+
+
+class LogPromptCache(Extension):
+
+    async def execute(self, call_data: dict = {}, **kwargs):
+        if not self.agent:
+            return
+
+        usage = call_data.get("usage")
+        if not usage or call_data.get("background"):
+            return
+
+        # attach prompt cache usage to the agent message of this loop iteration
+        log_item = self.agent.loop_data.params_temporary.get("log_item_generating")
+        if not log_item:
+            return
+        log_item.update(kvps={**(log_item.kvps or {}), "prompt_cache": usage.to_dict()})
@@ -2,7 +2,7 @@ import os
 from typing import Any
 
 from helpers.extension import Extension, extensible
-from helpers import files, subagents
+from helpers import files, projects, prompt_sections, subagents
 from helpers.print_style import PrintStyle
 from agent import Agent, LoopData
 
@@ -26,6 +26,13 @@ class ToolsPrompt(Extension):
 
 @extensible
 async def build_prompt(agent: Agent) -> str:
+    # templates are only re-read when their files, kwargs or model vision change
+    return await prompt_sections.memoized(
+        "tools", agent, _tools_inputs(agent), lambda: _build_tools_prompt(agent)
+    )
+
+
+async def _build_tools_prompt(agent: Agent) -> str:
     # collect tool files from all prompt directories
     prompt_dirs = subagents.get_paths(agent, "prompts")
     tool_files = files.get_unique_filenames_in_dirs(
@@ -49,10 +56,34 @@ async def build_prompt(agent: Agent) -> str:
     prompt = agent.read_prompt("agent.system.tools.md", tools=tools_str)
 
     # vision support
+    if _vision_enabled(agent):
+        prompt += "\n\n" + agent.read_prompt("agent.system.tools_vision.md")
+
+    return prompt
+
+
+def _vision_enabled(agent: Agent) -> bool:
     from plugins._model_config.helpers.model_config import get_chat_model_config
 
     chat_cfg = get_chat_model_config(agent)
-    if chat_cfg.get("vision", False):
-        prompt += "\n\n" + agent.read_prompt("agent.system.tools_vision.md")
+    return bool(chat_cfg.get("vision", False))
 
-    return prompt
+
+def _tools_inputs(agent: Agent) -> prompt_sections.SectionInputs:
+    inputs = prompt_sections.SectionInputs()
+    # tool templates, their variable plugins and includes
+    inputs.files(
+        subagents.get_paths(agent, "prompts"),
+        ("agent.system.tool", "agent.system.response_tool_tips"),
+    )
+    # subordinate profiles listed by the call_subordinate tool prompt
+    for root in subagents.get_agents_roots():
+        inputs.files(
+            [files.get_abs_path(root, subdir) for subdir in files.get_subdirectories(root)],
+            "agent.",
+        )
+    project_name = projects.get_context_project_name(agent.context)
+    if project_name:
+        inputs.paths(projects.get_project_meta(project_name, "agents.json"))
+    inputs.value(agent.get_data(TOOL_KWARGS_KEY) or {}, _vision_enabled(agent))
+    return inputs
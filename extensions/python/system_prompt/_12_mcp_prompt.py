@@ -1,7 +1,8 @@
 from typing import Any
 
 from helpers.extension import Extension, extensible
-from helpers.mcp_handler import MCPConfig
+from helpers import prompt_sections
+from helpers.mcp_handler import MCPConfig, get_tools_version
 from agent import Agent, LoopData
 
 
@@ -26,6 +27,14 @@ async def build_prompt(agent: Agent) -> str:
     if not mcp_config.servers:
         return ""
 
+    # tool schemas are only serialized again after servers or tool lists change
+    inputs = prompt_sections.SectionInputs().value(get_tools_version())
+    return await prompt_sections.memoized(
+        "mcp_tools", agent, inputs, lambda: _build_tools_prompt(agent, mcp_config)
+    )
+
+
+async def _build_tools_prompt(agent: Agent, mcp_config: MCPConfig) -> str:
     pre_progress = agent.context.log.progress
     agent.context.log.set_progress("Collecting MCP tools")
     tools = mcp_config.get_tools_prompt()
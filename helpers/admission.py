@@ -0,0 +1,308 @@
+"""Global admission control for agent runs.
+
+Every entry point that starts an agent run (web UI, external API, A2A, MCP,
+scheduler, integrations) takes a slot from one shared controller first, so a
+burst on one of them queues or is turned away instead of piling unbounded
+monologues onto the agent loops and the model's rate limits.
+
+Slots are bounded globally (``A0_MAX_AGENT_RUNS``) and per source
+(``A0_MAX_AGENT_RUNS_<SOURCE>``, e.g. ``A0_MAX_AGENT_RUNS_A2A``). Work that
+cannot start waits in a bounded queue (``A0_AGENT_RUN_QUEUE``): interactive
+UI runs go first, then remote API/A2A/MCP calls, then scheduled and other
+background work, and sources of the same priority take turns. When the
+queue is full the request is rejected with a ``Retry-After`` estimate;
+interactive runs are never rejected, only queued. A limit of 0 means
+unlimited.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator, TypeVar
+
+from helpers.dotenv import get_dotenv_int
+
+T = TypeVar("T")
+
+SOURCE_UI = "ui"
+SOURCE_API = "api"
+SOURCE_A2A = "a2a"
+SOURCE_MCP = "mcp"
+SOURCE_SCHEDULER = "scheduler"
+SOURCE_BACKGROUND = "background"
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_REMOTE = 1
+PRIORITY_BACKGROUND = 2
+
+SOURCE_PRIORITIES = {
+    SOURCE_UI: PRIORITY_INTERACTIVE,
+    SOURCE_API: PRIORITY_REMOTE,
+    SOURCE_A2A: PRIORITY_REMOTE,
+    SOURCE_MCP: PRIORITY_REMOTE,
+    SOURCE_SCHEDULER: PRIORITY_BACKGROUND,
+    SOURCE_BACKGROUND: PRIORITY_BACKGROUND,
+}
+
+MAX_RUNS_ENV = "A0_MAX_AGENT_RUNS"
+SOURCE_MAX_RUNS_ENV = "A0_MAX_AGENT_RUNS_{source}"
+QUEUE_SIZE_ENV = "A0_AGENT_RUN_QUEUE"
+DEFAULT_MAX_RUNS = 8
+DEFAULT_QUEUE_SIZE = 32
+
+# Until runs have finished, estimate waits from this typical run length.
+INITIAL_RUN_SECONDS = 30.0
+RUN_SECONDS_SMOOTHING = 0.2
+MIN_RETRY_AFTER = 1
+MAX_RETRY_AFTER = 300
+
+WAITING = "waiting"
+RUNNING = "running"
+DONE = "done"
+
+_source: ContextVar[str | None] = ContextVar("admission_source", default=None)
+
+
+class AdmissionRejected(RuntimeError):
+    """The run queue is full; the caller should retry after ``retry_after`` seconds."""
+
+    def __init__(self, source: str, retry_after: int, queued: int):
+        self.source = source
+        self.retry_after = retry_after
+        self.queued = queued
+        super().__init__(
+            f"Agent Zero is busy ({queued} runs already waiting); "
+            f"retry after {retry_after} seconds."
+        )
+
+
+@dataclass(eq=False)
+class Ticket:
+    source: str
+    priority: int
+    seq: int
+    queued_at: float = field(default_factory=time.monotonic)
+    started_at: float = 0.0
+    state: str = WAITING
+    future: Future[None] = field(default_factory=Future, repr=False)
+
+    @property
+    def granted(self) -> bool:
+        return self.state != WAITING
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_runs: int = DEFAULT_MAX_RUNS,
+        source_limits: dict[str, int] | None = None,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+    ):
+        self.max_runs = max(0, max_runs)
+        self.source_limits = dict(source_limits or {})
+        self.queue_size = max(0, queue_size)
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        self._running: dict[str, int] = {}
+        self._total_running = 0
+        # priority -> source -> waiting tickets; source order is the round-robin turn
+        self._waiting: dict[int, OrderedDict[str, deque[Ticket]]] = {}
+        self._queued = 0
+        self._run_seconds = INITIAL_RUN_SECONDS
+        self._rejected = 0
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        max_runs = get_dotenv_int(MAX_RUNS_ENV, DEFAULT_MAX_RUNS)
+        # remote and background sources get half the slots each by default,
+        # so one burst cannot starve the UI and the other sources
+        share = max(1, max_runs // 2) if max_runs else 0
+        limits = {
+            source: get_dotenv_int(
+                SOURCE_MAX_RUNS_ENV.format(source=source.upper()),
+                0 if priority == PRIORITY_INTERACTIVE else share,
+            )
+            for source, priority in SOURCE_PRIORITIES.items()
+        }
+        return cls(max_runs, limits, get_dotenv_int(QUEUE_SIZE_ENV, DEFAULT_QUEUE_SIZE))
+
+    def request(self, source: str, priority: int | None = None) -> Ticket:
+        """Take a slot for ``source`` or a place in the queue.
+
+        Raises :class:`AdmissionRejected` when the run has to wait and the
+        queue is already full (never for interactive runs).
+        """
+        if priority is None:
+            priority = SOURCE_PRIORITIES.get(source, PRIORITY_BACKGROUND)
+        with self._lock:
+            ticket = Ticket(source, priority, next(self._seq))
+            self._waiting.setdefault(priority, OrderedDict()).setdefault(source, deque()).append(ticket)
+            self._queued += 1
+            self._dispatch_locked()
+            if (
+                not ticket.granted
+                and priority != PRIORITY_INTERACTIVE
+                and self._queued > self.queue_size
+            ):
+                self._unqueue_locked(ticket)
+                self._rejected += 1
+                raise AdmissionRejected(source, self._retry_after_locked(), self._queued)
+        return ticket
+
+    async def wait(self, ticket: Ticket) -> None:
+        """Wait until ``ticket`` may run; cancelling the wait gives up its place."""
+        try:
+            await asyncio.wrap_future(ticket.future)
+        except BaseException:
+            self.release(ticket)
+            raise
+
+    def release(self, ticket: Ticket) -> None:
+        """Finish a run or withdraw a waiting ticket; safe to call twice."""
+        with self._lock:
+            if ticket.state == WAITING:
+                self._unqueue_locked(ticket)
+                ticket.future.cancel()
+            elif ticket.state == RUNNING:
+                self._running[ticket.source] -= 1
+                self._total_running -= 1
+                elapsed = time.monotonic() - ticket.started_at
+                self._run_seconds += RUN_SECONDS_SMOOTHING * (elapsed - self._run_seconds)
+            ticket.state = DONE
+            self._dispatch_locked()
+
+    def position(self, ticket: Ticket) -> int:
+        """Queued tickets ahead of ``ticket`` by priority and arrival (0 once granted)."""
+        with self._lock:
+            if ticket.granted:
+                return 0
+            return sum(
+                1
+                for priority, sources in self._waiting.items()
+                for queue in sources.values()
+                for other in queue
+                if (other.priority, other.seq) < (ticket.priority, ticket.seq)
+            )
+
+    def retry_after(self) -> int:
+        with self._lock:
+            return self._retry_after_locked()
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            queued: dict[str, int] = {}
+            for sources in self._waiting.values():
+                for source, queue in sources.items():
+                    if queue:
+                        queued[source] = queued.get(source, 0) + len(queue)
+            return {
+                "max_runs": self.max_runs,
+                "queue_size": self.queue_size,
+                "source_limits": dict(self.source_limits),
+                "running": self._total_running,
+                "running_by_source": {k: v for k, v in self._running.items() if v},
+                "queued": self._queued,
+                "queued_by_source": queued,
+                "rejected": self._rejected,
+                "retry_after": self._retry_after_locked(),
+            }
+
+    def _dispatch_locked(self) -> None:
+        for priority in sorted(self._waiting):
+            sources = self._waiting[priority]
+            granted = True
+            while granted and self._has_capacity_locked():
+                granted = False
+                for source in list(sources):
+                    queue = sources[source]
+                    if not queue or not self._source_has_capacity_locked(source):
+                        continue
+                    ticket = queue.popleft()
+                    self._queued -= 1
+                    granted = True
+                    if not ticket.future.set_running_or_notify_cancel():
+                        break  # its waiter went away; look again
+                    sources.move_to_end(source)  # next grant goes to another source
+                    self._running[source] = self._running.get(source, 0) + 1
+                    self._total_running += 1
+                    ticket.state = RUNNING
+                    ticket.started_at = time.monotonic()
+                    ticket.future.set_result(None)
+                    break
+            if not self._has_capacity_locked():
+                return
+
+    def _has_capacity_locked(self) -> bool:
+        return not self.max_runs or self._total_running < self.max_runs
+
+    def _source_has_capacity_locked(self, source: str) -> bool:
+        limit = self.source_limits.get(source, 0)
+        return not limit or self._running.get(source, 0) < limit
+
+    def _unqueue_locked(self, ticket: Ticket) -> None:
+        queue = self._waiting.get(ticket.priority, {}).get(ticket.source)
+        if queue and ticket in queue:
+            queue.remove(ticket)
+            self._queued -= 1
+
+    def _retry_after_locked(self) -> int:
+        slots = self.max_runs or max(1, self._total_running)
+        estimate = self._run_seconds * (self._queued / slots + 1)
+        return max(MIN_RETRY_AFTER, min(MAX_RETRY_AFTER, math.ceil(estimate)))
+
+
+_controller: AdmissionController | None = None
+_controller_lock = threading.Lock()
+
+
+def get_controller() -> AdmissionController:
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            _controller = AdmissionController.from_env()
+        return _controller
+
+
+@contextmanager
+def source(name: str) -> Iterator[None]:
+    """Attribute agent runs started inside this block to ``name``."""
+    token = _source.set(name)
+    try:
+        yield
+    finally:
+        _source.reset(token)
+
+
+def current_source(default: str = SOURCE_UI) -> str:
+    return _source.get() or default
+
+
+@asynccontextmanager
+async def admitted(name: str, priority: int | None = None) -> AsyncIterator[Ticket]:
+    """Hold a run slot for the body of the block, waiting in the queue if needed."""
+    controller = get_controller()
+    ticket = controller.request(name, priority)
+    try:
+        await controller.wait(ticket)
+        yield ticket
+    finally:
+        controller.release(ticket)
+
+
+async def run_admitted(ticket: Ticket, func: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+    """Run ``func`` once ``ticket`` is granted, freeing the slot when it ends."""
+    controller = get_controller()
+    try:
+        await controller.wait(ticket)
+        return await func(*args, **kwargs)
+    finally:
+        controller.release(ticket)
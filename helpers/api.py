@@ -18,7 +18,7 @@ from flask import (
 from werkzeug.wrappers.response import Response as BaseResponse
 from helpers.print_style import PrintStyle
 from helpers.errors import format_error
-from helpers import files, cache
+from helpers import admission, files, cache
 
 ThreadLockType = Union[threading.Lock, threading.RLock]
 
@@ -54,6 +54,15 @@ class ApiHandler:
     def requires_csrf(cls) -> bool:
         return cls.requires_auth()
 
+    @classmethod
+    def supports_native_asgi(cls) -> bool:
+        """Serve this handler on the event loop without the Flask WSGI bridge.
+
+        Opt in only when ``process`` sticks to the request surface mirrored by
+        ``helpers.api_asgi.NativeRequest`` and never blocks the event loop.
+        """
+        return False
+
     @abstractmethod
     async def process(self, input: Input, request: Request) -> Output:
         pass
@@ -87,6 +96,14 @@ class ApiHandler:
                     response=response_json, status=200, mimetype="application/json"
                 )
 
+        except admission.AdmissionRejected as e:
+            return Response(
+                response=json.dumps({"error": str(e), "retry_after": e.retry_after}),
+                status=429,
+                headers={"Retry-After": str(e.retry_after)},
+                mimetype="application/json",
+            )
+
             # return exceptions with 500
         except Exception as e:
             error = format_error(e)
@@ -164,42 +181,55 @@ def csrf_protect(f):
     return decorated
 
 
-def register_api_route(app: Flask, lock: ThreadLockType) -> None:
+def resolve_api_handler(path: str) -> type[ApiHandler] | None:
     from helpers.modules import load_classes_from_file
     from helpers import plugins
 
+    cache_key = f"class:{path}"
+    cached = cache.get(CACHE_AREA, cache_key)
+    if cached is not None:
+        return cached
+
+    # Resolve file path for the handler
+    # Try built-in api folder first, then plugin api folders
+    handler_cls: type[ApiHandler] | None = None
+
+    # Check built-in python/api/<path>.py
+    builtin_file = files.get_abs_path(f"api/{path}.py")
+    if files.is_in_dir(builtin_file, files.get_abs_path("api")) and files.exists(
+        builtin_file
+    ):
+        classes = load_classes_from_file(builtin_file, ApiHandler)
+        if classes:
+            handler_cls = classes[0]
+
+    # Check plugin api folders: path format plugins/<plugin_name>/<handler>
+    if handler_cls is None and path.startswith("plugins/"):
+        parts = path.split("/", 2)
+        if len(parts) == 3:
+            _, plugin_name, handler_name = parts
+            plugin_dir = plugins.find_plugin_dir(plugin_name)
+            if plugin_dir:
+                plugin_file = Path(plugin_dir) / "api" / f"{handler_name}.py"
+                if plugin_file.is_file():
+                    classes = load_classes_from_file(str(plugin_file), ApiHandler)
+                    if classes:
+                        handler_cls = classes[0]
+
+    if handler_cls is not None:
+        cache.add(CACHE_AREA, cache_key, handler_cls)
+    return handler_cls
+
+
+def register_api_route(app: Flask, lock: ThreadLockType) -> None:
+
     async def _dispatch(path: str) -> BaseResponse:
         # Return cached wrapped handler if available
         cached = cache.get(CACHE_AREA, path)
         if cached is not None:
             return await cached()
 
-        # Resolve file path for the handler
-        # Try built-in api folder first, then plugin api folders
-        handler_cls: type[ApiHandler] | None = None
-
-        # Check built-in python/api/<path>.py
-        builtin_file = files.get_abs_path(f"api/{path}.py")
-        if files.is_in_dir(builtin_file, files.get_abs_path("api")) and files.exists(
-            builtin_file
-        ):
-            classes = load_classes_from_file(builtin_file, ApiHandler)
-            if classes:
-                handler_cls = classes[0]
-
-        # Check plugin api folders: path format plugins/<plugin_name>/<handler>
-        if handler_cls is None and path.startswith("plugins/"):
-            parts = path.split("/", 2)
-            if len(parts) == 3:
-                _, plugin_name, handler_name = parts
-                plugin_dir = plugins.find_plugin_dir(plugin_name)
-                if plugin_dir:
-                    plugin_file = Path(plugin_dir) / "api" / f"{handler_name}.py"
-                    if plugin_file.is_file():
-                        classes = load_classes_from_file(str(plugin_file), ApiHandler)
-                        if classes:
-                            handler_cls = classes[0]
-
+        handler_cls = resolve_api_handler(path)
         if handler_cls is None:
             return Response(f"API endpoint not found: {path}", 404)
 
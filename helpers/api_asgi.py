@@ -0,0 +1,298 @@
+"""Native ASGI dispatch for ``ApiHandler`` endpoints.
+
+Handlers that opt in via ``ApiHandler.supports_native_asgi()`` are served
+directly on the uvicorn event loop. Every other ``/api/*`` request, and every
+non-API request, falls through to the Flask app behind the WSGI bridge, so the
+Flask route stays the reference implementation and the fallback.
+"""
+
+import json
+import os
+import shutil
+from typing import Any, Mapping
+
+from flask import Flask
+from flask.sessions import SecureCookieSessionInterface
+from starlette.datastructures import FormData, MultiDict, UploadFile
+from starlette.requests import Request as StarletteRequest
+from starlette.responses import PlainTextResponse, RedirectResponse, Response
+from starlette.types import ASGIApp, Receive, Scope, Send
+from werkzeug.wrappers.response import Response as BaseResponse
+
+from helpers import admission
+from helpers.api import ApiHandler, ThreadLockType, resolve_api_handler
+from helpers.errors import format_error
+from helpers.network import is_loopback_address
+from helpers.print_style import PrintStyle
+
+
+API_PREFIX = "/api/"
+NATIVE_DISPATCH_ENV = "A0_NATIVE_API_DISPATCH"
+
+
+def native_dispatch_enabled() -> bool:
+    return os.getenv(NATIVE_DISPATCH_ENV, "true").strip().lower() not in {
+        "0",
+        "false",
+        "no",
+        "off",
+    }
+
+
+def load_session(webapp: Flask, cookies: Mapping[str, str]) -> dict[str, Any]:
+    """Read-only view of the Flask signed-cookie session for ASGI handlers."""
+    serializer = SecureCookieSessionInterface().get_signing_serializer(webapp)
+    cookie = cookies.get(webapp.config["SESSION_COOKIE_NAME"])
+    if serializer is None or not cookie:
+        return {}
+    max_age = int(webapp.permanent_session_lifetime.total_seconds())
+    try:
+        data = serializer.loads(cookie, max_age=max_age)
+    except Exception:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def is_authenticated(session: Mapping[str, Any]) -> bool:
+    from helpers import login
+
+    user_pass_hash = login.get_credentials_hash()
+    return not user_pass_hash or session.get("authentication") == user_pass_hash
+
+
+class NativeUpload:
+    """Subset of ``werkzeug.datastructures.FileStorage`` used by API handlers."""
+
+    def __init__(self, upload: UploadFile):
+        self._upload = upload
+        self.filename = upload.filename
+        self.content_type = upload.content_type
+        self.stream = upload.file
+
+    def read(self, size: int = -1) -> bytes:
+        return self.stream.read(size)
+
+    def save(self, dst: str) -> None:
+        self.stream.seek(0)
+        with open(dst, "wb") as target:
+            shutil.copyfileobj(self.stream, target)
+
+
+class NativeRequest:
+    """Read-only request view mirroring the Flask ``Request`` surface that
+    native handlers may rely on. Body, JSON and form data are loaded up front
+    so handlers can keep using the synchronous Flask accessors."""
+
+    def __init__(
+        self,
+        request: StarletteRequest,
+        body: bytes,
+        form: FormData | None,
+        session: dict[str, Any],
+    ):
+        self._request = request
+        self.data = body
+        self.method = request.method
+        self.path = request.url.path
+        self.url = str(request.url)
+        self.headers = request.headers
+        self.cookies = request.cookies
+        self.args = request.query_params
+        self.content_type = request.headers.get("content-type", "")
+        self.mimetype = self.content_type.split(";", 1)[0].strip().lower()
+        self.remote_addr = request.client.host if request.client else None
+        self.session = session
+        self.form: MultiDict = MultiDict()
+        self.files: MultiDict = MultiDict()
+        if form is not None:
+            self.form = MultiDict(
+                [(key, value) for key, value in form.multi_items() if isinstance(value, str)]
+            )
+            self.files = MultiDict(
+                [
+                    (key, NativeUpload(value))
+                    for key, value in form.multi_items()
+                    if not isinstance(value, str)
+                ]
+            )
+        self._json: Any = None
+        self._json_loaded = False
+
+    @property
+    def is_json(self) -> bool:
+        return self.mimetype == "application/json" or (
+            self.mimetype.startswith("application/") and self.mimetype.endswith("+json")
+        )
+
+    def get_json(self, silent: bool = False) -> Any:
+        if not self._json_loaded:
+            self._json_loaded = True
+            try:
+                self._json = json.loads(self.data) if self.data else None
+            except ValueError:
+                if not silent:
+                    raise
+                self._json = None
+        return self._json
+
+    @property
+    def json(self) -> Any:
+        return self.get_json(silent=True) if self.is_json else None
+
+    def get_data(self, as_text: bool = False) -> bytes | str:
+        return self.data.decode("utf-8", "replace") if as_text else self.data
+
+
+class ApiAsgiDispatcher:
+    """ASGI front for ``/api/<path>``; falls back to ``fallback`` otherwise."""
+
+    def __init__(
+        self,
+        webapp: Flask,
+        lock: ThreadLockType,
+        fallback: ASGIApp,
+        *,
+        enabled: bool = True,
+    ):
+        self.webapp = webapp
+        self.lock = lock
+        self.fallback = fallback
+        self.enabled = enabled
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        handler_cls = self._native_handler(scope)
+        if handler_cls is None:
+            await self.fallback(scope, receive, send)
+            return
+        request = StarletteRequest(scope, receive)
+        response = await self.dispatch(handler_cls, request)
+        await response(scope, receive, send)
+
+    def _native_handler(self, scope: Scope) -> type[ApiHandler] | None:
+        if not self.enabled or scope["type"] != "http":
+            return None
+        path = scope.get("path", "")
+        if not path.startswith(API_PREFIX):
+            return None
+        try:
+            handler_cls = resolve_api_handler(path[len(API_PREFIX):])
+        except Exception:
+            # let the Flask route produce its usual error response
+            return None
+        if handler_cls is None or not handler_cls.supports_native_asgi():
+            return None
+        return handler_cls
+
+    async def dispatch(
+        self, handler_cls: type[ApiHandler], request: StarletteRequest
+    ) -> Response:
+        if request.method not in handler_cls.get_methods():
+            return PlainTextResponse(
+                f"Method {request.method} not allowed for: {request.url.path}", 405
+            )
+
+        session = load_session(self.webapp, request.cookies)
+        form = None
+        if request.headers.get("content-type", "").startswith(
+            ("multipart/form-data", "application/x-www-form-urlencoded")
+        ):
+            # authorize before spooling uploads, like the lazy Flask form parser
+            denied = self._check_access(
+                handler_cls, NativeRequest(request, b"", None, session)
+            )
+            if denied is not None:
+                return denied
+            form = await request.form()
+            native_request = NativeRequest(request, b"", form, session)
+        else:
+            native_request = NativeRequest(request, await request.body(), None, session)
+            denied = self._check_access(handler_cls, native_request)
+            if denied is not None:
+                return denied
+
+        try:
+            input_data: dict = {}
+            if native_request.is_json:
+                try:
+                    input_data = native_request.get_json() or {}
+                except Exception as e:
+                    PrintStyle().print(f"Error parsing JSON: {str(e)}")
+                    input_data = {}
+
+            instance = handler_cls(self.webapp, self.lock)
+            output = await instance.process(input_data, native_request)  # type: ignore[arg-type]
+            return self._to_response(output)
+        except admission.AdmissionRejected as e:
+            return Response(
+                content=json.dumps({"error": str(e), "retry_after": e.retry_after}),
+                status_code=429,
+                headers={"Retry-After": str(e.retry_after)},
+                media_type="application/json",
+            )
+        except Exception as e:
+            error = format_error(e)
+            PrintStyle.error(f"API error: {error}")
+            return PlainTextResponse(error, 500)
+        finally:
+            if form is not None:
+                await form.close()
+
+    def _check_access(
+        self, handler_cls: type[ApiHandler], request: NativeRequest
+    ) -> Response | None:
+        # same order as the Flask decorator stack: loopback, auth, api key, csrf
+        from helpers import runtime
+
+        if handler_cls.requires_loopback() and not is_loopback_address(
+            str(request.remote_addr)
+        ):
+            return PlainTextResponse("Access denied.", 403)
+
+        if handler_cls.requires_auth() and not is_authenticated(request.session):
+            return RedirectResponse("/login", 302)
+
+        if handler_cls.requires_api_key():
+            from helpers.settings import get_settings
+
+            valid_api_key = get_settings()["mcp_server_token"]
+            body = request.get_json(silent=True) if request.is_json else None
+            if api_key := request.headers.get("X-API-KEY"):
+                if api_key != valid_api_key:
+                    return PlainTextResponse("Invalid API key", 401)
+            elif isinstance(body, dict) and body.get("api_key"):
+                if body.get("api_key") != valid_api_key:
+                    return PlainTextResponse("Invalid API key", 401)
+            else:
+                return PlainTextResponse("API key required", 401)
+
+        if handler_cls.requires_csrf():
+            token = request.session.get("csrf_token")
+            sent = request.headers.get("X-CSRF-Token") or request.cookies.get(
+                "csrf_token_" + runtime.get_runtime_id()
+            )
+            if not token or not sent or token != sent:
+                return PlainTextResponse("CSRF token missing or invalid", 403)
+
+        return None
+
+    @staticmethod
+    def _to_response(output: Any) -> Response:
+        if isinstance(output, Response):
+            return output
+        if isinstance(output, BaseResponse):
+            headers = {
+                key: value
+                for key, value in output.headers.items()
+                if key.lower() not in {"content-length", "content-type"}
+            }
+            return Response(
+                content=output.get_data(),
+                status_code=output.status_code,
+                headers=headers,
+                media_type=output.content_type,
+            )
+        return Response(
+            content=json.dumps(output),
+            status_code=200,
+            media_type="application/json",
+        )
@@ -10,6 +10,12 @@ _cache: dict[str, dict[str, "CacheEntry"]] = {}
 _enabled_global: bool = True
 _enabled_areas: dict[str, bool] = {}
 
+# bumped whenever entries are dropped or areas toggled, so derived lookup
+# tables outside the cache can tell cheaply that they are stale; areas count
+# separately so trimming one area does not invalidate tables built on another
+_generation: int = 0
+_area_generations: dict[str, int] = {}
+
 
 @dataclass(slots=True)
 class CacheEntry:
@@ -17,13 +23,19 @@ class CacheEntry:
     timestamp: float
 
 
+def generation(area: str) -> int:
+    return _generation + _area_generations.setdefault(area, 0)
+
+
 def toggle_global(enabled: bool) -> None:
     global _enabled_global
     _enabled_global = enabled
+    _bump_generation()
 
 
 def toggle_area(area: str, enabled: bool) -> None:
     _enabled_areas[area] = enabled
+    _bump_generation(area)
 
 
 def has(area: str, key: Any) -> bool:
@@ -67,6 +79,7 @@ def remove(area: str, key: Any) -> None:
 
 def clear(area: str) -> None:
     with _lock:
+        _bump_generation(area)
         if any(ch in area for ch in "*?["):
             keys_to_remove = [k for k in _cache.keys() if fnmatch.fnmatch(k, area)]
             for k in keys_to_remove:
@@ -85,6 +98,8 @@ def trim_cache(area: str, seconds: float = 300) -> None:
                 continue
 
             keys_to_remove = [key for key, entry in area_cache.items() if entry.timestamp < cutoff]
+            if keys_to_remove:
+                _bump_generation(area_key)
             for key in keys_to_remove:
                 area_cache.pop(key, None)
 
@@ -94,9 +109,24 @@ def trim_cache(area: str, seconds: float = 300) -> None:
 
 def clear_all() -> None:
     with _lock:
+        _bump_generation()
         _cache.clear()
 
 
+def _bump_generation(area: str | None = None) -> None:
+    global _generation
+    if area is None:
+        _generation += 1
+        return
+    watched = list(_area_generations)
+    if any(ch in area for ch in "*?["):
+        matching = [k for k in watched if fnmatch.fnmatch(k, area)]
+    else:
+        matching = [area] if area in _area_generations else []
+    for key in matching:
+        _area_generations[key] += 1
+
+
 def _is_enabled(area: str) -> bool:
     if not _enabled_global:
         return False
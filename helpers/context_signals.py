@@ -0,0 +1,44 @@
+"""
+In-process change signals for agent contexts.
+
+Producers (the context log, the message queue, the context's run task)
+call ``emit`` from whatever thread they run on; listeners get the context
+id and what changed, never the data itself. Listeners must be cheap and
+thread-safe — typically they only schedule work on their own event loop.
+"""
+
+import threading
+from typing import Callable
+
+from helpers.print_style import PrintStyle
+
+LOG = "log"  # a log item was added or updated
+QUEUE = "queue"  # the message queue changed
+RUN = "run"  # the context's task started or finished
+
+Listener = Callable[[str, str], None]
+
+# Replaced, never mutated, so emit can iterate without the lock
+_listeners: tuple[Listener, ...] = ()
+_lock = threading.Lock()
+
+
+def connect(listener: Listener) -> None:
+    global _listeners
+    with _lock:
+        if listener not in _listeners:
+            _listeners = (*_listeners, listener)
+
+
+def disconnect(listener: Listener) -> None:
+    global _listeners
+    with _lock:
+        _listeners = tuple(l for l in _listeners if l != listener)
+
+
+def emit(context_id: str, kind: str) -> None:
+    for listener in _listeners:
+        try:
+            listener(context_id, kind)
+        except Exception as e:
+            PrintStyle.error(f"context signal listener failed: {e}")
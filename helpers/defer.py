@@ -1,13 +1,27 @@
 import asyncio
+from collections import deque
 from dataclasses import dataclass
+import os
 import threading
-from concurrent.futures import Future, InvalidStateError
+import time
+import zlib
+from concurrent.futures import Future, InvalidStateError, ProcessPoolExecutor
 from typing import Any, Callable, Optional, Coroutine, TypeVar, Awaitable
 
+from helpers import loop_monitor
+from helpers.dotenv import get_dotenv_int
+
 T = TypeVar("T")
 
 THREAD_BACKGROUND = "Background"
 
+LOOP_POOL_SIZE_ENV = "A0_AGENT_LOOPS"
+LOOP_ASSIGNMENT_ENV = "A0_AGENT_LOOP_ASSIGNMENT"
+CPU_WORKERS_ENV = "A0_CPU_PROCESS_WORKERS"
+
+ASSIGN_HASH = "hash"
+ASSIGN_LEAST_LOAD = "least_load"
+
 
 class EventLoopThread:
     _instances: dict[str, "EventLoopThread"] = {}
@@ -38,6 +52,7 @@ class EventLoopThread:
         if not self.loop:
             raise RuntimeError("Event loop is not initialized")
         asyncio.set_event_loop(self.loop)
+        loop_monitor.watch(self.loop, self.thread_name)
         self.loop.run_forever()
 
     def terminate(self):
@@ -47,6 +62,7 @@ class EventLoopThread:
         if not loop:
             return
 
+        loop_monitor.unwatch(loop)
         if loop.is_running():
             if thread and thread is threading.current_thread():
                 loop.stop()
@@ -74,6 +90,223 @@ class EventLoopThread:
         return asyncio.run_coroutine_threadsafe(coro, self.loop)
 
 
+class EventLoopPool:
+    """A fixed set of named event-loop threads that keyed work is sharded over.
+
+    Each key (e.g. an AgentContext id) is pinned to one loop for its lifetime,
+    so everything a context schedules keeps running on the same thread, while
+    a context that blocks its loop no longer stalls contexts on the others.
+    With a size of 1 the single loop keeps the pool's plain name, which is
+    the historical shared-thread behaviour.
+    """
+
+    _instances: dict[str, "EventLoopPool"] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, name: str, size: int = 1, assignment: str = ASSIGN_HASH):
+        self.name = name
+        self.size = max(1, size)
+        self.assignment = assignment
+        self._assigned: dict[str, int] = {}
+        self._assigned_lock = threading.Lock()
+
+    @classmethod
+    def get(cls, name: str) -> "EventLoopPool":
+        """Return the shared pool ``name``, configured from the environment."""
+        with cls._lock:
+            if name not in cls._instances:
+                cls._instances[name] = cls(
+                    name, get_dotenv_int(LOOP_POOL_SIZE_ENV, 1), _env_assignment()
+                )
+            return cls._instances[name]
+
+    def thread_name(self, index: int) -> str:
+        return self.name if self.size == 1 else f"{self.name}-{index}"
+
+    def assign(self, key: str) -> str:
+        """Return the thread name ``key`` is pinned to, assigning it if new."""
+        with self._assigned_lock:
+            index = self._assigned.get(key)
+            if index is None:
+                index = self._pick(key)
+                self._assigned[key] = index
+        return self.thread_name(index)
+
+    def release(self, key: str) -> None:
+        with self._assigned_lock:
+            self._assigned.pop(key, None)
+
+    def _pick(self, key: str) -> int:
+        if self.assignment == ASSIGN_LEAST_LOAD:
+            loads = [0] * self.size
+            for index in self._assigned.values():
+                loads[index] += 1
+            return loads.index(min(loads))
+        return zlib.crc32(key.encode("utf-8")) % self.size
+
+    async def diagnostics(self, timeout: float = 1.0) -> list[dict[str, Any]]:
+        """Per-loop assignment count, pending task count and scheduling lag."""
+        with self._assigned_lock:
+            counts = [0] * self.size
+            for index in self._assigned.values():
+                counts[index] += 1
+        return [
+            {**await loop_stats(self.thread_name(index), timeout), "contexts": counts[index]}
+            for index in range(self.size)
+        ]
+
+
+class LoopSafeLock:
+    """An ``asyncio.Lock`` replacement that may be shared between event loops.
+
+    ``asyncio.Lock`` binds to the first loop that waits on it, so a module-level
+    lock breaks as soon as contexts run on more than one loop of a pool. This
+    lock keeps its state under a thread lock and hands ownership to the next
+    waiter on that waiter's own loop, in FIFO order.
+    """
+
+    def __init__(self) -> None:
+        self._mutex = threading.Lock()
+        self._locked = False
+        self._waiters: deque[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+
+    def locked(self) -> bool:
+        return self._locked
+
+    async def acquire(self) -> bool:
+        loop = asyncio.get_running_loop()
+        with self._mutex:
+            if not self._locked and not self._waiters:
+                self._locked = True
+                return True
+            waiter = loop.create_future()
+            self._waiters.append((loop, waiter))
+        try:
+            await waiter
+        except BaseException:
+            with self._mutex:
+                try:
+                    self._waiters.remove((loop, waiter))
+                    queued = True
+                except ValueError:
+                    queued = False
+            # ownership was handed over just before we were cancelled; a
+            # cancelled waiter that was already dequeued is skipped by _grant
+            if not queued and waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        return True
+
+    def release(self) -> None:
+        with self._mutex:
+            if not self._locked:
+                raise RuntimeError("Lock is not acquired.")
+            while self._waiters:
+                loop, waiter = self._waiters.popleft()
+                try:
+                    loop.call_soon_threadsafe(self._grant, waiter)
+                except RuntimeError:
+                    continue  # the waiter's loop is closed
+                return
+            self._locked = False
+
+    def _grant(self, waiter: asyncio.Future) -> None:
+        if waiter.cancelled():
+            self.release()
+        else:
+            waiter.set_result(True)
+
+    async def __aenter__(self) -> None:
+        await self.acquire()
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.release()
+
+
+def loop_thread_names() -> list[str]:
+    with EventLoopThread._lock:
+        return list(EventLoopThread._instances)
+
+
+async def loop_stats(thread_name: str, timeout: float = 1.0) -> dict[str, Any]:
+    """Pending task count and scheduling lag of the named loop thread."""
+    with EventLoopThread._lock:
+        thread = EventLoopThread._instances.get(thread_name)
+    loop = getattr(thread, "loop", None) if thread else None
+    if not loop or not loop.is_running():
+        return {"name": thread_name, "running": False, "tasks": 0, "lag_ms": None}
+    return {
+        "name": thread_name,
+        "running": True,
+        "tasks": _pending_tasks(loop),
+        "lag_ms": await measure_lag(loop, timeout),
+    }
+
+
+async def measure_lag(
+    loop: asyncio.AbstractEventLoop, timeout: float = 1.0
+) -> float | None:
+    """Milliseconds until ``loop`` runs a freshly scheduled callback.
+
+    Returns None when the loop does not get to it within ``timeout``, which
+    means it is blocked.
+    """
+    started = time.perf_counter()
+    future: Future = Future()
+    loop.call_soon_threadsafe(
+        lambda: future.done() or future.set_result(time.perf_counter())
+    )
+    try:
+        finished = await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+    except asyncio.TimeoutError:
+        return None
+    return round((finished - started) * 1000, 3)
+
+
+def _pending_tasks(loop: asyncio.AbstractEventLoop) -> int:
+    # all_tasks() iterates a WeakSet owned by the other thread; retry if it
+    # changes underneath us
+    for _ in range(3):
+        try:
+            return sum(1 for task in asyncio.all_tasks(loop) if not task.done())
+        except RuntimeError:
+            continue
+    return 0
+
+
+_process_pool: ProcessPoolExecutor | None = None
+_process_pool_lock = threading.Lock()
+
+
+def _get_process_pool() -> ProcessPoolExecutor | None:
+    global _process_pool
+    workers = get_dotenv_int(CPU_WORKERS_ENV, 0)
+    if workers <= 0:
+        return None
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(max_workers=workers)
+        return _process_pool
+
+
+async def run_cpu_bound(func: Callable[..., T], *args: Any) -> T:
+    """Run a CPU-heavy callable off the event loop.
+
+    With ``A0_CPU_PROCESS_WORKERS`` > 0 the call goes to a shared process pool
+    (``func`` and ``args`` must be picklable); otherwise it runs in a worker
+    thread, which at least keeps the loop responsive for I/O.
+    """
+    pool = _get_process_pool()
+    if pool is None:
+        return await asyncio.to_thread(func, *args)
+    return await asyncio.get_running_loop().run_in_executor(pool, func, *args)
+
+
+def _env_assignment() -> str:
+    value = os.getenv(LOOP_ASSIGNMENT_ENV, ASSIGN_HASH).strip().lower()
+    return ASSIGN_LEAST_LOAD if value == ASSIGN_LEAST_LOAD else ASSIGN_HASH
+
+
 @dataclass
 class ChildTask:
     task: "DeferredTask"
@@ -106,6 +339,11 @@ class DeferredTask:
         if self._future:
             self._future.add_done_callback(self._on_task_done)
 
+    def add_done_callback(self, fn: Callable[[Future], Any]) -> None:
+        """Call ``fn`` once the current run ends, on whichever thread ends it."""
+        if self._future:
+            self._future.add_done_callback(fn)
+
     def _on_task_done(self, _future: Future):
         # Ensure child background tasks are always cleaned up once the parent finishes
         self.kill_children()
@@ -20,7 +20,7 @@ from langchain_core.documents import Document
 from langchain.schema import SystemMessage, HumanMessage
 
 from helpers.print_style import PrintStyle
-from helpers import files, errors
+from helpers import defer, files, errors
 from helpers.network import HttpFetchResult, fetch_public_http_resource
 from agent import Agent
 
@@ -514,25 +514,20 @@ class DocumentQueryHelper:
         if not exists:
             await self.agent.handle_intervention()
             if mimetype.startswith("image/"):
-                document_content = self.handle_image_document(
-                    document_uri, scheme, remote_resource=remote_resource
-                )
+                handler = DocumentQueryHelper.handle_image_document
             elif mimetype == "text/html":
-                document_content = self.handle_html_document(
-                    document_uri, scheme, remote_resource=remote_resource
-                )
+                handler = DocumentQueryHelper.handle_html_document
             elif mimetype.startswith("text/") or mimetype == "application/json":
-                document_content = self.handle_text_document(
-                    document_uri, scheme, remote_resource=remote_resource
-                )
+                handler = DocumentQueryHelper.handle_text_document
             elif mimetype == "application/pdf":
-                document_content = self.handle_pdf_document(
-                    document_uri, scheme, remote_resource=remote_resource
-                )
+                handler = DocumentQueryHelper.handle_pdf_document
             else:
-                document_content = self.handle_unstructured_document(
-                    document_uri, scheme, remote_resource=remote_resource
-                )
+                handler = DocumentQueryHelper.handle_unstructured_document
+            # parsing (OCR, unstructured, markdownify) is CPU-bound; keep it
+            # off the context's event loop
+            document_content = await defer.run_cpu_bound(
+                handler, document_uri, scheme, remote_resource
+            )
             if add_to_db:
                 self.progress_callback(f"Indexing document")
                 await self.agent.handle_intervention()
@@ -583,18 +578,18 @@ class DocumentQueryHelper:
 
         return ".bin"
 
+    @staticmethod
     def handle_image_document(
-        self,
         document: str,
         scheme: str,
         remote_resource: HttpFetchResult | None = None,
     ) -> str:
-        return self.handle_unstructured_document(
+        return DocumentQueryHelper.handle_unstructured_document(
             document, scheme, remote_resource=remote_resource
         )
 
+    @staticmethod
     def handle_html_document(
-        self,
         document: str,
         scheme: str,
         remote_resource: HttpFetchResult | None = None,
@@ -602,7 +597,7 @@ class DocumentQueryHelper:
         if scheme in ["http", "https"]:
             if remote_resource is None:
                 raise ValueError("Missing prefetched remote HTML content")
-            html_content = self._decode_remote_text(remote_resource)
+            html_content = DocumentQueryHelper._decode_remote_text(remote_resource)
             parts = [Document(page_content=html_content, metadata={"source": document})]
         elif scheme == "file":
             # Use RFC file operations instead of TextLoader
@@ -620,8 +615,8 @@ class DocumentQueryHelper:
             ]
         )
 
+    @staticmethod
     def handle_text_document(
-        self,
         document: str,
         scheme: str,
         remote_resource: HttpFetchResult | None = None,
@@ -629,7 +624,7 @@ class DocumentQueryHelper:
         if scheme in ["http", "https"]:
             if remote_resource is None:
                 raise ValueError("Missing prefetched remote text content")
-            file_content = self._decode_remote_text(remote_resource)
+            file_content = DocumentQueryHelper._decode_remote_text(remote_resource)
             elements = [
                 Document(page_content=file_content, metadata={"source": document})
             ]
@@ -646,8 +641,8 @@ class DocumentQueryHelper:
 
         return "\n".join([element.page_content for element in elements])
 
+    @staticmethod
     def handle_pdf_document(
-        self,
         document: str,
         scheme: str,
         remote_resource: HttpFetchResult | None = None,
@@ -714,8 +709,8 @@ class DocumentQueryHelper:
         finally:
             os.unlink(temp_file_path)
 
+    @staticmethod
     def handle_unstructured_document(
-        self,
         document: str,
         scheme: str,
         remote_resource: HttpFetchResult | None = None,
@@ -727,7 +722,7 @@ class DocumentQueryHelper:
             import tempfile
 
             temp_file_path = ""
-            suffix = self._get_temp_file_suffix(document, remote_resource)
+            suffix = DocumentQueryHelper._get_temp_file_suffix(document, remote_resource)
             with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
                 temp_file.write(remote_resource.content)
                 temp_file_path = temp_file.name
@@ -1,11 +1,13 @@
 from abc import abstractmethod
 from typing import Any, Awaitable, Type, cast
 from helpers import modules, files
-from helpers import cache
+from helpers import cache, loop_monitor
 from typing import TYPE_CHECKING
 from functools import wraps
 import inspect
 import os
+import threading
+import weakref
 
 from helpers.print_style import PrintStyle
 
@@ -28,15 +30,19 @@ class _Unset:
 
 _UNSET = _Unset()
 _EXTENSIONS_LOG_COUNTS: dict[str, int] = {}
+_EXTENSIONS_LOG_EVERY: int | None = None
 
 
 # debug - extensions call counter
 def _log_extension_call(name: str):
-    try:
-        every = int(os.getenv("EXTENSIONS_LOG", "0"))
-    except ValueError:
-        return
+    global _EXTENSIONS_LOG_EVERY
+    if _EXTENSIONS_LOG_EVERY is None:
+        try:
+            _EXTENSIONS_LOG_EVERY = int(os.getenv("EXTENSIONS_LOG", "0"))
+        except ValueError:
+            _EXTENSIONS_LOG_EVERY = 0
 
+    every = _EXTENSIONS_LOG_EVERY
     if every <= 0:
         return
 
@@ -98,6 +104,9 @@ def extensible(func):
     otherwise ``data["result"]`` is returned.
     """
 
+    # extension point paths only depend on the function, resolve them once
+    points = _function_points(func)
+
     def _get_agent(args, kwargs):
         from agent import Agent
 
@@ -112,22 +121,16 @@ def extensible(func):
         return None
 
     def _prepare_inputs(args, kwargs):
-        module_name = getattr(func, "__module__", "")
-        qual_name = getattr(func, "__qualname__", "")
-        if not module_name or not qual_name:
-            return None
-
-        module_parts = [part for part in module_name.split(".") if part]
-        qual_parts = [part for part in qual_name.split(".") if part and part != "<locals>"]
-        if not module_parts or not qual_parts:
+        if points is None:
             return None
 
-        base_path = os.path.join("_functions", *module_parts, *qual_parts)
-        start_point = os.path.join(base_path, "start")
-        end_point = os.path.join(base_path, "end")
-
+        start_point, end_point = points
         agent = _get_agent(args, kwargs)
 
+        # no extensions registered on either side: skip the wrapper entirely
+        if not _dispatch(start_point, agent) and not _dispatch(end_point, agent):
+            return None
+
         data = {
             "args": args,
             "kwargs": kwargs,
@@ -212,9 +215,22 @@ def extensible(func):
 class Extension:
 
     def __init__(self, agent: "Agent|None", **kwargs):
-        self.agent: "Agent|None" = agent
+        self.agent = agent
         self.kwargs = kwargs
 
+    # instances live in the per-agent dispatch tables, so they must not keep
+    # their agent (the table key) alive
+    @property
+    def agent(self) -> "Agent|None":
+        return self._agent_ref()
+
+    @agent.setter
+    def agent(self, agent: "Agent|None") -> None:
+        try:
+            self._agent_ref = weakref.ref(agent)
+        except TypeError:  # None and stand-ins that cannot be weakly referenced
+            self._agent_ref = lambda: agent
+
     @abstractmethod
     def execute(self, **kwargs) -> None | Awaitable[None]:
         pass
@@ -225,28 +241,34 @@ async def call_extensions_async(
 ):
     _log_extension_call(extension_point)
 
-    # fetch classes for this extension point and agent
-    classes = _get_extension_classes(extension_point, agent=agent, **kwargs)
+    # fetch extension instances for this extension point and agent
+    extensions = _dispatch(extension_point, agent)
+    if not extensions:
+        return
 
     # execute unique extensions
-    for cls in classes:
-        result = cls(agent=agent).execute(**kwargs)
-        if isinstance(result, Awaitable):
-            await result
+    with loop_monitor.activity(
+        extension=extension_point,
+        context=getattr(getattr(agent, "context", None), "id", None),
+    ):
+        for ext in extensions:
+            result = ext.execute(**kwargs)
+            if isinstance(result, Awaitable):
+                await result
 
 
 def call_extensions_sync(extension_point: str, agent: "Agent|None" = None, **kwargs):
     _log_extension_call(extension_point)
 
-    # fetch classes for this extension point and agent
-    classes = _get_extension_classes(extension_point, agent=agent, **kwargs)
+    # fetch extension instances for this extension point and agent
+    extensions = _dispatch(extension_point, agent)
 
     # execute unique extensions
-    for cls in classes:
-        result = cls(agent=agent).execute(**kwargs)
+    for ext in extensions:
+        result = ext.execute(**kwargs)
         if isinstance(result, Awaitable):
             raise ValueError(
-                f"Extension {cls.__name__} returned awaitable in sync mode"
+                f"Extension {ext.__class__.__name__} returned awaitable in sync mode"
             )
 
 
@@ -279,6 +301,77 @@ def get_webui_extensions(
     return entries
 
 
+# Dispatch tables: extension instances per (profile, project, point), kept per
+# agent so instances are created once and reused. Tables are dropped as a
+# whole whenever one of the extension cache areas is cleared (watchdog,
+# plugin toggles). Agents run on several loop threads, hence the lock.
+type _DispatchTable = dict[tuple, tuple[Extension, ...]]
+
+_agent_tables: "weakref.WeakKeyDictionary[Agent, _DispatchTable]" = (
+    weakref.WeakKeyDictionary()
+)
+_unbound_table: _DispatchTable = {}
+_tables_generation: tuple[int, int] = (-1, -1)
+_tables_lock = threading.Lock()
+
+
+def _extensions_generation() -> tuple[int, int]:
+    return (
+        cache.generation(_EXTENSIONS_CACHE_AREA),
+        cache.generation(_CLASSES_CACHE_AREA),
+    )
+
+
+def _dispatch(extension_point: str, agent: "Agent|None") -> tuple[Extension, ...]:
+    global _tables_generation
+    key = cache.determine_cache_key(agent, extension_point)
+    generation = _extensions_generation()
+    with _tables_lock:
+        if _tables_generation != generation:
+            _agent_tables.clear()
+            _unbound_table.clear()
+            _tables_generation = generation
+
+        if agent is None:
+            table = _unbound_table
+        else:
+            try:
+                table = _agent_tables.get(agent)
+                if table is None:
+                    table = _agent_tables.setdefault(agent, {})
+            except TypeError:  # agent stand-ins that cannot be weakly referenced
+                table = {}
+
+        extensions = table.get(key)
+    if extensions is not None:
+        return extensions
+
+    # build outside the lock, classes may have to be imported from disk
+    extensions = tuple(
+        cls(agent=agent)
+        for cls in _get_extension_classes(extension_point, agent=agent)
+    )
+    with _tables_lock:
+        if _tables_generation == generation:
+            extensions = table.setdefault(key, extensions)
+    return extensions
+
+
+def _function_points(func) -> tuple[str, str] | None:
+    module_name = getattr(func, "__module__", "")
+    qual_name = getattr(func, "__qualname__", "")
+    if not module_name or not qual_name:
+        return None
+
+    module_parts = [part for part in module_name.split(".") if part]
+    qual_parts = [part for part in qual_name.split(".") if part and part != "<locals>"]
+    if not module_parts or not qual_parts:
+        return None
+
+    base_path = os.path.join("_functions", *module_parts, *qual_parts)
+    return os.path.join(base_path, "start"), os.path.join(base_path, "end")
+
+
 def _get_extension_classes(
     extension_point: str, agent: "Agent|None" = None, **kwargs
 ) -> list[Type[Extension]]:
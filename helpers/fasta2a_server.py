@@ -6,7 +6,7 @@ from typing import Any, List
 import contextlib
 import threading
 
-from helpers import settings, projects
+from helpers import admission, settings, projects
 from starlette.requests import Request
 
 # Local imports
@@ -101,7 +101,8 @@ class AgentZeroWorker(Worker):  # type: ignore[misc]
             )
 
             # Process message through Agent Zero (includes response)
-            task = context.communicate(agent_message)
+            with admission.source(admission.SOURCE_A2A):
+                task = context.communicate(agent_message)
             result_text = await task.result()
 
             # Build A2A message from result
@@ -127,9 +128,20 @@ class AgentZeroWorker(Worker):  # type: ignore[misc]
 
         except Exception as e:
             _PRINTER.print(f"[A2A] Error processing task {params.get('id', 'unknown')}: {e}")
+            failure: dict[str, Any] = {}
+            if isinstance(e, admission.AdmissionRejected):
+                # tell the remote agent why and when to try again
+                failure['new_messages'] = [{
+                    'role': 'agent',
+                    'parts': [{'kind': 'text', 'text': str(e)}],
+                    'kind': 'message',
+                    'message_id': str(uuid.uuid4()),
+                    'metadata': {'retry_after': e.retry_after},
+                }]
             await self.storage.update_task(
                 task_id=params.get('id', 'unknown'),
-                state='failed'
+                state='failed',
+                **failure,
             )
 
             # Clean up context even on failure to prevent resource leaks
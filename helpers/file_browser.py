@@ -2,14 +2,71 @@ import os
 from pathlib import Path
 import shutil
 import base64
-import subprocess
+import binascii
+import json
+import stat
+from dataclasses import dataclass, field
 from typing import Dict, List, Tuple, Any
 from helpers.security import safe_filename
 from datetime import datetime
 
-from helpers import files
+from helpers import cache, files
 from helpers.print_style import PrintStyle
 
+LISTING_CACHE_AREA = "file_browser_listings"
+SORT_FIELDS = {"name", "size", "date"}
+MAX_PAGE_SIZE = 5000
+
+# directories under these roots are watched, so their cached listings stay
+# valid across requests; anything else is rescanned on every first page
+_watched_roots: list[str] = []
+
+
+@dataclass
+class _Listing:
+    mtime_ns: int
+    folders: List[Dict[str, Any]]
+    files: List[Dict[str, Any]]
+    # (sort, order, query) -> sorted [folders, files], reused across pages
+    views: Dict[tuple, List[List[Dict[str, Any]]]] = field(default_factory=dict)
+
+    def view(self, sort: str, descending: bool, query: str) -> List[List[Dict[str, Any]]]:
+        key = (sort, descending, query)
+        groups = self.views.get(key)
+        if groups is None:
+            if len(self.views) >= 8:
+                self.views.clear()
+            groups = [
+                _sorted_entries(_filter_entries(group, query), sort, descending)
+                for group in (self.folders, self.files)
+            ]
+            self.views[key] = groups
+        return groups
+
+
+def register_watchdogs():
+    from helpers import settings, watchdog
+
+    def on_workdir_change(items: list[watchdog.WatchItem]):
+        for path, _event in items:
+            invalidate_listing(os.path.dirname(path))
+            invalidate_listing(path)
+
+    root = os.path.realpath(settings.get_settings()["workdir_path"])
+    if not os.path.isdir(root):
+        return
+    watchdog.add_watchdog(
+        "file_browser_listings",
+        roots=[root],
+        debounce=0.1,
+        handler=on_workdir_change,
+    )
+    _watched_roots[:] = [root]
+
+
+def invalidate_listing(dir_path: str | Path) -> None:
+    cache.remove(LISTING_CACHE_AREA, os.path.realpath(dir_path))
+
 
 class FileBrowser:
     ALLOWED_EXTENSIONS = {
@@ -49,6 +106,8 @@ class FileBrowser:
             # Save file
             with open(target_file, "wb") as file:
                 file.write(base64.b64decode(base64_content))
+            # overwrites keep the directory mtime, drop the cached sizes
+            invalidate_listing(target_file.parent)
             return True
         except Exception as e:
             PrintStyle.error(f"Error saving file {filename}: {e}")
@@ -83,6 +142,7 @@ class FileBrowser:
                     PrintStyle.error(f"Error saving file {file.filename}: {e}")
                     failed.append(file.filename)
 
+            invalidate_listing(target_dir)
             return successful, failed
 
         except Exception as e:
@@ -177,6 +237,7 @@ class FileBrowser:
             os.makedirs(full_path.parent, exist_ok=True)
             with open(full_path, "w", encoding="utf-8") as file:
                 file.write(content)
+            invalidate_listing(full_path.parent)
             return True
         except Exception as e:
             PrintStyle.error(f"Error saving file {file_path}: {e}")
@@ -197,85 +258,38 @@ class FileBrowser:
     def _get_file_extension(self, filename: str) -> str:
         return filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
 
-    def _get_files_via_ls(self, full_path: Path) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
-        """Get files and folders using ls command for better error handling"""
+    def _scan_directory(self, full_path: Path) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Get files and folders with a single os.scandir pass"""
         files: List[Dict[str, Any]] = []
         folders: List[Dict[str, Any]] = []
 
         try:
-            # Use ls command to get directory listing
-            result = subprocess.run(
-                ['ls', '-la', str(full_path)],
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-
-            if result.returncode != 0:
-                PrintStyle.error(f"ls command failed: {result.stderr}")
-                return files, folders
-
-            # Parse ls output (skip first line which is "total X")
-            lines = result.stdout.strip().split('\n')
-            if len(lines) <= 1:
-                return files, folders
-
-            for line in lines[1:]:  # Skip the "total" line
-                try:
-                    # Skip current and parent directory entries
-                    if line.endswith(' .') or line.endswith(' ..'):
-                        continue
-
-                    # Parse ls -la output format
-                    parts = line.split()
-                    if len(parts) < 9:
-                        continue
-
-                    # Check if this is a symlink (permissions start with 'l')
-                    permissions = parts[0]
-                    is_symlink = permissions.startswith('l')
-
-                    if is_symlink:
-                        # For symlinks, extract the name before the '->' arrow
-                        full_name_part = ' '.join(parts[8:])
-                        if ' -> ' in full_name_part:
-                            filename = full_name_part.split(' -> ')[0]
-                            symlink_target = full_name_part.split(' -> ')[1]
-                        else:
-                            filename = full_name_part
-                            symlink_target = None
-                    else:
-                        filename = ' '.join(parts[8:])  # Handle filenames with spaces
-                        symlink_target = None
-
-                    if not filename:
-                        continue
-
-                    # Get full path for this entry
-                    entry_path = full_path / filename
-
+            # relative paths are built from one prefix, pathlib per entry is slow
+            relative_dir = str(full_path.relative_to(self.base_dir))
+            prefix = "" if relative_dir == "." else relative_dir + os.sep
+            with os.scandir(full_path) as it:
+                for entry in it:
                     try:
-                        stat_info = entry_path.stat()
-
+                        # DirEntry.stat() follows symlinks, like Path.stat()
+                        stat_info = entry.stat()
                         entry_data: Dict[str, Any] = {
-                            "name": filename,
-                            "path": str(entry_path.relative_to(self.base_dir)),
+                            "name": entry.name,
+                            "path": prefix + entry.name,
                             "modified": datetime.fromtimestamp(stat_info.st_mtime).isoformat()
                         }
 
-                        # Add symlink information if this is a symlink
-                        if is_symlink and symlink_target:
-                            entry_data["symlink_target"] = symlink_target
+                        if entry.is_symlink():
+                            entry_data["symlink_target"] = os.readlink(entry.path)
                             entry_data["is_symlink"] = True
 
-                        if entry_path.is_file():
+                        if stat.S_ISREG(stat_info.st_mode):
                             entry_data.update({
-                                "type": self._get_file_type(filename),
+                                "type": self._get_file_type(entry.name),
                                 "size": stat_info.st_size,
                                 "is_dir": False
                             })
                             files.append(entry_data)
-                        elif entry_path.is_dir():
+                        elif stat.S_ISDIR(stat_info.st_mode):
                             entry_data.update({
                                 "type": "folder",
                                 "size": 0,  # Directories show as 0 bytes
@@ -285,36 +299,80 @@ class FileBrowser:
 
                     except (OSError, PermissionError, FileNotFoundError) as e:
                         # Log error but continue with other files
-                        PrintStyle.warning(f"No access to {filename}: {e}")
+                        PrintStyle.warning(f"No access to {entry.name}: {e}")
                         continue
 
-                    if len(files) + len(folders) > 10000:
-                        break
-
-                except Exception as e:
-                    # Log error and continue with next line
-                    PrintStyle.error(f"Error parsing ls line '{line}': {e}")
-                    continue
-
-        except subprocess.TimeoutExpired:
-            PrintStyle.error("ls command timed out")
         except Exception as e:
-            PrintStyle.error(f"Error running ls command: {e}")
+            PrintStyle.error(f"Error scanning directory {full_path}: {e}")
 
         return files, folders
 
-    def get_files(self, current_path: str = "") -> Dict:
+    def _get_listing(self, full_path: Path, fresh: bool) -> _Listing:
+        """Cached listing, rescanned when the directory changed.
+
+        Entry additions, removals and renames change the directory mtime;
+        content changes inside watched roots are invalidated by the
+        watchdog. Unwatched directories are rescanned when ``fresh`` is
+        set (a first page), so later pages of one listing stay consistent.
+        """
+        key = os.path.realpath(full_path)
+        mtime_ns = os.stat(key).st_mtime_ns
+        listing: _Listing | None = cache.get(LISTING_CACHE_AREA, key)
+        watched = any(
+            key == root or key.startswith(root + os.sep) for root in _watched_roots
+        )
+        if (
+            listing is not None
+            and listing.mtime_ns == mtime_ns
+            and (watched or not fresh)
+        ):
+            return listing
+
+        files, folders = self._scan_directory(full_path)
+        listing = _Listing(mtime_ns=mtime_ns, folders=folders, files=files)
+        cache.add(LISTING_CACHE_AREA, key, listing)
+        return listing
+
+    def get_files(
+        self,
+        current_path: str = "",
+        cursor: str | None = None,
+        limit: int | None = None,
+        sort: str = "name",
+        order: str = "asc",
+        query: str = "",
+    ) -> Dict:
+        """List a directory, folders first.
+
+        Without ``limit`` the whole directory is returned. With it, entries
+        come in pages of ``limit``; pass the returned ``next_cursor`` back to
+        get the following page. ``sort`` is one of name/size/date and
+        ``query`` keeps entries whose name, path or type contain it.
+        """
         try:
             # Resolve the full path while preventing directory traversal
             full_path = (self.base_dir / current_path).resolve()
             if not str(full_path).startswith(str(self.base_dir)):
                 raise ValueError("Invalid path")
 
-            # Use ls command instead of os.scandir for better error handling
-            files, folders = self._get_files_via_ls(full_path)
+            listing = self._get_listing(full_path, fresh=cursor is None)
+            sort = sort if sort in SORT_FIELDS else "name"
+            descending = order == "desc"
+            groups = listing.view(sort, descending, (query or "").strip().lower())
+            total = len(groups[0]) + len(groups[1])
 
             # Combine folders and files, folders first
-            all_entries = folders + files
+            if cursor:
+                all_entries = _entries_after(groups, _decode_cursor(cursor), sort, descending)
+            else:
+                all_entries = groups[0] + groups[1]
+
+            next_cursor = None
+            if limit is not None:
+                limit = min(max(int(limit), 1), MAX_PAGE_SIZE)
+                if len(all_entries) > limit:
+                    all_entries = all_entries[:limit]
+                    next_cursor = _encode_cursor(all_entries[-1], sort)
 
             # Get parent directory path if not at root
             parent_path = ""
@@ -333,7 +391,9 @@ class FileBrowser:
             return {
                 "entries": all_entries,
                 "current_path": current_path,
-                "parent_path": parent_path
+                "parent_path": parent_path,
+                "total": total,
+                "next_cursor": next_cursor,
             }
 
         except Exception as e:
@@ -353,3 +413,73 @@ class FileBrowser:
             if ext in extensions:
                 return file_type
         return 'unknown'
+
+
+def _sort_key(entry: Dict[str, Any], sort: str) -> tuple:
+    name = entry["name"]
+    if sort == "size":
+        return (entry["size"], name)
+    if sort == "date":
+        return (entry["modified"], name)
+    return (name.casefold(), name)
+
+
+def _sorted_entries(entries: List[Dict[str, Any]], sort: str, descending: bool) -> List[Dict[str, Any]]:
+    return sorted(entries, key=lambda entry: _sort_key(entry, sort), reverse=descending)
+
+
+def _filter_entries(entries: List[Dict[str, Any]], query: str) -> List[Dict[str, Any]]:
+    if not query:
+        return entries
+    return [
+        entry for entry in entries
+        if query in " ".join(filter(None, [
+            entry["name"],
+            entry["path"],
+            entry["type"],
+            entry.get("symlink_target"),
+            "folder directory" if entry["is_dir"] else "file",
+        ])).lower()
+    ]
+
+
+def _entries_after(
+    groups: List[List[Dict[str, Any]]], cursor: tuple, sort: str, descending: bool
+) -> List[Dict[str, Any]]:
+    """Entries ordered after the cursor key (keyset pagination).
+
+    Keyset cursors survive entries being added or removed between pages,
+    unlike offsets.
+    """
+    group_index, key = cursor
+    result: List[Dict[str, Any]] = []
+    for index, group in enumerate(groups):
+        if index < group_index:
+            continue
+        if index > group_index:
+            result.extend(group)
+            continue
+        # binary search for the first entry ordered after the cursor
+        low, high = 0, len(group)
+        while low < high:
+            middle = (low + high) // 2
+            entry_key = _sort_key(group[middle], sort)
+            if (entry_key < key) if descending else (entry_key > key):
+                high = middle
+            else:
+                low = middle + 1
+        result.extend(group[low:])
+    return result
+
+
+def _encode_cursor(entry: Dict[str, Any], sort: str) -> str:
+    payload = [0 if entry["is_dir"] else 1, list(_sort_key(entry, sort))]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    try:
+        group_index, key = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return int(group_index), tuple(key)
+    except (ValueError, TypeError, binascii.Error) as e:
+        raise ValueError("Invalid cursor") from e
@@ -462,6 +462,14 @@ def write_file(relative_path: str, content: str, encoding: str = "utf-8"):
     with open(abs_path, "w", encoding=encoding) as f:
         f.write(content)
 
+def append_file(relative_path: str, content: str, encoding: str = "utf-8") -> int:
+    abs_path = get_abs_path(relative_path)
+    os.makedirs(os.path.dirname(abs_path), exist_ok=True)
+    content = sanitize_string(content, encoding)
+    with open(abs_path, "a", encoding=encoding) as f:
+        f.write(content)
+        return f.tell()
+
 def delete_file(relative_path: str):
     abs_path = get_abs_path(relative_path)
     if exists(abs_path):
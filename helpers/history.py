@@ -4,8 +4,9 @@ from collections import OrderedDict
 from collections.abc import Mapping
 import json
 import math
+import threading
 import uuid
-from typing import Coroutine, Literal, TypedDict, cast, Union, Dict, List, Any
+from typing import Callable, Coroutine, Literal, TypedDict, cast, Union, Dict, List, Any
 from helpers import messages, tokens, settings, call_llm
 from enum import Enum
 from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage, AIMessage
@@ -24,6 +25,8 @@ LARGE_MESSAGE_TO_HISTORY_TOPIC_RATIO = 0.2
 RAW_MESSAGE_OUTPUT_TEXT_TRIM = 100
 COMPRESSION_TARGET_RATIO = 0.8
 
+_deferred_load_lock = threading.RLock()
+
 
 class RawMessage(TypedDict):
     raw_content: "MessageContent"
@@ -313,6 +316,37 @@ class History(Record):
         self.current = Topic(history=self)
         self.agent: Agent = agent
 
+    @classmethod
+    def deferred(cls, agent, loader: Callable[["History"], None]) -> "History":
+        """History whose records are filled in by loader on first attribute access."""
+        history = cls.__new__(cls)
+        history.__dict__["agent"] = agent
+        history.__dict__["_loader"] = loader
+        return history
+
+    def __getattr__(self, name: str):
+        # only reached for attributes not set yet, i.e. before or during a deferred load
+        if name.startswith("__"):
+            raise AttributeError(name)
+        with _deferred_load_lock:
+            loader = self.__dict__.pop("_loader", None)
+            if loader is not None:
+                try:
+                    loader(self)
+                finally:
+                    self.__dict__.setdefault("counter", 0)
+                    self.__dict__.setdefault("bulks", [])
+                    self.__dict__.setdefault("topics", [])
+                    if "current" not in self.__dict__:
+                        self.current = Topic(history=self)
+        try:
+            return self.__dict__[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def is_loaded(self) -> bool:
+        return "_loader" not in self.__dict__
+
     def get_tokens(self) -> int:
         return (
             self.get_bulks_tokens()
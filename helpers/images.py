@@ -1,14 +1,69 @@
+import asyncio
 import base64
 import io
 import math
 import mimetypes
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 from urllib.parse import unquote, urlparse
 
 from PIL import Image
 
 
+# encoded data URLs kept in memory, screenshots stay in history for many turns
+ENCODING_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+type EncodingKey = tuple[str, int, int, int | None, int | None]
+
+
+class ImageEncodingCache:
+    """LRU cache of data URLs bounded by their total size in bytes."""
+
+    def __init__(self, max_bytes: int = ENCODING_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[EncodingKey, str] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: EncodingKey) -> str | None:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def __contains__(self, key: EncodingKey) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def put(self, key: EncodingKey, value: str) -> None:
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = value
+            self._size += len(value)
+            while self._size > self.max_bytes:
+                _key, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+
+_encoding_cache = ImageEncodingCache()
+
+
 def prepare_content(content: Any) -> Any:
     if isinstance(content, list):
         return [prepare_content(item) for item in content]
@@ -29,6 +84,17 @@ def prepare_content(content: Any) -> Any:
     return {key: prepare_content(value) for key, value in content.items()}
 
 
+async def preload(contents: list[Any]) -> None:
+    """Encode uncached local images of ``contents`` in a worker thread.
+
+    ``prepare_content`` runs synchronously inside message conversion; calling
+    this first keeps file reads and base64 encoding off the event loop.
+    """
+    missing = [url for url in _iter_local_refs(contents) if not _is_cached(url)]
+    if missing:
+        await asyncio.to_thread(_encode_all, missing)
+
+
 def is_local_ref(url: str) -> bool:
     if not url:
         return False
@@ -38,13 +104,34 @@ def is_local_ref(url: str) -> bool:
     return lowered.startswith("file://") or url.startswith(("/", "./", "../", "~"))
 
 
-def to_data_url(url: str) -> str:
+def to_data_url(
+    url: str, *, max_pixels: int | None = None, quality: int | None = None
+) -> str:
+    """Encode a local image as a data URL, compressed to JPEG when
+    ``max_pixels`` or ``quality`` is given. Results are cached per file
+    version and compression parameters."""
     path = resolve_ref(url)
     mime_type = mimetypes.guess_type(path.name)[0]
     if not mime_type or not mime_type.startswith("image/"):
         raise ValueError(f"Image attachment must have an image MIME type: {path}")
-    encoded = base64.b64encode(path.read_bytes()).decode("utf-8")
-    return f"data:{mime_type};base64,{encoded}"
+
+    key = _encoding_key(path, max_pixels, quality)
+    cached = _encoding_cache.get(key)
+    if cached is not None:
+        return cached
+
+    data = path.read_bytes()
+    if max_pixels is not None or quality is not None:
+        data = compress_image(
+            data,
+            max_pixels=max_pixels if max_pixels is not None else 256_000,
+            quality=quality if quality is not None else 50,
+        )
+        mime_type = "image/jpeg"
+    encoded = base64.b64encode(data).decode("utf-8")
+    data_url = f"data:{mime_type};base64,{encoded}"
+    _encoding_cache.put(key, data_url)
+    return data_url
 
 
 def resolve_ref(url: str) -> Path:
@@ -102,3 +189,41 @@ def compress_image(image_data: bytes, *, max_pixels: int = 256_000, quality: int
     output = io.BytesIO()
     img.save(output, format='JPEG', quality=quality, optimize=True)
     return output.getvalue()
+
+
+def _encoding_key(path: Path, max_pixels: int | None, quality: int | None) -> EncodingKey:
+    stat = path.stat()
+    return (str(path.resolve()), stat.st_mtime_ns, stat.st_size, max_pixels, quality)
+
+
+def _is_cached(url: str) -> bool:
+    try:
+        return _encoding_key(resolve_ref(url), None, None) in _encoding_cache
+    except OSError:
+        return False
+
+
+def _encode_all(urls: list[str]) -> None:
+    for url in urls:
+        try:
+            to_data_url(url)
+        except (OSError, ValueError):
+            pass  # reported by prepare_content at conversion time
+
+
+def _iter_local_refs(content: Any) -> Iterator[str]:
+    if isinstance(content, list):
+        for item in content:
+            yield from _iter_local_refs(item)
+        return
+    if not isinstance(content, dict):
+        return
+    if content.get("type") == "image_url":
+        image_url = content.get("image_url")
+        url = image_url.get("url", "") if isinstance(image_url, dict) else image_url
+        url = str(url or "").strip()
+        if is_local_ref(url):
+            yield url
+            return
+    for value in content.values():
+        yield from _iter_local_refs(value)
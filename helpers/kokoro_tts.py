@@ -1,10 +1,16 @@
 # kokoro_tts.py
 
 import base64
-import io
+import re
+import struct
+import threading
 import warnings
 import asyncio
-import soundfile as sf
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Iterable
+
+import numpy as np
+
 from helpers import runtime
 from helpers.print_style import PrintStyle
 from helpers.notification import NotificationManager, NotificationType, NotificationPriority
@@ -17,6 +23,12 @@ _voice = "am_puck,am_onyx"
 _speed = 1.1
 is_updating_model = False
 
+SAMPLE_RATE = 24000
+WAV_HEADER_SIZE = 44
+
+# The pipeline is not thread-safe: one synthesis thread, off the event loop
+_executor: ThreadPoolExecutor | None = None
+
 
 async def preload():
     try:
@@ -101,27 +113,116 @@ async def synthesize_sentences(sentences: list[str]):
 async def _synthesize_sentences(sentences: list[str]):
     await _preload()
 
-    combined_audio = []
-
-    try:
+    def synthesize() -> str:
+        parts: list[np.ndarray] = []
         for sentence in sentences:
             if sentence.strip():
-                segments = _pipeline(sentence.strip(), voice=_voice, speed=_speed) # type: ignore
-                segment_list = list(segments)
+                parts.extend(_synthesize_parts(sentence.strip()))
+        return base64.b64encode(_encode_wav(parts)).decode("utf-8")
 
-                for segment in segment_list:
-                    audio_tensor = segment.audio
-                    audio_numpy = audio_tensor.detach().cpu().numpy() # type: ignore
-                    combined_audio.extend(audio_numpy)
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_executor(), synthesize)
+    except Exception as e:
+        PrintStyle.error(f"Error in Kokoro TTS synthesis: {e}")
+        raise
 
-        # Convert combined audio to bytes
-        buffer = io.BytesIO()
-        sf.write(buffer, combined_audio, 24000, format="WAV")
-        audio_bytes = buffer.getvalue()
 
-        # Return base64 encoded audio
-        return base64.b64encode(audio_bytes).decode("utf-8")
+async def synthesize_stream(
+    sentences: Iterable[str], cancel: threading.Event | None = None
+) -> AsyncIterator[dict]:
+    """Yield ``{"index", "text", "audio"}`` (base64 WAV) per sentence as soon
+    as it is synthesized, so playback can start on the first one.
 
-    except Exception as e:
-        PrintStyle.error(f"Error in Kokoro TTS synthesis: {e}")
-        raise    
\ No newline at end of file
+    Synthesis stops when ``cancel`` is set or the consumer stops iterating.
+    """
+    await _preload()
+    cancel = cancel or threading.Event()
+    loop = asyncio.get_running_loop()
+    chunks: asyncio.Queue = asyncio.Queue()
+
+    def put(item) -> None:
+        try:
+            loop.call_soon_threadsafe(chunks.put_nowait, item)
+        except RuntimeError:
+            cancel.set()  # the consumer's loop is gone
+
+    def produce() -> None:
+        try:
+            texts = [s.strip() for s in sentences if s.strip()]
+            for index, text in enumerate(texts):
+                if cancel.is_set():
+                    return
+                parts = _synthesize_parts(text, cancel)
+                if cancel.is_set():
+                    return
+                audio = base64.b64encode(_encode_wav(parts)).decode("utf-8")
+                put({"index": index, "text": text, "audio": audio})
+            put(None)
+        except Exception as e:
+            put(e)
+
+    loop.run_in_executor(_get_executor(), produce)
+    try:
+        while True:
+            item = await chunks.get()
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                PrintStyle.error(f"Error in Kokoro TTS synthesis: {item}")
+                raise item
+            yield item
+    finally:
+        cancel.set()  # interrupted playback or a closed consumer
+
+
+def split_sentences(text: str) -> list[str]:
+    """Split text at line breaks and sentence ends."""
+    return [
+        sentence.strip()
+        for line in text.splitlines()
+        for sentence in re.split(r"(?<=[.!?])\s+", line)
+        if sentence.strip()
+    ]
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="kokoro-tts")
+    return _executor
+
+
+def _synthesize_parts(sentence: str, cancel: threading.Event | None = None) -> list[np.ndarray]:
+    parts: list[np.ndarray] = []
+    for segment in _pipeline(sentence, voice=_voice, speed=_speed):  # type: ignore
+        if cancel is not None and cancel.is_set():
+            break
+        audio = segment.audio
+        if hasattr(audio, "detach"):
+            audio = audio.detach().cpu().numpy()  # a view of the CPU tensor, not a copy
+        parts.append(np.asarray(audio, dtype=np.float32).reshape(-1))
+    return parts
+
+
+def _encode_wav(parts: list[np.ndarray]) -> bytearray:
+    """Encode float audio parts as one 16-bit PCM WAV.
+
+    Each part is converted into the preallocated output buffer: no
+    per-sample Python objects and no intermediate joined array.
+    """
+    samples = sum(len(part) for part in parts)
+    data_size = 2 * samples
+    wav = bytearray(WAV_HEADER_SIZE + data_size)
+    struct.pack_into(
+        "<4sI4s4sIHHIIHH4sI", wav, 0,
+        b"RIFF", 36 + data_size, b"WAVE",
+        b"fmt ", 16, 1, 1, SAMPLE_RATE, SAMPLE_RATE * 2, 2, 16,
+        b"data", data_size,
+    )
+    pcm = np.frombuffer(wav, dtype="<i2", offset=WAV_HEADER_SIZE)
+    position = 0
+    for part in parts:
+        clipped = np.clip(part, -1.0, 1.0)
+        pcm[position:position + len(part)] = np.round(clipped * 32767).astype(np.int16)
+        position += len(part)
+    return wav
@@ -7,7 +7,8 @@ from collections import OrderedDict
 from dataclasses import dataclass
 from typing import Any, Literal, Optional, TYPE_CHECKING, TypeVar, cast
 
-from helpers.secrets import get_secrets_manager
+from helpers import context_signals
+from helpers.secrets import SecretsMatcher, alias_for_key, get_secrets_manager
 from helpers.strings import truncate_text_by_ratio
 
 
@@ -69,6 +70,11 @@ KEY_MAX_LEN: int = 60
 VALUE_MAX_LEN: int = 5000
 PROGRESS_MAX_LEN: int = 120
 
+# streamed fields whose masking state is kept, most recently updated first
+STREAM_STATES_MAX: int = 16
+# content change records kept per item for computing snapshot deltas
+CONTENT_CHANGES_MAX: int = 32
+
 
 def _truncate_heading(text: str | None) -> str:
     if text is None:
@@ -143,6 +149,75 @@ def _truncate_content(text: str | None, type: Type) -> str:
     return truncated
 
 
+class _StreamText:
+    """Masked view of a text that usually grows by appending.
+
+    Text more than one secret length before the end can no longer become part
+    of a new match, so its masked form is committed and only the remaining
+    window plus the appended delta is scanned again. The result is identical
+    to masking the whole text at once, at a cost proportional to the delta.
+    """
+
+    def __init__(self, matcher: SecretsMatcher | None):
+        self.matcher = matcher
+        self.window = (
+            max((len(value) for value in matcher.value_to_key), default=1)
+            if matcher
+            else 1
+        )
+        self.raw = ""
+        self.committed = 0
+        self.committed_masked = ""
+        self.masked = ""
+
+    def feed(self, text: str) -> int:
+        """Mask ``text``; return how much of the previous masked text it kept."""
+        if text.startswith(self.raw):
+            stable = len(self.committed_masked)
+        else:
+            self.committed = 0
+            self.committed_masked = ""
+            stable = 0
+        self.raw = text
+        tail = text[self.committed :]
+
+        if not self.matcher:
+            self.committed = len(text)
+            self.committed_masked += tail
+            self.masked = self.committed_masked
+            return stable
+
+        matches = list(self.matcher.finditer(tail))
+        # matches starting before `safe` cannot grow any further
+        safe = len(tail) - (self.window - 1)
+        commit = max(0, safe)
+        for start, end, _key in matches:
+            if start < safe:
+                commit = max(commit, end)
+
+        head = self._render(tail, 0, commit, matches)
+        rest = self._render(tail, commit, len(tail), matches)
+        self.committed += commit
+        self.committed_masked += head
+        self.masked = self.committed_masked + rest
+        return stable
+
+    @staticmethod
+    def _render(
+        text: str, begin: int, end: int, matches: list[tuple[int, int, str]]
+    ) -> str:
+        out: list[str] = []
+        pos = begin
+        for start, stop, key in matches:
+            if start < begin or start >= end:
+                continue
+            out.append(text[pos:start])
+            out.append(alias_for_key(key))
+            pos = stop
+        out.append(text[pos:end])
+        return "".join(out)
+
+
 @dataclass
 class LogItem:
     log: "Log"
@@ -190,10 +265,10 @@ class LogItem:
         if heading is not None:
             self.update(heading=self.heading + heading)
         if content is not None:
-            self.update(content=self.content + content)
+            self.update(content=self.log._raw_text(self, "content") + content)
 
         for k, v in kwargs.items():
-            prev = self.kvps.get(k, "") if self.kvps else ""
+            prev = self.log._raw_text(self, "kvps", k)
             self.update(**{k: prev + v})
 
     def output(self):
@@ -224,6 +299,7 @@ class Log:
         self.guid: str = str(uuid.uuid4())
         self.updates: list[int] = []
         self.logs: list[LogItem] = []
+        self._init_journal()
         self.progress: str = ""
         self.progress_no: int = 0
         self.progress_active: bool = False
@@ -254,6 +330,7 @@ class Log:
             )
 
             self.logs.append(item)
+            self._content_changes[item.no] = [(len(self.updates), 0)]
 
         # Update outside the lock - the heavy masking/truncation work should not hold
         # the lock; we only need locking while mutating shared arrays/fields.
@@ -295,20 +372,31 @@ class Log:
             heading_out = _truncate_heading(self._mask_recursive(heading))
 
         content_out: str | None = None
+        content_stable = 0
         if content is not None:
-            content_out = _truncate_content(self._mask_recursive(content), type_for_truncation)
+            masked, content_stable = self._mask_streamed(no, ("content",), content)
+            content_out = _truncate_content(masked, type_for_truncation)
+            if content_out is not masked:
+                content_stable = 0  # truncation moves the marker, resend all
 
         kvps_out: OrderedDict | None = None
         if kvps is not None:
-            kvps_out_tmp = OrderedDict(copy.deepcopy(kvps))
-            kvps_out_tmp = self._mask_recursive(kvps_out_tmp)
-            kvps_out_tmp = _truncate_value(kvps_out_tmp)
-            kvps_out = OrderedDict(kvps_out_tmp)
+            kvps_out = OrderedDict()
+            for key, value in kvps.items():
+                if isinstance(value, str):
+                    value, _ = self._mask_streamed(no, ("kvps", key), value)
+                else:
+                    value = self._mask_recursive(copy.deepcopy(value))
+                kvps_out[_truncate_key(key)] = _truncate_value(value)
 
         kwargs_out: dict | None = None
         if kwargs:
-            kwargs_out = copy.deepcopy(kwargs)
-            kwargs_out = self._mask_recursive(kwargs_out)
+            kwargs_out = {}
+            for key, value in kwargs.items():
+                if isinstance(value, str):
+                    kwargs_out[key], _ = self._mask_streamed(no, ("kvps", key), value)
+                else:
+                    kwargs_out[key] = self._mask_recursive(copy.deepcopy(value))
 
         with self._lock:
             item = self.logs[no]
@@ -326,6 +414,7 @@ class Log:
                 item.heading = heading_out
 
             if content_out is not None:
+                content_stable = min(content_stable, len(item.content))
                 item.content = content_out
 
             if kvps_out is not None:
@@ -338,7 +427,9 @@ class Log:
                     item.kvps = OrderedDict()
                 item.kvps.update(kwargs_out)
 
-            self.updates.append(item.no)
+            index = self._journal(item.no)
+            if content_out is not None:
+                self._record_content_change(item.no, index, content_stable)
 
             if item.heading and item.update_progress != "none":
                 if item.no >= self.progress_no:
@@ -358,6 +449,7 @@ class Log:
         # (context metadata like last_message/log_version). Broadcast so all tabs refresh
         # their chat/task lists without leaking logs (logs are still scoped per-sid).
         _lazy_mark_dirty_all(reason="log.Log._notify_state_monitor")
+        context_signals.emit(ctx.id, context_signals.LOG)
 
     def _notify_state_monitor_for_context_update(self) -> None:
         ctx = self.context
@@ -366,6 +458,7 @@ class Log:
         # Log item updates only need to refresh the active chat stream for any sid
         # currently projecting this context. Avoid global fanout at high frequency.
         _lazy_mark_dirty_for_context(ctx.id, reason="log.Log._update_item")
+        context_signals.emit(ctx.id, context_signals.LOG)
 
     def set_progress(self, progress: str, no: int = 0, active: bool = True):
         progress = self._mask_recursive(progress)
@@ -392,7 +485,13 @@ class Log:
     def set_initial_progress(self):
         self.set_progress("Waiting for input", 0, False)
 
-    def output(self, start=None, end=None):
+    def output(self, start=None, end=None, deltas: bool = False):
+        """Items updated in ``updates[start:end]``.
+
+        With ``deltas`` an item whose content only grew since ``start`` is sent
+        as ``content_offset`` plus the text from that offset on; the receiver
+        keeps its first ``content_offset`` characters.
+        """
         with self._lock:
             if start is None:
                 start = 0
@@ -400,22 +499,118 @@ class Log:
                 end = len(self.updates)
             updates = self.updates[start:end]
             logs = list(self.logs)
-
-        out = []
-        seen = set()
-        for update in updates:
-            if update not in seen and update < len(logs):
-                out.append(logs[update].output())
-                seen.add(update)
+            self.mark_read(end)
+
+            out = []
+            seen = set()
+            for update in updates:
+                if update not in seen and update < len(logs):
+                    item = logs[update].output()
+                    offset = self._content_offset(update, start) if deltas and start else 0
+                    if offset:
+                        item["content"] = item["content"][offset:]
+                        item["content_offset"] = offset
+                    out.append(item)
+                    seen.add(update)
         return LogOutput(items=out, start=start, end=end)
 
+    def mark_read(self, end: int) -> None:
+        """Note that a reader consumed ``updates[:end]``.
+
+        Updates after the newest read position are coalesced: an item already
+        queued there is not journaled again, so a streamed item adds one entry
+        per push instead of one per chunk.
+        """
+        with self._lock:
+            self._read_end = max(self._read_end, end)
+
     def reset(self):
         with self._lock:
             self.guid = str(uuid.uuid4())
             self.updates = []
             self.logs = []
+            self._init_journal()
         self.set_initial_progress()
 
+    def _init_journal(self) -> None:
+        self._read_end = 0
+        self._queued: dict[int, int] = {}
+        self._content_changes: dict[int, list[tuple[int, int]]] = {}
+        self._streams: OrderedDict[tuple, _StreamText] = OrderedDict()
+        self._streams_lock = threading.Lock()
+
+    def _journal(self, no: int) -> int:
+        # caller holds self._lock
+        index = self._queued.get(no)
+        if index is not None and index >= self._read_end:
+            return index
+        index = len(self.updates)
+        self.updates.append(no)
+        self._queued[no] = index
+        return index
+
+    def _record_content_change(self, no: int, index: int, stable: int) -> None:
+        # caller holds self._lock
+        changes = self._content_changes.get(no)
+        if changes is None:
+            return  # restored item, history unknown
+        if changes and changes[-1][0] == index:
+            changes[-1] = (index, min(changes[-1][1], stable))
+            return
+        changes.append((index, stable))
+        if len(changes) > CONTENT_CHANGES_MAX:
+            # history is lost; force full resends for readers that predate it
+            del changes[:-CONTENT_CHANGES_MAX]
+            changes[0] = (changes[0][0], 0)
+
+    def _content_offset(self, no: int, start: int) -> int:
+        # caller holds self._lock
+        changes = self._content_changes.get(no)
+        if not changes or changes[0][0] >= start:
+            return 0
+        stable = len(self.logs[no].content)
+        for index, kept in changes:
+            if index >= start:
+                stable = min(stable, kept)
+        return stable
+
+    def _raw_text(self, item: LogItem, *field: str) -> str:
+        """Unmasked text last set on a streamed field, for appending to it."""
+        with self._streams_lock:
+            stream = self._streams.get((item.no, *field))
+        if stream is not None:
+            return stream.raw
+        if field == ("content",):
+            return item.content
+        return str(item.kvps.get(field[-1], "")) if item.kvps else ""
+
+    def _mask_streamed(self, no: int, field: tuple, text: str) -> tuple[str, int]:
+        """Mask a text field, re-scanning only what was appended since last time.
+
+        Returns the masked text and the length of the previous masked value it
+        kept unchanged (0 when the text was replaced rather than appended).
+        """
+        try:
+            from agent import AgentContext
+
+            secrets_mgr = get_secrets_manager(self.context or AgentContext.current())
+            matcher = secrets_mgr.get_matcher(4)
+        except Exception:
+            # If masking fails, keep the original text
+            return text, 0
+
+        key = (no, *field)
+        with self._streams_lock:
+            stream = self._streams.get(key)
+            if stream is None or stream.matcher is not matcher:
+                stream = _StreamText(matcher)
+            self._streams[key] = stream
+            self._streams.move_to_end(key)
+            while len(self._streams) > STREAM_STATES_MAX:
+                self._streams.popitem(last=False)
+            stable = stream.feed(text)
+            return stream.masked, stable
+
     def _mask_recursive(self, obj: T) -> T:
         """Recursively mask secrets in nested objects."""
         try:
@@ -0,0 +1,254 @@
+"""Event-loop lag sampler and blocking-call profiler.
+
+Every watched loop runs a cheap heartbeat callback every ``HEARTBEAT_INTERVAL``
+seconds; how late each beat fires is the loop's lag. A single watchdog thread
+notices when a beat is overdue by more than ``A0_LOOP_STALL_MS`` and grabs the
+loop thread's stack via ``sys._current_frames`` while it is still blocked, so
+the stall can be traced to the offending code instead of the await that
+resumes afterwards.
+
+Stalls are attributed to the labels set with ``activity()`` in the blocked
+task (extension point, tool name, context id) and aggregated per label.
+"""
+
+import asyncio
+import contextvars
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Iterator
+
+MONITOR_ENV = "A0_LOOP_MONITOR"
+STALL_THRESHOLD_ENV = "A0_LOOP_STALL_MS"
+
+HEARTBEAT_INTERVAL = 0.1
+DEFAULT_STALL_MS = 200
+RECENT_STALLS = 50
+STACK_DEPTH = 25
+
+ATTRIBUTION_KEYS = ("extension", "tool", "context")
+
+_activity: contextvars.ContextVar[dict[str, str] | None] = contextvars.ContextVar(
+    "_loop_monitor_activity", default=None
+)
+
+
+@dataclass
+class _Aggregate:
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+    def add(self, ms: float) -> None:
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_ms, 1),
+            "max_ms": round(self.max_ms, 1),
+        }
+
+
+@dataclass
+class _Watched:
+    name: str
+    loop: asyncio.AbstractEventLoop
+    thread_id: int | None = None
+    expected: float = 0.0
+    stopped: bool = False
+    beats: int = 0
+    lag_total: float = 0.0
+    lag_max: float = 0.0
+    lag_last: float = 0.0
+    stalls: int = 0
+    # stack and labels captured by the watchdog during the current stall
+    capture: tuple[list[str], dict[str, str]] | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "beats": self.beats,
+            "lag_avg_ms": round(self.lag_total / self.beats * 1000, 3) if self.beats else 0.0,
+            "lag_max_ms": round(self.lag_max * 1000, 3),
+            "lag_last_ms": round(self.lag_last * 1000, 3),
+            "stalls": self.stalls,
+        }
+
+
+@dataclass
+class _State:
+    watched: dict[int, _Watched] = field(default_factory=dict)
+    attribution: dict[str, dict[str, _Aggregate]] = field(default_factory=dict)
+    recent: deque = field(default_factory=lambda: deque(maxlen=RECENT_STALLS))
+
+
+_state = _State()
+_lock = threading.Lock()
+_watchdog: threading.Thread | None = None
+
+
+def enabled() -> bool:
+    return os.getenv(MONITOR_ENV, "true").strip().lower() not in {
+        "0",
+        "false",
+        "no",
+        "off",
+    }
+
+
+def stall_threshold() -> float:
+    try:
+        return max(10, int(os.getenv(STALL_THRESHOLD_ENV, str(DEFAULT_STALL_MS)))) / 1000
+    except (TypeError, ValueError):
+        return DEFAULT_STALL_MS / 1000
+
+
+@contextmanager
+def activity(**labels: str | None) -> Iterator[None]:
+    """Label work in the current task so stalls inside it can be attributed."""
+    current = _activity.get() or {}
+    merged = {**current, **{k: str(v) for k, v in labels.items() if v}}
+    token = _activity.set(merged)
+    try:
+        yield
+    finally:
+        _activity.reset(token)
+
+
+def watch(loop: asyncio.AbstractEventLoop, name: str) -> None:
+    """Start sampling ``loop``; safe to call from any thread."""
+    if not enabled():
+        return
+    with _lock:
+        if id(loop) in _state.watched:
+            return
+        watched = _Watched(name=name, loop=loop)
+        _state.watched[id(loop)] = watched
+    _ensure_watchdog()
+    try:
+        loop.call_soon_threadsafe(_beat, watched)
+    except RuntimeError:  # loop already closed
+        unwatch(loop)
+
+
+def unwatch(loop: asyncio.AbstractEventLoop) -> None:
+    with _lock:
+        watched = _state.watched.pop(id(loop), None)
+    if watched:
+        watched.stopped = True
+
+
+def get_stats() -> dict[str, Any]:
+    with _lock:
+        return {
+            "threshold_ms": round(stall_threshold() * 1000),
+            "loops": [w.to_dict() for w in _state.watched.values()],
+            "attribution": {
+                key: {
+                    label: agg.to_dict()
+                    for label, agg in sorted(
+                        values.items(), key=lambda item: -item[1].total_ms
+                    )
+                }
+                for key, values in _state.attribution.items()
+            },
+            "recent": list(_state.recent),
+        }
+
+
+def reset_stats() -> None:
+    with _lock:
+        for watched in _state.watched.values():
+            watched.beats = watched.stalls = 0
+            watched.lag_total = watched.lag_max = watched.lag_last = 0.0
+        _state.attribution.clear()
+        _state.recent.clear()
+
+
+def _beat(watched: _Watched) -> None:
+    if watched.stopped:
+        return
+    now = time.perf_counter()
+    if watched.thread_id is None:
+        watched.thread_id = threading.get_ident()
+    else:
+        lag = max(0.0, now - watched.expected)
+        with _lock:
+            watched.beats += 1
+            watched.lag_total += lag
+            watched.lag_max = max(watched.lag_max, lag)
+            watched.lag_last = lag
+            if lag >= stall_threshold():
+                _record_stall(watched, lag)
+            watched.capture = None
+    watched.expected = now + HEARTBEAT_INTERVAL
+    watched.loop.call_later(HEARTBEAT_INTERVAL, _beat, watched)
+
+
+def _record_stall(watched: _Watched, lag: float) -> None:
+    stack, labels = watched.capture or ([], {})
+    ms = lag * 1000
+    watched.stalls += 1
+    for key in ATTRIBUTION_KEYS:
+        label = labels.get(key)
+        if label:
+            _state.attribution.setdefault(key, {}).setdefault(label, _Aggregate()).add(ms)
+    _state.recent.append(
+        {
+            "loop": watched.name,
+            "at": datetime.now(timezone.utc).isoformat(),
+            "duration_ms": round(ms, 1),
+            "labels": labels,
+            "stack": stack,
+        }
+    )
+
+
+def _ensure_watchdog() -> None:
+    global _watchdog
+    with _lock:
+        if _watchdog and _watchdog.is_alive():
+            return
+        _watchdog = threading.Thread(
+            target=_watchdog_loop, daemon=True, name="LoopMonitorWatchdog"
+        )
+        _watchdog.start()
+
+
+def _watchdog_loop() -> None:
+    while True:
+        threshold = stall_threshold()
+        time.sleep(min(HEARTBEAT_INTERVAL, threshold / 2))
+        now = time.perf_counter()
+        with _lock:
+            overdue = [
+                w
+                for w in _state.watched.values()
+                if w.thread_id is not None
+                and w.capture is None
+                and now - w.expected >= threshold
+            ]
+        for watched in overdue:
+            watched.capture = _capture(watched)
+
+
+def _capture(watched: _Watched) -> tuple[list[str], dict[str, str]]:
+    frame = sys._current_frames().get(watched.thread_id or 0)
+    stack = traceback.format_stack(frame, limit=STACK_DEPTH) if frame else []
+    labels: dict[str, str] = {}
+    try:
+        task = asyncio.current_task(watched.loop)
+        if task is not None:
+            labels = dict(task.get_context().get(_activity) or {})
+    except Exception:
+        pass
+    return [line.rstrip() for line in stack], labels
@@ -44,6 +44,21 @@ from helpers.print_style import PrintStyle
 from helpers.tool import Tool, Response
 
 
+# bumped whenever servers or their tool lists change, lets prompt sections skip rebuilds
+_tools_version = 0
+_tools_version_lock = threading.Lock()
+
+
+def get_tools_version() -> int:
+    return _tools_version
+
+
+def _bump_tools_version() -> None:
+    global _tools_version
+    with _tools_version_lock:
+        _tools_version += 1
+
+
 def normalize_name(name: str) -> str:
     # Lowercase and strip whitespace
     name = name.strip().lower()
@@ -534,6 +549,7 @@ class MCPConfig(BaseModel):
         self.servers = []
         # initialize failed servers list
         self.disconnected_servers = []
+        _bump_tools_version()
 
         if not isinstance(servers_list, Iterable):
             (
@@ -933,6 +949,7 @@ class MCPClientBase(ABC):
             with self.__lock:
                 self.tools = []  # Ensure tools are cleared on failure
                 self.error = f"Failed to initialize. {error_text[:200]}{'...' if len(error_text) > 200 else ''}"  # store error from tools fetch
+        _bump_tools_version()
         return self
 
     def has_tool(self, tool_name: str) -> bool:
@@ -12,7 +12,7 @@ from agent import AgentContext, AgentContextType, UserMessage
 from helpers.persist_chat import remove_chat
 from initialize import initialize_agent
 from helpers.print_style import PrintStyle
-from helpers import settings, projects
+from helpers import admission, settings, projects
 from starlette.middleware import Middleware
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.exceptions import HTTPException as StarletteHTTPException
@@ -272,11 +272,12 @@ async def _run_chat(
             for filename in attachment_filenames:
                 _PRINTER.print(f"- {filename}")
 
-        task = context.communicate(
-            UserMessage(
-                message=message, system_message=[], attachments=attachment_filenames
+        with admission.source(admission.SOURCE_MCP):
+            task = context.communicate(
+                UserMessage(
+                    message=message, system_message=[], attachments=attachment_filenames
+                )
             )
-        )
         result = await task.result()
 
         # Success
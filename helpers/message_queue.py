@@ -1,7 +1,7 @@
 import os
 import uuid
 from typing import TYPE_CHECKING
-from helpers import guids
+from helpers import context_signals, guids
 
 if TYPE_CHECKING:
     from agent import AgentContext
@@ -40,6 +40,7 @@ def _sync_output(context: "AgentContext"):
             "attachment_count": len(item.get("attachments", [])),
         })
     context.set_output_data(QUEUE_KEY, truncated)
+    context_signals.emit(context.id, context_signals.QUEUE)
 
 
 def add(
@@ -1,6 +1,9 @@
 from collections import OrderedDict
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any
+import os
+import threading
 import uuid
 from agent import Agent, AgentConfig, AgentContext, AgentContextType
 from helpers import files, history
@@ -12,6 +15,9 @@ from helpers.log import Log, LogItem
 CHATS_FOLDER = "usr/chats"
 LOG_SIZE = 1000
 CHAT_FILE_NAME = "chat.json"
+JOURNAL_FILE_NAME = "chat.journal"
+# compact once the journal outgrows both this floor and the snapshot itself
+JOURNAL_COMPACT_MIN_BYTES = 1024 * 1024
 
 
 def get_chat_folder_path(ctxid: str):
@@ -30,16 +36,35 @@ def get_chat_msg_files_folder(ctxid: str):
     return files.get_abs_path(get_chat_folder_path(ctxid), "messages")
 
 def save_tmp_chat(context: AgentContext):
-    """Save context to the chats folder"""
+    """Save context to the chats folder.
+
+    Changes since the previous save are appended to the chat journal; the full
+    snapshot in chat.json is only rewritten when the journal has grown past
+    the compaction threshold or no journal baseline exists yet.
+    """
     # Skip saving BACKGROUND contexts as they should be ephemeral
     if context.type == AgentContextType.BACKGROUND:
         return
 
-    path = _get_chat_file_path(context.id)
-    files.make_dirs(path)
-    data = _serialize_context(context)
-    js = _safe_json_serialize(data, ensure_ascii=False)
-    files.write_file(path, js)
+    with _journal_lock(context.id):
+        journal = _journals.get(context.id)
+        if journal is None:
+            _write_snapshot(context)
+            return
+
+        frames = journal.diff(context)
+        if not frames:
+            return
+        lines = []
+        for frame in frames:
+            journal.seq += 1
+            frame["seq"] = journal.seq
+            lines.append(_safe_json_serialize(frame, ensure_ascii=False) + "\n")
+        journal.journal_bytes = files.append_file(
+            _get_journal_file_path(context.id), "".join(lines)
+        )
+        if journal.journal_bytes > max(JOURNAL_COMPACT_MIN_BYTES, journal.snapshot_bytes):
+            _write_snapshot(context)
 
 
 def save_tmp_chats():
@@ -52,20 +77,29 @@ def save_tmp_chats():
 
 
 def load_tmp_chats():
-    """Load all contexts from the chats folder"""
+    """Load all contexts from the chats folder.
+
+    Each chat is rebuilt from its snapshot plus journal; agent histories are
+    only deserialized when first accessed.
+    """
     _convert_v080_chats()
     folders = files.list_files(CHATS_FOLDER, "*")
-    json_files = []
-    for folder_name in folders:
-        json_files.append(_get_chat_file_path(folder_name))
 
     ctxids = []
-    for file in json_files:
+    for folder_name in folders:
+        file = _get_chat_file_path(folder_name)
         try:
-            js = files.read_file(file)
-            data = json.loads(js)
-            ctx = _deserialize_context(data)
+            data, seq = _read_chat(folder_name)
+            ctx = _deserialize_context(data, lazy_history=True)
             ctxids.append(ctx.id)
+            if ctx.id == folder_name and _log_numbering_kept(data):
+                with _journal_lock(ctx.id):
+                    _journals[ctx.id] = _ChatJournal.capture(
+                        ctx,
+                        seq=seq,
+                        snapshot_bytes=_file_size(file),
+                        journal_bytes=_file_size(_get_journal_file_path(ctx.id)),
+                    )
         except Exception as e:
             print(f"Error loading chat {file}: {e}")
     return ctxids
@@ -75,6 +109,10 @@ def _get_chat_file_path(ctxid: str):
     return files.get_abs_path(CHATS_FOLDER, ctxid, CHAT_FILE_NAME)
 
 
+def _get_journal_file_path(ctxid: str):
+    return files.get_abs_path(CHATS_FOLDER, ctxid, JOURNAL_FILE_NAME)
+
+
 def _convert_v080_chats():
     json_files = files.list_files(CHATS_FOLDER, "*.json")
     for file in json_files:
@@ -105,8 +143,12 @@ def export_json_chat(context: AgentContext):
 
 def remove_chat(ctxid):
     """Remove a chat or task context"""
-    path = get_chat_folder_path(ctxid)
-    files.delete_dir(path)
+    with _journal_lock(ctxid):
+        _journals.pop(ctxid, None)
+        path = get_chat_folder_path(ctxid)
+        files.delete_dir(path)
+        with _journal_locks_guard:
+            _journal_locks.pop(ctxid, None)
 
 
 def remove_msg_files(ctxid):
@@ -116,25 +158,29 @@ def remove_msg_files(ctxid):
 
 
 def _serialize_context(context: AgentContext):
+    # serialize agents
+    agents = [_serialize_agent(agent) for agent in _iter_agents(context)]
+
+    return {
+        "id": context.id,
+        **_serialize_meta(context),
+        "agents": agents,
+        "log": _serialize_log(context.log),
+    }
+
+
+def _serialize_meta(context: AgentContext):
+    """Everything except agent histories and the log."""
     profile = str(
         getattr(context.config, "profile", None)
         or getattr(context.agent0.config, "profile", None)
         or ""
     )
 
-    # serialize agents
-    agents = []
-    agent = context.agent0
-    while agent:
-        agents.append(_serialize_agent(agent))
-        agent = agent.data.get(Agent.DATA_NAME_SUBORDINATE, None)
-
-
     data = {k: v for k, v in context.data.items() if not k.startswith("_")}
     output_data = {k: v for k, v in context.output_data.items() if not k.startswith("_")}
 
     return {
-        "id": context.id,
         "name": context.name,
         "created_at": (
             context.created_at.isoformat()
@@ -147,26 +193,34 @@ def _serialize_context(context: AgentContext):
             if context.last_message
             else datetime.fromtimestamp(0).isoformat()
         ),
-        "agents": agents,
         "streaming_agent": (
             context.streaming_agent.number if context.streaming_agent else 0
         ),
         "agent_profile": profile,
-        "log": _serialize_log(context.log),
         "data": data,
         "output_data": output_data,
     }
 
 
+def _iter_agents(context: AgentContext):
+    agent = context.agent0
+    while agent:
+        yield agent
+        agent = agent.data.get(Agent.DATA_NAME_SUBORDINATE, None)
+
+
 def _serialize_agent(agent: Agent):
-    data = {k: v for k, v in agent.data.items() if not k.startswith("_")}
+    return {
+        **_serialize_agent_meta(agent),
+        "history": agent.history.serialize(),
+    }
 
-    history = agent.history.serialize()
 
+def _serialize_agent_meta(agent: Agent):
+    data = {k: v for k, v in agent.data.items() if not k.startswith("_")}
     return {
         "number": agent.number,
         "data": data,
-        "history": history,
     }
 
 
@@ -185,7 +239,7 @@ def _serialize_log(log: Log):
     }
 
 
-def _deserialize_context(data):
+def _deserialize_context(data, lazy_history: bool = False):
     profile = data.get("agent_profile")
     override_settings = {"agent_profile": profile} if profile else None
     config = initialize_agent(override_settings=override_settings)
@@ -216,7 +270,7 @@ def _deserialize_context(data):
     )
 
     agents = data.get("agents", [])
-    agent0 = _deserialize_agents(agents, config, context)
+    agent0 = _deserialize_agents(agents, config, context, lazy_history)
     streaming_agent = agent0
     while streaming_agent and streaming_agent.number != data.get("streaming_agent", 0):
         streaming_agent = streaming_agent.data.get(Agent.DATA_NAME_SUBORDINATE, None)
@@ -228,7 +282,10 @@ def _deserialize_context(data):
 
 
 def _deserialize_agents(
-    agents: list[dict[str, Any]], config: AgentConfig, context: AgentContext
+    agents: list[dict[str, Any]],
+    config: AgentConfig,
+    context: AgentContext,
+    lazy_history: bool = False,
 ) -> Agent:
     prev: Agent | None = None
     zero: Agent | None = None
@@ -240,9 +297,15 @@ def _deserialize_agents(
             context=context,
         )
         current.data = ag.get("data", {})
-        current.history = history.deserialize_history(
-            ag.get("history", ""), agent=current
-        )
+        if lazy_history:
+            current.history = history.History.deferred(
+                current, _history_loader(context.id, ag)
+            )
+        else:
+            current.history = history.deserialize_history(
+                ag.get("history", ""), agent=current
+            )
+            _replay_history_ops(current.history, ag.get("history_ops", []))
         if not zero:
             zero = current
 
@@ -316,3 +379,318 @@ def _safe_json_serialize(obj, **kwargs):
             return False
 
     return json.dumps(obj, default=serializer, **kwargs)
+
+
+# ---------------- Chat journal ----------------
+#
+# chat.journal holds one JSON frame per line, appended after chat.json was
+# last written. Frames carry a sequence number; chat.json records the last
+# sequence it already contains, so frames left over from an interrupted
+# compaction are skipped on replay.
+#
+#   {"op": "meta", ...}                       context fields and agent data
+#   {"op": "history", "agent": n, ...}        full history of one agent
+#   {"op": "history_append", "agent": n, ...} messages appended (optionally
+#                                              after starting a new topic)
+#   {"op": "log", "log": {...}}               whole log (after a reset)
+#   {"op": "log_items", "items": [...]}       upserted log items by "no"
+
+
+@dataclass
+class _HistoryCursor:
+    history_id: int
+    signature: list[tuple[int, str, int]]
+    current_id: int
+    current_count: int
+
+    @staticmethod
+    def capture(hist: history.History) -> "_HistoryCursor":
+        return _HistoryCursor(
+            history_id=id(hist),
+            signature=_history_signature(hist),
+            current_id=id(hist.current),
+            current_count=len(hist.current.messages),
+        )
+
+
+@dataclass
+class _ChatJournal:
+    seq: int = 0
+    snapshot_bytes: int = 0
+    journal_bytes: int = 0
+    meta: str = ""
+    log_guid: str = ""
+    log_cursor: int = 0
+    log_progress: tuple[str, int] = ("", 0)
+    histories: dict[int, _HistoryCursor] = field(default_factory=dict)
+
+    @staticmethod
+    def capture(context: AgentContext, **kwargs) -> "_ChatJournal":
+        journal = _ChatJournal(**kwargs)
+        journal.meta = journal._meta_json(context)
+        with context.log._lock:
+            journal.log_guid = context.log.guid
+            journal.log_cursor = len(context.log.updates)
+            context.log.mark_read(journal.log_cursor)
+            journal.log_progress = (context.log.progress, context.log.progress_no)
+        for agent in _iter_agents(context):
+            # deferred histories capture their own cursor once loaded
+            if agent.history.is_loaded():
+                journal.histories[agent.number] = _HistoryCursor.capture(agent.history)
+        return journal
+
+    def diff(self, context: AgentContext) -> list[dict[str, Any]]:
+        frames: list[dict[str, Any]] = []
+
+        meta = self._meta_json(context)
+        if meta != self.meta:
+            self.meta = meta
+            frames.append({"op": "meta", **json.loads(meta)})
+
+        for agent in _iter_agents(context):
+            frame = self._diff_history(agent)
+            if frame:
+                frames.append(frame)
+
+        frame = self._diff_log(context.log)
+        if frame:
+            frames.append(frame)
+        return frames
+
+    def _meta_json(self, context: AgentContext) -> str:
+        meta = _serialize_meta(context)
+        meta["agents"] = [_serialize_agent_meta(agent) for agent in _iter_agents(context)]
+        return _safe_json_serialize(meta, ensure_ascii=False)
+
+    def _diff_history(self, agent: Agent) -> dict[str, Any] | None:
+        hist = agent.history
+        cursor = self.histories.get(agent.number)
+        if not hist.is_loaded() and cursor is None:
+            return None  # still exactly as persisted
+
+        new = _HistoryCursor.capture(hist)
+        self.histories[agent.number] = new
+        if cursor and cursor.history_id == new.history_id:
+            if new.signature == cursor.signature:
+                return None
+            appended = _appended_messages(hist, cursor, new)
+            if appended is not None:
+                new_topic, messages = appended
+                return {
+                    "op": "history_append",
+                    "agent": agent.number,
+                    "new_topic": new_topic,
+                    "messages": [m.to_dict() for m in messages],
+                }
+        return {"op": "history", "agent": agent.number, "history": hist.serialize()}
+
+    def _diff_log(self, log: Log) -> dict[str, Any] | None:
+        with log._lock:
+            if log.guid != self.log_guid:
+                self.log_guid = log.guid
+                self.log_cursor = len(log.updates)
+                log.mark_read(self.log_cursor)
+                self.log_progress = (log.progress, log.progress_no)
+                return {"op": "log", "log": _serialize_log(log)}
+            updated = list(dict.fromkeys(log.updates[self.log_cursor :]))
+            self.log_cursor = len(log.updates)
+            log.mark_read(self.log_cursor)
+            items = [log.logs[no].output() for no in updated if no < len(log.logs)]
+            progress = (log.progress, log.progress_no)
+        if not items and progress == self.log_progress:
+            return None
+        self.log_progress = progress
+        return {
+            "op": "log_items",
+            "items": items,
+            "progress": progress[0],
+            "progress_no": progress[1],
+        }
+
+
+_journals: dict[str, _ChatJournal] = {}
+_journal_locks: dict[str, threading.RLock] = {}
+_journal_locks_guard = threading.Lock()
+
+
+def _journal_lock(ctxid: str) -> threading.RLock:
+    with _journal_locks_guard:
+        lock = _journal_locks.get(ctxid)
+        if lock is None:
+            lock = _journal_locks[ctxid] = threading.RLock()
+        return lock
+
+
+def _write_snapshot(context: AgentContext):
+    """Compact: write the full chat.json and start an empty journal."""
+    journal = _journals.get(context.id)
+    seq = journal.seq if journal else 0
+    path = _get_chat_file_path(context.id)
+    files.make_dirs(path)
+    data = _serialize_context(context)
+    data["journal_seq"] = seq
+    js = _safe_json_serialize(data, ensure_ascii=False)
+    files.write_file(path, js)
+    files.write_file(_get_journal_file_path(context.id), "")
+    # the baseline is taken after serializing, so it includes loaded histories
+    _journals[context.id] = _ChatJournal.capture(
+        context, seq=seq, snapshot_bytes=_file_size(path)
+    )
+
+
+def _read_chat(ctxid: str) -> tuple[dict[str, Any], int]:
+    """Read chat.json and fold the journal into it, in serialized form."""
+    data = json.loads(files.read_file(_get_chat_file_path(ctxid)))
+    seq = data.pop("journal_seq", 0)
+    journal_path = _get_journal_file_path(ctxid)
+    if not files.exists(journal_path):
+        return data, seq
+
+    agents = {ag["number"]: ag for ag in data.get("agents", [])}
+    logs = {item.get("no", i): item for i, item in enumerate(data.get("log", {}).get("logs", []))}
+
+    for frame in _read_frames(journal_path):
+        if frame.get("seq", 0) <= seq:
+            continue
+        seq = frame["seq"]
+        op = frame.get("op")
+        if op == "meta":
+            for ag in frame.get("agents", []):
+                agents[ag["number"]] = {**agents.get(ag["number"], {}), **ag}
+            numbers = [ag["number"] for ag in frame.get("agents", [])]
+            agents = {n: agents[n] for n in numbers}
+            data.update({k: v for k, v in frame.items() if k not in ("op", "seq", "agents")})
+        elif op == "history" and frame.get("agent") in agents:
+            agent = agents[frame["agent"]]
+            agent["history"] = frame.get("history", "")
+            agent["history_ops"] = []
+        elif op == "history_append" and frame.get("agent") in agents:
+            agents[frame["agent"]].setdefault("history_ops", []).append(frame)
+        elif op == "log":
+            data["log"] = frame.get("log", {})
+            logs = {item.get("no", i): item for i, item in enumerate(data["log"].get("logs", []))}
+        elif op == "log_items":
+            for item in frame.get("items", []):
+                logs[item.get("no", len(logs))] = item
+            data.setdefault("log", {})["progress"] = frame.get("progress", "")
+            data["log"]["progress_no"] = frame.get("progress_no", 0)
+
+    data["agents"] = list(agents.values())
+    data.setdefault("log", {})["logs"] = [logs[no] for no in sorted(logs)][-LOG_SIZE:]
+    return data, seq
+
+
+def _read_frames(path: str) -> list[dict[str, Any]]:
+    frames = []
+    for line in files.read_file(path).splitlines():
+        if not line.strip():
+            continue
+        try:
+            frames.append(json.loads(line))
+        except json.JSONDecodeError:
+            break  # torn write at the tail, nothing after it is trustworthy
+    return frames
+
+
+def _history_loader(ctxid: str, agent_data: dict[str, Any]):
+    serialized = agent_data.get("history", "")
+    ops = agent_data.get("history_ops", [])
+    number = agent_data.get("number", 0)
+
+    def load(hist: history.History):
+        try:
+            if serialized:
+                history.History.from_dict(history._json_loads(serialized), history=hist)
+            else:
+                history.History.__init__(hist, hist.agent)
+            _replay_history_ops(hist, ops)
+        except Exception as e:
+            print(f"Error loading chat history {ctxid}/{number}: {e}")
+            return
+        # Baseline for the next journal diff. Not taken under the journal lock:
+        # a concurrent save may be the one triggering this load.
+        journal = _journals.get(ctxid)
+        if journal is not None:
+            journal.histories[number] = _HistoryCursor.capture(hist)
+
+    return load
+
+
+def _replay_history_ops(hist: history.History, ops: list[dict[str, Any]]):
+    for op in ops:
+        if op.get("new_topic"):
+            hist.new_topic()
+        for message in op.get("messages", []):
+            hist.current.messages.append(history.Message.from_dict(message, history=hist))
+            hist.counter += 1
+
+
+def _history_signature(hist: history.History) -> list[tuple[int, str, int]]:
+    """Identity, summary and content fingerprint of every record, in output order.
+
+    Comparing these tells appends apart from restructuring (compression,
+    merges) and from messages edited in place, which need a full frame.
+    """
+    signature: list[tuple[int, str, int]] = []
+
+    def walk(record):
+        signature.append((id(record), getattr(record, "summary", ""), 0))
+        if isinstance(record, history.Topic):
+            for message in record.messages:
+                signature.append(
+                    (id(message), message.summary, _content_fingerprint(message.content))
+                )
+        elif isinstance(record, history.Bulk):
+            for nested in record.records:
+                walk(nested)
+
+    for record in [*hist.bulks, *hist.topics, hist.current]:
+        walk(record)
+    return signature
+
+
+def _content_fingerprint(content: Any) -> int:
+    # str hashes are cached on the object, so unchanged text costs nothing
+    if isinstance(content, str):
+        return hash(content)
+    if isinstance(content, dict):
+        return hash(tuple((key, _content_fingerprint(value)) for key, value in content.items()))
+    if isinstance(content, (list, tuple)):
+        return hash(tuple(_content_fingerprint(item) for item in content))
+    try:
+        return hash(content)
+    except TypeError:
+        return hash(repr(content))
+
+
+def _appended_messages(
+    hist: history.History, old: _HistoryCursor, new: _HistoryCursor
+) -> tuple[bool, list[history.Message]] | None:
+    """Messages added since old if nothing else changed, else None."""
+    if new.signature[: len(old.signature)] != old.signature:
+        return None
+    if new.current_id == old.current_id:
+        return False, hist.current.messages[old.current_count :]
+    # new_topic(): the old current topic closed unchanged, a fresh one follows
+    if (
+        hist.topics
+        and id(hist.topics[-1]) == old.current_id
+        and len(hist.topics[-1].messages) == old.current_count
+        and not hist.current.summary
+        and len(new.signature) == len(old.signature) + 1 + len(hist.current.messages)
+    ):
+        return True, list(hist.current.messages)
+    return None
+
+
+def _log_numbering_kept(data: dict[str, Any]) -> bool:
+    # the log is renumbered from 0 on load; journal item numbers must still match
+    logs = data.get("log", {}).get("logs", [])
+    return all(item.get("no", i) == i for i, item in enumerate(logs))
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
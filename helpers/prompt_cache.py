@@ -0,0 +1,217 @@
+"""Prefix-stable prompt layout and provider prompt-cache accounting.
+
+Providers cache the longest unchanged prompt prefix, so the main prompt is laid
+out from most to least stable: system prompt, append-only history, then the
+per-iteration extras (datetime, recalled memories, workdir listing, ...). The
+extras message is marked volatile so ``apply_layout`` can keep it out of the
+cached prefix and place the explicit cache breakpoints on the stable boundary
+instead of whatever message happens to be last.
+
+Cache read/write token counts reported by LiteLLM are collected per model and
+exposed through ``get_stats`` for the ``prompt_cache_stats`` API.
+"""
+
+import threading
+from dataclasses import asdict, dataclass
+from typing import Any, Mapping
+
+from langchain_core.messages import BaseMessage
+
+
+VOLATILE_MARKER = "a0_volatile"
+EPHEMERAL = {"type": "ephemeral"}
+
+# extras that change on (almost) every iteration, emitted last in this order
+VOLATILE_EXTRAS = (
+    "memory_recall_delayed",
+    "current_datetime",
+)
+
+
+@dataclass
+class PromptCacheUsage:
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        if not self.prompt_tokens:
+            return 0.0
+        return min(self.cache_read_tokens / self.prompt_tokens, 1.0)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "hit_ratio": round(self.hit_ratio, 4)}
+
+
+@dataclass
+class PromptCacheStats:
+    calls: int = 0
+    calls_with_hits: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+
+    def add(self, usage: PromptCacheUsage) -> None:
+        self.calls += 1
+        if usage.cache_read_tokens:
+            self.calls_with_hits += 1
+        self.prompt_tokens += usage.prompt_tokens
+        self.completion_tokens += usage.completion_tokens
+        self.cache_read_tokens += usage.cache_read_tokens
+        self.cache_write_tokens += usage.cache_write_tokens
+
+    def to_dict(self) -> dict[str, Any]:
+        ratio = self.cache_read_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+        return {**asdict(self), "hit_ratio": round(min(ratio, 1.0), 4)}
+
+
+_stats: dict[str, PromptCacheStats] = {}
+_stats_lock = threading.Lock()
+
+
+def order_extras(
+    persistent: Mapping[str, Any], temporary: Mapping[str, Any]
+) -> dict[str, Any]:
+    """Merge extras with persistent ones first and per-iteration ones last."""
+    merged = {**persistent, **temporary}
+    tail = [key for key in VOLATILE_EXTRAS if key in merged]
+    ordered = {key: value for key, value in merged.items() if key not in tail}
+    ordered.update((key, merged[key]) for key in tail)
+    return ordered
+
+
+def mark_volatile(message: BaseMessage) -> BaseMessage:
+    message.additional_kwargs[VOLATILE_MARKER] = True
+    return message
+
+
+def is_volatile(message: BaseMessage) -> bool:
+    return bool(getattr(message, "additional_kwargs", {}).get(VOLATILE_MARKER))
+
+
+def uses_cache_breakpoints(provider: str, model_name: str) -> bool:
+    """Whether the provider honours block-level ``cache_control`` breakpoints.
+
+    Other providers cache prefixes automatically and keep plain string content.
+    """
+    return provider == "anthropic" or "claude" in model_name.lower()
+
+
+def apply_layout(
+    messages: list[dict],
+    volatile: list[bool],
+    explicit_caching: bool = False,
+    content_blocks: bool = False,
+) -> list[dict]:
+    """Fold volatile messages into the preceding turn and set cache breakpoints.
+
+    Folding keeps user/assistant alternation like ``history.group_messages_abab``.
+    With ``content_blocks`` the folded turn becomes a list of content blocks so
+    the breakpoint can sit on the last stable block; otherwise strings are
+    joined as before and the breakpoint moves to the previous stable message.
+    """
+    result: list[dict] = []
+    stable: list[bool] = []
+    stable_blocks: dict[int, int] = {}
+
+    for message, is_volatile_message in zip(messages, volatile):
+        if is_volatile_message and result and _can_fold(result[-1], message):
+            index = len(result) - 1
+            previous = result[-1]
+            if (
+                content_blocks
+                or isinstance(previous["content"], list)
+                or isinstance(message["content"], list)
+            ):
+                head = _content_blocks(previous["content"])
+                if stable[index] and index not in stable_blocks:
+                    stable_blocks[index] = len(head)
+                previous["content"] = head + _content_blocks(message["content"])
+            else:
+                previous["content"] = f'{previous["content"]}\n{message["content"]}'
+                stable[index] = False
+            continue
+        result.append(message)
+        stable.append(not is_volatile_message)
+
+    if explicit_caching and result:
+        if result[0]["role"] == "system":
+            result[0]["cache_control"] = EPHEMERAL
+        boundary = next((i for i in range(len(result) - 1, 0, -1) if stable[i]), None)
+        if boundary is not None:
+            target = result[boundary]
+            if boundary in stable_blocks and stable_blocks[boundary]:
+                position = stable_blocks[boundary] - 1
+                target["content"][position] = {
+                    **target["content"][position],
+                    "cache_control": EPHEMERAL,
+                }
+            else:
+                target["cache_control"] = EPHEMERAL
+
+    return result
+
+
+def usage_from_response(response: Any) -> PromptCacheUsage | None:
+    """Extract token usage from a LiteLLM response or final stream chunk."""
+    usage = _get(response, "usage")
+    if not usage:
+        return None
+    details = _get(usage, "prompt_tokens_details")
+    cache_read = _get(details, "cached_tokens") or _get(usage, "cache_read_input_tokens")
+    cache_write = _get(details, "cache_creation_tokens") or _get(
+        usage, "cache_creation_input_tokens"
+    )
+    return PromptCacheUsage(
+        prompt_tokens=int(_get(usage, "prompt_tokens") or 0),
+        completion_tokens=int(_get(usage, "completion_tokens") or 0),
+        cache_read_tokens=int(cache_read or 0),
+        cache_write_tokens=int(cache_write or 0),
+    )
+
+
+def record_usage(model_name: str, usage: PromptCacheUsage) -> None:
+    with _stats_lock:
+        _stats.setdefault(model_name, PromptCacheStats()).add(usage)
+
+
+def get_stats() -> dict[str, dict[str, Any]]:
+    with _stats_lock:
+        return {model: stats.to_dict() for model, stats in _stats.items()}
+
+
+def reset_stats() -> None:
+    with _stats_lock:
+        _stats.clear()
+
+
+def _can_fold(previous: dict, message: dict) -> bool:
+    return (
+        previous["role"] == message["role"]
+        and previous["role"] in ("user", "assistant")
+        and not previous.get("tool_calls")
+        and not message.get("tool_calls")
+    )
+
+
+def _content_blocks(content: Any) -> list[Any]:
+    if isinstance(content, list):
+        return [_text_block(item) if isinstance(item, str) else item for item in content]
+    if isinstance(content, dict):
+        return [content]
+    return [_text_block(str(content))]
+
+
+def _text_block(text: str) -> dict[str, Any]:
+    return {"type": "text", "text": text}
+
+
+def _get(obj: Any, name: str) -> Any:
+    if obj is None:
+        return None
+    if isinstance(obj, Mapping):
+        return obj.get(name)
+    return getattr(obj, name, None)
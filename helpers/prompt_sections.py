@@ -0,0 +1,129 @@
+"""Memoized ``system_prompt`` sections.
+
+Sections such as the tools or MCP prompt are rebuilt from dozens of templates
+on every loop iteration although they only change when their source files,
+plugin configuration or MCP tool lists change. A section declares those inputs
+as a cheap ``SectionInputs`` fingerprint (file stats and plain values) and is
+only rebuilt when the fingerprint differs from the one it was built with.
+
+Entries live in a ``helpers.cache`` area, so plugin changes and the cache
+reset API drop them like every other derived cache.
+"""
+
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Iterable
+
+from helpers import cache
+from helpers.print_style import PrintStyle
+
+
+SECTIONS_CACHE_AREA = "system_prompt_sections(plugins)"
+
+
+@dataclass
+class SectionStats:
+    builds: int = 0
+    hits: int = 0
+
+
+_stats: dict[str, SectionStats] = {}
+_stats_lock = threading.Lock()
+
+
+class SectionInputs:
+    """Fingerprint of everything a section's text is derived from."""
+
+    def __init__(self):
+        self._parts: list[Any] = []
+
+    def files(
+        self, dirs: Iterable[str], prefix: str | tuple[str, ...] = ""
+    ) -> "SectionInputs":
+        """Stat every file in ``dirs`` whose name starts with ``prefix``.
+
+        Added, removed and edited files all change the fingerprint without
+        reading any content.
+        """
+        for directory in dirs:
+            self._parts.append((directory, *_scan(directory, prefix)))
+        return self
+
+    def paths(self, *paths: str) -> "SectionInputs":
+        for path in paths:
+            self._parts.append((path, _stat(path)))
+        return self
+
+    def value(self, *values: Any) -> "SectionInputs":
+        for value in values:
+            self._parts.append(json.dumps(value, sort_keys=True, default=str))
+        return self
+
+    def key(self) -> tuple:
+        return tuple(self._parts)
+
+
+async def memoized(
+    name: str,
+    agent: Any,
+    inputs: SectionInputs,
+    build: Callable[[], Awaitable[str]],
+) -> str:
+    """Return the cached section text, rebuilding it when ``inputs`` changed."""
+    cache_key = cache.determine_cache_key(agent, name)
+    signature = inputs.key()
+    entry = cache.get(SECTIONS_CACHE_AREA, cache_key)
+    if entry is not None and entry[0] == signature:
+        _count(name, hit=True)
+        return entry[1]
+
+    text = await build()
+    cache.add(SECTIONS_CACHE_AREA, cache_key, (signature, text))
+    _count(name, hit=False)
+    PrintStyle.debug(f"System prompt section rebuilt: {name}")
+    return text
+
+
+def get_stats() -> dict[str, dict[str, int]]:
+    with _stats_lock:
+        return {name: asdict(stats) for name, stats in _stats.items()}
+
+
+def reset_stats() -> None:
+    with _stats_lock:
+        _stats.clear()
+
+
+def _count(name: str, hit: bool) -> None:
+    with _stats_lock:
+        stats = _stats.setdefault(name, SectionStats())
+        if hit:
+            stats.hits += 1
+        else:
+            stats.builds += 1
+
+
+def _scan(directory: str, prefix: str | tuple[str, ...]) -> list[tuple[str, int, int]]:
+    try:
+        with os.scandir(directory) as entries:
+            result = [
+                (entry.name, stat.st_mtime_ns, stat.st_size)
+                for entry in entries
+                if entry.name.startswith(prefix)
+                and entry.is_file()
+                and (stat := entry.stat())
+            ]
+    except OSError:
+        return []
+    result.sort()
+    return result
+
+
+def _stat(path: str) -> tuple[int, int] | None:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
@@ -2,13 +2,17 @@ import asyncio
 import time
 from typing import Callable, Awaitable
 
+from helpers.defer import LoopSafeLock
+
 
 class RateLimiter:
     def __init__(self, seconds: int = 60, **limits: int):
         self.timeframe = seconds
         self.limits = {key: value if isinstance(value, (int, float)) else 0 for key, value in (limits or {}).items()}
         self.values = {key: [] for key in self.limits.keys()}
-        self._lock = asyncio.Lock()
+        # limiters are shared per model across contexts, which may run on
+        # different loops of the AgentContext pool
+        self._lock = LoopSafeLock()
 
     def add(self, **kwargs: int):
         now = time.time()
@@ -0,0 +1,181 @@
+"""Pooled HTTP client and result cache shared by the search backends.
+
+Every event loop gets one keep-alive ``aiohttp`` session instead of a new
+connection per query. Results are cached for ``A0_SEARCH_CACHE_TTL`` seconds
+under the normalized query, engine and parameters, and concurrent identical
+searches, also from other loop threads, wait for the one request in flight.
+
+Entries live in a ``helpers.cache`` area, so the cache reset API drops them
+like every other derived cache.
+"""
+
+import asyncio
+import atexit
+import concurrent.futures
+import json
+import os
+import threading
+import time
+import weakref
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable
+
+import aiohttp
+
+from helpers import cache
+
+SEARCH_CACHE_AREA = "search_results"
+CACHE_TTL_ENV = "A0_SEARCH_CACHE_TTL"
+
+DEFAULT_CACHE_TTL = 300
+POOL_LIMIT = 20
+REQUEST_TIMEOUT = 30
+
+
+@dataclass
+class SearchStats:
+    hits: int = 0
+    misses: int = 0
+    shared: int = 0  # waited for an identical search already in flight
+
+
+_stats = SearchStats()
+_lock = threading.Lock()
+_inflight: dict[tuple, concurrent.futures.Future] = {}
+_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def cache_ttl() -> float:
+    try:
+        return max(0.0, float(os.getenv(CACHE_TTL_ENV, str(DEFAULT_CACHE_TTL))))
+    except (TypeError, ValueError):
+        return DEFAULT_CACHE_TTL
+
+
+def get_session() -> aiohttp.ClientSession:
+    """The pooled session of the running event loop."""
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=POOL_LIMIT),
+            timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+        )
+        _sessions[loop] = session
+    return session
+
+
+async def close_session() -> None:
+    session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session and not session.closed:
+        await session.close()
+
+
+def close_sessions(timeout: float = 5.0) -> None:
+    """Close the pooled sessions of every loop, each on its own loop."""
+    with _lock:
+        sessions = list(_sessions.items())
+        _sessions.clear()
+    for loop, session in sessions:
+        if session.closed or loop.is_closed():
+            continue
+        try:
+            if loop.is_running():
+                asyncio.run_coroutine_threadsafe(session.close(), loop).result(timeout)
+            else:
+                loop.run_until_complete(session.close())
+        except Exception:
+            pass  # ignore errors during interpreter shutdown
+
+
+atexit.register(close_sessions)
+
+
+class _FetchAbandoned(Exception):
+    """The search a caller was waiting on was cancelled by its owner."""
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(str(query).split()).casefold()
+
+
+def cache_key(engine: str, query: str, params: dict[str, Any]) -> tuple:
+    return (engine, normalize_query(query), json.dumps(params, sort_keys=True, default=str))
+
+
+async def cached(
+    engine: str,
+    query: str,
+    fetch: Callable[[], Awaitable[Any]],
+    **params: Any,
+) -> Any:
+    """Return the cached result of ``fetch()`` for this search, running it on a miss.
+
+    Failed searches are not cached; callers sharing one in flight get its error.
+    """
+    ttl = cache_ttl()
+    key = cache_key(engine, query, params)
+    while True:
+        entry = cache.get(SEARCH_CACHE_AREA, key)
+        if entry is not None and time.monotonic() - entry[0] < ttl:
+            _count("hits")
+            return entry[1]
+
+        with _lock:
+            future = _inflight.get(key)
+            owner = future is None
+            if owner:
+                future = _inflight[key] = concurrent.futures.Future()
+                # a cancelled waiter must not cancel the search for the others
+                future.set_running_or_notify_cancel()
+        if owner:
+            break
+        _count("shared")
+        try:
+            return await asyncio.wrap_future(future)  # type: ignore[arg-type]
+        except _FetchAbandoned:
+            continue  # the owner was cancelled; take the search over
+
+    _count("misses")
+    try:
+        result = await fetch()
+    except asyncio.CancelledError:
+        # only the owner was cancelled: let the waiters retry on their own
+        _release(key, future)
+        future.set_exception(_FetchAbandoned())
+        raise
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    else:
+        if ttl:
+            cache.trim_cache(SEARCH_CACHE_AREA, ttl)
+            cache.add(SEARCH_CACHE_AREA, key, (time.monotonic(), result))
+        future.set_result(result)
+        return result
+    finally:
+        _release(key, future)
+
+
+def _release(key: tuple, future: concurrent.futures.Future) -> None:
+    with _lock:
+        if _inflight.get(key) is future:
+            del _inflight[key]
+
+
+def get_stats() -> dict[str, int]:
+    with _lock:
+        return asdict(_stats)
+
+
+def reset_stats() -> None:
+    global _stats
+    with _lock:
+        _stats = SearchStats()
+
+
+def _count(field: str) -> None:
+    with _lock:
+        setattr(_stats, field, getattr(_stats, field) + 1)
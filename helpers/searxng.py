@@ -1,12 +1,15 @@
-import aiohttp
-from helpers import runtime
+from helpers import runtime, search_client
 
 URL = "http://localhost:55510/search"
 
 async def search(query:str):
-    return await runtime.call_development_function(_search, query=query)
+    return await search_client.cached(
+        "searxng",
+        query,
+        lambda: runtime.call_development_function(_search, query=query),
+    )
 
 async def _search(query:str):
-    async with aiohttp.ClientSession() as session:
-        async with session.post(URL, data={"q": query, "format": "json"}) as response:
-            return await response.json()
+    session = search_client.get_session()
+    async with session.post(URL, data={"q": query, "format": "json"}) as response:
+        return await response.json()
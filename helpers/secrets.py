@@ -1,10 +1,12 @@
+import bisect
 import re
 import threading
 import time
 import os
+from collections import deque
 from io import StringIO
 from dataclasses import dataclass
-from typing import Dict, Optional, List, Literal, Set, Callable, Tuple, TYPE_CHECKING
+from typing import Dict, Iterator, Optional, List, Literal, Callable, Tuple, TYPE_CHECKING
 from dotenv.parser import parse_stream
 from helpers.errors import RepairableException
 from helpers import files
@@ -36,91 +38,295 @@ class EnvLine:
     )
 
 
+class SecretsMatcher:
+    """Multi-pattern matcher built once per set of secret values.
+
+    The values are stored in a trie. Streams scan their short buffers with a
+    regex compiled from the trie, and ``hold`` tells how much of a buffer's
+    tail may still grow into a secret, with a second regex over the same trie
+    that accepts any secret prefix at the end of the text.
+
+    ``mask`` handles whole texts. Up to ``FIND_SCAN_MAX_VALUES`` values it
+    runs one ``str.find`` sweep per value, which stays in C. With more values
+    it makes a single Aho-Corasick pass over the trie, whose cost does not
+    grow with the number of secrets. All matches are leftmost-longest.
+    """
+
+    ROOT = 0
+    # Crossover of the two bulk paths, measured on 108 KB of text with
+    # 24-character values: ~15 ms for either at 640 values; at 2048 the
+    # find sweeps take ~48 ms and the automaton ~18 ms.
+    FIND_SCAN_MAX_VALUES = 640
+
+    def __init__(self, value_to_key: Dict[str, str]):
+        self.value_to_key: Dict[str, str] = {
+            v: k for v, k in value_to_key.items() if isinstance(v, str) and v
+        }
+        self._goto: List[Dict[str, int]] = [{}]
+        self._terminal: List[bool] = [False]
+        for value in self.value_to_key:
+            self._insert(value)
+        self._values = sorted(self.value_to_key)
+        self._max_len = max(map(len, self._values), default=0)
+        self._automaton: Optional[Tuple[List[int], List[Tuple[int, ...]]]] = None
+        self._pattern: Optional[re.Pattern[str]] = None
+        self._prefix: Optional[re.Pattern[str]] = None
+        self._starts: Optional[re.Pattern[str]] = None
+        if self.value_to_key:
+            self._pattern = self._compile()
+            self._prefix = self._compile_prefix()
+            first_chars = sorted({value[0] for value in self._values})
+            self._starts = re.compile("[" + "".join(re.escape(ch) for ch in first_chars) + "]")
+
+    @classmethod
+    def for_secrets(
+        cls, secrets: Dict[str, str], min_length: int = 0
+    ) -> "SecretsMatcher":
+        value_to_key: Dict[str, str] = {}
+        for key, value in secrets.items():
+            if value and len(value.strip()) >= min_length:
+                value_to_key.setdefault(value, key)
+        return cls(value_to_key)
+
+    def __bool__(self) -> bool:
+        return bool(self.value_to_key)
+
+    def hold(self, text: str) -> int:
+        """Length of the longest suffix of text that is a prefix of some secret."""
+        if self._starts is None:
+            return 0
+        offset = max(0, len(text) - self._max_len)
+        if self._prefix is not None:
+            # the leftmost start that reaches the end is the longest suffix
+            match = self._prefix.search(text, offset)
+            return len(text) - match.start() if match else 0
+        # secrets too long to nest in a regex: a suffix can only be a prefix
+        # if it starts where some secret starts
+        for match in self._starts.finditer(text, offset):
+            suffix = text[match.start() :]
+            # values starting with suffix sort right at its insertion point
+            index = bisect.bisect_left(self._values, suffix)
+            if index < len(self._values) and self._values[index].startswith(suffix):
+                return len(suffix)
+        return 0
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """Yield (start, end, key) for non-overlapping leftmost-longest matches."""
+        if self._pattern is None or not text:
+            return
+        for match in self._pattern.finditer(text):
+            yield match.start(), match.end(), self.value_to_key[match.group()]
+
+    def mask(self, text: str, placeholder: str = "§§secret({key})") -> str:
+        if not self.value_to_key or not text:
+            return text
+        if len(self.value_to_key) <= self.FIND_SCAN_MAX_VALUES:
+            found = self._find_all(text)
+        else:
+            found = self._scan_all(text)
+        if not found:
+            return text
+
+        # leftmost-longest: by start, longest first, skipping overlaps
+        found.sort()
+        out: List[str] = []
+        pos = 0
+        for start, neg_len in found:
+            if start < pos:
+                continue
+            end = start - neg_len
+            out.append(text[pos:start])
+            out.append(alias_for_key(self.value_to_key[text[start:end]], placeholder))
+            pos = end
+        out.append(text[pos:])
+        return "".join(out)
+
+    def _find_all(self, text: str) -> List[Tuple[int, int]]:
+        """(start, -length) of every occurrence of every value."""
+        found: List[Tuple[int, int]] = []
+        for value in self.value_to_key:
+            start = text.find(value)
+            while start != -1:
+                found.append((start, -len(value)))
+                start = text.find(value, start + 1)
+        return found
+
+    def _scan_all(self, text: str) -> List[Tuple[int, int]]:
+        """Same as ``_find_all``, in one Aho-Corasick pass."""
+        fail, outputs = self._get_automaton()
+        goto = self._goto
+        found: List[Tuple[int, int]] = []
+        node = self.ROOT
+        for end, ch in enumerate(text, 1):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, self.ROOT)
+            if outputs[node]:
+                found.extend((end - length, -length) for length in outputs[node])
+        return found
+
+    def _get_automaton(self) -> Tuple[List[int], List[Tuple[int, ...]]]:
+        """Failure links and matched value lengths per trie node, built on first use."""
+        if self._automaton is not None:
+            return self._automaton
+        goto, terminal = self._goto, self._terminal
+        fail = [self.ROOT] * len(goto)
+        depth = [0] * len(goto)
+        outputs: List[Tuple[int, ...]] = [()] * len(goto)
+        queue = deque(goto[self.ROOT].values())
+        for child in queue:
+            depth[child] = 1
+            outputs[child] = (1,) if terminal[child] else ()
+        while queue:
+            node = queue.popleft()
+            for ch, child in goto[node].items():
+                link = fail[node]
+                while link and ch not in goto[link]:
+                    link = fail[link]
+                fail[child] = goto[link].get(ch, self.ROOT)
+                depth[child] = depth[node] + 1
+                own = (depth[child],) if terminal[child] else ()
+                outputs[child] = own + outputs[fail[child]]
+                queue.append(child)
+        self._automaton = (fail, outputs)
+        return self._automaton
+
+    def _insert(self, value: str) -> None:
+        node = self.ROOT
+        for ch in value:
+            child = self._goto[node].get(ch)
+            if child is None:
+                child = len(self._goto)
+                self._goto.append({})
+                self._terminal.append(False)
+                self._goto[node][ch] = child
+            node = child
+        self._terminal[node] = True
+
+    def _compile(self) -> re.Pattern[str]:
+        try:
+            return re.compile(self._node_regex(self.ROOT))
+        except (re.error, RecursionError):
+            # deeply nested tries: longest-first alternation matches the same way
+            values = sorted(self.value_to_key, key=len, reverse=True)
+            return re.compile("|".join(re.escape(v) for v in values))
+
+    def _compile_prefix(self) -> Optional[re.Pattern[str]]:
+        try:
+            return re.compile(f"(?:{self._prefix_regex(self.ROOT)})\\Z")
+        except (re.error, RecursionError):
+            return None
+
+    def _prefix_regex(self, node: int) -> str:
+        # Every trie node is accepting: each further character is optional.
+        branches: List[str] = []
+        for ch, child in sorted(self._goto[node].items()):
+            chain = [ch]
+            while len(self._goto[child]) == 1:
+                ((ch, child),) = self._goto[child].items()
+                chain.append(ch)
+            rest = self._prefix_regex(child)
+            tail = f"(?:{rest})?" if rest else ""
+            branches.append(
+                re.escape(chain[0])
+                + "".join(f"(?:{re.escape(c)}" for c in chain[1:])
+                + tail
+                + ")?" * (len(chain) - 1)
+            )
+        if not branches:
+            return ""
+        return branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+
+    def _node_regex(self, node: int) -> str:
+        # Children differ in their first character, so at most one branch can
+        # match; the greedy optional group makes the longest secret win.
+        branches: List[str] = []
+        for ch, child in sorted(self._goto[node].items()):
+            literal = [ch]
+            while not self._terminal[child] and len(self._goto[child]) == 1:
+                ((ch, child),) = self._goto[child].items()
+                literal.append(ch)
+            branches.append(re.escape("".join(literal)) + self._node_regex(child))
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if self._terminal[node] else body
+
+
 class StreamingSecretsFilter:
     """Stateful streaming filter that masks secrets on the fly.
 
     - Replaces full secret values with placeholders §§secret(KEY) when detected.
     - Holds the longest suffix of the current buffer that matches any secret prefix
-      (with minimum trigger length of 3) to avoid leaking partial secrets across chunks.
-    - On finalize(), any unresolved partial is masked with '***'.
+      to avoid leaking partial secrets across chunks. Only that suffix is kept
+      pending, so each chunk is scanned once by the matcher's compiled regex.
+    - On finalize(), an unresolved partial of at least min_trigger (3) characters
+      is masked with '***'; shorter ones are flushed as-is.
     """
 
-    def __init__(self, key_to_value: Dict[str, str], min_trigger: int = 3):
+    def __init__(
+        self,
+        key_to_value: Dict[str, str],
+        min_trigger: int = 3,
+        matcher: Optional[SecretsMatcher] = None,
+    ):
         self.min_trigger = max(1, int(min_trigger))
-        # Map value -> key for placeholder construction
-        self.value_to_key: Dict[str, str] = {
-            v: k for k, v in key_to_value.items() if isinstance(v, str) and v
-        }
-        # Only keep non-empty values
-        self.secret_values: List[str] = [v for v in self.value_to_key.keys() if v]
-        # Precompute all prefixes for quick suffix matching
-        self.prefixes: Set[str] = set()
-        for v in self.secret_values:
-            for i in range(self.min_trigger, len(v) + 1):
-                self.prefixes.add(v[:i])
-        self.max_len: int = max((len(v) for v in self.secret_values), default=0)
+        self.matcher = matcher or SecretsMatcher.for_secrets(key_to_value)
 
         # Internal buffer of pending text that is not safe to flush yet
         self.pending: str = ""
 
-    def _replace_full_values(self, text: str) -> str:
-        """Replace all full secret values with placeholders in the given text."""
-        # Sort by length desc to avoid partial overlaps
-        for val in sorted(self.secret_values, key=len, reverse=True):
-            if not val:
-                continue
-            key = self.value_to_key.get(val, "")
-            if key:
-                text = text.replace(val, alias_for_key(key))
-        return text
-
-    def _longest_suffix_prefix(self, text: str) -> int:
-        """Return length of longest suffix of text that is a known secret prefix.
-        Returns 0 if none found (or only shorter than min_trigger)."""
-        max_check = min(len(text), self.max_len)
-        for length in range(max_check, self.min_trigger - 1, -1):
-            suffix = text[-length:]
-            if suffix in self.prefixes:
-                return length
-        return 0
+    def _hold_len(self, buffer: str) -> int:
+        return self.matcher.hold(buffer)
 
     def process_chunk(self, chunk: str) -> str:
         if not chunk:
             return ""
+        if not self.matcher:
+            return chunk
 
-        self.pending += chunk
-
-        # Replace any full secret occurrences first
-        self.pending = self._replace_full_values(self.pending)
-
-        # Determine the longest suffix that could still form a secret
-        hold_len = self._longest_suffix_prefix(self.pending)
-        if hold_len > 0:
-            # Flush everything except the hold suffix
-            emit = self.pending[:-hold_len]
-            self.pending = self.pending[-hold_len:]
-        else:
-            # Safe to flush everything
-            emit = self.pending
-            self.pending = ""
+        buffer = self.pending + chunk
+        hold_start = len(buffer) - self._hold_len(buffer)
 
-        return emit
+        # Matches starting before the held suffix cannot grow any further
+        out: List[str] = []
+        pos = 0
+        for start, end, key in self.matcher.finditer(buffer):
+            if start >= hold_start:
+                break
+            out.append(buffer[pos:start])
+            out.append(alias_for_key(key))
+            pos = end
+        flush_to = max(pos, hold_start)
+        out.append(buffer[pos:flush_to])
+        self.pending = buffer[flush_to:]
+        return "".join(out)
 
     def finalize(self) -> str:
         """Flush any remaining buffered text. If pending contains an unresolved partial
         (i.e., a prefix of a secret >= min_trigger), mask it with *** to avoid leaks."""
-        if not self.pending:
+        buffer = self.pending
+        hold = self._hold_len(buffer)
+        if hold < self.min_trigger:
+            hold = 0
+        self.pending = ""
+        if not buffer:
             return ""
 
-        hold_len = self._longest_suffix_prefix(self.pending)
-        if hold_len > 0:
-            safe = self.pending[:-hold_len]
+        hold_start = len(buffer) - hold
+        out: List[str] = []
+        pos = 0
+        for start, end, key in self.matcher.finditer(buffer):
+            out.append(buffer[pos:start])
+            out.append(alias_for_key(key))
+            pos = end
+        if hold and pos < len(buffer):
             # Mask unresolved partial
-            result = safe + "***"
+            out.append(buffer[pos:hold_start])
+            out.append("***")
         else:
-            result = self.pending
-        self.pending = ""
-        return result
+            out.append(buffer[pos:])
+        return "".join(out)
 
 
 class SecretsManager:
@@ -147,6 +353,7 @@ class SecretsManager:
         self._raw_snapshots: Dict[str, str] = {}
         self._secrets_cache = None
         self._last_raw_text = None
+        self._matchers: Dict[int, SecretsMatcher] = {}
 
     def read_secrets_raw(self) -> str:
         """Read raw secrets file content from local filesystem (same system)."""
@@ -255,9 +462,18 @@ class SecretsManager:
             key_formatter=alias_for_key,
         )
 
+    def get_matcher(self, min_length: int = 0) -> SecretsMatcher:
+        """Matcher for secret values of at least min_length, built once per secrets version."""
+        with self._lock:
+            matcher = self._matchers.get(min_length)
+            if matcher is None:
+                matcher = SecretsMatcher.for_secrets(self.load_secrets(), min_length)
+                self._matchers[min_length] = matcher
+            return matcher
+
     def create_streaming_filter(self) -> "StreamingSecretsFilter":
         """Create a streaming-aware secrets filter snapshotting current secret values."""
-        return StreamingSecretsFilter(self.load_secrets())
+        return StreamingSecretsFilter(self.load_secrets(), matcher=self.get_matcher())
 
     def replace_placeholders(self, text: str) -> str:
         """Replace secret placeholders with actual values"""
@@ -302,18 +518,7 @@ class SecretsManager:
         """Replace actual secret values with placeholders in text"""
         if not text:
             return text
-
-        secrets = self.load_secrets()
-        result = text
-
-        # Sort by length (longest first) to avoid partial replacements
-        for key, value in sorted(
-            secrets.items(), key=lambda x: len(x[1]), reverse=True
-        ):
-            if value and len(value.strip()) >= min_length:
-                result = result.replace(value, alias_for_key(key, placeholder))
-
-        return result
+        return self.get_matcher(min_length).mask(text, placeholder)
 
     def get_masked_secrets(self) -> str:
         """Get content with values masked for frontend display (preserves comments and unrecognized lines)"""
@@ -352,6 +557,7 @@ class SecretsManager:
             self._secrets_cache = None
             self._raw_snapshots = {}
             self._last_raw_text = None
+            self._matchers = {}
 
     @classmethod
     def _invalidate_all_caches(cls):
@@ -12,17 +12,11 @@ import urllib.request
 
 import uvicorn
 
-from helpers import process
+from helpers import loop_monitor, process
+from helpers.dotenv import get_dotenv_int
 from helpers.print_style import PrintStyle
 
 
-def _env_int(name: str, default: int, minimum: int = 0) -> int:
-    try:
-        return max(minimum, int(os.getenv(name, str(default))))
-    except (TypeError, ValueError):
-        return default
-
-
 def _env_float(name: str, default: float, minimum: float = 0.0) -> float:
     try:
         return max(minimum, float(os.getenv(name, str(default))))
@@ -39,8 +33,8 @@ class StartupConfig:
     @classmethod
     def from_env(cls) -> "StartupConfig":
         return cls(
-            timeout_seconds=_env_int("A0_STARTUP_TIMEOUT_SECONDS", 90, minimum=15),
-            max_attempts=_env_int("A0_STARTUP_MAX_ATTEMPTS", 2, minimum=1),
+            timeout_seconds=get_dotenv_int("A0_STARTUP_TIMEOUT_SECONDS", 90, minimum=15),
+            max_attempts=get_dotenv_int("A0_STARTUP_MAX_ATTEMPTS", 2, minimum=1),
             retry_delay_seconds=_env_float(
                 "A0_STARTUP_RETRY_DELAY_SECONDS", 2.0, minimum=0.0
             ),
@@ -113,6 +107,7 @@ class StartupMonitor:
         @asynccontextmanager
         async def _lifespan(_app):
             self.mark("starlette.lifespan.startup")
+            loop_monitor.watch(asyncio.get_running_loop(), "uvicorn")
             try:
                 yield
             finally:
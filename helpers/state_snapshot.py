@@ -37,6 +37,8 @@ class StateRequestV1:
     log_from: int
     notifications_from: int
     timezone: str
+    # client can apply content_offset deltas to log items it already holds
+    log_deltas: bool = False
 
 
 class StateRequestValidationError(ValueError):
@@ -145,6 +147,7 @@ def parse_state_request_payload(payload: Mapping[str, Any]) -> StateRequestV1:
     log_from = payload.get("log_from")
     notifications_from = payload.get("notifications_from")
     timezone = payload.get("timezone")
+    log_deltas = payload.get("log_deltas", False)
 
     if context is not None and not isinstance(context, str):
         raise StateRequestValidationError(
@@ -164,6 +167,12 @@ def parse_state_request_payload(payload: Mapping[str, Any]) -> StateRequestV1:
             message="notifications_from must be an integer >= 0",
             details={"notifications_from": notifications_from},
         )
+    if not isinstance(log_deltas, bool):
+        raise StateRequestValidationError(
+            reason="log_deltas",
+            message="log_deltas must be a boolean",
+            details={"log_deltas": log_deltas},
+        )
     if not isinstance(timezone, str) or not timezone.strip():
         raise StateRequestValidationError(
             reason="timezone_empty",
@@ -189,6 +198,7 @@ def parse_state_request_payload(payload: Mapping[str, Any]) -> StateRequestV1:
         log_from=log_from,
         notifications_from=notifications_from,
         timezone=tz,
+        log_deltas=log_deltas,
     )
 
 
@@ -198,6 +208,7 @@ def _coerce_state_request_inputs(
     log_from: Any,
     notifications_from: Any,
     timezone: Any,
+    log_deltas: Any = False,
 ) -> StateRequestV1:
     tz = timezone if isinstance(timezone, str) and timezone else None
     tz = tz or get_dotenv_value("DEFAULT_USER_TIMEZONE", "UTC")
@@ -211,6 +222,7 @@ def _coerce_state_request_inputs(
         log_from=_coerce_non_negative_int(log_from, default=0),
         notifications_from=_coerce_non_negative_int(notifications_from, default=0),
         timezone=tz,
+        log_deltas=log_deltas is True,
     )
 
 
@@ -236,6 +248,7 @@ def advance_state_request_after_snapshot(
         log_from=log_from,
         notifications_from=notifications_from,
         timezone=request.timezone,
+        log_deltas=request.log_deltas,
     )
 
 
@@ -253,7 +266,7 @@ async def build_snapshot_from_request(*, request: StateRequestV1) -> SnapshotV1:
     active_context = AgentContext.get(ctxid) if ctxid else None
 
     if active_context:
-        log_output = active_context.log.output(start=from_no)
+        log_output = active_context.log.output(start=from_no, deltas=request.log_deltas)
         logs = log_output.items
         log_end = log_output.end
     else:
@@ -345,11 +358,13 @@ async def build_snapshot(
     log_from: int,
     notifications_from: int,
     timezone: str | None,
+    log_deltas: bool = False,
 ) -> SnapshotV1:
     request = _coerce_state_request_inputs(
         context=context,
         log_from=log_from,
         notifications_from=notifications_from,
         timezone=timezone,
+        log_deltas=log_deltas,
     )
     return await build_snapshot_from_request(request=request)
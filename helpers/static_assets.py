@@ -0,0 +1,326 @@
+"""Precompressed, content-addressed static asset serving for the web UI.
+
+Every asset gets a strong ETag derived from its content hash. Text assets are
+compressed once (gzip, plus brotli when the optional ``brotli`` package is
+installed) and kept in memory, so repeated loads cost a dict lookup instead of
+a Flask ``send_file`` through the WSGI bridge. URLs carrying the asset's
+fingerprint as ``?v=<hash>`` are served as immutable; everything else is
+revalidated with ``If-None-Match`` and answered with 304 when unchanged.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import stat
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable
+from urllib.parse import parse_qs
+
+from flask import Flask
+from starlette.datastructures import Headers
+from starlette.requests import cookie_parser
+from starlette.responses import FileResponse, PlainTextResponse, RedirectResponse, Response
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from helpers import files
+from helpers.api_asgi import is_authenticated, load_session
+from helpers.print_style import PrintStyle
+
+try:
+    import brotli  # type: ignore[import-not-found]
+except ImportError:  # optional, gzip is always available
+    brotli = None
+
+
+WEBUI_DIR = "webui"
+COMPRESSIBLE_EXTENSIONS = {
+    ".css",
+    ".html",
+    ".js",
+    ".json",
+    ".map",
+    ".md",
+    ".mjs",
+    ".svg",
+    ".txt",
+    ".webmanifest",
+    ".xml",
+}
+COMPRESS_MIN_BYTES = 1024
+COMPRESS_MAX_BYTES = 8 * 1024 * 1024
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 9
+CACHE_REVALIDATE = "no-cache"
+CACHE_IMMUTABLE = "public, max-age=31536000, immutable"
+FINGERPRINT_PARAM = "v"
+
+_LOCAL_ASSET_ATTR_RE = re.compile(
+    r'(?P<attr>\b(?:src|href)=")(?P<url>(?!https?:|//|data:|#|mailto:)[^"?#]+)"'
+)
+_TAG_RE = re.compile(r"<[a-zA-Z][^>]*>")
+_MODULE_TAG_RE = re.compile(r'\btype="module"|\brel="modulepreload"', re.IGNORECASE)
+
+
+@dataclass
+class StaticAsset:
+    path: str
+    signature: tuple[int, int]
+    etag: str
+    fingerprint: str
+    media_type: str
+    variants: dict[str, bytes] = field(default_factory=dict)
+
+
+class StaticAssetStore:
+    """Hash and precompress files once per (mtime, size) signature."""
+
+    def __init__(self):
+        self._assets: dict[str, StaticAsset] = {}
+        self._lock = threading.RLock()
+
+    def get(self, path: str) -> StaticAsset | None:
+        signature = _signature(path)
+        if signature is None:
+            return None
+        with self._lock:
+            asset = self._assets.get(path)
+        if asset and asset.signature == signature:
+            return asset
+        asset = self._build(path, signature)
+        with self._lock:
+            self._assets[path] = asset
+        return asset
+
+    def get_cached(self, path: str) -> StaticAsset | None:
+        """Return the prepared asset only if it is still fresh (no hashing)."""
+        with self._lock:
+            asset = self._assets.get(path)
+        if asset and asset.signature == _signature(path):
+            return asset
+        return None
+
+    def fingerprint(self, path: str) -> str:
+        asset = self.get(path)
+        return asset.fingerprint if asset else ""
+
+    def warm(self, root: str) -> int:
+        count = 0
+        for dirpath, _dirnames, filenames in os.walk(root):
+            for filename in filenames:
+                if self.get(os.path.join(dirpath, filename)):
+                    count += 1
+        return count
+
+    @staticmethod
+    def _build(path: str, signature: tuple[int, int]) -> StaticAsset:
+        media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        digest = hashlib.sha256()
+        compress = (
+            os.path.splitext(path)[1].lower() in COMPRESSIBLE_EXTENSIONS
+            and COMPRESS_MIN_BYTES <= signature[1] <= COMPRESS_MAX_BYTES
+        )
+        content = b""
+        with open(path, "rb") as source:
+            if compress:
+                content = source.read()
+                digest.update(content)
+            else:
+                for chunk in iter(lambda: source.read(1024 * 1024), b""):
+                    digest.update(chunk)
+        fingerprint = digest.hexdigest()[:16]
+        asset = StaticAsset(
+            path=path,
+            signature=signature,
+            etag=f'"{fingerprint}"',
+            fingerprint=fingerprint,
+            media_type=media_type,
+        )
+        if compress:
+            asset.variants["gzip"] = gzip.compress(content, GZIP_LEVEL, mtime=0)
+            if brotli is not None:
+                asset.variants["br"] = brotli.compress(content, quality=BROTLI_QUALITY)
+        return asset
+
+
+class StaticAssetHandler:
+    """ASGI handler for web UI, plugin and extension assets.
+
+    Anything it does not own (API calls, index, login, missing files) is
+    passed on to ``fallback`` unchanged.
+    """
+
+    def __init__(
+        self,
+        webapp: Flask,
+        fallback: ASGIApp,
+        store: StaticAssetStore,
+        *,
+        resolve_plugin_dir: Callable[[str], str | None] | None = None,
+    ):
+        self.webapp = webapp
+        self.fallback = fallback
+        self.store = store
+        self.webui_dir = files.get_abs_path(WEBUI_DIR)
+        self.extensions_dir = files.get_abs_path("extensions/webui")
+        self._resolve_plugin_dir = resolve_plugin_dir or _find_plugin_dir
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope.get("method") not in ("GET", "HEAD"):
+            await self.fallback(scope, receive, send)
+            return
+        resolved = self._resolve(scope.get("path", ""))
+        if resolved is None:
+            await self.fallback(scope, receive, send)
+            return
+        path, requires_auth = resolved
+        headers = Headers(scope=scope)
+        cookies = cookie_parser(headers.get("cookie", ""))
+        if requires_auth and not is_authenticated(load_session(self.webapp, cookies)):
+            await RedirectResponse("/login", 302)(scope, receive, send)
+            return
+        asset = self.store.get_cached(path) or await asyncio.to_thread(self.store.get, path)
+        if asset is None:
+            if requires_auth:
+                await PlainTextResponse("Asset not found", 404)(scope, receive, send)
+            else:
+                await self.fallback(scope, receive, send)
+            return
+        response = self.respond(asset, headers, _query_param(scope, FINGERPRINT_PARAM))
+        await response(scope, receive, send)
+
+    def respond(self, asset: StaticAsset, headers: Headers, version: str | None) -> Response:
+        cache_control = (
+            CACHE_IMMUTABLE if version and version == asset.fingerprint else CACHE_REVALIDATE
+        )
+        encoding = _pick_encoding(headers.get("accept-encoding", ""), asset.variants)
+        # each encoded representation gets its own strong validator
+        etag = f'"{asset.fingerprint}-{encoding}"' if encoding else asset.etag
+        common = {"etag": etag, "cache-control": cache_control}
+        if asset.variants:
+            common["vary"] = "Accept-Encoding"
+        if _etag_matches(headers.get("if-none-match", ""), etag):
+            return Response(status_code=304, headers=common)
+
+        if encoding:
+            return Response(
+                content=asset.variants[encoding],
+                media_type=asset.media_type,
+                headers={**common, "content-encoding": encoding},
+            )
+        return FileResponse(asset.path, media_type=asset.media_type, headers=common)
+
+    def _resolve(self, url_path: str) -> tuple[str, bool] | None:
+        if url_path in ("", "/") or url_path.startswith("/api/"):
+            return None
+        parts = url_path.lstrip("/").split("/")
+        if len(parts) >= 3 and parts[0] == "plugins":
+            return self._plugin_asset(parts[1], "/".join(parts[2:]))
+        if len(parts) >= 4 and parts[:2] == ["usr", "plugins"]:
+            return self._plugin_asset(parts[2], "/".join(parts[3:]))
+        if len(parts) >= 3 and parts[:2] == ["extensions", "webui"]:
+            path = files.get_abs_path(self.extensions_dir, "/".join(parts[2:]))
+            if not files.is_in_dir(path, self.extensions_dir):
+                return None
+            return path, True
+        path = files.get_abs_path(self.webui_dir, url_path.lstrip("/"))
+        if not files.is_in_dir(path, self.webui_dir) or not os.path.isfile(path):
+            return None
+        return path, False
+
+    def _plugin_asset(self, plugin_name: str, asset_path: str) -> tuple[str, bool] | None:
+        plugin_dir = self._resolve_plugin_dir(plugin_name)
+        if not plugin_dir:
+            return None
+        path = files.get_abs_path(plugin_dir, asset_path)
+        allowed = (
+            files.get_abs_path(plugin_dir, "webui"),
+            files.get_abs_path(plugin_dir, "extensions/webui"),
+        )
+        if not any(files.is_in_dir(path, root) for root in allowed):
+            return None
+        return path, True
+
+
+def fingerprint_asset_urls(html: str, store: StaticAssetStore, base_dir: str) -> str:
+    """Append ``?v=<hash>`` to local ``src``/``href`` attributes in ``html``.
+
+    ES module entries are left alone: modules are keyed by URL, and other
+    modules import them by their bare path, so a versioned entry would be
+    evaluated a second time.
+    """
+
+    def replace_tag(match: re.Match[str]) -> str:
+        tag = match.group(0)
+        if _MODULE_TAG_RE.search(tag):
+            return tag
+        return _LOCAL_ASSET_ATTR_RE.sub(replace, tag)
+
+    def replace(match: re.Match[str]) -> str:
+        url = match.group("url")
+        path = files.get_abs_path(base_dir, url.lstrip("/"))
+        if not files.is_in_dir(path, base_dir):
+            return match.group(0)
+        fingerprint = store.fingerprint(path)
+        if not fingerprint:
+            return match.group(0)
+        return f'{match.group("attr")}{url}?{FINGERPRINT_PARAM}={fingerprint}"'
+
+    return _TAG_RE.sub(replace_tag, html)
+
+
+def start_warmup(store: StaticAssetStore, root: str) -> threading.Thread:
+    def run() -> None:
+        try:
+            count = store.warm(root)
+            PrintStyle.debug(f"Static assets prepared: {count} files")
+        except Exception as e:
+            PrintStyle.error(f"Static asset warmup failed: {e}")
+
+    thread = threading.Thread(target=run, name="StaticAssetWarmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def _signature(path: str) -> tuple[int, int] | None:
+    try:
+        result = os.stat(path)
+    except OSError:
+        return None
+    if not stat.S_ISREG(result.st_mode):
+        return None
+    return (result.st_mtime_ns, result.st_size)
+
+
+def _find_plugin_dir(plugin_name: str) -> str | None:
+    from helpers import plugins
+
+    return plugins.find_plugin_dir(plugin_name)
+
+
+def _query_param(scope: Scope, name: str) -> str | None:
+    query = scope.get("query_string", b"").decode("latin-1")
+    values = parse_qs(query).get(name)
+    return values[0] if values else None
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if not header:
+        return False
+    candidates = {value.strip().removeprefix("W/") for value in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def _pick_encoding(accept_encoding: str, variants: dict[str, Any]) -> str | None:
+    accepted = {
+        part.split(";", 1)[0].strip().lower()
+        for part in accept_encoding.split(",")
+        if part.strip() and not part.strip().endswith(";q=0")
+    }
+    for encoding in ("br", "gzip"):
+        if encoding in variants and encoding in accepted:
+            return encoding
+    return None
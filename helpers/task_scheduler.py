@@ -19,6 +19,7 @@ from agent import Agent, AgentContext, UserMessage
 from initialize import initialize_agent
 from helpers.persist_chat import save_tmp_chat
 from helpers.print_style import PrintStyle
+from helpers import admission
 from helpers.defer import DeferredTask
 from helpers.files import get_abs_path, make_dirs, read_file, write_file
 from helpers.localization import Localization
@@ -928,7 +929,8 @@ class TaskScheduler:
                 # This ensures the task context is saved and can be found by polling
                 await self._persist_chat(current_task, context)
 
-                result = await agent.monologue()
+                async with admission.admitted(admission.SOURCE_SCHEDULER):
+                    result = await agent.monologue()
 
                 # Success
                 PrintStyle.success(f"Scheduler Task '{current_task.name}' completed: {result}")
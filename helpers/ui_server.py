@@ -27,10 +27,17 @@ import socketio  # type: ignore[import-untyped]
 
 from helpers import dotenv, fasta2a_server, files, git, login, mcp_server, runtime
 from helpers.api import register_api_route, requires_auth
+from helpers.api_asgi import ApiAsgiDispatcher, native_dispatch_enabled
 from helpers.extension import extensible
 from helpers.files import get_abs_path
 from helpers.print_style import PrintStyle
 from helpers.server_startup import StartupMonitor
+from helpers.static_assets import (
+    StaticAssetHandler,
+    StaticAssetStore,
+    fingerprint_asset_urls,
+    start_warmup,
+)
 from helpers import settings as settings_helper
 from helpers.ws import register_ws_namespace, validate_ws_origin
 from helpers.ws_manager import WsManager, set_shared_ws_manager
@@ -54,6 +61,7 @@ class UiServerRuntime:
     ws_manager: WsManager
     lock: threading.RLock
     settings_snapshot: dict[str, Any]
+    asset_store: StaticAssetStore = field(default_factory=StaticAssetStore)
     _routes_registered: bool = False
     _transport_registered: bool = False
     _route_handlers: "UiRouteHandlers | None" = field(default=None, init=False)
@@ -170,6 +178,18 @@ class UiServerRuntime:
         with startup_monitor.stage("wsgi.middleware.create"):
             wsgi_app = WSGIMiddleware(self.webapp)
 
+        with startup_monitor.stage("api.asgi.create"):
+            http_app = ApiAsgiDispatcher(
+                self.webapp,
+                self.lock,
+                fallback=wsgi_app,
+                enabled=native_dispatch_enabled(),
+            )
+
+        with startup_monitor.stage("static.assets.create"):
+            http_app = StaticAssetHandler(self.webapp, http_app, self.asset_store)
+            start_warmup(self.asset_store, get_abs_path("./webui"))
+
         with startup_monitor.stage("mcp.proxy.init"):
             mcp_app = mcp_server.DynamicMcpProxy.get_instance()
 
@@ -181,7 +201,7 @@ class UiServerRuntime:
                 routes=[
                     Mount("/mcp", app=mcp_app),
                     Mount("/a2a", app=a2a_app),
-                    Mount("/", app=wsgi_app),
+                    Mount("/", app=http_app),
                 ],
                 lifespan=startup_monitor.lifespan(),
             )
@@ -196,6 +216,8 @@ class UiServerRuntime:
 class UiRouteHandlers:
     def __init__(self, runtime_state: UiServerRuntime) -> None:
         self.runtime = runtime_state
+        self._git_info: dict[str, Any] | None = None
+        self._index_cache: dict[tuple[int, str], str] = {}
 
     @extensible
     async def login_handler(self):
@@ -222,23 +244,40 @@ class UiRouteHandlers:
     @requires_auth
     @extensible
     async def serve_index(self):
-        try:
-            gitinfo = git.get_git_info()
-        except Exception:
-            gitinfo = {
-                "version": "unknown",
-                "commit_time": "unknown",
-            }
-
-        index = files.read_file("webui/index.html")
-        return files.replace_placeholders_text(
-            _content=index,
-            version_no=gitinfo["version"],
-            version_time=gitinfo["commit_time"],
-            runtime_id=runtime.get_runtime_id(),
-            runtime_is_development=("true" if runtime.is_development() else "false"),
-            logged_in=("true" if login.get_credentials_hash() else "false"),
+        index_path = get_abs_path("webui/index.html")
+        logged_in = "true" if login.get_credentials_hash() else "false"
+        cache_key = (os.stat(index_path).st_mtime_ns, logged_in)
+        rendered = self._index_cache.get(cache_key)
+        if rendered is None:
+            gitinfo = self.get_git_info()
+            index = files.read_file("webui/index.html")
+            rendered = files.replace_placeholders_text(
+                _content=index,
+                version_no=gitinfo["version"],
+                version_time=gitinfo["commit_time"],
+                runtime_id=runtime.get_runtime_id(),
+                runtime_is_development=("true" if runtime.is_development() else "false"),
+                logged_in=logged_in,
+            )
+            self._index_cache = {cache_key: rendered}
+        # fingerprinted per request: assets change without touching index.html,
+        # and each lookup is a stat against the asset store
+        rendered = fingerprint_asset_urls(
+            rendered, self.runtime.asset_store, get_abs_path("webui")
         )
+        return Response(rendered, mimetype="text/html", headers={"Cache-Control": "no-cache"})
+
+    def get_git_info(self) -> dict[str, Any]:
+        # the checkout only changes through self-update, which restarts the process
+        if self._git_info is None:
+            try:
+                self._git_info = git.get_git_info()
+            except Exception:
+                self._git_info = {
+                    "version": "unknown",
+                    "commit_time": "unknown",
+                }
+        return self._git_info
 
     @requires_auth
     async def serve_builtin_plugin_asset(self, plugin_name, asset_path):
@@ -1,17 +1,9 @@
 import base64
-import warnings
-import whisper
-import tempfile
 import asyncio
-from helpers import runtime, rfc, settings, files
+from helpers import runtime, rfc, settings, whisper_worker
 from helpers.print_style import PrintStyle
 from helpers.notification import NotificationManager, NotificationType, NotificationPriority
 
-# Suppress FutureWarning from torch.load
-warnings.filterwarnings("ignore", category=FutureWarning)
-
-_model = None
-_model_name = ""
 is_updating_model = False  # Tracks whether the model is currently updating
 
 async def preload(model_name:str):
@@ -23,14 +15,15 @@ async def preload(model_name:str):
         raise e
         
 async def _preload(model_name:str):
-    global _model, _model_name, is_updating_model
+    global is_updating_model
 
     while is_updating_model:
         await asyncio.sleep(0.1)
 
+    worker = whisper_worker.get_worker()
     try:
         is_updating_model = True
-        if not _model or _model_name != model_name:
+        if worker.model_name != model_name:
             NotificationManager.send_notification(
                 NotificationType.INFO,
                 NotificationPriority.NORMAL,
@@ -38,8 +31,8 @@ async def _preload(model_name:str):
                 display_time=99,
                 group="whisper-preload")
             PrintStyle.standard(f"Loading Whisper model: {model_name}")
-            _model = whisper.load_model(name=model_name, download_root=files.get_abs_path("/tmp/models/whisper")) # type: ignore
-            _model_name = model_name
+            # the model lives in the transcription worker process
+            await worker.load(model_name)
             NotificationManager.send_notification(
                 NotificationType.INFO,
                 NotificationPriority.NORMAL,
@@ -67,7 +60,7 @@ async def is_downloaded():
         # return _is_downloaded()
 
 def _is_downloaded():
-    return _model is not None
+    return bool(whisper_worker.get_worker().model_name)
 
 async def transcribe(model_name:str, audio_bytes_b64: str):
     # return await runtime.call_development_function(_transcribe, model_name, audio_bytes_b64)
@@ -80,17 +73,30 @@ async def _transcribe(model_name:str, audio_bytes_b64: str):
     # Decode audio bytes if encoded as a base64 string
     audio_bytes = base64.b64decode(audio_bytes_b64)
 
-    # Create temp audio file
-    import os
-    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as audio_file:
-        audio_file.write(audio_bytes)
-        temp_path = audio_file.name
+    # Decoded off the event loop, segment by segment, in the worker process
+    stream = await whisper_worker.get_worker().open(model_name)
     try:
-        # Transcribe the audio file
-        result = _model.transcribe(temp_path, fp16=False) # type: ignore
-        return result
-    finally:
-        try:
-            os.remove(temp_path)
-        except Exception:
-            pass # ignore errors during cleanup
+        await stream.feed_file(audio_bytes)
+        await stream.finish()
+        return await stream.result()
+    except BaseException:
+        stream.cancel()
+        raise
+
+
+async def open_stream(
+    model_name: str,
+    language: str | None = None,
+    silence_threshold: float | None = None,
+):
+    """Start a chunked transcription stream; see ``whisper_worker``.
+
+    ``silence_threshold`` is the ``stt_silence_threshold`` setting; it sets
+    how loud a frame must be to count as speech.
+    """
+    await _preload(model_name)
+    return await whisper_worker.get_worker().open(
+        model_name,
+        language=language,
+        vad_threshold=whisper_worker.vad_threshold(silence_threshold),
+    )
@@ -0,0 +1,529 @@
+"""
+Off-loop Whisper transcription.
+
+A dedicated worker process keeps the model loaded and serves transcription
+streams. Audio arrives in chunks of 16 kHz mono PCM16; the worker cuts it
+into speech segments with a simple energy VAD and decodes them
+incrementally, emitting ``partial`` events while a segment is still open and
+a ``final`` event once it closes, then ``done`` with the whole result. A
+whole encoded file (the upload path) skips the VAD and is decoded in one go.
+
+The parent side never decodes: ``TranscriptionStream`` methods only move
+messages, so the event loop stays responsive however long the audio is.
+Work is bounded: at most ``max_sessions`` streams at a time and a capped
+command queue (``WorkerBusy`` when full). Cancellation travels on its own
+control queue, so it is never stuck behind queued audio; the worker drops
+the stream's state and skips whatever it had queued.
+"""
+
+import asyncio
+import itertools
+import math
+import multiprocessing
+import os
+import queue
+import tempfile
+import threading
+from collections import OrderedDict, deque
+from typing import Any, AsyncIterator, Callable
+
+import numpy as np
+
+from helpers.print_style import PrintStyle
+
+
+SAMPLE_RATE = 16000
+FRAME_SAMPLES = 480  # 30 ms VAD frames
+VAD_THRESHOLD = 0.01  # default frame RMS that counts as speech (float audio, -1..1)
+PREROLL_SECONDS = 0.2  # audio kept before speech onset
+SILENCE_SECONDS = 0.5  # trailing silence that closes a segment
+MIN_SPEECH_SECONDS = 0.25  # shorter segments are noise, not decoded
+MAX_SEGMENT_SECONDS = 25.0  # stay inside Whisper's 30 s window
+PARTIAL_STEP_SECONDS = 1.0  # open-segment growth between partial decodes
+PROMPT_CHARS = 200  # previous text passed to the decoder for continuity
+
+MAX_SESSIONS = 4
+QUEUE_SIZE = 64
+PUT_TIMEOUT = 10.0
+
+DOWNLOAD_ROOT = "/tmp/models/whisper"
+
+
+class WorkerBusy(RuntimeError):
+    """The worker is at its session limit or its queue is full."""
+
+
+class TranscriptionError(RuntimeError):
+    """The worker failed to load the model or to decode a stream."""
+
+
+# -- worker side ---------------------------------------------------------------
+
+
+def load_whisper(model_name: str):
+    import warnings
+    import whisper
+    from helpers import files
+
+    warnings.filterwarnings("ignore", category=FutureWarning)
+    return whisper.load_model(
+        name=model_name, download_root=files.get_abs_path(DOWNLOAD_ROOT)
+    )
+
+
+class _Session:
+    """VAD segmentation and incremental decoding for one stream."""
+
+    def __init__(
+        self,
+        decode: Callable[[np.ndarray, str, str | None], tuple[str, str | None]],
+        emit: Callable[[str, dict], None],
+        *,
+        language: str | None = None,
+        vad_threshold: float = VAD_THRESHOLD,
+    ):
+        self.decode = decode
+        self.emit = emit
+        self.language = language
+        self.vad_threshold = vad_threshold
+        self.segments: list[dict[str, Any]] = []
+        self._rest = np.zeros(0, dtype=np.float32)
+        self._preroll: deque[np.ndarray] = deque(
+            maxlen=max(1, int(PREROLL_SECONDS * SAMPLE_RATE / FRAME_SAMPLES))
+        )
+        self._segment: list[np.ndarray] = []
+        self._segment_start = 0  # sample index of the open segment
+        self._speech_frames = 0
+        self._silent_frames = 0
+        self._partial_frames = 0  # segment length at the last partial
+        self._position = 0  # samples consumed so far
+
+    def feed(self, samples: np.ndarray) -> None:
+        samples = np.concatenate([self._rest, samples.astype(np.float32, copy=False)])
+        whole = len(samples) - len(samples) % FRAME_SAMPLES
+        self._rest = samples[whole:]
+        if not whole:
+            return
+        frames = samples[:whole].reshape(-1, FRAME_SAMPLES)
+        speech = np.sqrt(np.mean(frames * frames, axis=1)) > self.vad_threshold
+        silence_limit = int(SILENCE_SECONDS * SAMPLE_RATE / FRAME_SAMPLES)
+        max_frames = int(MAX_SEGMENT_SECONDS * SAMPLE_RATE / FRAME_SAMPLES)
+        for frame, is_speech in zip(frames, speech):
+            self._position += FRAME_SAMPLES
+            if not self._segment:
+                if is_speech:
+                    self._segment = [*self._preroll, frame]
+                    self._segment_start = self._position - len(self._segment) * FRAME_SAMPLES
+                    self._preroll.clear()
+                    self._speech_frames, self._silent_frames = 1, 0
+                else:
+                    self._preroll.append(frame)
+                continue
+            self._segment.append(frame)
+            if is_speech:
+                self._speech_frames += 1
+                self._silent_frames = 0
+            else:
+                self._silent_frames += 1
+            if self._silent_frames >= silence_limit:
+                # the closing silence is the next segment's lead-in
+                self._preroll.extend(self._segment[-self._preroll.maxlen:])  # type: ignore[misc]
+                self._close_segment()
+            elif len(self._segment) >= max_frames:
+                self._close_segment()
+
+    def feed_whole(self, samples: np.ndarray) -> None:
+        """Decode a complete recording as one segment, without VAD gating."""
+        if self._segment:
+            self._close_segment()
+        self._segment_start = self._position
+        self._position += len(samples)
+        self._rest = np.zeros(0, dtype=np.float32)
+        self._preroll.clear()
+        text = self._decode(samples.astype(np.float32, copy=False)) if len(samples) else ""
+        if text:
+            segment = self._span(text, len(samples) / FRAME_SAMPLES)
+            self.segments.append(segment)
+            self.emit("final", segment)
+
+    def partial(self) -> None:
+        """Decode the open segment if it grew enough since the last partial."""
+        step = int(PARTIAL_STEP_SECONDS * SAMPLE_RATE / FRAME_SAMPLES)
+        if not self._segment or len(self._segment) - self._partial_frames < step:
+            return
+        self._partial_frames = len(self._segment)
+        text = self._decode(np.concatenate(self._segment))
+        self.emit("partial", self._span(text, len(self._segment)))
+
+    def finish(self) -> dict[str, Any]:
+        if self._segment:
+            self._close_segment()
+        return {
+            "text": " ".join(s["text"] for s in self.segments),
+            "segments": self.segments,
+            "language": self.language,
+        }
+
+    def _close_segment(self) -> None:
+        frames, speech = self._segment, self._speech_frames
+        self._segment, self._partial_frames = [], 0
+        if speech * FRAME_SAMPLES < MIN_SPEECH_SECONDS * SAMPLE_RATE:
+            return
+        # trailing silence adds nothing but decode time
+        keep = len(frames) - max(0, self._silent_frames - self._preroll.maxlen)  # type: ignore[operator]
+        text = self._decode(np.concatenate(frames[:keep]))
+        if text:
+            segment = self._span(text, keep)
+            self.segments.append(segment)
+            self.emit("final", segment)
+
+    def _decode(self, audio: np.ndarray) -> str:
+        prompt = " ".join(s["text"] for s in self.segments)[-PROMPT_CHARS:]
+        text, language = self.decode(audio, prompt, self.language)
+        self.language = self.language or language
+        return text
+
+    def _span(self, text: str, frames: float) -> dict[str, Any]:
+        start = self._segment_start / SAMPLE_RATE
+        return {
+            "text": text,
+            "start": round(start, 3),
+            "end": round(start + frames * FRAME_SAMPLES / SAMPLE_RATE, 3),
+        }
+
+
+def vad_threshold(silence_threshold: float | None) -> float:
+    """Frame RMS for the ``stt_silence_threshold`` setting (0..1).
+
+    Uses the same curve as the browser's silence detection, so the worker
+    hears speech where the microphone UI does.
+    """
+    if silence_threshold is None:
+        return VAD_THRESHOLD
+    return math.exp(-5 * (1 - min(1.0, max(0.0, float(silence_threshold)))))
+
+
+def _pcm16(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
+
+
+def _load_file(data: bytes) -> np.ndarray:
+    import whisper
+
+    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as audio_file:
+        audio_file.write(data)
+        path = audio_file.name
+    try:
+        return whisper.load_audio(path, sr=SAMPLE_RATE)
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _worker_main(commands, control, events, loader) -> None:
+    model: dict[str, Any] = {"name": "", "model": None}
+    sessions: dict[str, _Session] = {}
+    cancelled: OrderedDict[str, None] = OrderedDict()
+
+    def drain_control() -> None:
+        while True:
+            try:
+                sid = control.get_nowait()
+            except queue.Empty:
+                return
+            sessions.pop(sid, None)
+            cancelled[sid] = None
+            while len(cancelled) > 1024:
+                cancelled.popitem(last=False)
+
+    def ensure_model(name: str) -> None:
+        if model["model"] is None or model["name"] != name:
+            model["model"], model["name"] = None, ""
+            model["model"] = loader(name)
+            model["name"] = name
+            events.put(("", "loaded", {"model": name}))
+
+    def make_session(sid: str, language: str | None, threshold: float) -> _Session:
+        def decode(audio, prompt, language):
+            drain_control()
+            if sid in cancelled:
+                raise _Cancelled()
+            result = model["model"].transcribe(
+                audio,
+                fp16=False,
+                temperature=0.0,
+                language=language,
+                initial_prompt=prompt or None,
+                condition_on_previous_text=False,
+                without_timestamps=True,
+            )
+            return str(result.get("text", "")).strip(), result.get("language")
+
+        return _Session(
+            decode,
+            lambda kind, data: events.put((sid, kind, data)),
+            language=language,
+            vad_threshold=threshold,
+        )
+
+    while True:
+        drain_control()
+        try:
+            command = commands.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        if command is None:
+            return
+        op, sid, payload = command
+        drain_control()
+        if sid in cancelled:
+            continue
+        try:
+            if op == "load":
+                ensure_model(payload)
+                events.put((sid, "done", {"model": payload}))
+            elif op == "open":
+                ensure_model(payload["model"])
+                sessions[sid] = make_session(
+                    sid, payload.get("language"), payload.get("vad_threshold") or VAD_THRESHOLD
+                )
+            elif sid in sessions:
+                session = sessions[sid]
+                if op == "audio":
+                    session.feed(_pcm16(payload))
+                elif op == "file":
+                    session.feed_whole(_load_file(payload))
+                elif op == "finish":
+                    del sessions[sid]
+                    events.put((sid, "done", session.finish()))
+                    continue
+                # partials only when caught up, so a backlog never grows
+                if commands.empty():
+                    session.partial()
+        except _Cancelled:
+            continue
+        except Exception as e:
+            sessions.pop(sid, None)
+            events.put((sid, "error", {"error": f"{type(e).__name__}: {e}"}))
+
+
+class _Cancelled(Exception):
+    pass
+
+
+# -- parent side ---------------------------------------------------------------
+
+
+class TranscriptionStream:
+    """One stream of audio into the worker and of segments back out."""
+
+    def __init__(self, worker: "TranscriptionWorker", stream_id: str):
+        self.id = stream_id
+        self._worker = worker
+        self._loop = asyncio.get_running_loop()
+        self._events: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+        self.closed = False
+
+    async def feed(self, pcm: bytes) -> None:
+        """Queue 16 kHz mono little-endian PCM16 samples."""
+        await self._worker._put(("audio", self.id, bytes(pcm)))
+
+    async def feed_file(self, data: bytes) -> None:
+        """Queue a whole encoded audio file (anything ffmpeg reads)."""
+        await self._worker._put(("file", self.id, bytes(data)))
+
+    async def finish(self) -> None:
+        await self._worker._put(("finish", self.id, None))
+
+    def cancel(self) -> None:
+        """Stop the stream; events not yet consumed are discarded."""
+        if self.closed:
+            return
+        self._worker._cancel(self)
+        while not self._events.empty():
+            self._events.get_nowait()
+        self._push({"type": "cancelled"})
+
+    async def events(self) -> AsyncIterator[dict[str, Any]]:
+        """Yield ``partial`` and ``final`` events, then the ``done`` result."""
+        while True:
+            event = await self._events.get()
+            kind = event["type"]
+            if kind == "error":
+                raise TranscriptionError(event["error"])
+            if kind == "cancelled":
+                return
+            yield event
+            if kind == "done":
+                return
+
+    async def result(self) -> dict[str, Any]:
+        async for event in self.events():
+            if event["type"] == "done":
+                return {k: v for k, v in event.items() if k != "type"}
+        raise TranscriptionError("transcription cancelled")
+
+    def _push(self, event: dict[str, Any]) -> None:
+        if self.closed:
+            return
+        if event["type"] in ("done", "error", "cancelled"):
+            self.closed = True
+        self._events.put_nowait(event)
+
+
+class TranscriptionWorker:
+    def __init__(
+        self,
+        *,
+        max_sessions: int = MAX_SESSIONS,
+        queue_size: int = QUEUE_SIZE,
+        loader: Callable[[str], Any] = load_whisper,
+    ):
+        self.max_sessions = max_sessions
+        self.queue_size = queue_size
+        self.loader = loader
+        self.model_name = ""  # model currently loaded in the worker
+        self._streams: dict[str, TranscriptionStream] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._process = None
+        self._commands = None
+        self._control = None
+
+    @property
+    def active(self) -> int:
+        return len(self._streams)
+
+    def start(self) -> None:
+        with self._lock:
+            if self._process is not None and self._process.is_alive():
+                return
+            # torch does not survive fork; start a fresh interpreter
+            ctx = multiprocessing.get_context("spawn")
+            self._commands = ctx.Queue(maxsize=self.queue_size)
+            self._control = ctx.Queue()
+            events = ctx.Queue()
+            self._process = ctx.Process(
+                target=_worker_main,
+                args=(self._commands, self._control, events, self.loader),
+                name="whisper-worker",
+                daemon=True,
+            )
+            self._process.start()
+            threading.Thread(
+                target=self._read_events,
+                args=(self._process, events),
+                name="whisper-worker-events",
+                daemon=True,
+            ).start()
+
+    def stop(self) -> None:
+        with self._lock:
+            process, self._process = self._process, None
+        if process is None:
+            return
+        try:
+            self._commands.put_nowait(None)  # type: ignore[union-attr]
+        except Exception:
+            pass
+        process.join(timeout=5)
+        if process.is_alive():
+            process.terminate()
+
+    async def load(self, model_name: str) -> None:
+        stream = self._register()
+        try:
+            await self._put(("load", stream.id, model_name))
+            await stream.result()
+        finally:
+            self._streams.pop(stream.id, None)
+
+    async def open(
+        self,
+        model_name: str,
+        *,
+        language: str | None = None,
+        vad_threshold: float | None = None,
+    ) -> TranscriptionStream:
+        if len(self._streams) >= self.max_sessions:
+            raise WorkerBusy(f"transcription worker is busy ({self.max_sessions} streams)")
+        stream = self._register()
+        payload = {"model": model_name, "language": language, "vad_threshold": vad_threshold}
+        try:
+            await self._put(("open", stream.id, payload))
+        except BaseException:
+            self._streams.pop(stream.id, None)
+            raise
+        return stream
+
+    def _register(self) -> TranscriptionStream:
+        self.start()
+        stream = TranscriptionStream(self, f"s{os.getpid()}-{next(self._ids)}")
+        self._streams[stream.id] = stream
+        return stream
+
+    async def _put(self, command: tuple) -> None:
+        assert self._commands is not None
+        try:
+            self._commands.put_nowait(command)
+            return
+        except queue.Full:
+            pass
+        try:
+            await asyncio.to_thread(self._commands.put, command, True, PUT_TIMEOUT)
+        except queue.Full:
+            raise WorkerBusy("transcription queue is full") from None
+
+    def _cancel(self, stream: TranscriptionStream) -> None:
+        self._streams.pop(stream.id, None)
+        if self._control is not None:
+            self._control.put(stream.id)
+
+    def _read_events(self, process, events) -> None:
+        while True:
+            try:
+                sid, kind, data = events.get(timeout=0.5)
+            except queue.Empty:
+                if process.is_alive():
+                    continue
+                self._fail_all(process, "transcription worker exited")
+                return
+            except (EOFError, OSError):
+                self._fail_all(process, "transcription worker exited")
+                return
+            if kind == "loaded":
+                self.model_name = data["model"]
+                continue
+            stream = self._streams.get(sid)
+            if stream is None:
+                continue  # cancelled meanwhile
+            if kind in ("done", "error"):
+                self._streams.pop(sid, None)
+            self._dispatch(stream, {"type": kind, **data})
+
+    def _fail_all(self, process, message: str) -> None:
+        if self._process is process:
+            PrintStyle.error(f"Whisper: {message}")
+            self.model_name = ""
+        for sid, stream in list(self._streams.items()):
+            self._streams.pop(sid, None)
+            self._dispatch(stream, {"type": "error", "error": message})
+
+    @staticmethod
+    def _dispatch(stream: TranscriptionStream, event: dict[str, Any]) -> None:
+        try:
+            stream._loop.call_soon_threadsafe(stream._push, event)
+        except RuntimeError:
+            pass  # the stream's loop is gone
+
+
+_worker: TranscriptionWorker | None = None
+
+
+def get_worker() -> TranscriptionWorker:
+    global _worker
+    if _worker is None:
+        _worker = TranscriptionWorker()
+    return _worker
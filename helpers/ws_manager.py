@@ -347,6 +347,8 @@ class WsManager:
                 preview = f"dict({len(value)})"
             elif isinstance(value, list):
                 preview = f"list({len(value)})"
+            elif isinstance(value, (bytes, bytearray)):
+                preview = f"bytes({len(value)})"
             else:
                 preview = value.__class__.__name__
             summary[key] = preview
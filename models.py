@@ -20,7 +20,7 @@ import openai
 from litellm.types.utils import ModelResponse
 
 from helpers import dotenv
-from helpers import settings, dirty_json, images
+from helpers import settings, dirty_json, images, prompt_cache
 from helpers.dotenv import load_dotenv
 from helpers.providers import ModelType as ProviderModelType, get_provider_config
 from helpers.rate_limiter import RateLimiter
@@ -320,6 +320,7 @@ class LiteLLMChatWrapper(SimpleChatModel):
 
     def _convert_messages(self, messages: List[BaseMessage], explicit_caching: bool = False) -> List[dict]:
         result = []
+        volatile = []
         # Map LangChain message types to LiteLLM roles
         role_mapping = {
             "human": "user",
@@ -370,16 +371,16 @@ class LiteLLMChatWrapper(SimpleChatModel):
                 message_dict["content"] = "empty"
 
             result.append(message_dict)
-
-        if explicit_caching and result:
-            if result[0]["role"] == "system":
-                result[0]["cache_control"] = {"type": "ephemeral"}
-            for i in range(len(result) - 1, -1, -1):
-                if result[i]["role"] == "assistant":
-                    result[i]["cache_control"] = {"type": "ephemeral"}
-                    break
-
-        return result
+            volatile.append(prompt_cache.is_volatile(m))
+
+        # keep volatile extras out of the cached prefix, breakpoints on stable boundaries
+        return prompt_cache.apply_layout(
+            result,
+            volatile,
+            explicit_caching=explicit_caching,
+            content_blocks=explicit_caching
+            and prompt_cache.uses_cache_breakpoints(self.provider, self.model_name),
+        )
 
     def _call(
         self,
@@ -447,6 +448,7 @@ class LiteLLMChatWrapper(SimpleChatModel):
         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
         **kwargs: Any,
     ) -> AsyncIterator[ChatGenerationChunk]:
+        await images.preload([m.content for m in messages])
         msgs = self._convert_messages(messages)
 
         # Apply rate limiting if configured
@@ -484,6 +486,9 @@ class LiteLLMChatWrapper(SimpleChatModel):
         rate_limiter_callback: (
             Callable[[str, str, int, int], Awaitable[bool]] | None
         ) = None,
+        usage_callback: (
+            Callable[[prompt_cache.PromptCacheUsage], Awaitable[None]] | None
+        ) = None,
         explicit_caching: bool = False,
         **kwargs: Any,
     ) -> Tuple[str, str]:
@@ -498,7 +503,8 @@ class LiteLLMChatWrapper(SimpleChatModel):
         if user_message:
             messages.append(HumanMessage(content=user_message))
 
-        # convert to litellm format
+        # convert to litellm format, encoding new local images off the event loop first
+        await images.preload([m.content for m in messages])
         msgs_conv = self._convert_messages(messages, explicit_caching=explicit_caching)
 
         # Apply rate limiting if configured
@@ -511,6 +517,9 @@ class LiteLLMChatWrapper(SimpleChatModel):
         max_retries: int = int(call_kwargs.pop("a0_retry_attempts", 2))
         retry_delay_s: float = float(call_kwargs.pop("a0_retry_delay_seconds", 1.5))
         stream = reasoning_callback is not None or response_callback is not None or tokens_callback is not None
+        if stream:
+            # final chunk carries token usage incl. prompt cache reads/writes
+            call_kwargs.setdefault("stream_options", {"include_usage": True})
 
         # results
         result = ChatGenerationResult()
@@ -518,6 +527,7 @@ class LiteLLMChatWrapper(SimpleChatModel):
         attempt = 0
         while True:
             got_any_chunk = False
+            usage: prompt_cache.PromptCacheUsage | None = None
             try:
                 # call model
                 _completion = await acompletion(
@@ -533,6 +543,7 @@ class LiteLLMChatWrapper(SimpleChatModel):
                     try:
                         async for chunk in _completion:  # type: ignore
                             got_any_chunk = True
+                            usage = prompt_cache.usage_from_response(chunk) or usage
                             # parse chunk
                             parsed = _parse_chunk(chunk)
                             output = result.add_chunk(parsed)
@@ -572,6 +583,7 @@ class LiteLLMChatWrapper(SimpleChatModel):
 
                 # non-stream response
                 else:
+                    usage = prompt_cache.usage_from_response(_completion)
                     parsed = _parse_chunk(_completion)
                     output = result.add_chunk(parsed)
                     if limiter:
@@ -580,6 +592,11 @@ class LiteLLMChatWrapper(SimpleChatModel):
                         if output["reasoning_delta"]:
                             limiter.add(output=approximate_tokens(output["reasoning_delta"]))
 
+                if usage:
+                    prompt_cache.record_usage(self.model_name, usage)
+                    if usage_callback:
+                        await usage_callback(usage)
+
                 # Successful completion of stream
                 return result.response, result.reasoning
 
@@ -737,6 +754,9 @@ def _get_litellm_embedding(
 
 
 def _parse_chunk(chunk: Any) -> ChatChunk:
+    if not chunk["choices"]:
+        # usage-only chunk at the end of a stream
+        return ChatChunk(reasoning_delta="", response_delta="")
     delta = chunk["choices"][0].get("delta", {})
     message = chunk["choices"][0].get("message", {}) or chunk["choices"][0].get(
         "model_extra", {}
@@ -8,6 +8,7 @@ from helpers.print_style import PrintStyle
 from helpers.ws import WsHandler
 from helpers.ws_manager import WsResult
 
+from plugins._a0_connector.helpers.context_hub import ContextHub
 from plugins._a0_connector.helpers.exec_config import build_exec_config
 from plugins._a0_connector.helpers.event_bridge import get_context_log_entries
 from plugins._a0_connector.helpers.ws_runtime import (
@@ -63,7 +64,8 @@ WS_FEATURES = [
 
 
 class WsConnector(WsHandler):
-    _streaming_tasks: ClassVar[dict[tuple[str, str], asyncio.Task[None]]] = {}
+    # Shared by all handler instances: one topic per context, one cursor per sid
+    _hub: ClassVar[ContextHub | None] = None
 
     @classmethod
     def requires_auth(cls) -> bool:
@@ -84,7 +86,7 @@ class WsConnector(WsHandler):
     async def on_disconnect(self, sid: str) -> None:
         contexts = unregister_sid(sid)
         for context_id in contexts:
-            self._cancel_streaming(sid, context_id)
+            self._get_hub().unsubscribe(sid, context_id)
         clear_remote_tree_snapshot(sid)
         fail_pending_file_ops_for_sid(
             sid,
@@ -250,20 +252,12 @@ class WsConnector(WsHandler):
                 correlation_id=data.get("correlationId"),
             )
 
-        subscribe_sid_to_context(sid, context_id)
-        events, last_sequence = get_context_log_entries(context_id, after=from_sequence)
-        await self.emit_to(
+        last_sequence = await self._start_streaming(
             sid,
-            "connector_context_snapshot",
-            {
-                "context_id": context_id,
-                "events": events,
-                "last_sequence": last_sequence,
-                "message_queue": self._queue_items_for_context(context),
-            },
+            context,
+            from_sequence=from_sequence,
             correlation_id=data.get("correlationId"),
         )
-        self._start_streaming(sid, context_id, from_sequence=last_sequence)
 
         return {
             "context_id": context_id,
@@ -284,7 +278,7 @@ class WsConnector(WsHandler):
                 correlation_id=data.get("correlationId"),
             )
 
-        self._cancel_streaming(sid, context_id)
+        self._get_hub().unsubscribe(sid, context_id)
         unsubscribe_sid_from_context(sid, context_id)
         return {"context_id": context_id, "unsubscribed": True}
 
@@ -346,20 +340,12 @@ class WsConnector(WsHandler):
             )
 
         if context_id not in subscribed_contexts_for_sid(sid):
-            subscribe_sid_to_context(sid, context_id)
-            events, last_sequence = get_context_log_entries(context_id, after=0)
-            await self.emit_to(
+            await self._start_streaming(
                 sid,
-                "connector_context_snapshot",
-                {
-                    "context_id": context_id,
-                    "events": events,
-                    "last_sequence": last_sequence,
-                    "message_queue": self._queue_items_for_context(context),
-                },
+                context,
+                from_sequence=0,
                 correlation_id=data.get("correlationId"),
             )
-            self._start_streaming(sid, context_id, from_sequence=last_sequence)
 
         message_id = client_message_id or data.get("correlationId") or ""
         context.log.log(
@@ -625,7 +611,10 @@ class WsConnector(WsHandler):
             "context_id": context_id,
             "message_queue": self._queue_items_for_context(context),
         }
+        hub = self._get_hub()
         for target_sid in subscribed_sids_for_context(context_id):
+            if hub.is_subscribed(target_sid, context_id):
+                continue  # streamed sids get the update from the hub
             try:
                 await self.emit_to(target_sid, "connector_message_queue_updated", payload)
             except Exception as exc:
@@ -863,67 +852,41 @@ class WsConnector(WsHandler):
                     f"[a0-connector] failed to emit connector_context_complete to {target_sid}: {exc}"
                 )
 
-    def _start_streaming(self, sid: str, context_id: str, *, from_sequence: int) -> None:
-        key = (sid, context_id)
-        task = self._streaming_tasks.get(key)
-        if task is not None and not task.done():
-            return
-
-        task = asyncio.create_task(
-            self._stream_events(sid, context_id, from_sequence=from_sequence)
-        )
-        self._streaming_tasks[key] = task
-
-    def _cancel_streaming(self, sid: str, context_id: str) -> None:
-        task = self._streaming_tasks.pop((sid, context_id), None)
-        if task is not None and not task.done():
-            task.get_loop().call_soon_threadsafe(task.cancel)
+    def _get_hub(self) -> ContextHub:
+        hub = WsConnector._hub
+        if hub is None:
+            hub = ContextHub(
+                self.emit_to,
+                read_log=get_context_log_entries,
+                read_queue=lambda context_id: self._queue_state_for_context_id(context_id)[1],
+                is_running=self._context_is_running,
+            )
+            WsConnector._hub = hub
+        return hub
 
-    async def _stream_events(
+    async def _start_streaming(
         self,
         sid: str,
-        context_id: str,
+        context: AgentContext,
         *,
         from_sequence: int,
-    ) -> None:
+        correlation_id: Any = None,
+    ) -> int:
+        """Send the context snapshot after ``from_sequence``, then stream updates."""
         # `from_sequence` is a log-output cursor (not an event sequence number).
-        cursor = max(int(from_sequence or 0), 0)
-        last_queue_signature, _ = self._queue_state_for_context_id(context_id)
-        was_running = self._context_is_running(context_id)
-        try:
-            while context_id in subscribed_contexts_for_sid(sid):
-                events, next_cursor = get_context_log_entries(context_id, after=cursor)
-                for event in events:
-                    await self.emit_to(sid, "connector_context_event", event)
-                cursor = max(cursor, int(next_cursor or cursor))
-                queue_signature, queue_items = self._queue_state_for_context_id(context_id)
-                if queue_signature != last_queue_signature:
-                    last_queue_signature = queue_signature
-                    await self.emit_to(
-                        sid,
-                        "connector_message_queue_updated",
-                        {
-                            "context_id": context_id,
-                            "message_queue": queue_items,
-                        },
-                    )
-                is_running = self._context_is_running(context_id)
-                if was_running and not is_running:
-                    await self.emit_to(
-                        sid,
-                        "connector_context_complete",
-                        {
-                            "context_id": context_id,
-                            "status": "completed",
-                        },
-                    )
-                was_running = is_running
-                await asyncio.sleep(0.5)
-        except asyncio.CancelledError:
-            raise
-        except Exception as exc:
-            PrintStyle.error(
-                f"[a0-connector] stream error sid={sid} context={context_id}: {exc}"
-            )
-        finally:
-            self._streaming_tasks.pop((sid, context_id), None)
+        context_id = context.id
+        subscribe_sid_to_context(sid, context_id)
+        events, last_sequence = get_context_log_entries(context_id, after=from_sequence)
+        snapshot = {
+            "context_id": context_id,
+            "events": events,
+            "last_sequence": last_sequence,
+            "message_queue": self._queue_items_for_context(context),
+        }
+        await self._get_hub().subscribe(
+            sid,
+            context_id,
+            log_cursor=last_sequence,
+            preface=[("connector_context_snapshot", snapshot, correlation_id)],
+        )
+        return last_sequence
@@ -0,0 +1,304 @@
+"""Per-context fan-out of connector events to subscribed websocket sids.
+
+Producers signal changes through ``helpers.context_signals`` (log items,
+message queue, run state). Signals for a context are coalesced for
+``COALESCE_SECONDS``; the context is then read once and the resulting
+events are appended to its topic, a bounded backlog numbered by ``seq``.
+Every subscribed sid has its own sender task and cursor into that backlog,
+so a slow client delays nobody else. A client that falls behind the
+backlog catches up with one coalesced log read from its own log cursor.
+Idle contexts cost nothing: no signal, no read, no wakeup.
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+from helpers import context_signals
+from helpers.print_style import PrintStyle
+
+
+COALESCE_SECONDS = 0.025
+BACKLOG_SIZE = 256
+
+EVENT_CONTEXT = "connector_context_event"
+EVENT_QUEUE = "connector_message_queue_updated"
+EVENT_COMPLETE = "connector_context_complete"
+
+EmitFn = Callable[..., Awaitable[None]]  # emit(sid, event, payload, correlation_id=None)
+ReadLogFn = Callable[[str, int], tuple[list[dict[str, Any]], int]]
+
+
+@dataclass
+class HubStats:
+    signals: int = 0  # producer signals for subscribed contexts
+    reads: int = 0  # coalesced context reads
+    catch_ups: int = 0  # subscribers resynced after falling behind the backlog
+
+
+@dataclass
+class _Entry:
+    seq: int
+    event: str
+    payload: dict[str, Any]
+    log_cursor: int  # log cursor once this entry was read; 0 for non-log events
+
+
+class _Subscriber:
+    def __init__(self, sid: str, seq: int, log_cursor: int):
+        self.sid = sid
+        self.seq = seq
+        self.log_cursor = log_cursor
+        self.wake = asyncio.Event()
+        self.task: asyncio.Task[None] | None = None
+
+
+class _Topic:
+    def __init__(self, context_id: str, log_cursor: int, queue: list, running: bool):
+        self.context_id = context_id
+        self.seq = 0
+        self.entries: deque[_Entry] = deque(maxlen=BACKLOG_SIZE)
+        self.log_cursor = log_cursor
+        self.queue_signature = repr(queue)
+        self.running = running
+        self.last_complete = 0  # seq of the newest completion entry
+        self.subscribers: dict[str, _Subscriber] = {}
+        self.pending: set[str] = set()
+        self.handle: asyncio.TimerHandle | None = None
+
+    def first_seq(self) -> int:
+        return self.entries[0].seq if self.entries else self.seq + 1
+
+
+class ContextHub:
+    """Publish/subscribe hub; call its methods on one event loop.
+
+    ``notify`` is the exception: it is the ``context_signals`` listener and
+    may be called from any thread.
+    """
+
+    def __init__(
+        self,
+        emit: EmitFn,
+        *,
+        read_log: ReadLogFn,
+        read_queue: Callable[[str], list[dict[str, Any]]],
+        is_running: Callable[[str], bool],
+    ):
+        self._emit = emit
+        self._read_log = read_log
+        self._read_queue = read_queue
+        self._is_running = is_running
+        self._topics: dict[str, _Topic] = {}
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self.stats = HubStats()
+        context_signals.connect(self.notify)
+
+    def close(self) -> None:
+        context_signals.disconnect(self.notify)
+        for context_id in list(self._topics):
+            for sid in list(self._topics[context_id].subscribers):
+                self.unsubscribe(sid, context_id)
+
+    # -- subscriptions ---------------------------------------------------------
+
+    async def subscribe(
+        self,
+        sid: str,
+        context_id: str,
+        *,
+        log_cursor: int,
+        preface: list[tuple[str, dict[str, Any], Any]] | None = None,
+    ) -> None:
+        """Send ``context_id`` events after ``log_cursor`` to ``sid``.
+
+        ``preface`` (event, payload, correlation id) is emitted before this
+        returns, so a snapshot read together with ``log_cursor`` is never
+        overtaken; events published meanwhile wait in the backlog.
+        """
+        self._loop = asyncio.get_running_loop()
+        with self._lock:
+            topic = self._topics.get(context_id)
+            if topic is None:
+                topic = _Topic(
+                    context_id,
+                    log_cursor,
+                    self._read_queue(context_id),
+                    self._is_running(context_id),
+                )
+                self._topics[context_id] = topic
+            old = topic.subscribers.get(sid)
+            subscriber = _Subscriber(sid, topic.seq, log_cursor)
+            topic.subscribers[sid] = subscriber
+        if old is not None and old.task is not None:
+            old.task.cancel()
+        try:
+            for event, payload, correlation_id in preface or []:
+                await self._emit(sid, event, payload, correlation_id=correlation_id)
+        except BaseException:
+            self._drop(topic, subscriber)
+            raise
+        if topic.subscribers.get(sid) is subscriber:
+            subscriber.task = asyncio.create_task(self._deliver(topic, subscriber))
+            subscriber.wake.set()
+
+    def unsubscribe(self, sid: str, context_id: str) -> None:
+        topic = self._topics.get(context_id)
+        subscriber = topic.subscribers.get(sid) if topic else None
+        if topic is not None and subscriber is not None:
+            self._drop(topic, subscriber)
+
+    def _drop(self, topic: _Topic, subscriber: _Subscriber) -> None:
+        with self._lock:
+            if topic.subscribers.get(subscriber.sid) is subscriber:
+                del topic.subscribers[subscriber.sid]
+            if not topic.subscribers and self._topics.get(topic.context_id) is topic:
+                del self._topics[topic.context_id]
+                if topic.handle is not None:
+                    topic.handle.cancel()
+                    topic.handle = None
+        task = subscriber.task
+        if task is not None and not task.done():
+            try:
+                current = asyncio.current_task()
+            except RuntimeError:
+                current = None
+            if task is not current:  # a failed sender drops itself
+                task.cancel()
+
+    def is_subscribed(self, sid: str, context_id: str) -> bool:
+        topic = self._topics.get(context_id)
+        return topic is not None and sid in topic.subscribers
+
+    # -- producers ---------------------------------------------------------------
+
+    def notify(self, context_id: str, kind: str) -> None:
+        if context_id not in self._topics:
+            return  # nobody listens; the common case for every log update
+        loop = self._loop
+        with self._lock:
+            topic = self._topics.get(context_id)
+            if topic is None or loop is None:
+                return
+            self.stats.signals += 1
+            first = not topic.pending
+            topic.pending.add(kind)
+        if not first:
+            return  # a read is already scheduled and will see this change
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._schedule(topic)
+        elif not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(self._schedule, topic)
+            except RuntimeError:
+                pass  # loop closed meanwhile
+
+    def _schedule(self, topic: _Topic) -> None:
+        if topic.handle is None and self._topics.get(topic.context_id) is topic:
+            loop = asyncio.get_running_loop()
+            topic.handle = loop.call_later(COALESCE_SECONDS, self._read, topic)
+
+    def _read(self, topic: _Topic) -> None:
+        topic.handle = None
+        with self._lock:
+            kinds, topic.pending = topic.pending, set()
+        if self._topics.get(topic.context_id) is not topic:
+            return
+        self.stats.reads += 1
+        context_id = topic.context_id
+        before = topic.seq
+
+        if context_signals.LOG in kinds:
+            events, end = self._read_log(context_id, topic.log_cursor)
+            topic.log_cursor = max(topic.log_cursor, int(end or 0))
+            for event in events:
+                self._append(topic, EVENT_CONTEXT, event, topic.log_cursor)
+
+        if context_signals.QUEUE in kinds:
+            items = self._read_queue(context_id)
+            signature = repr(items)
+            if signature != topic.queue_signature:
+                topic.queue_signature = signature
+                self._append(
+                    topic, EVENT_QUEUE, {"context_id": context_id, "message_queue": items}
+                )
+
+        if context_signals.RUN in kinds:
+            running = self._is_running(context_id)
+            if topic.running and not running:
+                self._append(
+                    topic, EVENT_COMPLETE, {"context_id": context_id, "status": "completed"}
+                )
+                topic.last_complete = topic.seq
+            topic.running = running
+
+        if topic.seq != before:
+            for subscriber in topic.subscribers.values():
+                subscriber.wake.set()
+
+    def _append(
+        self, topic: _Topic, event: str, payload: dict[str, Any], log_cursor: int = 0,
+    ) -> None:
+        topic.seq += 1
+        topic.entries.append(_Entry(topic.seq, event, payload, log_cursor))
+
+    # -- consumers ---------------------------------------------------------------
+
+    async def _deliver(self, topic: _Topic, subscriber: _Subscriber) -> None:
+        sid = subscriber.sid
+        try:
+            while True:
+                await subscriber.wake.wait()
+                subscriber.wake.clear()
+                while subscriber.seq < topic.seq:
+                    first = topic.first_seq()
+                    if subscriber.seq + 1 < first:
+                        await self._catch_up(topic, subscriber)
+                        continue
+                    batch = list(
+                        itertools.islice(topic.entries, subscriber.seq + 1 - first, None)
+                    )
+                    for entry in batch:
+                        # the snapshot sent at subscribe time already covers these
+                        if not entry.log_cursor or entry.log_cursor > subscriber.log_cursor:
+                            await self._emit(sid, entry.event, entry.payload)
+                        subscriber.seq = entry.seq
+                        if entry.log_cursor:
+                            subscriber.log_cursor = max(subscriber.log_cursor, entry.log_cursor)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            PrintStyle.error(
+                f"[a0-connector] stream error sid={sid} context={topic.context_id}: {exc}"
+            )
+            self._drop(topic, subscriber)
+
+    async def _catch_up(self, topic: _Topic, subscriber: _Subscriber) -> None:
+        """Resync a subscriber whose next entry was evicted from the backlog."""
+        self.stats.catch_ups += 1
+        context_id = topic.context_id
+        target = topic.seq
+        completed = subscriber.seq < topic.last_complete <= target
+        events, end = self._read_log(context_id, subscriber.log_cursor)
+        queue = self._read_queue(context_id)
+        # entries up to `target` are superseded by this read
+        subscriber.seq = target
+        subscriber.log_cursor = max(subscriber.log_cursor, int(end or 0))
+        for event in events:
+            await self._emit(subscriber.sid, EVENT_CONTEXT, event)
+        await self._emit(
+            subscriber.sid, EVENT_QUEUE, {"context_id": context_id, "message_queue": queue}
+        )
+        if completed:
+            await self._emit(
+                subscriber.sid, EVENT_COMPLETE, {"context_id": context_id, "status": "completed"}
+            )
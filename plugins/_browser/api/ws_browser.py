@@ -2,18 +2,16 @@ from __future__ import annotations
 
 import asyncio
 import contextlib
-import time
 from typing import Any, ClassVar
 
 from agent import AgentContext
 from helpers.ws import WsHandler
 from helpers.ws_manager import WsResult
+from plugins._browser.helpers import screencast_hub
 from plugins._browser.helpers.runtime import get_runtime, list_runtime_sessions
 
 
-FRAME_IDLE_POLL_SECONDS = 0.05
 FRAME_RETRY_DELAY_SECONDS = 0.5
-FRAME_STATE_REFRESH_SECONDS = 0.75
 SCREENCAST_QUALITY = 92
 
 
@@ -38,6 +36,9 @@ class WsBrowser(WsHandler):
             return await self._subscribe(data, sid)
         if event == "browser_viewer_unsubscribe":
             return self._unsubscribe(data, sid)
+        if event == "browser_viewer_frame_ack":
+            screencast_hub.ack(self._context_id(data), sid, data.get("seq"))
+            return None
         if event == "browser_viewer_snapshot":
             return await self._snapshot(data)
         if event == "browser_viewer_sessions":
@@ -368,9 +369,8 @@ class WsBrowser(WsHandler):
         browser_id: int | str | None,
         viewer_id: str = "",
     ) -> None:
-        runtime = None
-        stream_id = None
         while True:
+            subscriber = None
             try:
                 runtime = await get_runtime(context_id, create=False)
                 if not runtime:
@@ -386,15 +386,7 @@ class WsBrowser(WsHandler):
                     await asyncio.sleep(FRAME_RETRY_DELAY_SECONDS)
                     continue
 
-                screencast = await runtime.call(
-                    "start_screencast",
-                    active_id,
-                    quality=SCREENCAST_QUALITY,
-                    every_nth_frame=1,
-                )
-                stream_id = screencast["stream_id"]
-                active_id = screencast["browser_id"]
-                state = screencast.get("state")
+                subscriber = screencast_hub.join(context_id, active_id, sid, viewer_id)
                 await self.emit_to(
                     sid,
                     "browser_viewer_frame",
@@ -405,47 +397,28 @@ class WsBrowser(WsHandler):
                         "browsers": browsers,
                         "image": "",
                         "mime": "",
-                        "state": state,
+                        "state": self._state_for_browser(browsers, active_id, None),
                         "frame_source": "state",
                     },
                 )
 
-                last_state_refresh = 0.0
                 while True:
-                    now = time.monotonic()
-                    if now - last_state_refresh >= FRAME_STATE_REFRESH_SECONDS:
-                        listing = await runtime.call("list")
-                        browsers = listing.get("browsers") or []
-                        browser_ids = {str(browser.get("id")) for browser in browsers}
-                        if str(active_id) not in browser_ids:
-                            break
-                        state = self._state_for_browser(browsers, active_id, state)
-                        last_state_refresh = now
-
-                    try:
-                        frame = await runtime.call("pop_screencast_frame", stream_id)
-                    except KeyError:
+                    shared = await subscriber.next_frame()
+                    if shared is None:
                         break
-                    if frame is None:
-                        await asyncio.sleep(FRAME_IDLE_POLL_SECONDS)
-                        continue
-
+                    frame = dict(shared)
                     frame["context_id"] = context_id
                     frame["viewer_id"] = viewer_id
-                    frame["browser_id"] = active_id
-                    frame["browsers"] = browsers
-                    frame["state"] = state
                     frame["frame_source"] = "screencast"
+                    subscriber.mark_sent(frame["seq"])
                     await self.emit_to(sid, "browser_viewer_frame", frame)
             except asyncio.CancelledError:
                 raise
             except Exception:
                 await asyncio.sleep(FRAME_RETRY_DELAY_SECONDS)
             finally:
-                if runtime and stream_id:
-                    with contextlib.suppress(Exception):
-                        await runtime.call("stop_screencast", stream_id)
-                    stream_id = None
+                if subscriber:
+                    screencast_hub.leave(subscriber)
 
     @staticmethod
     def _active_browser_id(
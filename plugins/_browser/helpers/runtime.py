@@ -38,6 +38,9 @@ DEFAULT_VIEWPORT = {"width": 1024, "height": 768}
 CHROME_SINGLETON_FILES = ("SingletonLock", "SingletonCookie", "SingletonSocket")
 SCREENCAST_MAX_WIDTH = 4096
 SCREENCAST_MAX_HEIGHT = 4096
+# Chrome screencast JPEGs carry SOF0 well inside the first kilobyte; decoding a
+# bounded base64 prefix avoids materialising every full frame just to size it.
+SCREENCAST_HEADER_BASE64_CHARS = 4096
 VIEWPORT_SIZE_TOLERANCE = 4
 VIEWPORT_REMOUNT_PAUSE_SECONDS = 0.05
 CLIPBOARD_BRIDGE_SCRIPT = r"""
@@ -321,6 +324,8 @@ class _BrowserScreencast:
         self._ack_tasks: set[asyncio.Task] = set()
         self._expected_width = 0
         self._expected_height = 0
+        self.quality = 0
+        self.every_nth_frame = 1
 
     async def start(
         self,
@@ -337,14 +342,30 @@ class _BrowserScreencast:
         with contextlib.suppress(Exception):
             await self.session.send("Page.enable")
         await self._apply_cdp_viewport_with_remount({"width": width, "height": height})
+        await self._start_cdp_screencast(quality, every_nth_frame)
+
+    async def update(self, *, quality: int, every_nth_frame: int) -> None:
+        quality = max(20, min(95, int(quality)))
+        every_nth_frame = max(1, int(every_nth_frame))
+        if self.stopped or (
+            quality == self.quality and every_nth_frame == self.every_nth_frame
+        ):
+            return
+        with contextlib.suppress(Exception):
+            await self.session.send("Page.stopScreencast")
+        await self._start_cdp_screencast(quality, every_nth_frame)
+
+    async def _start_cdp_screencast(self, quality: int, every_nth_frame: int) -> None:
+        self.quality = max(20, min(95, int(quality)))
+        self.every_nth_frame = max(1, int(every_nth_frame))
         await self.session.send(
             "Page.startScreencast",
             {
                 "format": "jpeg",
-                "quality": max(20, min(95, int(quality))),
+                "quality": self.quality,
                 "maxWidth": SCREENCAST_MAX_WIDTH,
                 "maxHeight": SCREENCAST_MAX_HEIGHT,
-                "everyNthFrame": max(1, int(every_nth_frame)),
+                "everyNthFrame": self.every_nth_frame,
             },
         )
 
@@ -427,6 +448,7 @@ class _BrowserScreencast:
                     metadata["jpegWidth"], metadata["jpegHeight"] = size
                 metadata["expectedWidth"] = self._expected_width
                 metadata["expectedHeight"] = self._expected_height
+                metadata["quality"] = self.quality
                 self._queue_latest(
                     {
                         "browser_id": self.browser_id,
@@ -451,8 +473,10 @@ class _BrowserScreencast:
 
     @staticmethod
     def _jpeg_size(data: str) -> tuple[int, int] | None:
+        header = data[:SCREENCAST_HEADER_BASE64_CHARS]
+        header = header[: len(header) - len(header) % 4]
         try:
-            raw = base64.b64decode(data, validate=False)
+            raw = base64.b64decode(header, validate=False)
         except Exception:
             return None
         if len(raw) < 10 or raw[:2] != b"\xff\xd8":
@@ -1621,6 +1645,18 @@ class _BrowserRuntimeCore:
             raise KeyError("Browser screencast is not active.")
         return await screencast.next_frame(timeout=timeout)
 
+    async def update_screencast(
+        self,
+        stream_id: str,
+        *,
+        quality: int,
+        every_nth_frame: int = 1,
+    ) -> None:
+        screencast = self.screencasts.get(str(stream_id or ""))
+        if not screencast:
+            raise KeyError("Browser screencast is not active.")
+        await screencast.update(quality=quality, every_nth_frame=every_nth_frame)
+
     async def pop_screencast_frame(self, stream_id: str) -> dict[str, Any] | None:
         screencast = self.screencasts.get(str(stream_id or ""))
         if not screencast:
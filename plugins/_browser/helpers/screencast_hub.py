@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import contextlib
+import statistics
+import time
+from typing import Any
+
+from plugins._browser.helpers.runtime import get_runtime
+
+
+FRAME_RETRY_DELAY_SECONDS = 0.5
+FRAME_STATE_REFRESH_SECONDS = 0.75
+FRAME_ACK_TIMEOUT_SECONDS = 1.0
+ACK_LATENCY_SMOOTHING = 0.3
+PROFILE_SWITCH_SECONDS = 2.0
+# (upper bound of median ack latency in seconds, JPEG quality, everyNthFrame)
+SCREENCAST_PROFILES: tuple[tuple[float, int, int], ...] = (
+    (0.08, 92, 1),
+    (0.2, 80, 1),
+    (0.45, 65, 2),
+    (float("inf"), 50, 3),
+)
+
+
+class ScreencastSubscriber:
+    """Latest-frame-wins mailbox for one socket watching a screencast.
+
+    At most one frame is in flight per subscriber; frames published while the
+    client has not acknowledged the previous one replace each other, so slow
+    viewers skip frames instead of building up a backlog.
+    """
+
+    def __init__(self, hub: ScreencastHub, sid: str, viewer_id: str = ""):
+        self.hub = hub
+        self.sid = sid
+        self.viewer_id = viewer_id
+        self.latency: float | None = None
+        self.closed = False
+        self._latest: dict[str, Any] | None = None
+        self._wake = asyncio.Event()
+        self._pending_seq: int | None = None
+        self._sent_at = 0.0
+
+    def offer(self, frame: dict[str, Any]) -> None:
+        self._latest = frame
+        self._wake.set()
+
+    def close(self) -> None:
+        self.closed = True
+        self._wake.set()
+
+    async def next_frame(self) -> dict[str, Any] | None:
+        while not self.closed:
+            timeout = None
+            if self._pending_seq is not None:
+                timeout = FRAME_ACK_TIMEOUT_SECONDS - (time.monotonic() - self._sent_at)
+                if timeout <= 0:
+                    self._record_latency(FRAME_ACK_TIMEOUT_SECONDS)
+                    self._pending_seq = None
+                    continue
+            elif self._latest is not None:
+                frame, self._latest = self._latest, None
+                return frame
+            self._wake.clear()
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), timeout)
+        return None
+
+    def mark_sent(self, seq: int) -> None:
+        self._pending_seq = seq
+        self._sent_at = time.monotonic()
+
+    def ack(self, seq: int) -> bool:
+        if self._pending_seq is None or seq != self._pending_seq:
+            return False
+        self._pending_seq = None
+        self._record_latency(time.monotonic() - self._sent_at)
+        self._wake.set()
+        return True
+
+    def _record_latency(self, latency: float) -> None:
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += ACK_LATENCY_SMOOTHING * (latency - self.latency)
+        self.hub.latency_changed()
+
+
+class ScreencastHub:
+    """One CDP screencast per (context, browser) fanned out to all subscribers."""
+
+    def __init__(self, context_id: str, browser_id: int | str):
+        self.context_id = context_id
+        self.browser_id = browser_id
+        self.subscribers: dict[str, ScreencastSubscriber] = {}
+        self.browsers: list[dict[str, Any]] = []
+        self.state: dict[str, Any] | None = None
+        self.profile = SCREENCAST_PROFILES[0]
+        self.closed = False
+        self._seq = 0
+        self._candidate: tuple[float, int, int] | None = None
+        self._candidate_since = 0.0
+        self._profile_changed = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def key(self) -> tuple[str, str]:
+        return (self.context_id, str(self.browser_id))
+
+    def subscribe(self, sid: str, viewer_id: str = "") -> ScreencastSubscriber:
+        previous = self.subscribers.pop(sid, None)
+        if previous:
+            previous.close()
+        subscriber = ScreencastSubscriber(self, sid, viewer_id)
+        self.subscribers[sid] = subscriber
+        if not self._task:
+            self._task = asyncio.create_task(self._pump())
+        return subscriber
+
+    def unsubscribe(self, subscriber: ScreencastSubscriber) -> None:
+        subscriber.close()
+        if self.subscribers.get(subscriber.sid) is subscriber:
+            del self.subscribers[subscriber.sid]
+        if not self.subscribers:
+            self.close()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        _hubs.pop(self.key, None)
+        for subscriber in list(self.subscribers.values()):
+            subscriber.close()
+        self.subscribers.clear()
+        if self._task and self._task is not asyncio.current_task():
+            self._task.cancel()
+
+    def latency_changed(self) -> None:
+        latencies = [
+            subscriber.latency
+            for subscriber in self.subscribers.values()
+            if subscriber.latency is not None
+        ]
+        if not latencies:
+            return
+        latency = statistics.median(latencies)
+        target = next(profile for profile in SCREENCAST_PROFILES if latency <= profile[0])
+        now = time.monotonic()
+        if target == self.profile:
+            self._candidate = None
+            return
+        if target != self._candidate:
+            self._candidate = target
+            self._candidate_since = now
+            return
+        if now - self._candidate_since >= PROFILE_SWITCH_SECONDS:
+            self.profile = target
+            self._candidate = None
+            self._profile_changed.set()
+
+    def publish(self, frame: dict[str, Any]) -> None:
+        image = frame.get("image") or b""
+        if isinstance(image, str):
+            image = base64.b64decode(image, validate=False)
+        self._seq += 1
+        shared = {
+            **frame,
+            "image": image,
+            "seq": self._seq,
+            "browser_id": self.browser_id,
+            "browsers": self.browsers,
+            "state": self.state,
+        }
+        for subscriber in self.subscribers.values():
+            subscriber.offer(shared)
+
+    async def _pump(self) -> None:
+        try:
+            while not self.closed:
+                runtime = await get_runtime(self.context_id, create=False)
+                if not runtime:
+                    return
+                if not await self._refresh_listing(runtime):
+                    return
+                try:
+                    await self._stream(runtime)
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    await asyncio.sleep(FRAME_RETRY_DELAY_SECONDS)
+        finally:
+            self.close()
+
+    async def _stream(self, runtime: Any) -> None:
+        _max_latency, quality, every_nth_frame = self.profile
+        screencast = await runtime.call(
+            "start_screencast",
+            self.browser_id,
+            quality=quality,
+            every_nth_frame=every_nth_frame,
+        )
+        stream_id = screencast["stream_id"]
+        self.state = screencast.get("state") or self.state
+        self._profile_changed.clear()
+        try:
+            last_state_refresh = time.monotonic()
+            while not self.closed:
+                now = time.monotonic()
+                if now - last_state_refresh >= FRAME_STATE_REFRESH_SECONDS:
+                    if not await self._refresh_listing(runtime):
+                        self.close()
+                        return
+                    last_state_refresh = now
+                if self._profile_changed.is_set():
+                    self._profile_changed.clear()
+                    _max_latency, quality, every_nth_frame = self.profile
+                    await runtime.call(
+                        "update_screencast",
+                        stream_id,
+                        quality=quality,
+                        every_nth_frame=every_nth_frame,
+                    )
+                try:
+                    frame = await runtime.call(
+                        "read_screencast_frame",
+                        stream_id,
+                        timeout=FRAME_STATE_REFRESH_SECONDS,
+                    )
+                except asyncio.TimeoutError:
+                    continue
+                self.publish(frame)
+        finally:
+            with contextlib.suppress(Exception):
+                await runtime.call("stop_screencast", stream_id)
+
+    async def _refresh_listing(self, runtime: Any) -> bool:
+        listing = await runtime.call("list")
+        self.browsers = listing.get("browsers") or []
+        for browser in self.browsers:
+            if str(browser.get("id")) == str(self.browser_id):
+                self.state = browser
+                return True
+        return False
+
+
+_hubs: dict[tuple[str, str], ScreencastHub] = {}
+_memberships: dict[tuple[str, str], ScreencastSubscriber] = {}
+
+
+def join(
+    context_id: str,
+    browser_id: int | str,
+    sid: str,
+    viewer_id: str = "",
+) -> ScreencastSubscriber:
+    previous = _memberships.get((sid, context_id))
+    if previous:
+        leave(previous)
+    key = (context_id, str(browser_id))
+    hub = _hubs.get(key)
+    if not hub or hub.closed:
+        hub = ScreencastHub(context_id, browser_id)
+        _hubs[key] = hub
+    subscriber = hub.subscribe(sid, viewer_id)
+    _memberships[(sid, context_id)] = subscriber
+    return subscriber
+
+
+def leave(subscriber: ScreencastSubscriber) -> None:
+    key = (subscriber.sid, subscriber.hub.context_id)
+    if _memberships.get(key) is subscriber:
+        del _memberships[key]
+    subscriber.hub.unsubscribe(subscriber)
+
+
+def ack(context_id: str, sid: str, seq: Any) -> bool:
+    subscriber = _memberships.get((sid, context_id))
+    if not subscriber:
+        return False
+    try:
+        return subscriber.ack(int(seq))
+    except (TypeError, ValueError):
+        return False
+
+
+def active_hubs() -> list[ScreencastHub]:
+    return list(_hubs.values())
@@ -80,6 +80,21 @@ function nextAnimationFrame() {
   });
 }
 
+function frameSourceFromImage(image, mime = "image/jpeg") {
+  if (!image) return "";
+  if (typeof image === "string") {
+    return `data:${mime || "image/jpeg"};base64,${image}`;
+  }
+  const blob = image instanceof Blob ? image : new Blob([image], { type: mime || "image/jpeg" });
+  return URL.createObjectURL(blob);
+}
+
+function releaseFrameSource(src) {
+  if (typeof src === "string" && src.startsWith("blob:")) {
+    URL.revokeObjectURL(src);
+  }
+}
+
 function loadFrameDimensions(src) {
   return new Promise((resolve) => {
     if (!src) {
@@ -1002,9 +1017,16 @@ const model = {
         if (!this.addressFocused && data.state?.currentUrl) {
           this.address = data.state.currentUrl;
         }
+        if (data.seq != null) {
+          void websocket.emit("browser_viewer_frame_ack", {
+            context_id: data.context_id,
+            viewer_id: this._viewerToken,
+            seq: data.seq,
+          }).catch(() => {});
+        }
         if (data.image) {
           const frameBrowserId = incomingBrowserId || this.activeBrowserId;
-          this.queueFrameRender(`data:${data.mime || "image/jpeg"};base64,${data.image}`, {
+          this.queueFrameRender(frameSourceFromImage(data.image, data.mime), {
             browserId: frameBrowserId,
             contextId: incomingContextId,
             onAccepted: () => {
@@ -1072,6 +1094,9 @@ const model = {
   },
 
   queueFrameRender(frameSrc, options = {}) {
+    if (this._pendingFrameSrc && this._pendingFrameSrc !== frameSrc) {
+      releaseFrameSource(this._pendingFrameSrc);
+    }
     this._pendingFrameSrc = frameSrc;
     this._pendingFrameOptions = options || null;
     if (this._frameRenderHandle) return;
@@ -1107,15 +1132,20 @@ const model = {
     }
     const dimensions = await loadFrameDimensions(frameSrc);
     if (sequence !== this._frameRenderSequence || surfaceSequence !== this._surfaceOpenSequence) {
+      releaseFrameSource(frameSrc);
       return;
     }
     const viewport = this.currentViewportSize() || this._lastViewport;
     if (!this.frameMatchesViewport(dimensions, viewport)) {
       this.requestViewportSyncAfterRejectedFrame();
       if (!this.shouldAcceptMismatchedFrame(dimensions)) {
+        releaseFrameSource(frameSrc);
         return;
       }
     }
+    if (this.frameSrc !== frameSrc) {
+      releaseFrameSource(this.frameSrc);
+    }
     this.frameSrc = frameSrc;
     this._lastFrameDimensions = dimensions;
     this._lastFrameAt = Date.now();
@@ -1215,6 +1245,7 @@ const model = {
     }
     this._frameRenderHandle = null;
     this._frameRenderCancel = null;
+    releaseFrameSource(this._pendingFrameSrc);
     this._pendingFrameSrc = "";
     this._pendingFrameOptions = null;
     this._frameRenderSequence += 1;
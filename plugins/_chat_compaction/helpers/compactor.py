@@ -1,11 +1,14 @@
 """Core compaction logic for the compaction plugin."""
+import asyncio
+import hashlib
+import json
 import os
 from collections import deque
 from datetime import datetime
 
 import models as models_module
 from agent import Agent
-from helpers import tokens
+from helpers import plugins, tokens
 from helpers.history import History, output_text
 from helpers.persist_chat import (
     export_json_chat,
@@ -18,6 +21,13 @@ from helpers.state_monitor_integration import mark_dirty_all
 MIN_COMPACTION_TOKENS = 1000
 COMPACTION_CHUNK_TARGET_RATIO = 0.9
 COMPACTION_CHUNK_VERIFY_RATIO = 0.98
+COMPACTION_MAP_CONCURRENCY = 4
+COMPACTION_REDUCE_MAX_LEVELS = 8
+COMPACTION_PARTS_PREFIX = (
+    "This is a multi-part conversation. Here are summaries of each part:\n\n"
+)
+COMPACTION_PARTS_SEPARATOR = "\n\n---\n\n"
+PROGRESS_SUFFIX = ".progress.json"
 
 from plugins._model_config.helpers.model_config import (
     get_chat_model_config,
@@ -51,6 +61,60 @@ def _save_pre_compaction_backup(context, full_text: str) -> dict[str, str]:
     return {"json": json_path, "txt": txt_path}
 
 
+def _find_resumable_backup(context, full_text: str) -> dict[str, str] | None:
+    """Backup of an interrupted compaction of exactly ``full_text``, if any.
+
+    Large compactions write the backup before the map phase and record every
+    finished part summary next to it, so a rerun only summarizes what is left.
+    """
+    backup_dir = os.path.join(get_chat_folder_path(context.id), "backups")
+    try:
+        names = sorted(os.listdir(backup_dir), reverse=True)
+    except OSError:
+        return None
+    digest = _digest(full_text)
+    for name in names:
+        if not (name.startswith("pre-compact-") and name.endswith(PROGRESS_SUFFIX)):
+            continue
+        progress_path = os.path.join(backup_dir, name)
+        if _read_progress(progress_path).get("source") != digest:
+            continue
+        stem = progress_path[: -len(PROGRESS_SUFFIX)]
+        paths = {"json": stem + ".json", "txt": stem + ".txt", "progress": progress_path}
+        if os.path.exists(paths["json"]) and os.path.exists(paths["txt"]):
+            return paths
+    return None
+
+
+def _start_progress(backup_paths: dict[str, str], full_text: str) -> dict[str, str]:
+    progress_path = backup_paths.get("progress") or (
+        os.path.splitext(backup_paths["txt"])[0] + PROGRESS_SUFFIX
+    )
+    if not os.path.exists(progress_path):
+        _write_progress(progress_path, {"source": _digest(full_text), "summaries": {}})
+    return {**backup_paths, "progress": progress_path}
+
+
+def _read_progress(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _write_progress(path: str, data: dict) -> None:
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8", "surrogatepass")).hexdigest()
+
+
 def _build_model(use_chat_model: bool, preset_name: str | None, agent):
     """Build the LLM model for compaction based on user selection.
 
@@ -87,7 +151,7 @@ async def run_compaction(
     This function:
     1. Extracts the full conversation text
     2. Estimates token count and checks against model context window
-    3. If needed, splits history and summarizes iteratively
+    3. If needed, splits history and map-reduces it, resuming an interrupted run
     4. Calls the LLM to generate a comprehensive summary
     5. Replaces the history with a single AI message containing the summary
     6. Resets the log and creates a response log item
@@ -123,9 +187,26 @@ async def run_compaction(
         )
         
         # Step 4: Handle large histories by chunking if necessary
+        backup_paths = None
         if token_count > max_input_tokens:
+            # back up first so part summaries survive an interrupted run
+            backup_paths = _start_progress(
+                _find_resumable_backup(context, full_text)
+                or _save_pre_compaction_backup(context, full_text),
+                full_text,
+            )
+            config = plugins.get_plugin_config("_chat_compaction", agent=agent) or {}
             summary = await _compact_large_history(
-                agent, full_text, token_count, max_input_tokens, log_item, model
+                agent,
+                full_text,
+                token_count,
+                max_input_tokens,
+                log_item,
+                model,
+                concurrency=int(
+                    config.get("map_concurrency", COMPACTION_MAP_CONCURRENCY)
+                ),
+                progress_path=backup_paths["progress"],
             )
         else:
             summary = await _compact_single_pass(
@@ -136,7 +217,10 @@ async def run_compaction(
             raise ValueError("Compaction produced empty summary")
         
         # Step 5: Save pre-compaction backup before destroying history
-        backup_paths = _save_pre_compaction_backup(context, full_text)
+        if backup_paths is None:
+            backup_paths = _save_pre_compaction_backup(context, full_text)
+        else:
+            os.remove(backup_paths["progress"])
         
         # Step 6: Replace history with compacted version
         backup_note = (
@@ -200,34 +284,55 @@ async def _compact_single_pass(agent, full_text: str, log_item, model) -> str:
 
 
 async def _compact_large_history(
-    agent, full_text: str, token_count: int, max_input_tokens: int, log_item, model
+    agent,
+    full_text: str,
+    token_count: int,
+    max_input_tokens: int,
+    log_item,
+    model,
+    concurrency: int = COMPACTION_MAP_CONCURRENCY,
+    progress_path: str | None = None,
 ) -> str:
-    """Handle large histories by splitting into chunks and summarizing iteratively."""
+    """Map-reduce a history that does not fit the model window.
+
+    Chunks are summarized concurrently (at most ``concurrency`` calls at a
+    time). While the joined part summaries still exceed the window they are
+    grouped and summarized again, level by level, before the final streamed
+    reduce. With ``progress_path`` finished part summaries are recorded there
+    and reused when an interrupted compaction is run again.
+    """
+    system_prompt = agent.read_prompt("compact.sys.md")
     chunks = _split_text_for_compaction(agent, full_text, token_count, max_input_tokens)
     log_item.update(
         content=f"History is large (~{token_count} tokens). Splitting into {len(chunks)} chunks...",
     )
 
-    summaries = []
-    for i, chunk in enumerate(chunks, 1):
-        log_item.update(content=f"Summarizing part {i}/{len(chunks)}...")
-
-        system_prompt = agent.read_prompt("compact.sys.md")
-        user_prompt = agent.read_prompt("compact.msg.md", conversation=chunk)
+    summaries = await _summarize_parts(
+        agent, system_prompt, chunks, log_item, model, concurrency, progress_path
+    )
 
-        chunk_summary, _ = await model.unified_call(
-            system_message=system_prompt,
-            user_message=user_prompt,
+    # tree reduce until the part summaries fit into one prompt
+    for level in range(1, COMPACTION_REDUCE_MAX_LEVELS + 1):
+        groups = _group_for_reduce(agent, summaries, max_input_tokens)
+        if len(groups) <= 1:
+            break
+        log_item.update(
+            content=f"Merging {len(summaries)} part summaries into {len(groups)} (level {level})...",
+        )
+        summaries = await _summarize_parts(
+            agent,
+            system_prompt,
+            [_parts_conversation(group) for group in groups],
+            log_item,
+            model,
+            concurrency,
+            progress_path,
         )
-        summaries.append(chunk_summary)
 
-    combined = "\n\n---\n\n".join(summaries)
     log_item.update(content="Creating final summary from parts...")
 
-    final_prompt = agent.read_prompt("compact.sys.md")
     final_user = agent.read_prompt(
-        "compact.msg.md",
-        conversation=f"This is a multi-part conversation. Here are summaries of each part:\n\n{combined}",
+        "compact.msg.md", conversation=_parts_conversation(summaries)
     )
 
     async def stream_cb(chunk: str, total: str):
@@ -235,13 +340,95 @@ async def _compact_large_history(
             log_item.stream(content=chunk)
 
     final_summary, _ = await model.unified_call(
-        system_message=final_prompt,
+        system_message=system_prompt,
         user_message=final_user,
         response_callback=stream_cb,
     )
     return final_summary
 
 
+async def _summarize_parts(
+    agent,
+    system_prompt: str,
+    parts: list[str],
+    log_item,
+    model,
+    concurrency: int,
+    progress_path: str | None,
+) -> list[str]:
+    """Summarize ``parts`` concurrently, streaming a status line per part."""
+    progress = _read_progress(progress_path) if progress_path else {}
+    done: dict[str, str] = progress.get("summaries", {})
+    keys = [_digest(part) for part in parts]
+    summaries: list[str | None] = [done.get(key) for key in keys]
+    status = [
+        "resumed" if summary is not None else "waiting" for summary in summaries
+    ]
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    def show_status() -> None:
+        finished = sum(1 for summary in summaries if summary is not None)
+        lines = [f"Summarizing parts: {finished}/{len(parts)} done"]
+        lines += [f"- part {i}: {state}" for i, state in enumerate(status, 1)]
+        log_item.update(content="\n".join(lines))
+
+    async def summarize(index: int) -> None:
+        async with semaphore:
+            status[index] = "summarizing"
+            show_status()
+
+            async def stream_cb(chunk: str, total: str):
+                status[index] = f"summarizing ({len(total)} chars)"
+                show_status()
+
+            summary, _ = await model.unified_call(
+                system_message=system_prompt,
+                user_message=agent.read_prompt("compact.msg.md", conversation=parts[index]),
+                response_callback=stream_cb,
+            )
+            summaries[index] = summary
+            status[index] = "done"
+            if progress_path:
+                done[keys[index]] = summary
+                _write_progress(progress_path, {**progress, "summaries": done})
+            show_status()
+
+    show_status()
+    await asyncio.gather(
+        *(summarize(i) for i, summary in enumerate(summaries) if summary is None)
+    )
+    return [summary or "" for summary in summaries]
+
+
+def _group_for_reduce(
+    agent, summaries: list[str], max_input_tokens: int
+) -> list[list[str]]:
+    """Pack consecutive summaries into groups whose reduce prompt fits the window."""
+    budget = max(int(max_input_tokens * COMPACTION_CHUNK_VERIFY_RATIO), 1)
+    if _compaction_input_tokens(agent, _parts_conversation(summaries)) <= budget:
+        return [summaries]
+
+    overhead = _compaction_input_tokens(agent, COMPACTION_PARTS_PREFIX)
+    separator = tokens.approximate_tokens(COMPACTION_PARTS_SEPARATOR)
+    groups: list[list[str]] = []
+    group: list[str] = []
+    used = overhead
+    for summary in summaries:
+        size = tokens.approximate_tokens(summary) + separator
+        if group and used + size > budget:
+            groups.append(group)
+            group, used = [], overhead
+        group.append(summary)
+        used += size
+    if group:
+        groups.append(group)
+    return groups
+
+
+def _parts_conversation(summaries: list[str]) -> str:
+    return COMPACTION_PARTS_PREFIX + COMPACTION_PARTS_SEPARATOR.join(summaries)
+
+
 def _split_text_for_compaction(
     agent, full_text: str, token_count: int, max_input_tokens: int
 ) -> list[str]:
@@ -7,6 +7,7 @@ from helpers.extension import Extension
 from helpers.print_style import PrintStyle
 from helpers import virtual_desktop_routes
 from plugins._desktop import hooks
+from plugins._desktop.helpers import desktop_session
 
 
 _startup_preparation_thread: threading.Thread | None = None
@@ -38,6 +39,14 @@ def _prepare_runtime_safely() -> None:
         _log_runtime_preparation_result(hooks.cleanup_stale_runtime_state())
     except Exception as exc:
         PrintStyle.warning("Desktop runtime preparation failed:", exc)
+        return
+    try:
+        started = desktop_session.get_manager().fill_warm_pool()
+    except Exception as exc:
+        PrintStyle.warning("Desktop warm pool could not start:", exc)
+        return
+    if started:
+        PrintStyle.info("Desktop warm pool ready:", started)
 
 
 def _log_runtime_preparation_result(result: dict[str, Any]) -> None:
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import os
+import shutil
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+# With a live event stream the predicate is only re-checked on events plus
+# this occasional safety net (window renames do not touch the root window).
+EVENT_RECHECK_SECONDS = 1.0
+# Without xprop the waits degrade to the old polling cadence.
+POLL_INTERVAL_SECONDS = 0.25
+FILE_POLL_INTERVAL_SECONDS = 0.05
+
+FileSignature = tuple[int, int, int]
+
+
+class WindowEvents:
+    """Wakes waiters when windows map, unmap or take focus on an X display.
+
+    ``xprop -root -spy`` prints a line whenever the window manager updates
+    ``_NET_CLIENT_LIST`` or ``_NET_ACTIVE_WINDOW``, so waiters re-check
+    their condition as soon as a window appears or goes away instead of
+    sleeping between xdotool searches.
+    """
+
+    def __init__(self, command: list[str] | None, env: dict[str, str] | None = None) -> None:
+        self._command = command
+        self._env = env
+        self._changed = threading.Condition()
+        self._generation = 0
+        self._closed = False
+        self._process: subprocess.Popen[str] | None = None
+
+    @classmethod
+    def for_display(cls, env: dict[str, str]) -> "WindowEvents":
+        xprop = shutil.which("xprop")
+        command = [xprop, "-root", "-spy", "_NET_CLIENT_LIST", "_NET_ACTIVE_WINDOW"] if xprop else None
+        return cls(command, env)
+
+    def start(self) -> bool:
+        if self.listening:
+            return True
+        if not self._command or self._closed:
+            return False
+        try:
+            self._process = subprocess.Popen(
+                self._command,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                env=self._env,
+            )
+        except OSError:
+            self._command = None
+            return False
+        threading.Thread(
+            target=self._read,
+            args=(self._process,),
+            name="a0-desktop-window-events",
+            daemon=True,
+        ).start()
+        return True
+
+    @property
+    def listening(self) -> bool:
+        return bool(self._process and self._process.poll() is None)
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def wait(self, predicate: Callable[[], T], timeout: float) -> T:
+        """Return the first truthy ``predicate()`` result, or the last one on timeout."""
+        deadline = time.monotonic() + timeout
+        while True:
+            generation = self._generation
+            result = predicate()
+            remaining = deadline - time.monotonic()
+            if result or remaining <= 0:
+                return result
+            self.wait_for_change(generation, min(remaining, self._interval()))
+
+    def wait_for_change(self, generation: int, timeout: float) -> bool:
+        """Block until an event newer than ``generation`` arrives."""
+        with self._changed:
+            return self._changed.wait_for(
+                lambda: self._generation != generation,
+                timeout=max(0.0, timeout),
+            )
+
+    def close(self) -> None:
+        with self._changed:
+            self._closed = True
+            self._changed.notify_all()
+        process = self._process
+        if process and process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    def _interval(self) -> float:
+        return EVENT_RECHECK_SECONDS if self.listening else POLL_INTERVAL_SECONDS
+
+    def _read(self, process: subprocess.Popen[str]) -> None:
+        assert process.stdout is not None
+        for _line in process.stdout:
+            with self._changed:
+                self._generation += 1
+                self._changed.notify_all()
+        process.stdout.close()
+        with self._changed:
+            self._changed.notify_all()
+
+
+def file_signature(path: str | Path) -> FileSignature | None:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+def wait_for_file_change(
+    path: str | Path,
+    before: FileSignature | None,
+    *,
+    timeout: float,
+) -> bool:
+    """Wait until ``path`` is rewritten, i.e. its stat signature moves off ``before``.
+
+    LibreOffice saves through a temporary file that is renamed into place, so
+    the first new signature already belongs to the complete file.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        current = file_signature(path)
+        if current is not None and current != before:
+            return True
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(FILE_POLL_INTERVAL_SECONDS)
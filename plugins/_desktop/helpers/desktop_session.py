@@ -13,12 +13,13 @@ import threading
 import time
 import uuid
 import xml.etree.ElementTree as ET
+from concurrent.futures import Future
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
 from helpers import files, virtual_desktop
-from plugins._desktop.helpers import desktop_state
+from plugins._desktop.helpers import desktop_readiness, desktop_state
 from plugins._office.helpers import document_store, libreoffice
 
 
@@ -46,6 +47,11 @@ BLOCKING_DIALOG_TITLES = ("Remote Files", "File Services")
 DISPLAY_START_TIMEOUT_SECONDS = 30.0
 PORT_START_TIMEOUT_SECONDS = 30.0
 STARTUP_GRACE_SECONDS = 45
+SPAWN_WAIT_TIMEOUT_SECONDS = DISPLAY_START_TIMEOUT_SECONDS + STARTUP_GRACE_SECONDS + PORT_START_TIMEOUT_SECONDS
+SAVE_TIMEOUT_SECONDS = 3.0
+RELOAD_SETTLE_SECONDS = 0.8
+WARM_POOL_ENV = "A0_DESKTOP_WARM_POOL"
+WARM_SESSION_PREFIX = "warm-"
 RUNTIME_INSTALL_MESSAGE = (
     "Installing Agent Zero Desktop runtime dependencies. "
     "This can take a few minutes after an update."
@@ -103,6 +109,7 @@ class DesktopSession:
     process_ids: dict[str, int] = field(default_factory=dict)
     owns_processes: bool = True
     started_at: float = field(default_factory=time.time)
+    window_events: desktop_readiness.WindowEvents | None = field(default=None, repr=False, compare=False)
 
     def alive(self) -> bool:
         return _running(self.processes.get("xpra")) or _pid_is_running(self.process_ids.get("xpra", 0))
@@ -131,14 +138,21 @@ class DesktopSession:
 
 class DesktopSessionManager:
     def __init__(self) -> None:
+        # Guards bookkeeping only; spawning desktops and driving LibreOffice
+        # windows happen outside it so one slow start does not block others.
         self._lock = threading.RLock()
         self._sessions: dict[str, DesktopSession] = {}
+        self._reserved: dict[str, DesktopSession] = {}
+        self._warm: list[DesktopSession] = []
+        self._warming = False
+        self._warm_start: Future[None] | None = None
+        self._system_start: Future[DesktopSession] | None = None
+        self._document_locks: dict[str, threading.Lock] = {}
 
     def ensure_system_desktop(self) -> dict[str, Any]:
         try:
+            session = self._ensure_system_desktop()
             with self._lock:
-                self._reap_dead_locked()
-                session = self._ensure_system_desktop_locked()
                 return session.public()
         except Exception as exc:
             status = collect_desktop_status()
@@ -153,29 +167,29 @@ class DesktopSessionManager:
         if ext not in OFFICIAL_EXTENSIONS:
             return {"available": False, "reason": f".{ext} does not use the LibreOffice desktop surface."}
 
-        with self._lock:
-            self._reap_dead_locked()
-            try:
-                session = self._ensure_system_desktop_locked()
-            except Exception as exc:
-                status = collect_desktop_status()
-                return {
-                    "available": False,
-                    "error": str(exc),
-                    "status": status,
-                }
-            refreshed = False
-            try:
+        try:
+            session = self._ensure_system_desktop()
+        except Exception as exc:
+            status = collect_desktop_status()
+            return {
+                "available": False,
+                "error": str(exc),
+                "status": status,
+            }
+        refreshed = False
+        try:
+            with self._document_lock(str(doc.get("file_id") or "")):
                 if refresh and session.file_id == str(doc.get("file_id") or ""):
-                    refreshed = self._reload_document_locked(session, doc)
+                    refreshed = self._reload_document(session, doc)
                 else:
-                    self._open_document_locked(session, doc)
-            except Exception as exc:
-                return {
-                    "available": False,
-                    "error": str(exc),
-                    "status": collect_desktop_status(),
-                }
+                    self._open_document(session, doc)
+        except Exception as exc:
+            return {
+                "available": False,
+                "error": str(exc),
+                "status": collect_desktop_status(),
+            }
+        with self._lock:
             session.file_id = str(doc["file_id"])
             session.extension = ext
             session.path = str(doc["path"])
@@ -210,7 +224,9 @@ class DesktopSessionManager:
                         session = existing
             if not session:
                 return {"ok": True, "refreshed": False}
-            refreshed = self._reload_document_locked(session, doc)
+        with self._document_lock(normalized):
+            refreshed = self._reload_document(session, doc)
+        with self._lock:
             session.file_id = str(doc["file_id"])
             session.extension = ext
             session.path = str(doc["path"])
@@ -230,6 +246,7 @@ class DesktopSessionManager:
                 "document": _public_doc(updated) if updated else None,
             }
 
+        saved_before = desktop_readiness.file_signature(doc["path"]) if doc else None
         result = subprocess.run(
             [xdotool, "key", "--clearmodifiers", "ctrl+s"],
             check=False,
@@ -238,7 +255,8 @@ class DesktopSessionManager:
             timeout=8,
             env=self._display_env(session),
         )
-        time.sleep(0.8)
+        if doc and result.returncode == 0:
+            desktop_readiness.wait_for_file_change(doc["path"], saved_before, timeout=SAVE_TIMEOUT_SECONDS)
         updated = document_store.register_document(doc["path"]) if doc else None
         if result.returncode != 0:
             detail = (result.stderr or result.stdout or "").strip()
@@ -334,6 +352,7 @@ class DesktopSessionManager:
         self._terminate_session(session, include_rehydrated=True)
         self._remove_manifest(session.session_id)
         _clear_shutdown_request(session)
+        self._fill_warm_pool_in_background()
         return {
             "ok": True,
             "closed": 1,
@@ -446,15 +465,62 @@ class DesktopSessionManager:
             raise FileNotFoundError(f"LibreOffice desktop session not found: {session_id}")
         return session
 
+    def fill_warm_pool(self) -> int:
+        """Spawn idle desktops until ``A0_DESKTOP_WARM_POOL`` of them are ready.
+
+        Blocks until the pool is full and returns how many desktops were
+        started; returns 0 right away when another caller is already filling.
+        Warm desktops run in the system profile, so the pool stays empty while
+        a system desktop is running or starting.
+        """
+        with self._lock:
+            if self._warming:
+                return 0
+            self._warming = True
+        started = 0
+        try:
+            while True:
+                with self._lock:
+                    self._reap_warm_locked()
+                    if len(self._warm) >= _warm_pool_size():
+                        return started
+                    if self._system_start or self._running_system_desktop_locked():
+                        return started
+                    session = self._reserve_desktop_locked(f"{WARM_SESSION_PREFIX}{uuid.uuid4().hex[:12]}")
+                    warm_start = self._warm_start = Future()
+                try:
+                    self._start_desktop(session)
+                except Exception as exc:
+                    with self._lock:
+                        self._reserved.pop(session.session_id, None)
+                        self._warm_start = None
+                    warm_start.set_exception(exc)
+                    raise
+                with self._lock:
+                    self._reserved.pop(session.session_id, None)
+                    self._warm.append(session)
+                    self._warm_start = None
+                    self._write_manifest(session)
+                warm_start.set_result(None)
+                started += 1
+        finally:
+            with self._lock:
+                self._warming = False
+
     def shutdown(self) -> None:
         with self._lock:
             sessions = list(self._sessions.values())
+            warm = list(self._warm)
             self._sessions.clear()
+            self._warm.clear()
         for session in sessions:
             virtual_desktop.unregister_session(session.token)
             if session.owns_processes:
                 self._terminate_session(session)
                 self._remove_manifest(session.session_id)
+        for session in warm:
+            self._terminate_session(session)
+            self._remove_manifest(session.session_id)
 
     def _document_for_save(self, session: DesktopSession, file_id: str = "") -> dict[str, Any] | None:
         normalized = str(file_id or "").strip()
@@ -481,50 +547,139 @@ class DesktopSessionManager:
             resize=lambda width, height, session_id=session.session_id: self.resize(session_id, width, height),
         )
 
-    def _ensure_system_desktop_locked(self) -> DesktopSession:
+    def _ensure_system_desktop(self) -> DesktopSession:
+        while True:
+            with self._lock:
+                self._reap_dead_locked()
+                session = self._running_system_desktop_locked() or self._claim_warm_desktop_locked()
+                starting = self._system_start
+                warm_start = self._warm_start
+                reserved = None
+                if not session and not starting and not warm_start:
+                    reserved = self._reserve_desktop_locked(SYSTEM_SESSION_ID)
+                    starting = self._system_start = Future()
+            if session or starting or not warm_start:
+                break
+            # A warm desktop is starting in the system profile; claim it
+            # rather than start a second desktop on the same profile.
+            try:
+                warm_start.result(timeout=SPAWN_WAIT_TIMEOUT_SECONDS)
+            except Exception:
+                pass
+
+        if session:
+            self._prepare_desktop_url_bridge(session)
+            self._refresh_xfce_desktop(session)
+            return session
+        if not reserved:
+            # Another caller is already spawning the desktop; share its result.
+            return starting.result(timeout=SPAWN_WAIT_TIMEOUT_SECONDS)
+
+        try:
+            self._start_desktop(reserved)
+        except BaseException as exc:
+            with self._lock:
+                self._reserved.pop(reserved.session_id, None)
+                self._system_start = None
+            starting.set_exception(exc)
+            raise
+        with self._lock:
+            self._reserved.pop(reserved.session_id, None)
+            self._system_start = None
+            self._sessions[reserved.session_id] = reserved
+            self._register_virtual_desktop(reserved)
+            self._write_manifest(reserved)
+        starting.set_result(reserved)
+        return reserved
+
+    def _running_system_desktop_locked(self) -> DesktopSession | None:
         existing = self._sessions.get(SYSTEM_SESSION_ID)
         if existing and existing.alive():
-            self._prepare_desktop_url_bridge(existing)
-            self._refresh_xfce_desktop(existing)
             return existing
 
         existing = self._load_system_desktop_from_manifest_locked()
         if existing:
             self._sessions[existing.session_id] = existing
             self._register_virtual_desktop(existing)
-            self._prepare_desktop_url_bridge(existing)
-            self._refresh_xfce_desktop(existing)
-            return existing
+        return existing
 
-        status = collect_desktop_status()
-        if not status["healthy"]:
-            raise RuntimeError(status["message"])
+    def _claim_warm_desktop_locked(self) -> DesktopSession | None:
+        self._reap_warm_locked()
+        if not self._warm:
+            return None
+        session = self._warm.pop(0)
+        self._remove_manifest(session.session_id)
+        session.session_id = SYSTEM_SESSION_ID
+        session.token = SYSTEM_SESSION_ID
+        session.url = _xpra_url(SYSTEM_SESSION_ID)
+        self._sessions[session.session_id] = session
+        self._register_virtual_desktop(session)
+        self._write_manifest(session)
+        return session
+
+    def _reap_warm_locked(self) -> None:
+        for session in [item for item in self._warm if not item.alive()]:
+            self._warm.remove(session)
+            self._terminate_session(session)
+            self._remove_manifest(session.session_id)
+
+    def _fill_warm_pool_in_background(self) -> None:
+        if _warm_pool_size() <= 0:
+            return
+        threading.Thread(
+            target=self._fill_warm_pool_safely,
+            name="a0-desktop-warm-pool",
+            daemon=True,
+        ).start()
+
+    def _fill_warm_pool_safely(self) -> None:
+        try:
+            self.fill_warm_pool()
+        except Exception:
+            pass
 
+    def _reserve_desktop_locked(self, session_id: str) -> DesktopSession:
         display, xpra_port = self._allocate_endpoint_locked()
-        profile_dir = PROFILE_DIR / SYSTEM_SESSION_ID
+        # Warm desktops use the system profile so a claimed one is
+        # indistinguishable from a desktop spawned on demand; fill_warm_pool
+        # keeps them from running next to a system desktop.
         session = DesktopSession(
-            session_id=SYSTEM_SESSION_ID,
+            session_id=session_id,
             file_id=SYSTEM_FILE_ID,
             extension="desktop",
             path=str(document_store.document_binary_home()),
             title=SYSTEM_TITLE,
             display=display,
             xpra_port=xpra_port,
-            token=SYSTEM_SESSION_ID,
-            url=_xpra_url(SYSTEM_SESSION_ID),
-            profile_dir=profile_dir,
+            token=session_id,
+            url=_xpra_url(session_id),
+            profile_dir=PROFILE_DIR / SYSTEM_SESSION_ID,
         )
+        self._reserved[session_id] = session
+        return session
+
+    def _start_desktop(self, session: DesktopSession) -> None:
+        status = collect_desktop_status()
+        if not status["healthy"]:
+            raise RuntimeError(status["message"])
         try:
             self._prepare_profile(session)
             self._prepare_desktop_launchers(session)
-            self._spawn_desktop_locked(session)
+            self._spawn_desktop(session)
         except Exception:
             self._terminate_session(session)
             raise
-        self._sessions[session.session_id] = session
-        self._register_virtual_desktop(session)
-        self._write_manifest(session)
-        return session
+
+    def _document_lock(self, file_id: str) -> threading.Lock:
+        with self._lock:
+            return self._document_locks.setdefault(file_id, threading.Lock())
+
+    def _window_events(self, session: DesktopSession) -> desktop_readiness.WindowEvents:
+        with self._lock:
+            if session.window_events is None:
+                session.window_events = desktop_readiness.WindowEvents.for_display(self._display_env(session))
+            session.window_events.start()
+            return session.window_events
 
     def _load_system_desktop_from_manifest_locked(self) -> DesktopSession | None:
         manifest = SESSION_DIR / f"{SYSTEM_SESSION_ID}.json"
@@ -576,7 +731,7 @@ class DesktopSessionManager:
         except Exception:
             return None
 
-    def _spawn_desktop_locked(self, session: DesktopSession) -> None:
+    def _spawn_desktop(self, session: DesktopSession) -> None:
         STATE_DIR.mkdir(parents=True, exist_ok=True)
         SESSION_DIR.mkdir(parents=True, exist_ok=True)
         session.profile_dir.mkdir(parents=True, exist_ok=True)
@@ -639,14 +794,14 @@ class DesktopSessionManager:
             process=session.processes.get("xpra"),
         )
 
-    def _open_document_locked(self, session: DesktopSession, doc: dict[str, Any]) -> None:
+    def _open_document(self, session: DesktopSession, doc: dict[str, Any]) -> None:
         soffice = libreoffice.find_soffice()
         if not soffice:
             raise RuntimeError("LibreOffice is not installed in this runtime.")
         path = str(doc["path"])
         self._remove_stale_lock_file(session, path=path)
         process_key = f"soffice-{doc['file_id']}"
-        session.processes[process_key] = subprocess.Popen(
+        process = subprocess.Popen(
             [
                 soffice,
                 "--norestore",
@@ -661,45 +816,47 @@ class DesktopSessionManager:
             stderr=subprocess.DEVNULL,
             env=self._display_env(session),
         )
-        self._fit_office_window(session, process=session.processes[process_key])
-        window_id = self._wait_for_office_window_locked(
+        with self._lock:
+            session.processes[process_key] = process
+        self._fit_office_window(session, process=process)
+        window_id = self._wait_for_office_window(
             session,
             title=str(doc.get("basename") or ""),
-            process=session.processes[process_key],
+            process=process,
         )
         if not window_id:
             raise RuntimeError(
                 f"LibreOffice did not show {doc.get('basename') or 'the document'} "
                 f"on desktop :{session.display}.",
             )
-        self._fit_office_window_id_locked(
+        self._fit_office_window_id(
             session,
             window_id,
             env=self._display_env(session),
             keys=("Escape",),
         )
 
-    def _reload_document_locked(self, session: DesktopSession, doc: dict[str, Any]) -> bool:
-        if self._close_document_window_locked(session, doc):
-            self._open_document_locked(session, doc)
+    def _reload_document(self, session: DesktopSession, doc: dict[str, Any]) -> bool:
+        if self._close_document_window(session, doc):
+            self._open_document(session, doc)
             return True
-        if self._send_reload_shortcut_locked(session, doc):
+        if self._send_reload_shortcut(session, doc):
             return True
-        self._open_document_locked(session, doc)
+        self._open_document(session, doc)
         return False
 
-    def _close_document_window_locked(self, session: DesktopSession, doc: dict[str, Any]) -> bool:
+    def _close_document_window(self, session: DesktopSession, doc: dict[str, Any]) -> bool:
         xdotool = shutil.which("xdotool")
         if not xdotool:
             return False
         title = str(doc.get("basename") or Path(str(doc.get("path") or "")).name or "").strip()
         if not title:
             return False
-        window_id = self._office_window_id_locked(session, title=title, fallback=False)
+        window_id = self._office_window_id(session, title=title, fallback=False)
         if not window_id:
             return False
         env = self._display_env(session)
-        self._fit_office_window_id_locked(session, window_id, env=env, keys=("Escape",))
+        self._fit_office_window_id(session, window_id, env=env, keys=("Escape",))
         for command in (
             [xdotool, "key", "--clearmodifiers", "alt+F4"],
             [xdotool, "windowclose", window_id],
@@ -715,23 +872,25 @@ class DesktopSessionManager:
                 )
             except (OSError, subprocess.TimeoutExpired):
                 continue
-            if self._wait_for_window_closed_locked(session, window_id):
+            if self._wait_for_window_closed(session, window_id):
                 return True
         self._dismiss_blocking_dialogs(session)
-        return self._wait_for_window_closed_locked(session, window_id, timeout_seconds=1.5)
+        return self._wait_for_window_closed(session, window_id, timeout_seconds=1.5)
 
-    def _send_reload_shortcut_locked(self, session: DesktopSession, doc: dict[str, Any]) -> bool:
+    def _send_reload_shortcut(self, session: DesktopSession, doc: dict[str, Any]) -> bool:
         xdotool = shutil.which("xdotool")
         if not xdotool:
             return False
-        window_id = self._office_window_id_locked(
+        window_id = self._office_window_id(
             session,
             title=str(doc.get("basename") or ""),
         )
         if not window_id:
             return False
         env = self._display_env(session)
-        self._fit_office_window_id_locked(session, window_id, env=env, keys=("Escape",))
+        self._fit_office_window_id(session, window_id, env=env, keys=("Escape",))
+        events = self._window_events(session)
+        generation = events.generation
         try:
             result = subprocess.run(
                 [xdotool, "key", "--clearmodifiers", "ctrl+shift+r"],
@@ -743,12 +902,13 @@ class DesktopSessionManager:
             )
         except (OSError, subprocess.TimeoutExpired):
             return False
-        time.sleep(0.8)
+        # Reloading remaps the document window; wake on that instead of a fixed pause.
+        events.wait_for_change(generation, RELOAD_SETTLE_SECONDS)
         self._dismiss_blocking_dialogs(session)
-        self._fit_office_window_id_locked(session, window_id, env=env, keys=("Escape",))
+        self._fit_office_window_id(session, window_id, env=env, keys=("Escape",))
         return result.returncode == 0
 
-    def _office_window_id_locked(
+    def _office_window_id(
         self,
         session: DesktopSession,
         *,
@@ -815,7 +975,7 @@ class DesktopSessionManager:
                 return window_ids[-1]
         return ""
 
-    def _wait_for_office_window_locked(
+    def _wait_for_office_window(
         self,
         session: DesktopSession,
         *,
@@ -823,36 +983,37 @@ class DesktopSessionManager:
         process: subprocess.Popen[Any] | None = None,
         timeout_seconds: float = 20.0,
     ) -> str:
-        deadline = time.time() + timeout_seconds
         last_fallback = ""
         title = str(title or "").strip()
-        while time.time() < deadline:
-            window_id = self._office_window_id_locked(session, title=title, fallback=False)
+
+        def ready() -> str:
+            nonlocal last_fallback
+            window_id = self._office_window_id(session, title=title, fallback=False)
             if window_id:
                 return window_id
-            last_fallback = self._office_window_id_locked(session, fallback=True) or last_fallback
+            last_fallback = self._office_window_id(session, fallback=True) or last_fallback
             if last_fallback and not title:
                 return last_fallback
             if process and process.poll() is not None and last_fallback:
                 return last_fallback
-            time.sleep(0.25)
-        return self._office_window_id_locked(session, title=title, fallback=True) or last_fallback
+            return ""
+
+        window_id = self._window_events(session).wait(ready, timeout_seconds)
+        return window_id or self._office_window_id(session, title=title, fallback=True) or last_fallback
 
-    def _wait_for_window_closed_locked(
+    def _wait_for_window_closed(
         self,
         session: DesktopSession,
         window_id: str,
         *,
         timeout_seconds: float = 6.0,
     ) -> bool:
-        deadline = time.time() + timeout_seconds
-        while time.time() < deadline:
-            if not self._window_exists_locked(session, window_id):
-                return True
-            time.sleep(0.2)
-        return not self._window_exists_locked(session, window_id)
+        return self._window_events(session).wait(
+            lambda: not self._window_exists(session, window_id),
+            timeout_seconds,
+        )
 
-    def _window_exists_locked(self, session: DesktopSession, window_id: str) -> bool:
+    def _window_exists(self, session: DesktopSession, window_id: str) -> bool:
         xdotool = shutil.which("xdotool")
         if not xdotool or not window_id:
             return False
@@ -869,7 +1030,7 @@ class DesktopSessionManager:
             return False
         return result.returncode == 0
 
-    def _fit_office_window_id_locked(
+    def _fit_office_window_id(
         self,
         session: DesktopSession,
         window_id: str,
@@ -1460,8 +1621,9 @@ fi
         return str(path) if path.exists() else ""
 
     def _allocate_endpoint_locked(self) -> tuple[int, int]:
-        used_displays = {session.display for session in self._sessions.values()}
-        used_ports = {session.xpra_port for session in self._sessions.values()}
+        sessions = [*self._sessions.values(), *self._reserved.values(), *self._warm]
+        used_displays = {session.display for session in sessions}
+        used_ports = {session.xpra_port for session in sessions}
         for offset in range(MAX_SESSIONS):
             display = DISPLAY_BASE + offset
             port = XPRA_PORT_BASE + offset
@@ -1502,19 +1664,18 @@ fi
         raise TimeoutError("Timed out waiting for the LibreOffice X display.")
 
     def _wait_for_xfce(self, session: DesktopSession) -> None:
-        deadline = time.time() + STARTUP_GRACE_SECONDS
-        while time.time() < deadline:
+        def ready() -> bool:
             process = session.processes.get("xfce")
             if process and process.poll() is not None:
-                return
-            if virtual_desktop.has_window(
+                return True
+            return virtual_desktop.has_window(
                 display=session.display,
                 name="xfce4-panel",
                 xauthority=self._xauthority(session),
                 home=str(session.profile_dir),
-            ):
-                return
-            time.sleep(0.25)
+            )
+
+        self._window_events(session).wait(ready, STARTUP_GRACE_SECONDS)
 
     def _write_manifest(self, session: DesktopSession) -> None:
         SESSION_DIR.mkdir(parents=True, exist_ok=True)
@@ -1541,6 +1702,8 @@ fi
         (SESSION_DIR / f"{session_id}.json").unlink(missing_ok=True)
 
     def _terminate_session(self, session: DesktopSession, *, include_rehydrated: bool = False) -> None:
+        if session.window_events:
+            session.window_events.close()
         process_names = [name for name in session.processes if name.startswith("soffice")]
         process_names.extend(["xfce", "xpra", "xvfb"])
         terminated_pids: set[int] = set()
@@ -1668,6 +1831,15 @@ def cleanup_stale_runtime_state() -> dict[str, Any]:
     return {"ok": not errors, "killed": killed, "errors": errors}
 
 
+def _warm_pool_size() -> int:
+    try:
+        size = int(os.environ.get(WARM_POOL_ENV) or 0)
+    except ValueError:
+        return 0
+    # warm desktops share the system profile, so at most one may run
+    return max(0, min(size, 1))
+
+
 def get_manager() -> DesktopSessionManager:
     global _manager
     try:
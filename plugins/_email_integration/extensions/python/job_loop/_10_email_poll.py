@@ -1,4 +1,5 @@
-"""Per-handler email poll loop with configurable seconds/cron intervals."""
+"""Per-handler email ingestion: a persistent IMAP IDLE worker, or a poll
+loop with configurable seconds/cron intervals."""
 
 import asyncio
 from datetime import datetime, timezone
@@ -25,23 +26,36 @@ class EmailAutoPoll(Extension):
 
     async def execute(self, **kwargs: Any) -> None:
         # _poll_tasks lives in handler.py (persists across module reloads)
-        from plugins._email_integration.helpers.handler import _poll_tasks
+        from plugins._email_integration.helpers.handler import (
+            _poll_configs,
+            _poll_tasks,
+            uses_idle,
+        )
 
         config = plugins.get_plugin_config(PLUGIN_NAME) or {}
         handlers = config.get("handlers", [])
-        enabled_names = {
-            h["name"] for h in handlers if h.get("enabled") and h.get("name")
+        enabled = {
+            h["name"]: h for h in handlers if h.get("enabled") and h.get("name")
         }
 
         for name in list(_poll_tasks):
-            if name not in enabled_names or _poll_tasks[name].done():
+            # IDLE workers hold their config; restart them when it changes
+            changed = uses_idle(_poll_configs.get(name, {})) and (
+                _poll_configs.get(name) != enabled.get(name)
+            )
+            if name not in enabled or _poll_tasks[name].done() or changed:
                 task = _poll_tasks.pop(name, None)
+                _poll_configs.pop(name, None)
                 if task and not task.done():
                     task.cancel()
 
-        for name in enabled_names:
+        for name, handler_cfg in enabled.items():
             if name not in _poll_tasks or _poll_tasks[name].done():
-                _poll_tasks[name] = asyncio.create_task(_handler_poll_loop(name))
+                _poll_configs[name] = handler_cfg
+                if uses_idle(handler_cfg):
+                    _poll_tasks[name] = asyncio.create_task(_handler_idle_loop(name, handler_cfg))
+                else:
+                    _poll_tasks[name] = asyncio.create_task(_handler_poll_loop(name))
 
 
 # ------------------------------------------------------------------
@@ -86,6 +100,22 @@ async def _handler_poll_loop(handler_name: str) -> None:
         await asyncio.sleep(sleep_sec)
 
 
+# ------------------------------------------------------------------
+# Per-handler IDLE worker
+# ------------------------------------------------------------------
+
+async def _handler_idle_loop(handler_name: str, handler_cfg: dict) -> None:
+    from plugins._email_integration.helpers.handler import run_imap_ingestion
+
+    try:
+        # NOOP fallback (no IDLE on the server) keeps the configured interval
+        await run_imap_ingestion(
+            handler_cfg, poll_interval=lambda: _get_sleep_seconds(handler_cfg),
+        )
+    except Exception as e:
+        PrintStyle.error(f"Email ingestion error ({handler_name}): {format_error(e)}")
+
+
 # ------------------------------------------------------------------
 # Poll interval
 # ------------------------------------------------------------------
@@ -12,6 +12,7 @@ import uuid
 
 from agent import Agent, AgentContext, AgentContextType, UserMessage
 from helpers import guids, plugins, files, runtime
+from helpers.defer import LoopSafeLock
 from helpers import message_queue as mq
 from helpers import integration_commands
 from helpers.persist_chat import save_tmp_chat
@@ -23,6 +24,7 @@ from plugins._email_integration.helpers import dispatcher as disp
 from plugins._model_config.helpers import model_config
 from plugins._email_integration.helpers.imap_client import (
     InboundMessage,
+    open_imap,
     connect_imap,
     disconnect_imap,
     fetch_new,
@@ -31,6 +33,7 @@ from plugins._email_integration.helpers.imap_client import (
     connect_exchange,
     fetch_unread_exchange,
 )
+from plugins._email_integration.helpers.imap_idle import ImapIngestor, MailboxState
 from plugins._email_integration.helpers.smtp_client import SmtpConfig, send_reply
 
 
@@ -43,12 +46,14 @@ STATE_FILE = "usr/email/state.json"
 # UID state persistence
 # ------------------------------------------------------------------
 
-_state_lock = asyncio.Lock()
+_state_lock = LoopSafeLock()
 
 # Poll task registry — lives here (not in extension module) because
 # extension modules are re-executed on each job_loop tick (cache disabled),
 # which would reset module-level state and orphan running tasks.
 _poll_tasks: dict[str, asyncio.Task] = {}  # type: ignore[type-arg]
+# Handler config each task was started with; a changed config restarts it
+_poll_configs: dict[str, dict] = {}
 
 def _load_state() -> dict:
     path = files.get_abs_path(STATE_FILE)
@@ -129,6 +134,69 @@ async def _poll_single_handler(handler_cfg: dict, state: dict):
         await disconnect_imap(client)
 
 
+# ------------------------------------------------------------------
+# Persistent IMAP ingestion (IDLE)
+# ------------------------------------------------------------------
+
+def uses_idle(handler_cfg: dict) -> bool:
+    return handler_cfg.get("account_type", "imap") != "exchange" and bool(
+        handler_cfg.get("imap_idle", True)
+    )
+
+
+async def run_imap_ingestion(
+    handler_cfg: dict, poll_interval=lambda: 15.0,
+) -> None:
+    """Keep one IMAP connection open for a handler and dispatch new mail.
+
+    The first run (no stored UID) and process_unread_days catch-up go
+    through the regular poll path; after that only UIDs above the stored
+    one are pulled, as the server announces them.
+    """
+    name = handler_cfg.get("name", "default")
+    async with _state_lock:
+        state = _load_state()
+        # Same as the poll loop: catch-up re-runs whenever the worker starts
+        if int(handler_cfg.get("process_unread_days", 0)) > 0:
+            state.pop(name, None)
+        if not state.get(name, {}).get("last_uid"):
+            await _poll_single_handler(handler_cfg, state)
+            _save_state(state)
+        entry = state.get(name, {})
+
+    async def deliver(messages: list[InboundMessage], mailbox: MailboxState):
+        # Persist before dispatching so a crash never re-fetches a message
+        async with _state_lock:
+            state = _load_state()
+            state[name] = {
+                "last_uid": mailbox.last_uid,
+                "uidvalidity": mailbox.uidvalidity,
+            }
+            _save_state(state)
+        if messages:
+            PrintStyle.info(f"Email ({name}): {len(messages)} new messages")
+            await _dispatch_all(handler_cfg, messages)
+
+    ingestor = ImapIngestor(
+        connect=lambda: open_imap(
+            server=handler_cfg.get("imap_server", ""),
+            port=int(handler_cfg.get("imap_port", 993)),
+            username=handler_cfg.get("username", ""),
+            password=handler_cfg.get("password", ""),
+        ),
+        state=MailboxState(
+            uidvalidity=int(entry.get("uidvalidity", 0)),
+            last_uid=int(entry.get("last_uid", 0)),
+        ),
+        on_messages=deliver,
+        download_folder=DOWNLOAD_FOLDER,
+        sender_whitelist=handler_cfg.get("sender_whitelist") or None,
+        poll_interval=poll_interval,
+        name=name,
+    )
+    await ingestor.run()
+
+
 async def _fetch_exchange(
     cfg: dict, whitelist: list[str], since_days: int = 0,
 ) -> list[InboundMessage]:
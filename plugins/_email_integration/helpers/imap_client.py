@@ -52,14 +52,24 @@ async def connect_imap(
     timeout: int = 30,
 ) -> IMAPClient:
     loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(
+        None, open_imap, server, port, username, password, ssl, timeout,
+    )
 
-    def _sync():
-        client = IMAPClient(server, port=port, ssl=ssl, timeout=timeout)
-        client._imap._maxline = 100000  # type: ignore[attr-defined]
-        client.login(username, password)
-        return client
 
-    return await loop.run_in_executor(None, _sync)
+def open_imap(
+    server: str,
+    port: int = 993,
+    username: str = "",
+    password: str = "",
+    ssl: bool = True,
+    timeout: int = 30,
+) -> IMAPClient:
+    """Blocking connect + login, for callers that own their IMAP thread."""
+    client = IMAPClient(server, port=port, ssl=ssl, timeout=timeout)
+    client._imap._maxline = 100000  # type: ignore[attr-defined]
+    client.login(username, password)
+    return client
 
 
 async def disconnect_imap(client: IMAPClient) -> None:
@@ -210,11 +220,24 @@ async def _fetch_single(
     email_msg = email.message_from_bytes(email_data)  # type: ignore[arg-type]
 
     sender = _decode_header(email_msg.get("From", ""))
-    if _is_noreply(sender):
+    if not is_wanted_sender(sender, sender_whitelist):
         return None
+    return await build_inbound(email_msg, download_folder)
+
+
+def is_wanted_sender(sender: str, sender_whitelist: list[str] | None) -> bool:
+    """No-reply and whitelist filters, applied before any body is used."""
+    if _is_noreply(sender):
+        return False
     if sender_whitelist and not _matches_whitelist(sender, sender_whitelist):
-        return None
+        return False
+    return True
 
+
+async def build_inbound(
+    email_msg: EmailMessage, download_folder: str,
+) -> InboundMessage:
+    sender = _decode_header(email_msg.get("From", ""))
     subject = _decode_header(email_msg.get("Subject", ""))
     message_id = email_msg.get("Message-ID", "")
     in_reply_to = email_msg.get("In-Reply-To", "")
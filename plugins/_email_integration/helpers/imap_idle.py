@@ -0,0 +1,280 @@
+"""
+Long-lived IMAP ingestion: one connection per handler, IDLE push (NOOP
+polling where the server lacks IDLE) and UID-based incremental sync.
+
+No agent/tool dependencies — new messages are handed to a callback.
+"""
+
+import asyncio
+import email
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+from imapclient import IMAPClient
+
+from helpers.errors import format_error
+from helpers.print_style import PrintStyle
+from plugins._email_integration.helpers.imap_client import (
+    InboundMessage,
+    _decode_header,
+    build_inbound,
+    is_wanted_sender,
+)
+
+FOLDER = "INBOX"
+# Headers the filters and the dispatcher need, fetched without the body
+HEADER_FIELDS = "FROM SUBJECT MESSAGE-ID IN-REPLY-TO REFERENCES"
+HEADER_ITEM = f"BODY.PEEK[HEADER.FIELDS ({HEADER_FIELDS})]"
+BODY_ITEM = "BODY.PEEK[]"
+
+IDLE_CHECK_SECONDS = 1.0  # how often a waiting IDLE looks at the stop flag
+IDLE_RENEW_SECONDS = 25 * 60  # RFC 2177: re-issue IDLE well before 29 min
+RECONNECT_DELAYS = (1, 2, 5, 15, 30, 60)
+
+
+@dataclass
+class MailboxState:
+    uidvalidity: int = 0
+    last_uid: int = 0
+
+
+@dataclass
+class IngestStats:
+    syncs: int = 0
+    header_fetches: int = 0  # FETCH commands for headers (batched)
+    body_fetches: int = 0  # messages whose full body was downloaded
+    filtered: int = 0  # messages dropped on headers alone
+    reconnects: int = 0
+
+
+class ImapIngestor:
+    """Keeps one authenticated IMAP connection and delivers new mail.
+
+    ``connect`` is a blocking factory (see ``imap_client.open_imap``).
+    All IMAP calls run on one dedicated thread, so a long IDLE never
+    occupies the default executor. ``on_messages`` receives each batch of
+    new messages together with the mailbox state to persist.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], IMAPClient],
+        state: MailboxState,
+        on_messages: Callable[[list[InboundMessage], MailboxState], Awaitable[None]],
+        download_folder: str,
+        sender_whitelist: list[str] | None = None,
+        max_messages: int = 10,
+        poll_interval: Callable[[], float] = lambda: 15.0,
+        name: str = "default",
+    ):
+        self.connect = connect
+        self.state = state
+        self.on_messages = on_messages
+        self.download_folder = download_folder
+        self.sender_whitelist = sender_whitelist or None
+        self.max_messages = max_messages
+        self.poll_interval = poll_interval
+        self.name = name
+        self.stats = IngestStats()
+        self.idle_supported = False
+        self.gmail = False
+        self._delivered = (state.uidvalidity, state.last_uid)
+        self._client: IMAPClient | None = None
+        self._stop = threading.Event()
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix=f"imap-{name}"
+        )
+
+    # -- lifecycle -------------------------------------------------------------
+
+    async def run(self) -> None:
+        attempt = 0
+        try:
+            while not self._stop.is_set():
+                try:
+                    await self._call(self._open)
+                    attempt = 0
+                    await self._sync()
+                    await self._watch()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    delay = RECONNECT_DELAYS[min(attempt, len(RECONNECT_DELAYS) - 1)]
+                    attempt += 1
+                    self.stats.reconnects += 1
+                    PrintStyle.error(
+                        f"Email ({self.name}): IMAP connection error, reconnecting"
+                        f" in {delay}s: {format_error(e)}"
+                    )
+                    await self._call(self._close)
+                    await asyncio.sleep(delay)
+        finally:
+            self.stop()
+            # queued behind a running IDLE wait, which sees the stop flag
+            # within IDLE_CHECK_SECONDS
+            self._executor.submit(self._close)
+            self._executor.shutdown(wait=False)
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    async def _call(self, fn: Callable[..., Any], *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    # -- waiting for mail ----------------------------------------------------------
+
+    async def _watch(self) -> None:
+        while not self._stop.is_set():
+            if self.idle_supported:
+                changed = await self._call(self._idle_wait)
+            else:
+                await asyncio.sleep(self.poll_interval())
+                changed = await self._call(self._noop)
+            if changed:
+                await self._sync()
+
+    def _idle_wait(self) -> bool:
+        """Block in IDLE until the server reports new mail."""
+        client = self._require_client()
+        client.idle()
+        # EXISTS sent with earlier commands or just before IDLE started
+        # would otherwise slip between the last search and this wait
+        changed = bool(client._imap.untagged_responses.pop("EXISTS", None))  # type: ignore[attr-defined]
+        started = time.monotonic()
+        while (
+            not changed
+            and not self._stop.is_set()
+            and time.monotonic() - started < IDLE_RENEW_SECONDS
+        ):
+            changed = _has_new_mail(client.idle_check(timeout=IDLE_CHECK_SECONDS))
+        _, responses = client.idle_done()
+        return changed or _has_new_mail(responses)
+
+    def _noop(self) -> bool:
+        _, responses = self._require_client().noop()
+        return _has_new_mail(responses)
+
+    # -- sync ----------------------------------------------------------------
+
+    async def _sync(self) -> None:
+        candidates = await self._call(self._collect)
+        messages: list[InboundMessage] = []
+        for uid, raw in candidates:
+            try:
+                msg = await build_inbound(email.message_from_bytes(raw), self.download_folder)
+                messages.append(msg)
+            except Exception as e:
+                PrintStyle.error(
+                    f"Email ({self.name}): error processing message {uid}: {format_error(e)}"
+                )
+        self.stats.syncs += 1
+        current = (self.state.uidvalidity, self.state.last_uid)
+        if messages or current != self._delivered:
+            self._delivered = current
+            await self.on_messages(messages, self.state)
+
+    def _collect(self) -> list[tuple[int, bytes]]:
+        """Pull messages above the last seen UID.
+
+        Headers of all new UIDs are fetched in one batch; bodies (and with
+        them attachments) only for messages that pass the sender filters.
+        """
+        client = self._require_client()
+        last_uid = self.state.last_uid
+        # "n:*" always matches the highest UID, even when it is below n
+        criteria = ["UNSEEN", "UID", f"{last_uid + 1}:*"]
+        if self.gmail:
+            criteria += ["X-GM-RAW", "category:primary"]
+        uids = sorted(
+            uid for uid in client.search(criteria) if uid > last_uid  # type: ignore[arg-type]
+        )
+        if not uids:
+            return []
+        highest = uids[-1]
+        if len(uids) > self.max_messages:
+            PrintStyle.standard(
+                f"Email: {len(uids)} new, processing latest {self.max_messages}"
+            )
+            uids = uids[-self.max_messages:]
+
+        self.stats.header_fetches += 1
+        headers = client.fetch(uids, [HEADER_ITEM])
+        wanted = []
+        for uid in uids:
+            header = email.message_from_bytes(_header_bytes(headers.get(uid, {})))
+            if is_wanted_sender(_decode_header(header.get("From", "")), self.sender_whitelist):
+                wanted.append(uid)
+            else:
+                self.stats.filtered += 1
+
+        bodies: dict = {}
+        if wanted:
+            self.stats.body_fetches += len(wanted)
+            bodies = client.fetch(wanted, [BODY_ITEM])
+        # Mark every handled message read, filtered ones included
+        client.add_flags(uids, [b"\\Seen"])
+        self.state.last_uid = highest
+        return [
+            (uid, bodies[uid][b"BODY[]"])
+            for uid in wanted
+            if bodies.get(uid, {}).get(b"BODY[]")
+        ]
+
+    # -- connection --------------------------------------------------------------
+
+    def _open(self) -> None:
+        self._close()
+        client = self.connect()
+        self._client = client
+        capabilities = client.capabilities()
+        self.idle_supported = b"IDLE" in capabilities
+        self.gmail = b"X-GM-EXT-1" in capabilities
+        info = client.select_folder(FOLDER)
+        uidvalidity = int(info.get(b"UIDVALIDITY", 0))
+        if uidvalidity != self.state.uidvalidity:
+            if self.state.uidvalidity or not self.state.last_uid:
+                # UIDs of the old mailbox generation mean nothing now
+                uidnext = int(info.get(b"UIDNEXT", 0))
+                if uidnext:
+                    self.state.last_uid = uidnext - 1
+                else:
+                    uids = client.search(["ALL"])  # type: ignore[arg-type]
+                    self.state.last_uid = max(uids) if uids else 0
+                if self.state.uidvalidity:
+                    PrintStyle.warning(
+                        f"Email ({self.name}): UIDVALIDITY changed, tracking from UID"
+                        f" {self.state.last_uid}"
+                    )
+            self.state.uidvalidity = uidvalidity
+
+    def _close(self) -> None:
+        client, self._client = self._client, None
+        if client is None:
+            return
+        try:
+            client.logout()
+        except Exception:
+            pass
+
+    def _require_client(self) -> IMAPClient:
+        if self._client is None:
+            raise ConnectionError("IMAP connection is closed")
+        return self._client
+
+
+def _has_new_mail(responses: list) -> bool:
+    return any(
+        isinstance(item, tuple) and len(item) > 1 and item[1] == b"EXISTS"
+        for item in responses or []
+    )
+
+
+def _header_bytes(data: dict) -> bytes:
+    for key, value in data.items():
+        if isinstance(key, bytes) and key.startswith(b"BODY[HEADER") and value:
+            return value
+    return b""
@@ -189,6 +189,7 @@ export const store = createStore("emailConfig", {
       smtp_port: 587,
       username: "",
       password: "",
+      imap_idle: true,
       poll_mode: "seconds",
       poll_interval_seconds: 60,
       poll_interval_cron: "*/2 * * * *",
@@ -0,0 +1,18 @@
+from helpers.api import ApiHandler, Request, Response
+from plugins._infection_check.helpers import checker
+
+
+class InfectionCheckStats(ApiHandler):
+
+    @classmethod
+    def get_methods(cls) -> list[str]:
+        return ["GET", "POST"]
+
+    @classmethod
+    def supports_native_asgi(cls) -> bool:
+        return True
+
+    async def process(self, input: dict, request: Request) -> dict | Response:
+        if input.get("reset"):
+            checker.reset_stats(clear_cache=bool(input.get("clear_cache")))
+        return checker.get_stats()
@@ -10,6 +10,11 @@ class InfectionAnalyzeThoughts(Extension):
         checker = get_checker(self.agent)
         if checker.mode != "thoughts":
             return
-        # Start background analysis once thoughts are complete
-        if parsed.get("heading") or parsed.get("tool_name"):
-            checker.start_analysis(self.agent)
+        # tool_name is complete once tool_args started streaming
+        tool_name = parsed.get("tool_name", "") if "tool_args" in parsed else ""
+        # Start background analysis once thoughts are complete; with the fast
+        # path on, wait for the tool name so benign calls skip the audit model
+        if tool_name or (
+            not checker.fast_path and (parsed.get("heading") or parsed.get("tool_name"))
+        ):
+            checker.start_analysis(self.agent, tool_name=tool_name)
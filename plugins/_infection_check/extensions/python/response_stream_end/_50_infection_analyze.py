@@ -1,4 +1,5 @@
 from helpers.extension import Extension
+from helpers import extract_tools
 from agent import LoopData
 from plugins._infection_check.helpers.checker import get_checker
 
@@ -7,4 +8,6 @@ class InfectionAnalyzeEnd(Extension):
     async def execute(self, loop_data=LoopData(), **kwargs):
         if not self.agent:
             return
-        get_checker(self.agent).start_analysis(self.agent)
+        checker = get_checker(self.agent)
+        parsed = extract_tools.json_parse_dirty(checker.response_log) or {}
+        checker.start_analysis(self.agent, tool_name=str(parsed.get("tool_name", "")))
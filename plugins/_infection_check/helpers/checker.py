@@ -2,6 +2,10 @@ import re
 import json
 import time
 import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
 from typing import TYPE_CHECKING
 
 from helpers import plugins
@@ -22,6 +26,22 @@ _RE_OK = re.compile(r"<ok\s*/>")
 _RE_TERMINATE = re.compile(r"<terminate\s*/>")
 _RE_CLARIFY = re.compile(r"<clarify>(.*?)</clarify>", re.DOTALL)
 
+VERDICT_CACHE_SIZE = 512
+
+# Anything that hints at the hard rules or suspicious signals of the audit
+# prompt. A call is only cleared locally when none of these occur anywhere in
+# its reasoning, response or arguments.
+_RE_RISK = re.compile(
+    r"credential|secret|passw|passphrase|api[\s_-]?key|token|private[\s_-]?key"
+    r"|\.env\b|id_rsa|id_ed25519|\.pem\b|\.key\b|\.ssh|keychain|wallet"
+    r"|exfiltrat|upload|webhook|curl|wget|netcat|\bnc\b|socket|requests\.|fetch\("
+    r"|https?://|ftp://|base64|\bsudo\b|chmod|chown|rm\s+-|mkfs|\bdd\b|drop\s+table"
+    r"|ignore (?:all |any )?(?:previous|prior|above)|disregard|you are now|jailbreak"
+    r"|unrestricted|system prompt|\[blocked\]"
+    r"|\b(?:sk|pk|ghp|gho|xox[abp])[-_][A-Za-z0-9]{8,}|[A-Za-z0-9+/_-]{40,}",
+    re.IGNORECASE,
+)
+
 
 def get_config(agent: "Agent") -> dict:
     return plugins.get_plugin_config(PLUGIN_NAME, agent=agent) or {}
@@ -52,6 +72,94 @@ def get_checker(agent: "Agent") -> "InfectionChecker":
     return checker
 
 
+@dataclass
+class GateStats:
+    gates: int = 0
+    gate_ms_total: float = 0.0
+    gate_ms_max: float = 0.0
+    fast_path: int = 0  # cleared by the local rules
+    cache_hits: int = 0
+    cache_misses: int = 0
+    llm_checks: int = 0  # audit model calls started
+    llm_checks_avoided: int = 0  # gates decided without any audit model call
+
+
+class VerdictCache:
+    """LRU of cleared calls with a per-entry time to live."""
+
+    def __init__(self, size: int = VERDICT_CACHE_SIZE):
+        self.size = size
+        self._entries: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, ttl: float) -> bool:
+        with self._lock:
+            cleared_at = self._entries.get(key)
+            if cleared_at is None:
+                return False
+            if time.monotonic() - cleared_at > ttl:
+                del self._entries[key]
+                return False
+            self._entries.move_to_end(key)
+            return True
+
+    def put(self, key: str) -> None:
+        with self._lock:
+            self._entries[key] = time.monotonic()
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_verdicts = VerdictCache()
+_stats = GateStats()
+_stats_lock = threading.Lock()
+
+
+def get_stats() -> dict:
+    with _stats_lock:
+        stats = asdict(_stats)
+    lookups = stats["cache_hits"] + stats["cache_misses"]
+    stats["cache_hit_ratio"] = round(stats["cache_hits"] / lookups, 3) if lookups else 0.0
+    stats["gate_ms_avg"] = (
+        round(stats["gate_ms_total"] / stats["gates"], 2) if stats["gates"] else 0.0
+    )
+    stats["gate_ms_total"] = round(stats["gate_ms_total"], 2)
+    stats["gate_ms_max"] = round(stats["gate_ms_max"], 2)
+    return stats
+
+
+def reset_stats(clear_cache: bool = False) -> None:
+    global _stats
+    with _stats_lock:
+        _stats = GateStats()
+    if clear_cache:
+        _verdicts.clear()
+
+
+def _count(**increments: int) -> None:
+    with _stats_lock:
+        for name, value in increments.items():
+            setattr(_stats, name, getattr(_stats, name) + value)
+
+
+def _record_gate(ms: float, avoided: bool) -> None:
+    with _stats_lock:
+        _stats.gates += 1
+        _stats.gate_ms_total += ms
+        _stats.gate_ms_max = max(_stats.gate_ms_max, ms)
+        if avoided:
+            _stats.llm_checks_avoided += 1
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split()).lower()
+
+
 def parse_result(text: str) -> tuple[str, str]:
     """Find the *last* occurrence of any verdict tag in *text*."""
     pos = -1
@@ -76,6 +184,9 @@ class InfectionChecker:
         self.prompt: str = config.get("prompt", "")
         self.history_size: int = int(config.get("history_size", 10))
         self.max_clarifications: int = int(config.get("max_clarifications", 3))
+        self.fast_path: bool = bool(config.get("fast_path", True))
+        self.benign_tools: set[str] = set(config.get("benign_tools") or [])
+        self.cache_ttl: float = float(config.get("cache_ttl", 600))
         self.iteration = iteration
 
         # Accumulated text from stream callbacks
@@ -85,6 +196,7 @@ class InfectionChecker:
         # Background analysis task
         self._task: asyncio.Task | None = None
         self._check_msgs: list = []
+        self._llm_checks = 0
 
     # -- collection ----------------------------------------------------------
 
@@ -98,19 +210,27 @@ class InfectionChecker:
 
     # -- analysis trigger ----------------------------------------------------
 
-    def start_analysis(self, agent: "Agent"):
-        """Fire-and-forget background check (called from stream extensions)."""
+    def start_analysis(self, agent: "Agent", tool_name: str = ""):
+        """Fire-and-forget background check (called from stream extensions).
+
+        Calls to benign tools are left to the gate, which can usually clear
+        them without the audit model once their arguments are known.
+        """
         if self._task is not None:
             return
+        if self.fast_path and tool_name and tool_name in self.benign_tools:
+            return
         snapshot = self._build_log()
         if not snapshot.strip():
             return
-        self._task = asyncio.create_task(self._run_check(agent, snapshot))
+        self._start_check(agent, snapshot)
 
     # -- gate (called before every tool execution) ---------------------------
 
     async def gate(self, agent: "Agent", tool_name: str = "", tool_args: dict | None = None):
         """Block until the safety check passes or terminate the agent."""
+        started = time.perf_counter()
+        checks = self._llm_checks
         try:
             await self._gate_inner(agent, tool_name, tool_args)
         except HandledException:
@@ -124,6 +244,11 @@ class InfectionChecker:
                 agent.context.log.set_progress("Infection check: error (non-fatal)")
             except Exception:
                 pass
+        finally:
+            _record_gate(
+                (time.perf_counter() - started) * 1000,
+                avoided=self._llm_checks == checks == 0,
+            )
 
     async def _gate_inner(self, agent: "Agent", tool_name: str, tool_args: dict | None):
         if agent.get_data(DATA_KEY_PASSED):
@@ -145,6 +270,19 @@ class InfectionChecker:
             self._tool_name = ""
             self._tool_args = {}
 
+        # Local rules and cached verdicts clear repeated or plainly benign calls
+        if self.fast_path and self._is_benign(tool_name):
+            _count(fast_path=1)
+            self._pass(agent, "passed (local rules)")
+            return
+        cache_key = self._verdict_key() if tool_name and self.cache_ttl > 0 else ""
+        if cache_key:
+            if _verdicts.get(cache_key, self.cache_ttl):
+                _count(cache_hits=1)
+                self._pass(agent, "passed (cached verdict)")
+                return
+            _count(cache_misses=1)
+
         action, detail, cot = None, "", ""
 
         # Fast path: reuse result if background task already finished.
@@ -170,15 +308,17 @@ class InfectionChecker:
             if not snapshot.strip():
                 return
 
-            self._task = asyncio.create_task(self._run_check(agent, snapshot))
+            self._start_check(agent, snapshot)
             try:
-                action, detail, cot = await self._task
+                action, detail, cot = await self._task  # type: ignore[misc]
             except asyncio.CancelledError:
                 return
             except Exception:
                 return
 
         if action == "ok":
+            if cache_key:
+                _verdicts.put(cache_key)
             _log.set_progress("Infection check: passed")
             agent.set_data(DATA_KEY_PASSED, True)
             return
@@ -200,6 +340,41 @@ class InfectionChecker:
 
     # -- internals -----------------------------------------------------------
 
+    def _start_check(self, agent: "Agent", snapshot: str) -> None:
+        self._llm_checks += 1
+        _count(llm_checks=1)
+        self._task = asyncio.create_task(self._run_check(agent, snapshot))
+
+    def _pass(self, agent: "Agent", progress: str) -> None:
+        # a background check started before the tool was known is not needed
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        agent.context.log.set_progress(f"Infection check: {progress}")
+        agent.set_data(DATA_KEY_PASSED, True)
+
+    def _is_benign(self, tool_name: str) -> bool:
+        """Allow-listed tool and no risk signal anywhere in what is checked."""
+        if not tool_name or tool_name not in self.benign_tools:
+            return False
+        return not _RE_RISK.search(self._build_log())
+
+    def _verdict_key(self) -> str:
+        """Hash of the tool call plus the whole reasoning and response it was audited with.
+
+        Only whitespace and case are normalized: an injection can be worded
+        in ways no pattern anticipates, so any other change to the text the
+        audit model saw is a cache miss.
+        """
+        window = [_normalize(self.reasoning_log), _normalize(self.response_log)]
+        try:
+            args = json.dumps(self._tool_args, sort_keys=True, ensure_ascii=False, default=str)
+        except Exception:
+            args = str(self._tool_args)
+        payload = json.dumps(
+            [self.model_choice, self.prompt, self._tool_name, _normalize(args), window]
+        )
+        return hashlib.sha256(payload.encode("utf-8", "surrogatepass")).hexdigest()
+
     def _build_log(self) -> str:
         parts: list[str] = []
         if self.reasoning_log:
@@ -4,17 +4,27 @@ Pure file operations for the text_editor plugin.
 No agent/tool dependencies — only stdlib + tokens helper.
 """
 
+import io
+import mmap
 import os
 import shutil
 import tempfile
-from typing import TypedDict
+from typing import BinaryIO, Callable, Iterable, TypedDict
 
 from helpers import tokens
+from plugins._text_editor.helpers import line_index
 from plugins._text_editor.helpers.context_patch import (
     apply_context_patch_with_metadata,
 )
 
 _BINARY_PEEK = 8192
+_COPY_CHUNK = 1024 * 1024
+
+# Edits that leave at least this much of the file untouched and rewrite at
+# most IN_PLACE_MAX_TAIL bytes overwrite the tail in place instead of
+# copying the whole file to a temp file.
+IN_PLACE_MIN_PREFIX = 1024 * 1024
+IN_PLACE_MAX_TAIL = 16 * 1024 * 1024
 
 
 # ------------------------------------------------------------------
@@ -104,25 +114,24 @@ def read_file(
             error="file appears binary, use terminal instead",
         )
 
+    line_from = max(line_from, 1)
+    if line_to is None:
+        line_to = line_from + default_line_count - 1
+
     try:
-        with open(path, "r", encoding="utf-8", errors="replace") as f:
-            all_lines = f.readlines()
-    except OSError as exc:
+        index = line_index.get(path)
+        total_lines = index.total_lines()
+        line_to = min(line_to, total_lines)
+        selected = [
+            raw.decode("utf-8", errors="replace")
+            for raw in index.read_lines(line_from, line_to)
+        ]
+    except (OSError, ValueError) as exc:
         return ReadResult(
             content="", total_lines=0, warnings="",
             error=str(exc),
         )
 
-    total_lines = len(all_lines)
-    line_from = max(line_from, 1)
-    if line_to is None:
-        line_to = line_from + default_line_count - 1
-    line_to = min(line_to, total_lines)
-
-    # Convert 1-based inclusive range to 0-based slice
-    idx_from = line_from - 1
-    idx_to = line_to  # slice is exclusive, line_to is inclusive 1-based
-    selected = all_lines[idx_from:idx_to]
     num_width = len(str(line_to))
 
     warn_parts: list[str] = []
@@ -280,10 +289,11 @@ def validate_edits(edits: list | None) -> tuple[list[dict], str]:
 
 def apply_patch(path: str, edits: list[dict]) -> int:
     """
-    Apply sorted, validated edits by streaming to a temp file.
+    Apply sorted, validated edits from the first edited line on.
 
     Line numbers are 1-based. Edits use inclusive 'to'.
     Inserts have 'insert': True.
+    Lines before the first edit are left untouched on disk.
     Returns total line count after patching.
     """
     # Ensure content always ends with newline to prevent line merging
@@ -291,64 +301,60 @@ def apply_patch(path: str, edits: list[dict]) -> int:
         if e["content"] and not e["content"].endswith("\n"):
             e["content"] += "\n"
 
-    dir_name = os.path.dirname(path) or "."
-    fd, tmp_path = tempfile.mkstemp(dir=dir_name, suffix=".tmp")
-    try:
-        with (
-            open(path, "r", encoding="utf-8", errors="replace") as src,
-            os.fdopen(fd, "w", encoding="utf-8") as dst,
+    index = line_index.get(path)
+    offset, line_no = index.locate(edits[0]["from"])
+    written = 0
+
+    def patch_tail(src: BinaryIO) -> Iterable[bytes]:
+        nonlocal written
+        for chunk, count in _patched_lines(src, edits, line_no):
+            written += count
+            yield chunk
+
+    _rewrite_from(path, offset, index.size, patch_tail)
+    return line_no - 1 + written
+
+
+def _patched_lines(
+    src: Iterable[bytes], edits: list[dict], line_no: int
+) -> Iterable[tuple[bytes, int]]:
+    """Yield (bytes, line count) for ``src`` lines from ``line_no`` on."""
+    edit_idx = 0
+
+    for raw_line in src:
+        # Process all inserts targeting this line first
+        while (
+            edit_idx < len(edits)
+            and edits[edit_idx]["insert"]
+            and edits[edit_idx]["from"] == line_no
         ):
-            edit_idx = 0
-            line_no = 1  # 1-based
-            total_written = 0
-
-            for raw_line in src:
-                # Process all inserts targeting this line first
-                while (
-                    edit_idx < len(edits)
-                    and edits[edit_idx]["insert"]
-                    and edits[edit_idx]["from"] == line_no
-                ):
-                    edit = edits[edit_idx]
-                    if edit["content"]:
-                        dst.write(edit["content"])
-                        total_written += _count_content_lines(edit["content"])
+            edit = edits[edit_idx]
+            if edit["content"]:
+                yield _encoded_content(edit["content"])
+            edit_idx += 1
+
+        # Check if current line falls in a replace/delete range
+        if edit_idx < len(edits) and not edits[edit_idx]["insert"]:
+            edit = edits[edit_idx]
+            if edit["from"] <= line_no <= edit["to"]:
+                # Write replacement content once at range start
+                if line_no == edit["from"] and edit["content"]:
+                    yield _encoded_content(edit["content"])
+                # Skip original line; advance edit at range end
+                if line_no == edit["to"]:
                     edit_idx += 1
-
-                # Check if current line falls in a replace/delete range
-                if edit_idx < len(edits) and not edits[edit_idx]["insert"]:
-                    edit = edits[edit_idx]
-                    if edit["from"] <= line_no <= edit["to"]:
-                        # Write replacement content once at range start
-                        if line_no == edit["from"] and edit["content"]:
-                            dst.write(edit["content"])
-                            total_written += _count_content_lines(
-                                edit["content"]
-                            )
-                        # Skip original line; advance edit at range end
-                        if line_no == edit["to"]:
-                            edit_idx += 1
-                        line_no += 1
-                        continue
-
-                dst.write(raw_line)
-                total_written += 1
                 line_no += 1
+                continue
 
-            # Remaining edits past end of file
-            while edit_idx < len(edits):
-                edit = edits[edit_idx]
-                if edit["content"]:
-                    dst.write(edit["content"])
-                    total_written += _count_content_lines(edit["content"])
-                edit_idx += 1
+        yield raw_line, 1
+        line_no += 1
 
-        shutil.move(tmp_path, path)
-        return total_written
-    except Exception:
-        if os.path.exists(tmp_path):
-            os.unlink(tmp_path)
-        raise
+    # Remaining edits past end of file
+    while edit_idx < len(edits):
+        edit = edits[edit_idx]
+        if edit["content"]:
+            yield _encoded_content(edit["content"])
+        edit_idx += 1
 
 
 def patch_file(path: str, edits: list | None) -> PatchResult:
@@ -375,20 +381,15 @@ def apply_context_patch_file(path: str, patch_text: str) -> ContextPatchFileResu
     if not os.path.isfile(path):
         raise FileNotFoundError("file not found")
 
-    with open(path, "r", encoding="utf-8", errors="replace") as src:
-        content = src.read()
+    with open(path, "rb") as src:
+        raw = src.read()
+    content = _decode_text(raw)
 
     result = apply_context_patch_with_metadata(content, patch_text)
-    dir_name = os.path.dirname(path) or "."
-    fd, tmp_path = tempfile.mkstemp(dir=dir_name, suffix=".tmp")
-    try:
-        with os.fdopen(fd, "w", encoding="utf-8") as dst:
-            dst.write(result.content)
-        shutil.move(tmp_path, path)
-    except Exception:
-        if os.path.exists(tmp_path):
-            os.unlink(tmp_path)
-        raise
+    new_raw = result.content.encode("utf-8")
+    # Only the changed tail is written when the decoded text is byte-exact
+    offset = _common_prefix(raw, new_raw) if _is_faithful(raw, content) else 0
+    _rewrite_from(path, offset, len(raw), lambda src: (new_raw[offset:],))
 
     return ContextPatchFileResult(
         total_lines=_count_content_lines(result.content),
@@ -408,6 +409,39 @@ def apply_exact_replace_file(
     if not old_text:
         raise ValueError("old_text is required for exact replace")
 
+    old_raw = old_text.encode("utf-8")
+    new_raw = new_text.encode("utf-8")
+    index = line_index.get(path)
+    matches = _find_bytes(path, index.size, old_raw)
+    if len(matches) != 1:
+        # No byte-exact match (e.g. CRLF files): fall back to decoded text
+        return _exact_replace_text(path, old_text, new_text)
+    if old_text == new_text:
+        raise ValueError("old_text and new_text are identical")
+
+    start = matches[0]
+    line_from = index.line_of(start)
+    line_to = line_from + max(_count_content_lines(old_text) - 1, 0)
+
+    def replace_tail(src: BinaryIO) -> Iterable[bytes]:
+        yield new_raw
+        src.seek(len(old_raw), io.SEEK_CUR)
+        yield from iter(lambda: src.read(_COPY_CHUNK), b"")
+
+    _rewrite_from(path, start, index.size, replace_tail)
+    total = line_index.get(path).total_lines()
+
+    return ExactReplaceFileResult(
+        total_lines=total,
+        replacement_count=1,
+        line_from=line_from,
+        line_to=line_to,
+    )
+
+
+def _exact_replace_text(
+    path: str, old_text: str, new_text: str
+) -> ExactReplaceFileResult:
     with open(path, "r", encoding="utf-8", errors="replace") as src:
         content = src.read()
 
@@ -425,17 +459,8 @@ def apply_exact_replace_file(
     line_from = content[:start].count("\n") + 1
     line_to = line_from + max(_count_content_lines(old_text) - 1, 0)
     new_content = content.replace(old_text, new_text, 1)
-
-    dir_name = os.path.dirname(path) or "."
-    fd, tmp_path = tempfile.mkstemp(dir=dir_name, suffix=".tmp")
-    try:
-        with os.fdopen(fd, "w", encoding="utf-8") as dst:
-            dst.write(new_content)
-        shutil.move(tmp_path, path)
-    except Exception:
-        if os.path.exists(tmp_path):
-            os.unlink(tmp_path)
-        raise
+    new_raw = new_content.encode("utf-8")
+    _rewrite_from(path, 0, os.path.getsize(path), lambda src: (new_raw,))
 
     return ExactReplaceFileResult(
         total_lines=_count_content_lines(new_content),
@@ -453,3 +478,101 @@ def _count_content_lines(content: str) -> int:
     return content.count("\n") + (
         1 if content and not content.endswith("\n") else 0
     )
+
+
+def _encoded_content(content: str) -> tuple[bytes, int]:
+    return content.encode("utf-8"), _count_content_lines(content)
+
+
+def _decode_text(raw: bytes) -> str:
+    """Decode like text-mode ``open`` does (utf-8, universal newlines)."""
+    text = raw.decode("utf-8", errors="replace")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def _is_faithful(raw: bytes, text: str) -> bool:
+    return b"\r" not in raw and "\ufffd" not in text
+
+
+def _common_prefix(left: bytes, right: bytes) -> int:
+    """Length of the common prefix, compared a chunk at a time."""
+    limit = min(len(left), len(right))
+    pos = 0
+    while pos < limit:
+        end = min(pos + _COPY_CHUNK, limit)
+        if left[pos:end] != right[pos:end]:
+            return pos + len(os.path.commonprefix([left[pos:end], right[pos:end]]))
+        pos = end
+    return limit
+
+
+def _find_bytes(path: str, size: int, needle: bytes) -> list[int]:
+    """Offsets of the first two non-overlapping matches of ``needle``."""
+    if not size:
+        return []
+    found: list[int] = []
+    with (
+        open(path, "rb") as f,
+        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm,
+    ):
+        pos = mm.find(needle)
+        while pos >= 0 and len(found) < 2:
+            found.append(pos)
+            pos = mm.find(needle, pos + len(needle))
+    return found
+
+
+def _rewrite_from(
+    path: str,
+    offset: int,
+    size: int,
+    patch_tail: Callable[[BinaryIO], Iterable[bytes]],
+) -> None:
+    """
+    Replace the bytes of ``path`` from ``offset`` on.
+
+    ``patch_tail`` receives the original content positioned at ``offset``
+    and yields the new tail. The prefix is never rewritten: a large file
+    with a small tail is overwritten in place (the old tail is restored if
+    the write fails), anything else is streamed through a temp file.
+    """
+    if (
+        offset >= IN_PLACE_MIN_PREFIX
+        and size - offset <= IN_PLACE_MAX_TAIL
+        and os.access(path, os.W_OK)
+    ):
+        with open(path, "r+b") as f:
+            f.seek(offset)
+            old_tail = f.read()
+            new_tail = b"".join(patch_tail(io.BytesIO(old_tail)))
+            try:
+                f.seek(offset)
+                f.write(new_tail)
+                f.truncate()
+            except Exception:
+                f.seek(offset)
+                f.write(old_tail)
+                f.truncate()
+                raise
+    else:
+        dir_name = os.path.dirname(path) or "."
+        fd, tmp_path = tempfile.mkstemp(dir=dir_name, suffix=".tmp")
+        try:
+            with open(path, "rb") as src, os.fdopen(fd, "wb") as dst:
+                remaining = offset
+                while remaining:
+                    chunk = src.read(min(remaining, _COPY_CHUNK))
+                    if not chunk:
+                        break
+                    dst.write(chunk)
+                    remaining -= len(chunk)
+                for chunk in patch_tail(src):
+                    dst.write(chunk)
+            shutil.move(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+    line_index.keep_prefix(path, offset)
@@ -0,0 +1,202 @@
+"""
+Lazy line-offset index for windowed reads of large text files.
+
+The index keeps one checkpoint (line number, byte offset) per scanned chunk
+instead of every line start, built with mmap only as far as a read needs.
+Locating a line is a bisect over checkpoints plus a scan of at most one
+chunk, so paging through a multi-hundred-MB log costs O(window) once the
+index exists.
+
+Indexes are cached per real path and keyed by (mtime, size). A file that
+only grew (its first and last indexed chunks are unchanged, as with logs)
+keeps its checkpoints and is scanned from where the index stopped, and an
+edit that left a prefix intact keeps the checkpoints inside that prefix.
+"""
+
+import bisect
+import mmap
+import os
+import threading
+import zlib
+from collections import OrderedDict
+
+CHUNK_SIZE = 64 * 1024
+CACHE_SIZE = 32
+
+
+class LineIndex:
+
+    def __init__(self, path: str, mtime_ns: int, size: int):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.size = size
+        # lines[i] is the 0-based line number starting at offsets[i]
+        self.lines: list[int] = [0]
+        self.offsets: list[int] = [0]
+        self.scanned_to = 0  # bytes scanned for newlines
+        self.newlines = 0  # newlines in [0, scanned_to)
+        self._head_crc: int | None = None
+        self._tail_start = 0
+        self._tail_crc: int | None = None
+        self._lock = threading.RLock()
+
+    # -- queries -------------------------------------------------------------
+
+    def total_lines(self) -> int:
+        """Line count as ``readlines()`` would report it."""
+        with self._lock, _open_map(self.path, self.size) as mm:
+            self._scan(mm, self.size)
+            if not self.size:
+                return 0
+            return self.newlines + (0 if mm[self.size - 1 : self.size] == b"\n" else 1)
+
+    def locate(self, line_no: int) -> tuple[int, int]:
+        """Byte offset where 1-based ``line_no`` starts.
+
+        Past the end, the start of the last line (which may be the empty line
+        after a trailing newline) is returned together with its line number.
+        """
+        target = max(line_no, 1) - 1
+        with self._lock, _open_map(self.path, self.size) as mm:
+            while self.newlines < target and self.scanned_to < self.size:
+                self._scan(mm, self.scanned_to + CHUNK_SIZE)
+            i = bisect.bisect_right(self.lines, target) - 1
+            line, offset = self.lines[i], self.offsets[i]
+            while line < target:
+                nl = mm.find(b"\n", offset, self.size)
+                if nl < 0:
+                    break
+                offset = nl + 1
+                line += 1
+            return offset, line + 1
+
+    def read_lines(self, line_from: int, line_to: int) -> list[bytes]:
+        """Raw lines ``line_from..line_to`` (1-based, inclusive) with endings."""
+        start, first = self.locate(line_from)
+        if first != max(line_from, 1):
+            return []
+        out: list[bytes] = []
+        with _open_map(self.path, self.size) as mm:
+            offset = start
+            for _ in range(max(line_to - first + 1, 0)):
+                if offset >= self.size:
+                    break
+                nl = mm.find(b"\n", offset, self.size)
+                end = self.size if nl < 0 else nl + 1
+                out.append(mm[offset:end])
+                offset = end
+        return out
+
+    def line_of(self, offset: int) -> int:
+        """1-based line number containing byte ``offset``."""
+        with self._lock, _open_map(self.path, self.size) as mm:
+            self._scan(mm, offset)
+            i = bisect.bisect_right(self.offsets, offset) - 1
+            return self.lines[i] + mm[self.offsets[i] : offset].count(b"\n") + 1
+
+    # -- building --------------------------------------------------------------
+
+    def _scan(self, mm, until: int) -> None:
+        until = min(until, self.size)
+        while self.scanned_to < until:
+            end = min(self.scanned_to + CHUNK_SIZE, self.size)
+            chunk = mm[self.scanned_to : end]
+            if self.scanned_to == 0:
+                self._head_crc = zlib.crc32(chunk)
+            self._tail_start, self._tail_crc = self.scanned_to, zlib.crc32(chunk)
+            self.newlines += chunk.count(b"\n")
+            self.scanned_to = end
+            if end < self.size:
+                # checkpoint at the first line start at or after the chunk end
+                nl = mm.find(b"\n", end - 1, self.size)
+                if nl < 0:
+                    continue
+                nl_offset = nl + 1
+                extra = mm[end:nl_offset].count(b"\n")
+                if nl_offset > self.offsets[-1]:
+                    self.lines.append(self.newlines + extra)
+                    self.offsets.append(nl_offset)
+
+    def _extends(self, mm, size: int) -> bool:
+        """Whether the file only grew since this index was built."""
+        if size < self.size or self.scanned_to == 0:
+            return False
+        head_end = min(CHUNK_SIZE, self.scanned_to)
+        return (
+            zlib.crc32(mm[0:head_end]) == self._head_crc
+            and zlib.crc32(mm[self._tail_start : self.scanned_to]) == self._tail_crc
+        )
+
+
+class _open_map:
+    """Context manager yielding a read-only mmap (or empty bytes)."""
+
+    def __init__(self, path: str, size: int):
+        self.path = path
+        self.size = size
+
+    def __enter__(self):
+        self._file = open(self.path, "rb")
+        if not self.size:
+            self._map = None
+            return b""
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def __exit__(self, *exc) -> None:
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+
+_cache: "OrderedDict[str, LineIndex]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def get(path: str) -> LineIndex:
+    """Cached index of ``path``, rebuilt lazily when the file changed."""
+    real = os.path.realpath(os.path.expanduser(path))
+    stat = os.stat(real)
+    with _lock:
+        index = _cache.get(real)
+        if index is not None:
+            _cache.move_to_end(real)
+            if index.mtime_ns == stat.st_mtime_ns and index.size == stat.st_size:
+                return index
+    if index is not None and stat.st_size > index.size:
+        with index._lock:
+            with _open_map(real, stat.st_size) as mm:
+                grown = index._extends(mm, stat.st_size)
+            if grown:
+                index.mtime_ns, index.size = stat.st_mtime_ns, stat.st_size
+                return index
+    index = LineIndex(real, stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        _cache[real] = index
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return index
+
+
+def invalidate(path: str) -> None:
+    with _lock:
+        _cache.pop(os.path.realpath(os.path.expanduser(path)), None)
+
+
+def keep_prefix(path: str, offset: int) -> None:
+    """Re-key the cached index after ``path`` changed only from ``offset`` on."""
+    real = os.path.realpath(os.path.expanduser(path))
+    with _lock:
+        old = _cache.pop(real, None)
+    if old is None:
+        return
+    stat = os.stat(real)
+    index = LineIndex(real, stat.st_mtime_ns, stat.st_size)
+    with old._lock:
+        keep = bisect.bisect_right(old.offsets, min(offset, old.scanned_to))
+        index.lines, index.offsets = old.lines[:keep], old.offsets[:keep]
+        index.scanned_to, index.newlines = index.offsets[-1], index.lines[-1]
+        if index.scanned_to >= CHUNK_SIZE:
+            index._head_crc = old._head_crc
+    with _lock:
+        _cache[real] = index
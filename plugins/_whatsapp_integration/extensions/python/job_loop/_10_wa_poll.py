@@ -1,4 +1,4 @@
-"""WhatsApp poll loop — start bridge and poll for incoming messages."""
+"""WhatsApp poll loop — start bridge and receive incoming messages."""
 
 import asyncio
 from typing import Any
@@ -13,6 +13,9 @@ PLUGIN_NAME: str = "_whatsapp_integration"
 DEFAULT_INTERVAL: int = 3
 MIN_INTERVAL: int = 2
 MAX_CONSECUTIVE_FAILURES: int = 5
+# Pass interval while the event stream is open: config/bridge checks and
+# typing refresh (WhatsApp drops "composing" after ~25 s)
+STREAM_CHECK_INTERVAL: int = 10
 
 
 # ------------------------------------------------------------------
@@ -43,7 +46,11 @@ class WhatsAppAutoPoll(Extension):
 
 async def _poll_loop() -> None:
     from plugins._whatsapp_integration.helpers import bridge_manager
-    from plugins._whatsapp_integration.helpers.handler import poll_messages
+    from plugins._whatsapp_integration.helpers.handler import (
+        process_messages,
+        refresh_typing,
+    )
+    from plugins._whatsapp_integration.helpers.wa_inbound import InboundFeed
     from plugins._whatsapp_integration.helpers.storage_paths import (
         get_bridge_media_dir,
         get_bridge_session_dir,
@@ -51,6 +58,8 @@ async def _poll_loop() -> None:
 
     bridge_started = False
     consecutive_failures = 0
+    feed: InboundFeed | None = None
+    stream_task: asyncio.Task | None = None  # type: ignore[type-arg]
 
     try:
         while True:
@@ -105,14 +114,32 @@ async def _poll_loop() -> None:
                     await asyncio.sleep(10)
                     continue
 
+            # Messages are pushed over the bridge's event stream; polling
+            # with the same cursor only fills in while no stream is open
+            base_url = bridge_manager.get_bridge_url(port)
+            if feed is None or feed.base_url != base_url:
+                if stream_task:
+                    stream_task.cancel()
+                    stream_task = None
+                feed = InboundFeed(base_url, process_messages)
+            if feed.stream_supported and (not stream_task or stream_task.done()):
+                stream_task = asyncio.create_task(feed.stream())
+
             try:
-                await poll_messages(config)
+                await refresh_typing(config)
+                if not feed.streaming:
+                    await feed.poll()
             except Exception as e:
                 PrintStyle.error(f"WhatsApp poll error: {format_error(e)}")
 
-            sleep_sec = max(config.get("poll_interval_seconds", DEFAULT_INTERVAL), MIN_INTERVAL)
+            if feed.streaming:
+                sleep_sec = STREAM_CHECK_INTERVAL
+            else:
+                sleep_sec = max(config.get("poll_interval_seconds", DEFAULT_INTERVAL), MIN_INTERVAL)
             await asyncio.sleep(sleep_sec)
     finally:
+        if stream_task:
+            stream_task.cancel()
         # Ensure bridge stops when poll loop exits (plugin disabled or task cancelled)
         try:
             if bridge_manager.is_process_alive():
@@ -18,11 +18,11 @@ from collections import deque
 from pathlib import Path
 from typing import Any, Sequence
 
+from helpers.defer import LoopSafeLock
 from helpers.print_style import PrintStyle
 
 
-_bridge_lock: asyncio.Lock | None = None
-_bridge_lock_loop: asyncio.AbstractEventLoop | None = None
+_bridge_lock = LoopSafeLock()
 _bridge_config: dict = {}  # config the running bridge was started with
 
 MAX_STARTUP_LOG_LINES = 80
@@ -163,12 +163,7 @@ def get_running_config() -> dict:
 # Internal
 # ------------------------------------------------------------------
 
-def _get_bridge_lock() -> asyncio.Lock:
-    global _bridge_lock, _bridge_lock_loop
-    loop = asyncio.get_running_loop()
-    if _bridge_lock is None or _bridge_lock_loop is not loop:
-        _bridge_lock = asyncio.Lock()
-        _bridge_lock_loop = loop
+def _get_bridge_lock() -> LoopSafeLock:
     return _bridge_lock
 
 
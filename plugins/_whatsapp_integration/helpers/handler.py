@@ -49,11 +49,13 @@ _poll_task: asyncio.Task | None = None  # type: ignore[type-arg]
 
 
 # ------------------------------------------------------------------
-# Poll loop
+# Inbound messages
 # ------------------------------------------------------------------
 
-async def _refresh_typing(base_url: str) -> None:
+async def refresh_typing(config: dict) -> None:
     """Re-send composing for all contexts with active typing flag."""
+    port = int(config.get("bridge_port", 3100))
+    base_url = bridge_manager.get_bridge_url(port)
     for ctx in AgentContext._contexts.values():
         if not isinstance(ctx, AgentContext):
             continue
@@ -64,27 +66,18 @@ async def _refresh_typing(base_url: str) -> None:
             await wa_client.send_typing(base_url, chat_id)
 
 
-async def poll_messages(config: dict) -> None:
+async def process_messages(messages: list[dict]) -> None:
+    """Filter and dispatch inbound bridge messages (streamed or polled).
+
+    Streamed batches arrive between poll loop passes, so the plugin config is
+    read and the enabled checks are repeated for every batch.
+    """
+    config = plugins.get_plugin_config(PLUGIN_NAME) or {}
     if not config.get("enabled", False):
         return
     if PLUGIN_NAME not in plugins.get_enabled_plugins(None):
         return
 
-    port = int(config.get("bridge_port", 3100))
-    base_url = bridge_manager.get_bridge_url(port)
-
-    # Refresh typing indicator for active sessions (beats 25s WhatsApp timeout)
-    await _refresh_typing(base_url)
-
-    try:
-        messages = await wa_client.get_messages(base_url)
-    except Exception as e:
-        PrintStyle.error(f"WhatsApp poll error: {format_error(e)}")
-        return
-
-    if not messages:
-        return
-
     # Allowed-numbers filtering is authoritative in Python.
     allowed_set = normalize_allowed_numbers(config.get("allowed_numbers"))
 
@@ -4,17 +4,52 @@ WhatsApp bridge HTTP client.
 No agent/tool dependencies.
 """
 
+import json
+from typing import AsyncIterator
+
 import aiohttp
 
+# Inbound messages can be long texts; NDJSON lines must fit the read buffer
+STREAM_READ_BUFSIZE = 2**20
+
+
+async def poll_events(base_url: str, boot: str, after: int) -> dict | list[dict]:
+    """Inbound messages after the (boot, after) cursor, as one JSON poll.
 
-async def get_messages(base_url: str) -> list[dict]:
+    A legacy bridge ignores the cursor and answers with a plain list of the
+    messages it queued since the last poll.
+    """
     async with aiohttp.ClientSession() as session:
         async with session.get(
-            f"{base_url}/messages", timeout=aiohttp.ClientTimeout(total=10),
+            f"{base_url}/messages",
+            params={"boot": boot, "after": str(after)},
+            timeout=aiohttp.ClientTimeout(total=10),
         ) as resp:
             if resp.status == 200:
                 return await resp.json()
-            return []
+            return {"boot": boot, "events": []}
+
+
+async def stream_events(
+    base_url: str, boot: str, after: int, idle_timeout: float,
+) -> AsyncIterator[dict]:
+    """Follow the bridge's NDJSON event stream from the (boot, after) cursor.
+
+    Raises ``aiohttp.ClientResponseError`` for non-200 replies (404 from a
+    bridge without /events) and ``asyncio.TimeoutError`` when no line,
+    not even a ping, arrives within ``idle_timeout``.
+    """
+    async with aiohttp.ClientSession() as session:
+        async with session.get(
+            f"{base_url}/events",
+            params={"boot": boot, "after": str(after)},
+            timeout=aiohttp.ClientTimeout(total=None, connect=5, sock_read=idle_timeout),
+            read_bufsize=STREAM_READ_BUFSIZE,
+        ) as resp:
+            resp.raise_for_status()
+            async for line in resp.content:
+                if line.strip():
+                    yield json.loads(line)
 
 
 async def send_message(
@@ -0,0 +1,145 @@
+"""
+Inbound delivery from the WhatsApp bridge.
+
+The bridge numbers inbound messages per boot and keeps the most recent
+ones. ``InboundFeed`` follows its /events stream with a (boot, seq) cursor:
+a dropped stream resumes after the last delivered message, and a restarted
+bridge (new boot) is read from its first message instead of being mistaken
+for duplicates. Polling /messages with the same cursor is the fallback;
+a legacy bridge answers it with a plain list, delivered as is.
+
+No agent/tool dependencies.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+import aiohttp
+
+from helpers.errors import format_error
+from helpers.print_style import PrintStyle
+from plugins._whatsapp_integration.helpers import wa_client
+
+
+STREAM_IDLE_TIMEOUT = 45  # the bridge pings every 15 s
+RECONNECT_DELAYS = (0.5, 1, 2, 5, 10)
+
+
+@dataclass
+class FeedStats:
+    connects: int = 0
+    polls: int = 0
+    delivered: int = 0
+    duplicates: int = 0  # replayed events the cursor had already passed
+    dropped: int = 0  # events the bridge evicted before they were read
+
+
+class InboundFeed:
+    """Delivers each inbound bridge message exactly once per bridge boot.
+
+    ``stream()`` runs until cancelled and reconnects on its own; ``poll()``
+    covers the gaps while no stream is open. Both share the cursor, so
+    running them side by side never delivers a message twice.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        on_messages: Callable[[list[dict]], Awaitable[None]],
+    ):
+        self.base_url = base_url
+        self.on_messages = on_messages
+        self.boot = ""
+        self.seq = 0
+        self.streaming = False
+        self.stream_supported = True
+        self.stats = FeedStats()
+
+    async def stream(self) -> None:
+        attempt = 0
+        while True:
+            try:
+                async for event in wa_client.stream_events(
+                    self.base_url, self.boot, self.seq, STREAM_IDLE_TIMEOUT,
+                ):
+                    kind = event.get("type")
+                    if kind == "hello":
+                        self._sync_cursor(event)
+                        self.streaming = True
+                        self.stats.connects += 1
+                        attempt = 0
+                    elif kind == "message" and self._accept(event["seq"]):
+                        await self._deliver([event["message"]])
+            except asyncio.CancelledError:
+                raise
+            except aiohttp.ClientResponseError as e:
+                if e.status == 404:
+                    self.stream_supported = False
+                    PrintStyle.warning(
+                        "WhatsApp: bridge has no event stream, polling instead"
+                    )
+                    return
+                self._stream_failed(attempt, e)
+            except Exception as e:
+                self._stream_failed(attempt, e)
+            finally:
+                self.streaming = False
+            await asyncio.sleep(RECONNECT_DELAYS[min(attempt, len(RECONNECT_DELAYS) - 1)])
+            attempt += 1
+
+    async def poll(self) -> None:
+        data = await wa_client.poll_events(self.base_url, self.boot, self.seq)
+        self.stats.polls += 1
+        if isinstance(data, list):
+            # a legacy bridge drains its queue on every poll and has no cursor
+            messages = data
+        else:
+            self._sync_cursor(data)
+            messages = [
+                event["message"]
+                for event in data.get("events", [])
+                if self._accept(event["seq"])
+            ]
+        if messages:
+            await self._deliver(messages)
+
+    # -- cursor ----------------------------------------------------------------
+
+    def _sync_cursor(self, info: dict) -> None:
+        boot = info.get("boot", "")
+        if boot and boot != self.boot:
+            if self.boot:
+                PrintStyle.info("WhatsApp: bridge restarted, reading its new messages")
+            # the bridge answers a foreign cursor from its first message
+            self.boot, self.seq = boot, 0
+        oldest = int(info.get("oldest", 0))
+        if oldest > self.seq + 1:
+            dropped = oldest - self.seq - 1
+            self.stats.dropped += dropped
+            PrintStyle.warning(
+                f"WhatsApp: {dropped} inbound message(s) were dropped by the bridge"
+                " before they could be read"
+            )
+            self.seq = oldest - 1
+
+    def _accept(self, seq: int) -> bool:
+        if seq <= self.seq:
+            self.stats.duplicates += 1
+            return False
+        self.seq = seq
+        return True
+
+    async def _deliver(self, messages: list[dict]) -> None:
+        self.stats.delivered += len(messages)
+        try:
+            await self.on_messages(messages)
+        except Exception as e:
+            PrintStyle.error(f"WhatsApp dispatch error: {format_error(e)}")
+
+    def _stream_failed(self, attempt: int, error: Exception) -> None:
+        # the bridge restarting refuses a few connects; report a streak once
+        if attempt == 0:
+            PrintStyle.warning(
+                f"WhatsApp: event stream interrupted, reconnecting: {format_error(error)}"
+            )
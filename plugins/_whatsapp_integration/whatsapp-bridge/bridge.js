@@ -6,6 +6,7 @@
  * and exposes HTTP endpoints for the Python plugin.
  *
  * Endpoints:
+ *   GET  /events         - Stream incoming messages (NDJSON, resumable cursor)
  *   GET  /messages       - Poll for new incoming messages
  *   POST /send           - Send a message { chatId, message, replyTo? }
  *   POST /edit           - Edit a sent message { chatId, messageId, message }
@@ -27,6 +28,7 @@ import { mkdirSync, readFileSync, writeFileSync, existsSync, readdirSync } from
 import { randomBytes } from 'crypto';
 import qrcode from 'qrcode-terminal';
 import QRCode from 'qrcode';
+import { createInboundFeed } from './inbound-feed.js';
 
 // Parse CLI args
 const args = process.argv.slice(2);
@@ -84,9 +86,9 @@ function resolveNumber(num) {
 
 const logger = pino({ level: 'warn' });
 
-// Message queue for polling
-const messageQueue = [];
+// Inbound messages for streaming and polling consumers
 const MAX_QUEUE_SIZE = 100;
+const inbound = createInboundFeed({ maxEvents: MAX_QUEUE_SIZE });
 
 // Track recently sent message IDs to prevent echo-back loops
 const recentlySentIds = new Set();
@@ -390,10 +392,7 @@ async function startSocket() {
         messageStore.delete(messageStore.keys().next().value);
       }
 
-      messageQueue.push(event);
-      if (messageQueue.length > MAX_QUEUE_SIZE) {
-        messageQueue.shift();
-      }
+      inbound.push(event);
     }
   });
 }
@@ -402,11 +401,11 @@ async function startSocket() {
 const app = express();
 app.use(express.json());
 
+// Stream new messages as they arrive
+app.get('/events', (req, res) => inbound.stream(req, res));
+
 // Poll for new messages
-app.get('/messages', (req, res) => {
-  const msgs = messageQueue.splice(0, messageQueue.length);
-  res.json(msgs);
-});
+app.get('/messages', (req, res) => inbound.poll(req, res));
 
 // Send a message
 app.post('/send', async (req, res) => {
@@ -594,7 +593,7 @@ app.get('/qr', (req, res) => {
 app.get('/health', (req, res) => {
   res.json({
     status: connectionState,
-    queueLength: messageQueue.length,
+    queueLength: inbound.pending(),
     uptime: process.uptime(),
   });
 });
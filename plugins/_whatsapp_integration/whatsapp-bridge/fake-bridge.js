@@ -0,0 +1,106 @@
+#!/usr/bin/env node
+/**
+ * Fake WhatsApp bridge for local testing without a WhatsApp account.
+ *
+ * Serves the same inbound feed as bridge.js and accepts replies, but
+ * messages come from POST /inject (or --emit-every) instead of WhatsApp.
+ * Every inbound message carries `sentAt` (epoch ms) so a consumer can
+ * measure end-to-end latency, and GET /stats counts requests per path to
+ * show what a consumer costs while nothing happens.
+ *
+ * Endpoints:
+ *   GET  /events, GET /messages  - inbound feed (see inbound-feed.js)
+ *   POST /inject                 - queue a message { body?, chatId?, senderNumber? }
+ *   POST /send, /typing          - accepted and counted
+ *   GET  /health, GET /stats
+ *
+ * Usage:
+ *   node fake-bridge.js --port 3100 [--emit-every 1000]
+ */
+
+import http from 'http';
+import { createInboundFeed } from './inbound-feed.js';
+
+const args = process.argv.slice(2);
+function getArg(name, defaultVal) {
+  const idx = args.indexOf(`--${name}`);
+  return idx !== -1 && args[idx + 1] ? args[idx + 1] : defaultVal;
+}
+
+const PORT = parseInt(getArg('port', '3100'), 10);
+const EMIT_EVERY_MS = parseInt(getArg('emit-every', '0'), 10);
+
+const inbound = createInboundFeed({ heartbeatMs: parseInt(getArg('heartbeat-ms', '15000'), 10) });
+const requests = {};
+let injected = 0;
+
+function inject(fields = {}) {
+  injected += 1;
+  const chatId = fields.chatId || '15550000000@s.whatsapp.net';
+  const senderNumber = fields.senderNumber || chatId.split('@')[0];
+  return inbound.push({
+    messageId: fields.messageId || `FAKE${injected}`,
+    chatId,
+    senderId: chatId,
+    senderNumber,
+    senderName: fields.senderName || 'Fake Sender',
+    chatName: fields.senderName || 'Fake Sender',
+    isGroup: false,
+    mentionedMe: false,
+    repliedToMe: false,
+    body: fields.body ?? `fake message ${injected}`,
+    hasMedia: false,
+    mediaType: '',
+    mediaUrls: [],
+    timestamp: Math.floor(Date.now() / 1000),
+    sentAt: Date.now(),
+  });
+}
+
+function readJson(req) {
+  return new Promise((resolve) => {
+    let data = '';
+    req.on('data', (chunk) => { data += chunk; });
+    req.on('end', () => {
+      try { resolve(data ? JSON.parse(data) : {}); } catch { resolve({}); }
+    });
+  });
+}
+
+function reply(res, body) {
+  const data = JSON.stringify(body);
+  res.writeHead(200, { 'Content-Type': 'application/json', 'Content-Length': Buffer.byteLength(data) });
+  res.end(data);
+}
+
+const server = http.createServer(async (req, res) => {
+  const route = `${req.method} ${new URL(req.url, 'http://127.0.0.1').pathname}`;
+  requests[route] = (requests[route] || 0) + 1;
+
+  switch (route) {
+    case 'GET /events':
+      return inbound.stream(req, res);
+    case 'GET /messages':
+      return inbound.poll(req, res);
+    case 'POST /inject': {
+      const event = inject(await readJson(req));
+      return reply(res, { seq: event.seq, boot: inbound.boot, sentAt: event.message.sentAt });
+    }
+    case 'POST /send':
+    case 'POST /typing':
+      await readJson(req);
+      return reply(res, { success: true, messageId: `FAKESENT${Date.now()}` });
+    case 'GET /health':
+      return reply(res, { status: 'connected', queueLength: inbound.pending(), uptime: process.uptime() });
+    case 'GET /stats':
+      return reply(res, { boot: inbound.boot, injected, requests });
+    default:
+      res.writeHead(404);
+      res.end();
+  }
+});
+
+server.listen(PORT, '127.0.0.1', () => {
+  console.log(`[fake-bridge] listening on port ${PORT}`);
+  if (EMIT_EVERY_MS > 0) setInterval(() => inject(), EMIT_EVERY_MS);
+});
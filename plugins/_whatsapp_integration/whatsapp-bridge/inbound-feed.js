@@ -0,0 +1,97 @@
+/**
+ * Inbound message feed shared by bridge.js and fake-bridge.js.
+ *
+ * Every inbound message gets a sequence number that grows for the lifetime
+ * of this process (its "boot"). Consumers keep a (boot, seq) cursor:
+ *
+ *   GET /events?boot=<id>&after=<seq>    - NDJSON stream, replays what the
+ *                                          cursor has not seen, then pushes
+ *                                          live events and a ping every 15s
+ *   GET /messages?boot=<id>&after=<seq>  - the same as one JSON poll
+ *   GET /messages                        - legacy: everything not yet handed out
+ *
+ * A cursor from another boot (the bridge restarted) starts over at seq 0,
+ * so the new process's messages are never mistaken for already seen ones.
+ * Only plain node:http request/response APIs are used, so the feed works
+ * under express and without it.
+ */
+
+import { randomBytes } from 'crypto';
+
+export function createInboundFeed({ maxEvents = 100, heartbeatMs = 15000 } = {}) {
+  const boot = randomBytes(8).toString('hex');
+  const events = []; // { seq, message }, oldest first
+  const streams = new Set();
+  let seq = 0;
+  let delivered = 0; // highest seq handed to any consumer
+
+  function oldest() {
+    return events.length ? events[0].seq : seq + 1;
+  }
+
+  function since(after) {
+    return events.filter((e) => e.seq > after);
+  }
+
+  function cursorOf(req) {
+    const query = new URL(req.url, 'http://127.0.0.1').searchParams;
+    if (!query.has('after')) return null;
+    if (query.get('boot') !== boot) return 0;
+    return Math.max(parseInt(query.get('after'), 10) || 0, 0);
+  }
+
+  function writeEvent(res, event) {
+    res.write(JSON.stringify({ type: 'message', seq: event.seq, message: event.message }) + '\n');
+    delivered = Math.max(delivered, event.seq);
+  }
+
+  function push(message) {
+    const event = { seq: ++seq, message };
+    events.push(event);
+    if (events.length > maxEvents) events.shift();
+    for (const res of streams) writeEvent(res, event);
+    return event;
+  }
+
+  function poll(req, res) {
+    const after = cursorOf(req);
+    if (after === null) {
+      const out = since(delivered);
+      delivered = seq;
+      return sendJson(res, out.map((e) => e.message));
+    }
+    const out = since(after);
+    if (out.length) delivered = Math.max(delivered, out[out.length - 1].seq);
+    sendJson(res, { boot, seq, oldest: oldest(), events: out });
+  }
+
+  function stream(req, res) {
+    const after = cursorOf(req) ?? 0;
+    req.socket.setNoDelay(true);
+    res.writeHead(200, {
+      'Content-Type': 'application/x-ndjson',
+      'Cache-Control': 'no-cache',
+      Connection: 'keep-alive',
+    });
+    res.write(JSON.stringify({ type: 'hello', boot, seq, oldest: oldest() }) + '\n');
+    for (const event of since(after)) writeEvent(res, event);
+    streams.add(res);
+    const timer = setInterval(() => res.write('{"type":"ping"}\n'), heartbeatMs);
+    req.on('close', () => {
+      clearInterval(timer);
+      streams.delete(res);
+    });
+  }
+
+  function pending() {
+    return since(delivered).length;
+  }
+
+  return { boot, push, poll, stream, pending };
+}
+
+function sendJson(res, body) {
+  const data = JSON.stringify(body);
+  res.writeHead(200, { 'Content-Type': 'application/json', 'Content-Length': Buffer.byteLength(data) });
+  res.end(data);
+}
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: per-call cost of @extensible with and without dispatch tables.
+
+Times the same sync function bare, wrapped with the dispatch tables
+(``extension._dispatch``), and wrapped with the previous path, which looked the
+extension classes up in the cache and instantiated them on every call. Each
+variant runs for an empty extension point and for a point with one no-op
+extension. Nothing is asserted; the numbers are only printed.
+
+    python scripts/benchmark_extension_dispatch.py --calls 200000 --repeat 5
+
+With ``--calls 50000 --repeat 3`` on one CPU, Python 3.11.7 (us per call; a
+bare call costs 0.055 us):
+
+    point         lookup us  tables us  speedup
+    empty             9.491      5.411     1.8x
+    1 no-op          21.239     12.320     1.7x
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from helpers import extension
+
+
+class Noop(extension.Extension):
+    def execute(self, **kwargs):
+        pass
+
+
+def bare(value: int) -> int:
+    return value + 1
+
+
+def lookup_every_call(extension_point: str, agent=None) -> tuple:
+    """The dispatch before the tables: class lookup and instances per call."""
+    return tuple(
+        cls(agent=agent)
+        for cls in extension._get_extension_classes(extension_point, agent=agent)
+    )
+
+
+def per_call_us(func: Callable[[int], int], calls: int, repeat: int) -> float:
+    func(0)  # fill caches and tables
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for i in range(calls):
+            func(i)
+        runs.append((time.perf_counter() - started) / calls * 1_000_000)
+    return statistics.median(runs)
+
+
+def measure(dispatch, with_extension: bool, calls: int, repeat: int) -> float:
+    real_classes = extension._get_extension_classes
+
+    def classes(extension_point, agent=None, **kwargs):
+        found = real_classes(extension_point, agent=agent, **kwargs)
+        return [*found, Noop] if with_extension else found
+
+    original_dispatch = extension._dispatch
+    extension._get_extension_classes = classes
+    extension._dispatch = dispatch
+    extension.cache.clear("*(extensions)*")
+    try:
+        return per_call_us(extension.extensible(bare), calls, repeat)
+    finally:
+        extension._dispatch = original_dispatch
+        extension._get_extension_classes = real_classes
+        extension.cache.clear("*(extensions)*")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    bare_us = per_call_us(bare, args.calls, args.repeat)
+    print(f"bare function: {bare_us:.3f} us/call\n")
+    print(f"{'point':<12} {'lookup us':>10} {'tables us':>10} {'speedup':>8}")
+    for name, with_extension in (("empty", False), ("1 no-op", True)):
+        before = measure(lookup_every_call, with_extension, args.calls, args.repeat)
+        after = measure(extension._dispatch, with_extension, args.calls, args.repeat)
+        print(f"{name:<12} {before:>10.3f} {after:>10.3f} {before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
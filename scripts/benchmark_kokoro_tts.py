@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""CPU benchmark: sentence-streamed Kokoro synthesis vs. whole-clip synthesis.
+
+Each mode synthesizes the same long reply in a fresh subprocess, so peak RSS
+is per mode. ``legacy`` reproduces the previous implementation (samples
+accumulated in a Python list, encoded at the end) as a baseline.
+
+    python scripts/benchmark_kokoro_tts.py --sentences 200
+    python scripts/benchmark_kokoro_tts.py --fake   # without the kokoro package
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import io
+import json
+import resource
+import subprocess
+import sys
+import time
+import wave
+from pathlib import Path
+from types import SimpleNamespace
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+MODES = ("legacy", "whole", "stream")
+SAMPLES_PER_CHAR = 1700  # roughly Kokoro's speaking rate at 24 kHz
+FAKE_REALTIME_FACTOR = 0.05  # fake compute time per second of audio
+
+
+class FakePipeline:
+    """Kokoro-shaped output without the model: one segment per sentence."""
+
+    def __call__(self, text, voice=None, speed=None):
+        import numpy as np
+
+        samples = SAMPLES_PER_CHAR * len(text)
+        time.sleep(samples / 24000 * FAKE_REALTIME_FACTOR)
+        rng = np.random.default_rng(len(text))
+        yield SimpleNamespace(audio=(0.3 * rng.standard_normal(samples)).astype(np.float32))
+
+
+def long_reply(sentences: int) -> list[str]:
+    return [
+        f"This is sentence number {i} of a long reply, read aloud by the agent."
+        for i in range(sentences)
+    ]
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def legacy(kokoro_tts, sentences: list[str]) -> str:
+    import numpy as np
+
+    combined_audio = []
+    for sentence in sentences:
+        for segment in kokoro_tts._pipeline(sentence, voice=kokoro_tts._voice, speed=kokoro_tts._speed):
+            combined_audio.extend(segment.audio)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(24000)
+        wav.writeframes((np.clip(combined_audio, -1, 1) * 32767).astype("<i2").tobytes())
+    return base64.b64encode(buffer.getvalue()).decode("utf-8")
+
+
+async def run_mode(mode: str, sentences: list[str], fake: bool) -> dict[str, float]:
+    from helpers import kokoro_tts
+
+    if fake:
+        kokoro_tts._pipeline = FakePipeline()
+    await kokoro_tts.preload()
+    kokoro_tts._pipeline("Warm up.", voice=kokoro_tts._voice, speed=kokoro_tts._speed)
+    baseline = peak_rss_mb()
+
+    started = time.perf_counter()
+    first = None
+    if mode == "stream":
+        async for _chunk in kokoro_tts.synthesize_stream(sentences):
+            if first is None:
+                first = time.perf_counter() - started
+    elif mode == "whole":
+        await kokoro_tts.synthesize_sentences(sentences)
+    else:
+        await legacy(kokoro_tts, sentences)
+    total = time.perf_counter() - started
+
+    return {
+        "first_audio_s": first if first is not None else total,
+        "total_s": total,
+        "peak_rss_mb": peak_rss_mb(),
+        "rss_growth_mb": peak_rss_mb() - baseline,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sentences", type=int, default=200)
+    parser.add_argument("--fake", action="store_true", help="use a synthetic pipeline")
+    parser.add_argument("--run", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        result = asyncio.run(run_mode(args.run, long_reply(args.sentences), args.fake))
+        print(json.dumps(result))
+        return
+
+    results = {}
+    for mode in MODES:
+        command = [sys.executable, __file__, "--run", mode, "--sentences", str(args.sentences)]
+        if args.fake:
+            command.append("--fake")
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+        results[mode] = json.loads(output.strip().splitlines()[-1])
+
+    print(f"{'mode':<8} {'first audio s':>14} {'total s':>9} {'peak RSS MB':>12} {'RSS growth MB':>14}")
+    for mode, result in results.items():
+        print(
+            f"{mode:<8} {result['first_audio_s']:>14.2f} {result['total_s']:>9.2f}"
+            f" {result['peak_rss_mb']:>12.1f} {result['rss_growth_mb']:>14.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from helpers import context_signals
+from helpers import log as log_module
+from plugins._a0_connector.helpers import context_hub
+from plugins._a0_connector.helpers.event_bridge import log_entry_to_connector_event
+
+
+@pytest.fixture(autouse=True)
+def isolated_log(monkeypatch):
+    matcher = SimpleNamespace(mask=lambda text: text)
+    manager = SimpleNamespace(
+        get_matcher=lambda min_length=0: None,
+        mask_values=lambda text, min_length=4: text,
+    )
+    monkeypatch.setattr(log_module, "get_secrets_manager", lambda context=None: manager)
+    monkeypatch.setattr(log_module, "_MARK_DIRTY_ALL", lambda **kwargs: None)
+    monkeypatch.setattr(log_module, "_MARK_DIRTY_FOR_CONTEXT", lambda *args, **kwargs: None)
+    return matcher
+
+
+class _World:
+    """Contexts with real logs plus a hub whose emit records what each sid got."""
+
+    def __init__(self, contexts: int = 1):
+        self.logs: dict[str, log_module.Log] = {}
+        self.queues: dict[str, list] = {}
+        self.running: dict[str, bool] = {}
+        for i in range(contexts):
+            context_id = f"ctx{i}"
+            log = log_module.Log()
+            log.context = SimpleNamespace(id=context_id, streaming_agent=None)  # type: ignore[assignment]
+            self.logs[context_id] = log
+            self.queues[context_id] = []
+            self.running[context_id] = False
+        self.received: dict[str, list[tuple[float, str, dict]]] = {}
+        self.blocked: dict[str, asyncio.Event] = {}
+        self.hub = context_hub.ContextHub(
+            self.emit,
+            read_log=self.read_log,
+            read_queue=lambda context_id: list(self.queues[context_id]),
+            is_running=lambda context_id: self.running[context_id],
+        )
+
+    async def emit(self, sid, event, payload, correlation_id=None):
+        gate = self.blocked.get(sid)
+        if gate is not None:
+            await gate.wait()
+        self.received.setdefault(sid, []).append((time.monotonic(), event, payload))
+
+    def read_log(self, context_id: str, after: int):
+        output = self.logs[context_id].output(start=after)
+        return [log_entry_to_connector_event(item, context_id) for item in output.items], output.end
+
+    async def subscribe(self, sid: str, context_id: str) -> None:
+        events, end = self.read_log(context_id, 0)
+        await self.hub.subscribe(
+            sid, context_id, log_cursor=end,
+            preface=[("connector_context_snapshot", {"events": events}, None)],
+        )
+
+    def run(self, scenario):
+        async def main():
+            try:
+                return await scenario()
+            finally:
+                self.hub.close()
+
+        return asyncio.run(main())
+
+    def texts(self, sid: str, event: str = context_hub.EVENT_CONTEXT) -> list[str]:
+        return [
+            payload["data"].get("text", "")
+            for _, name, payload in self.received.get(sid, [])
+            if name == event
+        ]
+
+    async def wait_for(self, predicate, timeout: float = 2.0) -> None:
+        deadline = time.monotonic() + timeout
+        while not predicate():
+            assert time.monotonic() < deadline, "timed out"
+            await asyncio.sleep(0.002)
+
+
+def test_one_read_fans_out_to_every_sid_quickly_and_idle_costs_nothing() -> None:
+    w = _World(contexts=4)
+    sids = [f"sid{i}" for i in range(50)]
+
+    async def scenario():
+        for i, sid in enumerate(sids):
+            await w.subscribe(sid, f"ctx{i % 4}")
+        await asyncio.sleep(0.1)
+        idle_before = (w.hub.stats.signals, w.hub.stats.reads)
+        await asyncio.sleep(0.5)
+        idle_after = (w.hub.stats.signals, w.hub.stats.reads)
+
+        latencies = []
+        for n in range(5):
+            # agent loops write logs from their own threads
+            sent = time.monotonic()
+            writer = threading.Thread(target=w.logs["ctx0"].log, kwargs={"type": "info", "content": f"step {n}"})
+            writer.start()
+            writer.join()
+            await w.wait_for(lambda: all(len(w.texts(sid)) == n + 1 for sid in sids[::4]))
+            latencies.append(max(w.received[sid][-1][0] for sid in sids[::4]) - sent)
+        return idle_before, idle_after, latencies
+
+    idle_before, idle_after, latencies = w.run(scenario)
+
+    assert idle_before == idle_after == (0, 0)
+    assert max(latencies) < 0.05
+    assert w.texts("sid0") == [f"step {n}" for n in range(5)]
+    assert w.texts("sid1") == []  # other contexts untouched
+    assert w.hub.stats.reads == 5  # once per change, not once per sid
+
+
+def test_late_subscriber_starts_after_its_snapshot() -> None:
+    w = _World()
+    log = w.logs["ctx0"]
+
+    async def scenario():
+        log.log(type="info", content="old")
+        await w.subscribe("early", "ctx0")
+        log.log(type="info", content="middle")
+        await w.wait_for(lambda: w.texts("early") == ["middle"])
+        await w.subscribe("late", "ctx0")
+        log.log(type="info", content="new")
+        await w.wait_for(lambda: len(w.texts("late")) == 1 and len(w.texts("early")) == 2)
+
+    w.run(scenario)
+
+    assert w.texts("early") == ["middle", "new"]
+    assert w.texts("late") == ["new"]
+    snapshot = w.received["late"][0]
+    assert snapshot[1] == "connector_context_snapshot"
+    assert [e["data"]["text"] for e in snapshot[2]["events"]] == ["old", "middle"]
+
+
+def test_slow_sid_does_not_hold_back_others_and_catches_up(monkeypatch) -> None:
+    monkeypatch.setattr(context_hub, "BACKLOG_SIZE", 4)
+    w = _World()
+    log = w.logs["ctx0"]
+
+    async def scenario():
+        await w.subscribe("fast", "ctx0")
+        await w.subscribe("slow", "ctx0")
+        w.blocked["slow"] = asyncio.Event()
+        for n in range(12):
+            log.log(type="info", content=f"item {n}")
+            await w.wait_for(lambda: len(w.texts("fast")) == n + 1)
+        assert w.texts("slow") == []
+        w.blocked["slow"].set()
+        await w.wait_for(lambda: "item 11" in w.texts("slow"))
+
+    w.run(scenario)
+
+    assert w.texts("fast") == [f"item {n}" for n in range(12)]
+    assert w.hub.stats.catch_ups == 1
+    # the blocked emit finishes, then one coalesced read covers the rest
+    assert w.texts("slow") == ["item 0"] + [f"item {n}" for n in range(1, 12)]
+
+
+def test_queue_and_run_state_signals() -> None:
+    w = _World()
+
+    async def scenario():
+        w.running["ctx0"] = True
+        await w.subscribe("sid", "ctx0")
+        w.queues["ctx0"].append({"id": "q1"})
+        context_signals.emit("ctx0", context_signals.QUEUE)
+        context_signals.emit("ctx0", context_signals.QUEUE)  # coalesced
+        await w.wait_for(lambda: w.received["sid"][-1][1] == context_hub.EVENT_QUEUE)
+        w.running["ctx0"] = False
+        context_signals.emit("ctx0", context_signals.RUN)
+        await w.wait_for(lambda: w.received["sid"][-1][1] == context_hub.EVENT_COMPLETE)
+        w.hub.unsubscribe("sid", "ctx0")
+        context_signals.emit("ctx0", context_signals.QUEUE)
+        await asyncio.sleep(0.05)
+
+    w.run(scenario)
+
+    names = [name for _, name, _ in w.received["sid"]]
+    assert names == [
+        "connector_context_snapshot",
+        context_hub.EVENT_QUEUE,
+        context_hub.EVENT_COMPLETE,
+    ]
+    assert w.received["sid"][1][2]["message_queue"] == [{"id": "q1"}]
+    assert w.hub.stats.reads == 2
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+from flask import Flask, request
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from helpers import admission
+from helpers.api import ApiHandler
+
+
+def _burst(controller, source, count):
+    return [controller.request(source) for _ in range(count)]
+
+
+def _running(tickets):
+    return [ticket for ticket in tickets if ticket.state == admission.RUNNING]
+
+
+def test_global_and_per_source_limits_hold_under_a_burst():
+    controller = admission.AdmissionController(
+        max_runs=4, source_limits={admission.SOURCE_A2A: 2}, queue_size=100
+    )
+
+    a2a = _burst(controller, admission.SOURCE_A2A, 10)
+    mcp = _burst(controller, admission.SOURCE_MCP, 10)
+
+    assert len(_running(a2a)) == 2
+    assert len(_running(mcp)) == 2
+    snapshot = controller.snapshot()
+    assert snapshot["running"] == 4
+    assert snapshot["queued"] == 16
+
+    for ticket in _running(a2a):
+        controller.release(ticket)
+    assert len(_running(a2a)) == 1  # freed slots alternate between sources
+    assert len(_running(mcp)) == 3
+
+    for ticket in _running(mcp):
+        controller.release(ticket)
+    assert len(_running(a2a)) == 2  # the a2a cap still holds
+    assert len(_running(mcp)) == 2
+    assert controller.snapshot()["running"] == 4
+
+
+def test_interactive_runs_jump_ahead_of_background_work():
+    controller = admission.AdmissionController(max_runs=1, queue_size=100)
+    first = controller.request(admission.SOURCE_SCHEDULER)
+    background = _burst(controller, admission.SOURCE_SCHEDULER, 3)
+    remote = controller.request(admission.SOURCE_API)
+    ui = controller.request(admission.SOURCE_UI)
+
+    assert first.granted
+    assert controller.position(ui) == 0
+    assert controller.position(remote) == 1
+
+    controller.release(first)
+    assert ui.granted and not remote.granted
+    controller.release(ui)
+    assert remote.granted
+    assert not _running(background)
+
+
+def test_sources_of_the_same_priority_take_turns():
+    controller = admission.AdmissionController(max_runs=1, queue_size=100)
+    holder = controller.request(admission.SOURCE_UI)
+    a2a = _burst(controller, admission.SOURCE_A2A, 3)
+    mcp = _burst(controller, admission.SOURCE_MCP, 3)
+
+    order = []
+    current = holder
+    for _ in range(6):
+        controller.release(current)
+        current = next(ticket for ticket in a2a + mcp if ticket.state == admission.RUNNING)
+        order.append(current.source)
+
+    assert order == ["a2a", "mcp"] * 3
+
+
+def test_full_queue_rejects_remote_work_with_retry_after_but_not_the_ui():
+    controller = admission.AdmissionController(max_runs=1, queue_size=2)
+    _burst(controller, admission.SOURCE_API, 3)
+
+    with pytest.raises(admission.AdmissionRejected) as rejected:
+        controller.request(admission.SOURCE_MCP)
+
+    assert rejected.value.source == admission.SOURCE_MCP
+    assert rejected.value.queued == 2
+    assert admission.MIN_RETRY_AFTER <= rejected.value.retry_after <= admission.MAX_RETRY_AFTER
+    assert rejected.value.retry_after == controller.retry_after()
+
+    ui = controller.request(admission.SOURCE_UI)
+    assert not ui.granted
+    assert controller.snapshot()["rejected"] == 1
+
+
+def test_cancelled_waiter_gives_up_its_place():
+    controller = admission.AdmissionController(max_runs=1, queue_size=10)
+
+    async def scenario():
+        holder = controller.request(admission.SOURCE_API)
+        leaving = controller.request(admission.SOURCE_API)
+        staying = controller.request(admission.SOURCE_API)
+
+        waiter = asyncio.create_task(controller.wait(leaving))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        assert controller.position(staying) == 0
+        controller.release(holder)
+        await asyncio.wait_for(controller.wait(staying), timeout=1)
+        return leaving, staying
+
+    leaving, staying = asyncio.run(scenario())
+
+    assert leaving.state == admission.DONE
+    assert staying.state == admission.RUNNING
+    assert controller.snapshot()["queued"] == 0
+
+
+def test_admitted_runs_never_exceed_the_limit(monkeypatch):
+    controller = admission.AdmissionController(max_runs=3, queue_size=100)
+    monkeypatch.setattr(admission, "_controller", controller)
+    active = peak = 0
+
+    async def run(source):
+        nonlocal active, peak
+        async with admission.admitted(source):
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    async def burst():
+        sources = [admission.SOURCE_API, admission.SOURCE_A2A, admission.SOURCE_SCHEDULER]
+        await asyncio.gather(*(run(sources[i % 3]) for i in range(30)))
+
+    asyncio.run(burst())
+
+    assert peak == 3
+    assert controller.snapshot()["running"] == 0
+
+
+def test_source_context_attributes_runs():
+    assert admission.current_source() == admission.SOURCE_UI
+    with admission.source(admission.SOURCE_MCP):
+        assert admission.current_source() == admission.SOURCE_MCP
+    assert admission.current_source(admission.SOURCE_BACKGROUND) == admission.SOURCE_BACKGROUND
+
+
+def test_limits_come_from_the_environment(monkeypatch):
+    monkeypatch.setenv(admission.MAX_RUNS_ENV, "6")
+    monkeypatch.setenv("A0_MAX_AGENT_RUNS_A2A", "1")
+    monkeypatch.setenv(admission.QUEUE_SIZE_ENV, "5")
+
+    controller = admission.AdmissionController.from_env()
+
+    assert controller.max_runs == 6
+    assert controller.queue_size == 5
+    assert controller.source_limits[admission.SOURCE_A2A] == 1
+    assert controller.source_limits[admission.SOURCE_MCP] == 3
+    assert controller.source_limits[admission.SOURCE_UI] == 0
+
+
+class BusyHandler(ApiHandler):
+    @classmethod
+    def requires_auth(cls) -> bool:
+        return False
+
+    @classmethod
+    def requires_csrf(cls) -> bool:
+        return False
+
+    async def process(self, input: dict, request) -> dict:
+        raise admission.AdmissionRejected(admission.SOURCE_API, 42, 7)
+
+
+def test_api_handler_answers_a_rejection_with_429():
+    webapp = Flask("test_admission")
+    handler = BusyHandler(webapp, threading.RLock())
+
+    with webapp.test_request_context("/api/busy", method="POST", json={}):
+        response = asyncio.run(handler.handle_request(request))
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "42"
+    assert response.get_json()["retry_after"] == 42
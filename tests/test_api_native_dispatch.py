@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+from flask import Flask
+from flask.sessions import SecureCookieSessionInterface
+from starlette.testclient import TestClient
+from uvicorn.middleware.wsgi import WSGIMiddleware
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from helpers import api as api_module
+from helpers import api_asgi, runtime
+from helpers.api import ApiHandler, register_api_route
+
+
+class NativeEcho(ApiHandler):
+    @classmethod
+    def supports_native_asgi(cls) -> bool:
+        return True
+
+    async def process(self, input: dict, request) -> dict:
+        return {"echo": input.get("value"), "native": not hasattr(request, "environ")}
+
+
+class FlaskEcho(NativeEcho):
+    @classmethod
+    def supports_native_asgi(cls) -> bool:
+        return False
+
+
+class NativeUploadCount(NativeEcho):
+    @classmethod
+    def requires_csrf(cls) -> bool:
+        return False
+
+    async def process(self, input: dict, request) -> dict:
+        uploads = request.files.getlist("files[]")
+        return {
+            "path": request.form.get("path", ""),
+            "files": [(upload.filename, upload.read().decode()) for upload in uploads],
+        }
+
+
+HANDLERS = {
+    "native_echo": NativeEcho,
+    "flask_echo": FlaskEcho,
+    "native_upload": NativeUploadCount,
+}
+
+
+@pytest.fixture
+def app_client(monkeypatch):
+    resolve = HANDLERS.get
+    monkeypatch.setattr(api_module, "resolve_api_handler", resolve)
+    monkeypatch.setattr(api_asgi, "resolve_api_handler", resolve)
+    monkeypatch.setattr("helpers.login.get_credentials_hash", lambda: None)
+
+    webapp = Flask("test_api_native_dispatch")
+    webapp.secret_key = "test-secret"
+    lock = threading.RLock()
+    register_api_route(webapp, lock)
+    app = api_asgi.ApiAsgiDispatcher(webapp, lock, fallback=WSGIMiddleware(webapp))
+    client = TestClient(app)
+
+    serializer = SecureCookieSessionInterface().get_signing_serializer(webapp)
+    client.cookies.set(
+        webapp.config["SESSION_COOKIE_NAME"],
+        serializer.dumps({"csrf_token": "csrf-1"}),
+    )
+    return client
+
+
+def test_native_dispatch_serves_opted_in_handler(app_client) -> None:
+    response = app_client.post(
+        "/api/native_echo",
+        json={"value": 7},
+        headers={"X-CSRF-Token": "csrf-1"},
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"echo": 7, "native": True}
+
+
+def test_native_dispatch_falls_back_to_flask(app_client) -> None:
+    response = app_client.post(
+        "/api/flask_echo",
+        json={"value": 3},
+        headers={"X-CSRF-Token": "csrf-1"},
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"echo": 3, "native": False}
+
+
+def test_native_dispatch_enforces_csrf_like_flask(app_client) -> None:
+    native = app_client.post("/api/native_echo", json={}, headers={"X-CSRF-Token": "bad"})
+    flask = app_client.post("/api/flask_echo", json={}, headers={"X-CSRF-Token": "bad"})
+
+    assert native.status_code == flask.status_code == 403
+
+
+def test_native_dispatch_accepts_csrf_cookie(app_client) -> None:
+    app_client.cookies.set(f"csrf_token_{runtime.get_runtime_id()}", "csrf-1")
+
+    response = app_client.post("/api/native_echo", json={"value": 1})
+
+    assert response.status_code == 200
+
+
+def test_native_dispatch_redirects_unauthenticated(app_client, monkeypatch) -> None:
+    monkeypatch.setattr("helpers.login.get_credentials_hash", lambda: "hash")
+
+    response = app_client.post(
+        "/api/native_echo",
+        json={},
+        headers={"X-CSRF-Token": "csrf-1"},
+        follow_redirects=False,
+    )
+
+    assert response.status_code == 302
+    assert response.headers["location"] == "/login"
+
+
+def test_native_dispatch_rejects_wrong_method(app_client) -> None:
+    response = app_client.get("/api/native_echo")
+
+    assert response.status_code == 405
+
+
+def test_native_dispatch_exposes_multipart_uploads(app_client) -> None:
+    response = app_client.post(
+        "/api/native_upload",
+        data={"path": "docs"},
+        files=[("files[]", ("a.txt", b"alpha")), ("files[]", ("b.txt", b"beta"))],
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "path": "docs",
+        "files": [["a.txt", "alpha"], ["b.txt", "beta"]],
+    }
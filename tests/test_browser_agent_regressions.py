@@ -113,6 +113,7 @@ import plugins._browser.helpers.playwright as browser_playwright_module
 import plugins._browser.hooks as browser_hooks_module
 import plugins._browser.tools.browser as browser_tool_module
 import plugins._browser.api.ws_browser as ws_browser_module
+import plugins._browser.helpers.screencast_hub as screencast_hub_module
 
 
 SMALL_JPEG_10X10 = (
@@ -1075,6 +1076,9 @@ def test_browser_viewer_uses_cdp_screencast_transport():
     runtime = (
         PROJECT_ROOT / "plugins" / "_browser" / "helpers" / "runtime.py"
     ).read_text(encoding="utf-8")
+    hub = (
+        PROJECT_ROOT / "plugins" / "_browser" / "helpers" / "screencast_hub.py"
+    ).read_text(encoding="utf-8")
     browser_store = (
         PROJECT_ROOT / "plugins" / "_browser" / "webui" / "browser-store.js"
     ).read_text(encoding="utf-8")
@@ -1086,9 +1090,15 @@ def test_browser_viewer_uses_cdp_screencast_transport():
     assert "SCREENCAST_QUALITY = 92" in ws_browser
     assert "initial_viewport = self._viewport_from_data(data)" in ws_browser
     assert '"set_viewport"' in ws_browser
-    assert "start_screencast" in ws_browser
-    assert "pop_screencast_frame" in ws_browser
-    assert "stop_screencast" in ws_browser
+    assert "screencast_hub.join(context_id, active_id, sid, viewer_id)" in ws_browser
+    assert '"browser_viewer_frame_ack"' in ws_browser
+    assert "pop_screencast_frame" not in ws_browser
+    assert '"start_screencast"' in hub
+    assert '"read_screencast_frame"' in hub
+    assert '"update_screencast"' in hub
+    assert '"stop_screencast"' in hub
+    assert '"browser_viewer_frame_ack"' in browser_store
+    assert "frameSourceFromImage(data.image, data.mime)" in browser_store
     assert '"Page.startScreencast"' in runtime
     assert '"Page.screencastFrame"' in runtime
     assert '"Page.screencastFrameAck"' in runtime
@@ -1418,6 +1428,62 @@ async def test_browser_screencast_passes_wrong_viewport_frames_to_frontend_valid
     await screencast.stop()
 
 
+def test_browser_screencast_sizes_jpeg_from_header_prefix_only():
+    padded = SMALL_JPEG_10X10 + "A" * 400_000
+
+    assert _BrowserScreencast._jpeg_size(padded) == (10, 10)
+    assert _BrowserScreencast._jpeg_size("not-a-jpeg") is None
+
+
+@pytest.mark.anyio
+async def test_screencast_hub_fans_out_binary_frames_with_latest_frame_wins():
+    hub = screencast_hub_module.ScreencastHub("ctx", 7)
+    hub._task = object()
+    fast = hub.subscribe("fast")
+    slow = hub.subscribe("slow")
+
+    hub.publish({"image": SMALL_JPEG_10X10, "mime": "image/jpeg", "metadata": {}})
+    first_fast = await fast.next_frame()
+    first_slow = await slow.next_frame()
+    fast.mark_sent(first_fast["seq"])
+    slow.mark_sent(first_slow["seq"])
+
+    assert isinstance(first_fast["image"], bytes)
+    assert first_fast["image"][:2] == b"\xff\xd8"
+    assert first_fast["image"] is first_slow["image"]
+
+    hub.publish({"image": SMALL_JPEG_10X10, "metadata": {}})
+    hub.publish({"image": SMALL_JPEG_10X10, "metadata": {}})
+    assert fast.ack(first_fast["seq"]) is True
+    second_fast = await asyncio.wait_for(fast.next_frame(), timeout=0.1)
+
+    assert second_fast["seq"] == 3
+    assert fast.latency is not None
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(slow.next_frame(), timeout=0.05)
+
+    hub._task = None
+    hub.close()
+    assert await slow.next_frame() is None
+
+
+def test_screencast_hub_degrades_profile_after_sustained_ack_latency(monkeypatch):
+    clock = {"now": 100.0}
+    monkeypatch.setattr(screencast_hub_module.time, "monotonic", lambda: clock["now"])
+    hub = screencast_hub_module.ScreencastHub("ctx", 7)
+    subscriber = screencast_hub_module.ScreencastSubscriber(hub, "sid")
+    hub.subscribers["sid"] = subscriber
+
+    subscriber.latency = 0.6
+    hub.latency_changed()
+    assert hub.profile == screencast_hub_module.SCREENCAST_PROFILES[0]
+
+    clock["now"] += screencast_hub_module.PROFILE_SWITCH_SECONDS
+    hub.latency_changed()
+    assert hub.profile == screencast_hub_module.SCREENCAST_PROFILES[-1]
+    assert hub._profile_changed.is_set()
+
+
 def test_browser_docker_installs_full_chromium_to_tmp_cache():
     script = (
         PROJECT_ROOT / "docker" / "run" / "fs" / "ins" / "install_playwright.sh"
@@ -0,0 +1,279 @@
+import asyncio
+import sys
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from agent import Agent, AgentContext, UserMessage
+from helpers.defer import DeferredTask
+from helpers.log import Log
+from tools import call_subordinate
+from tools.call_subordinate import FanOut
+
+
+class FakeAgent:
+    def __init__(self, name: str, log: Log, reply=None, superior=None):
+        self.agent_name = name
+        self.number = 1 if superior else 0
+        self.context = SimpleNamespace(log=log)
+        self.data: dict = {}
+        self.messages: list[str] = []
+        self.topics = 0
+        self.history = SimpleNamespace(new_topic=self._new_topic)
+        self.reply = reply
+        if superior:
+            self.data[Agent.DATA_NAME_SUPERIOR] = superior
+
+    def get_data(self, key):
+        return self.data.get(key)
+
+    def set_data(self, key, value):
+        self.data[key] = value
+
+    def hist_add_user_message(self, message):
+        self.messages.append(getattr(message, "message", message))
+
+    def _new_topic(self):
+        self.topics += 1
+
+    async def monologue(self):
+        return await self.reply(self)
+
+
+def _fan_out(replies, **kwargs):
+    log = Log()
+    superior = FakeAgent("A0", log)
+    fan_out = FanOut(superior, **kwargs)  # type: ignore[arg-type]
+    siblings = []
+    for i, reply in enumerate(replies):
+        sibling = FakeAgent(f"A1.{i + 1}", log, reply, superior)
+        fan_out.add(sibling, f"task {i + 1}", "researcher" if i == 0 else "")  # type: ignore[arg-type]
+        siblings.append(sibling)
+    return superior, fan_out, siblings
+
+
+def test_siblings_run_concurrently_under_the_cap() -> None:
+    running = 0
+    peak = 0
+
+    async def reply(agent):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return f"done {agent.messages[0]}"
+
+    superior, fan_out, siblings = _fan_out([reply] * 5, concurrency=2)
+    result = asyncio.run(fan_out.run())
+
+    assert peak == 2
+    assert result.startswith("## A1.1 (researcher)\ndone task 1\n\n## A1.2\ndone task 2")
+    assert "## A1.5\ndone task 5" in result
+    assert all(s.topics == 1 for s in siblings)
+    assert Agent.DATA_NAME_SUBORDINATES not in superior.data
+    headings = [item.heading for item in fan_out.siblings[0].agent.context.log.logs]
+    assert "icon://communication A0: Subordinate A1.1 (researcher)" in headings
+
+
+def test_sibling_errors_are_reported_without_stopping_the_others() -> None:
+    async def ok(agent):
+        return "fine"
+
+    async def broken(agent):
+        raise RuntimeError("model unavailable")
+
+    _, fan_out, _ = _fan_out([broken, ok])
+    result = asyncio.run(fan_out.run())
+
+    assert "## A1.1 (researcher)\nError: model unavailable" in result
+    assert "## A1.2\nfine" in result
+
+
+def test_shared_token_budget_cancels_running_and_skips_queued() -> None:
+    async def spend(agent):
+        fan_out = FanOut.of(agent)
+        assert fan_out is not None
+        for _ in range(10):
+            fan_out.charge(agent, 100)
+            await asyncio.sleep(0)
+        return "finished"
+
+    _, fan_out, siblings = _fan_out([spend] * 3, concurrency=2, token_budget=250)
+    result = asyncio.run(fan_out.run())
+
+    assert "stopped, shared token budget exhausted" in result
+    assert "## A1.3\nError: skipped, shared token budget exhausted" in result
+    assert "finished" not in result
+    assert siblings[2].messages == []
+    assert fan_out.tokens_used == 300
+
+
+class FakeContext:
+    """Just enough of AgentContext to drive communicate/nudge without extensions."""
+
+    kill_process = AgentContext.kill_process.__wrapped__  # type: ignore[attr-defined]
+    nudge = AgentContext.nudge.__wrapped__  # type: ignore[attr-defined]
+    reset = AgentContext.reset.__wrapped__  # type: ignore[attr-defined]
+    communicate = AgentContext.communicate.__wrapped__  # type: ignore[attr-defined]
+    get_agent = AgentContext.get_agent.__wrapped__  # type: ignore[attr-defined]
+    _drop_fan_outs = AgentContext._drop_fan_outs
+    _process_chain = AgentContext._process_chain.__wrapped__  # type: ignore[attr-defined]
+
+    def __init__(self, agent0, log: Log):
+        self.agent0 = agent0
+        self.config = None
+        self.log = log
+        self.streaming_agent = None
+        self.paused = False
+        self.task: DeferredTask | None = None
+
+    def run_task(self, func, *args):
+        if not self.task:
+            self.task = DeferredTask(thread_name="FanOutTestContext")
+        self.task.start_task(func, *args)
+        return self.task
+
+
+def _interrupted_fan_out(monkeypatch):
+    """A superior whose fan-out has one finished and one running sibling."""
+    runs: dict[str, int] = {}
+    second_started = threading.Event()
+
+    async def reply(agent):
+        runs[agent.agent_name] = runs.get(agent.agent_name, 0) + 1
+        if agent.agent_name == "A1.2" and runs["A1.2"] == 1:
+            second_started.set()
+            await asyncio.sleep(30)
+        return f"result of {agent.agent_name}"
+
+    superior, fan_out, siblings = _fan_out([reply, reply])
+    # registered again by the call_subordinate tool call below
+    superior.data.pop(Agent.DATA_NAME_SUBORDINATES)
+    history: list[tuple[str, str]] = []
+
+    async def superior_monologue():
+        if not history[1:]:
+            # the call_subordinate tool call the nudge interrupts
+            superior.set_data(Agent.DATA_NAME_SUBORDINATES, fan_out)
+            await fan_out.run()
+        return "final"
+
+    superior.monologue = superior_monologue
+    superior.read_prompt = lambda name: "nudge"
+    superior.hist_add_tool_result = lambda tool_name, tool_result: history.append(
+        (tool_name, tool_result)
+    )
+    superior.hist_add_user_message = lambda msg: history.append(
+        ("user", getattr(msg, "message", msg))
+    )
+
+    async def no_extensions(*args, **kwargs):
+        return None
+
+    monkeypatch.setattr(sys.modules["agent"].extension, "call_extensions_async", no_extensions)
+    context = FakeContext(superior, superior.context.log)
+    context.communicate(UserMessage(message="go"))
+    assert second_started.wait(5)
+    # the superior stays the streaming agent while its siblings run
+    context.streaming_agent = superior
+    return context, superior, fan_out, history, runs
+
+
+def test_nudge_resumes_the_interrupted_fan_out(monkeypatch) -> None:
+    context, superior, fan_out, history, runs = _interrupted_fan_out(monkeypatch)
+    try:
+        task = context.nudge()
+
+        assert task.result_sync(timeout=5) == "final"
+        assert runs == {"A1.1": 1, "A1.2": 2}
+        assert [entry[0] for entry in history] == ["user", "call_subordinate", "user"]
+        assert "## A1.1 (researcher)\nresult of A1.1" in history[1][1]
+        assert "## A1.2\nresult of A1.2" in history[1][1]
+        assert history[2] == ("user", "nudge")
+        assert Agent.DATA_NAME_SUBORDINATES not in superior.data
+    finally:
+        context.task.kill(terminate_thread=True)  # type: ignore[union-attr]
+
+
+def test_reset_drops_the_interrupted_fan_out(monkeypatch) -> None:
+    context, superior, fan_out, history, runs = _interrupted_fan_out(monkeypatch)
+    try:
+        class FreshAgent(Agent):
+            def __init__(self, *args):
+                self.data = {}
+
+        monkeypatch.setattr(sys.modules["agent"], "Agent", FreshAgent)
+        context.reset()
+
+        assert Agent.DATA_NAME_SUBORDINATES not in superior.data
+        assert context.agent0 is not superior
+        assert runs == {"A1.1": 1, "A1.2": 1}
+    finally:
+        context.task.kill(terminate_thread=True)  # type: ignore[union-attr]
+
+
+def test_interventions_reach_the_superior_while_siblings_run() -> None:
+    superior_seen: list = []
+
+    async def reply(agent):
+        # what Agent.monologue does at the start of every message loop
+        agent.context.streaming_agent = Agent.streaming_target(agent)  # type: ignore[arg-type]
+        superior_seen.append(agent.context.streaming_agent)
+        await asyncio.sleep(0.01)
+        return "done"
+
+    superior, fan_out, siblings = _fan_out([reply] * 3)
+    context = SimpleNamespace(
+        log=superior.context.log,
+        streaming_agent=superior,
+        agent0=superior,
+        paused=False,
+        task=SimpleNamespace(is_alive=lambda: True),
+    )
+    context.get_agent = lambda: context.streaming_agent or context.agent0
+    for agent in [superior, *siblings]:
+        agent.context = context
+        agent.intervention = None
+    communicate = AgentContext.communicate.__wrapped__  # type: ignore[attr-defined]
+
+    async def run():
+        running = asyncio.create_task(fan_out.run())
+        await asyncio.sleep(0.005)
+        communicate(context, "stop")
+        return await running
+
+    asyncio.run(run())
+
+    assert superior_seen == [superior] * 3
+    assert superior.intervention == "stop"
+    assert all(s.intervention is None for s in siblings)
+    assert context.streaming_agent is superior
+    # once the fan-out is over a subordinate streams as itself again
+    assert Agent.streaming_target(siblings[0]) is siblings[0]  # type: ignore[arg-type]
+
+
+def test_fan_out_tasks_from_messages_or_profiles() -> None:
+    assert call_subordinate._fan_out_tasks("", {}) == []
+    assert call_subordinate._fan_out_tasks(
+        "", {"messages": ["a", {"message": "b", "profile": "coder"}], "profile": "r"}
+    ) == [("a", "r"), ("b", "coder")]
+    assert call_subordinate._fan_out_tasks(
+        "compare", {"profiles": ["researcher", "coder"]}
+    ) == [("compare", "researcher"), ("compare", "coder")]
+
+
+def test_fan_out_options_come_back_as_a_hint() -> None:
+    tool = object.__new__(call_subordinate.Delegation)
+    tool.agent = SimpleNamespace(read_prompt=lambda name: name)  # type: ignore[assignment]
+    long_result = "x" * call_subordinate.save_tool_call_file.LEN_MIN
+
+    assert tool.hint("short") is None
+    assert tool.hint("short", fan_out=True) == {"hint": "fw.hint.call_sub_fan_out.md"}
+    assert tool.hint(long_result, fan_out=True) == {
+        "hint": "fw.hint.call_sub_fan_out.md\nfw.hint.call_sub.md"
+    }
@@ -1,5 +1,7 @@
+import asyncio
 import sys
 from pathlib import Path
+from types import SimpleNamespace
 
 import pytest
 
@@ -87,3 +89,97 @@ async def test_large_compaction_does_not_send_unsplit_single_line_payload(monkey
     assert len(chunk_messages) > 2
     assert all(chunk_messages)
     assert all(len(message) <= 10_000 for message in chunk_messages)
+
+
+class _SlowModel:
+    """Returns ``reply(user_message)`` after a short delay, tracking concurrency."""
+
+    def __init__(self, reply, fail_after: int | None = None):
+        self.reply = reply
+        self.fail_after = fail_after
+        self.user_messages = []
+        self.running = 0
+        self.peak = 0
+
+    async def unified_call(self, system_message, user_message, response_callback=None):
+        if self.fail_after is not None and len(self.user_messages) >= self.fail_after:
+            raise RuntimeError("model went away")
+        self.user_messages.append(user_message)
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        text = self.reply(user_message)
+        if response_callback:
+            await response_callback(text, text)
+        return text, None
+
+
+@pytest.mark.asyncio
+async def test_map_phase_runs_chunks_concurrently_under_the_cap(monkeypatch):
+    monkeypatch.setattr(
+        compactor.tokens, "approximate_tokens", lambda text: len(text or "")
+    )
+    model = _SlowModel(lambda message: "s")
+    log = _FakeLog()
+
+    await compactor._compact_large_history(
+        _FakeAgent(), "x" * 85_000, 85_000, 10_000, log, model, concurrency=3
+    )
+
+    assert model.peak == 3
+    assert len(model.user_messages) > 4
+    assert any("- part 1: summarizing (1 chars)" in u["content"] for u in log.updates)
+
+
+@pytest.mark.asyncio
+async def test_oversized_part_summaries_are_tree_reduced(monkeypatch):
+    monkeypatch.setattr(
+        compactor.tokens, "approximate_tokens", lambda text: len(text or "")
+    )
+    # every summary is a third of the window, so parts need merging first
+    model = _SlowModel(lambda message: "s" * 3_000)
+
+    await compactor._compact_large_history(
+        _FakeAgent(), "x" * 85_000, 85_000, 10_000, _FakeLog(), model
+    )
+
+    merges = [m for m in model.user_messages if m.startswith(compactor.COMPACTION_PARTS_PREFIX)]
+    assert len(merges) > 2
+    assert all(len(m) <= 10_000 for m in model.user_messages)
+
+
+@pytest.mark.asyncio
+async def test_interrupted_compaction_resumes_from_progress(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        compactor.tokens, "approximate_tokens", lambda text: len(text or "")
+    )
+    monkeypatch.setattr(compactor, "get_chat_folder_path", lambda ctxid: str(tmp_path))
+    monkeypatch.setattr(compactor, "export_json_chat", lambda context: "{}")
+    context = SimpleNamespace(id="ctx")
+    text = "".join(f"{i:07d} " for i in range(10_625))
+
+    backup = compactor._start_progress(
+        compactor._save_pre_compaction_backup(context, text), text
+    )
+    failing = _SlowModel(lambda message: "s", fail_after=4)
+    with pytest.raises(RuntimeError):
+        await compactor._compact_large_history(
+            _FakeAgent(), text, len(text), 10_000, _FakeLog(), failing,
+            concurrency=1, progress_path=backup["progress"],
+        )
+
+    assert compactor._find_resumable_backup(context, text) == backup
+    assert compactor._find_resumable_backup(context, text + "more") is None
+
+    model = _SlowModel(lambda message: "s")
+    await compactor._compact_large_history(
+        _FakeAgent(), text, len(text), 10_000, _FakeLog(), model,
+        progress_path=backup["progress"],
+    )
+    fresh = _SlowModel(lambda message: "s")
+    await compactor._compact_large_history(
+        _FakeAgent(), text, len(text), 10_000, _FakeLog(), fresh
+    )
+
+    assert len(model.user_messages) == len(fresh.user_messages) - 4
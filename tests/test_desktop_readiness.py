@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from plugins._desktop.helpers import desktop_readiness, desktop_session
+
+
+class FakeProcess:
+    pid = 0
+
+    def __init__(self):
+        self.returncode = None
+
+    def poll(self):
+        return self.returncode
+
+    def terminate(self):
+        self.returncode = 0
+
+    def wait(self, timeout=None):
+        return 0
+
+    def kill(self):
+        self.returncode = 0
+
+
+def _spy(script: str) -> list[str]:
+    return [sys.executable, "-u", "-c", f"import time\n{script}"]
+
+
+def test_window_events_wake_waiters_on_the_event_not_the_recheck_interval():
+    events = desktop_readiness.WindowEvents(_spy("time.sleep(0.3); print('mapped'); time.sleep(30)"))
+    mapped_at = time.monotonic() + 0.3
+    assert events.start()
+    try:
+        started = time.monotonic()
+        window = events.wait(lambda: "0x42" if time.monotonic() >= mapped_at else "", timeout=10)
+        elapsed = time.monotonic() - started
+    finally:
+        events.close()
+
+    assert window == "0x42"
+    assert elapsed < desktop_readiness.EVENT_RECHECK_SECONDS / 2 + 0.3
+    assert not events.listening
+
+
+def test_window_events_fall_back_to_polling_without_xprop():
+    events = desktop_readiness.WindowEvents(None)
+    calls = []
+
+    assert not events.start()
+    result = events.wait(lambda: calls.append(1) or len(calls) >= 3, timeout=5)
+
+    assert result is True
+    assert len(calls) == 3
+    assert events.wait(lambda: "", timeout=0.1) == ""
+
+
+def test_wait_for_file_change_sees_an_atomic_save(tmp_path):
+    path = tmp_path / "report.odt"
+    path.write_bytes(b"v1")
+    before = desktop_readiness.file_signature(path)
+
+    def save():
+        time.sleep(0.2)
+        temp = tmp_path / "lu123.tmp"
+        temp.write_bytes(b"v2 longer")
+        os.replace(temp, path)
+
+    threading.Thread(target=save).start()
+    started = time.monotonic()
+    assert desktop_readiness.wait_for_file_change(path, before, timeout=5)
+    assert time.monotonic() - started < 1
+    assert path.read_bytes() == b"v2 longer"
+    assert not desktop_readiness.wait_for_file_change(path, desktop_readiness.file_signature(path), timeout=0.1)
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    monkeypatch.setattr(desktop_session, "STATE_DIR", tmp_path / "desktop")
+    monkeypatch.setattr(desktop_session, "SESSION_DIR", tmp_path / "desktop" / "sessions")
+    monkeypatch.setattr(desktop_session, "PROFILE_DIR", tmp_path / "desktop" / "profiles")
+    monkeypatch.setattr(desktop_session, "collect_desktop_status", lambda: {"healthy": True, "message": "ok"})
+    monkeypatch.setattr(desktop_session, "_port_is_free", lambda port: True)
+    monkeypatch.setattr(desktop_session.document_store, "document_binary_home", lambda: tmp_path)
+    monkeypatch.delenv(desktop_session.WARM_POOL_ENV, raising=False)
+    for name in (
+        "_prepare_profile",
+        "_prepare_desktop_launchers",
+        "_prepare_desktop_url_bridge",
+        "_refresh_xfce_desktop",
+        "_register_virtual_desktop",
+    ):
+        monkeypatch.setattr(desktop_session.DesktopSessionManager, name, lambda self, session: None)
+
+    spawned = []
+
+    def fake_spawn(self, session):
+        time.sleep(0.4)
+        session.processes["xpra"] = FakeProcess()
+        spawned.append(session.display)
+
+    def fake_open_document(self, session, doc):
+        time.sleep(0.4)
+        with self._lock:
+            session.processes[f"soffice-{doc['file_id']}"] = FakeProcess()
+
+    monkeypatch.setattr(desktop_session.DesktopSessionManager, "_spawn_desktop", fake_spawn)
+    monkeypatch.setattr(desktop_session.DesktopSessionManager, "_open_document", fake_open_document)
+    manager = desktop_session.DesktopSessionManager()
+    manager.spawned = spawned
+    yield manager
+    manager.shutdown()
+
+
+def _doc(tmp_path, name):
+    return {
+        "file_id": name,
+        "extension": "odt",
+        "path": str(tmp_path / f"{name}.odt"),
+        "basename": f"{name}.odt",
+    }
+
+
+def _run_concurrently(*calls):
+    results = [None] * len(calls)
+
+    def run(index, call):
+        results[index] = call()
+
+    threads = [threading.Thread(target=run, args=(index, call)) for index, call in enumerate(calls)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, time.monotonic() - started
+
+
+def test_concurrent_opens_share_one_spawn_and_do_not_serialize(manager, tmp_path):
+    results, elapsed = _run_concurrently(
+        lambda: manager.open(_doc(tmp_path, "alpha")),
+        lambda: manager.open(_doc(tmp_path, "beta")),
+        lambda: manager.open(_doc(tmp_path, "gamma")),
+    )
+
+    assert all(result["available"] for result in results)
+    assert {result["session_id"] for result in results} == {desktop_session.SYSTEM_SESSION_ID}
+    assert manager.spawned == [desktop_session.DISPLAY_BASE]
+    assert elapsed < 0.4 + 0.4 * 2  # one spawn, then the three opens overlap
+
+    _results, elapsed = _run_concurrently(
+        lambda: manager.open(_doc(tmp_path, "alpha")),
+        lambda: manager.open(_doc(tmp_path, "beta")),
+    )
+    assert elapsed < 0.4 * 2
+
+
+def test_failed_spawn_is_reported_to_every_waiter(manager, tmp_path, monkeypatch):
+    def broken_spawn(self, session):
+        time.sleep(0.2)
+        raise RuntimeError("Xvfb exited")
+
+    monkeypatch.setattr(desktop_session.DesktopSessionManager, "_spawn_desktop", broken_spawn)
+
+    results, _elapsed = _run_concurrently(
+        lambda: manager.open(_doc(tmp_path, "alpha")),
+        lambda: manager.open(_doc(tmp_path, "beta")),
+    )
+
+    assert [result["error"] for result in results] == ["Xvfb exited", "Xvfb exited"]
+    assert not manager._reserved
+    assert manager._system_start is None
+
+
+def _wait_for_warm(manager):
+    deadline = time.monotonic() + 5
+    while not manager._warm and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+
+def test_warm_pool_hands_out_a_ready_desktop_and_refills_after_shutdown(manager, tmp_path, monkeypatch):
+    monkeypatch.setenv(desktop_session.WARM_POOL_ENV, "3")
+
+    assert manager.fill_warm_pool() == 1  # one warm desktop per system profile
+    assert manager.fill_warm_pool() == 0
+    warm = manager._warm[0]
+    warm_manifest = desktop_session.SESSION_DIR / f"{warm.session_id}.json"
+    assert warm.session_id.startswith(desktop_session.WARM_SESSION_PREFIX)
+    assert warm.profile_dir == desktop_session.PROFILE_DIR / desktop_session.SYSTEM_SESSION_ID
+    assert warm_manifest.exists()
+
+    started = time.monotonic()
+    desktop = manager.ensure_system_desktop()
+    assert time.monotonic() - started < 0.2
+    assert desktop["session_id"] == desktop_session.SYSTEM_SESSION_ID
+    assert desktop["display"] == f":{warm.display}"
+    assert manager.get(desktop_session.SYSTEM_SESSION_ID) is warm
+    assert not warm_manifest.exists()
+
+    # no second desktop on the live system profile
+    assert manager.fill_warm_pool() == 0
+    assert not manager._warm
+    assert len(manager.spawned) == 1
+
+    manager.shutdown_system_desktop(save_first=False)
+    _wait_for_warm(manager)
+    assert len(manager._warm) == 1
+    assert len(manager.spawned) == 2
+
+
+def test_system_desktop_claims_a_warm_desktop_that_is_still_starting(manager, tmp_path, monkeypatch):
+    monkeypatch.setenv(desktop_session.WARM_POOL_ENV, "1")
+    filler = threading.Thread(target=manager.fill_warm_pool)
+    filler.start()
+    time.sleep(0.1)
+
+    desktop = manager.ensure_system_desktop()
+    filler.join()
+
+    assert desktop["session_id"] == desktop_session.SYSTEM_SESSION_ID
+    assert manager.spawned == [desktop_session.DISPLAY_BASE]
+    assert not manager._warm
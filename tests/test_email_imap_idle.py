@@ -0,0 +1,284 @@
+import asyncio
+import re
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from plugins._email_integration.helpers import imap_idle
+from plugins._email_integration.helpers.imap_client import open_imap
+
+
+class StubImapServer:
+    """Just enough IMAP4rev1 (+IDLE) over a local socket for IMAPClient."""
+
+    def __init__(self, idle: bool = True, uidvalidity: int = 7):
+        self.idle = idle
+        self.uidvalidity = uidvalidity
+        self.messages: list[dict] = []  # {"uid", "raw", "seen"}
+        self.fetches: list[tuple[str, list[int]]] = []
+        self.logins = 0
+        self._next_uid = 1
+        self._idlers: list[socket.socket] = []
+        self._lock = threading.Lock()
+        self._sock = socket.create_server(("127.0.0.1", 0))
+        self.port = self._sock.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def append(self, sender: str, subject: str, body: str = "Hello") -> int:
+        raw = (
+            f"From: {sender}\r\nSubject: {subject}\r\nMessage-ID: <{subject}@stub>\r\n"
+            f"Content-Type: text/plain\r\n\r\n{body}\r\n"
+        ).encode()
+        with self._lock:
+            uid = self._next_uid
+            self._next_uid += 1
+            self.messages.append({"uid": uid, "raw": raw, "seen": False})
+            for conn in self._idlers:
+                conn.sendall(f"* {len(self.messages)} EXISTS\r\n".encode())
+        return uid
+
+    def body_fetches(self) -> list[int]:
+        return [uid for kind, uids in self.fetches if kind == "body" for uid in uids]
+
+    def close(self) -> None:
+        self._sock.close()
+
+    # -- protocol --------------------------------------------------------------
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn: socket.socket) -> None:
+        reader = conn.makefile("rb")
+        conn.sendall(b"* OK stub ready\r\n")
+        reported = 0
+        try:
+            for line in reader:
+                tag, _, rest = line.decode().strip().partition(" ")
+                command = rest.upper()
+                out: list[bytes] = []
+                if command.startswith("CAPABILITY"):
+                    caps = "IMAP4rev1 IDLE" if self.idle else "IMAP4rev1"
+                    out.append(f"* CAPABILITY {caps}\r\n".encode())
+                elif command.startswith("LOGIN"):
+                    self.logins += 1
+                elif command.startswith("SELECT"):
+                    with self._lock:
+                        reported = len(self.messages)
+                        out += [
+                            f"* {reported} EXISTS\r\n".encode(),
+                            f"* OK [UIDVALIDITY {self.uidvalidity}] ok\r\n".encode(),
+                            f"* OK [UIDNEXT {self._next_uid}] ok\r\n".encode(),
+                        ]
+                elif command.startswith("UID SEARCH"):
+                    out.append(self._search(rest))
+                elif command.startswith("UID FETCH"):
+                    out += self._fetch(rest)
+                elif command.startswith("UID STORE"):
+                    uids = self._uids(rest.split()[2])
+                    with self._lock:
+                        for msg in self.messages:
+                            if msg["uid"] in uids:
+                                msg["seen"] = True
+                elif command == "IDLE":
+                    with self._lock:
+                        conn.sendall(b"+ idling\r\n")
+                        self._idlers.append(conn)
+                    reader.readline()  # DONE
+                    with self._lock:
+                        self._idlers.remove(conn)
+                elif command == "NOOP":
+                    with self._lock:
+                        if len(self.messages) != reported:
+                            reported = len(self.messages)
+                            out.append(f"* {reported} EXISTS\r\n".encode())
+                elif command == "LOGOUT":
+                    conn.sendall(b"* BYE\r\n" + f"{tag} OK done\r\n".encode())
+                    return
+                conn.sendall(b"".join(out) + f"{tag} OK done\r\n".encode())
+        except OSError:
+            pass
+        finally:
+            conn.close()
+
+    def _uids(self, spec: str) -> set[int]:
+        highest = max((m["uid"] for m in self.messages), default=0)
+        result: set[int] = set()
+        for part in spec.split(","):
+            low, _, high = part.partition(":")
+            start = highest if low == "*" else int(low)
+            end = start if not high else (highest if high == "*" else int(high))
+            result.update(range(min(start, end), max(start, end) + 1))
+        return result
+
+    def _search(self, rest: str) -> bytes:
+        spec = re.search(r"UID (\S+)", rest[len("UID SEARCH"):]).group(1)
+        with self._lock:
+            uids = self._uids(spec)
+            found = [m["uid"] for m in self.messages if m["uid"] in uids and not m["seen"]]
+        return ("* SEARCH " + " ".join(map(str, found))).rstrip().encode() + b"\r\n"
+
+    def _fetch(self, rest: str) -> list[bytes]:
+        uids = self._uids(rest.split()[2])
+        header = "HEADER.FIELDS" in rest.upper()
+        out = []
+        with self._lock:
+            matched = [m for m in self.messages if m["uid"] in uids]
+            self.fetches.append(("header" if header else "body", [m["uid"] for m in matched]))
+            for seq, msg in enumerate(self.messages, start=1):
+                if msg not in matched:
+                    continue
+                if header:
+                    data = msg["raw"].split(b"\r\n\r\n")[0] + b"\r\n\r\n"
+                    key = "BODY[HEADER.FIELDS (FROM SUBJECT MESSAGE-ID IN-REPLY-TO REFERENCES)]"
+                else:
+                    data, key = msg["raw"], "BODY[]"
+                out.append(
+                    f"* {seq} FETCH (UID {msg['uid']} {key} {{{len(data)}}}\r\n".encode()
+                    + data + b")\r\n"
+                )
+        return out
+
+
+@pytest.fixture
+def server():
+    stub = StubImapServer()
+    yield stub
+    stub.close()
+
+
+class _Harness:
+    def __init__(self, server: StubImapServer, state=None, **kwargs):
+        self.deliveries: list[tuple[float, list, int]] = []
+        self.server = server
+
+        async def on_messages(messages, mailbox):
+            self.deliveries.append((time.monotonic(), messages, mailbox.last_uid))
+
+        self.ingestor = imap_idle.ImapIngestor(
+            connect=lambda: open_imap("127.0.0.1", port=server.port, ssl=False, timeout=5),
+            state=state or imap_idle.MailboxState(),
+            on_messages=on_messages,
+            download_folder="usr/email/attachments",
+            name="stub",
+            **kwargs,
+        )
+
+    def messages(self) -> list:
+        return [msg for _, batch, _ in self.deliveries for msg in batch]
+
+    async def wait_for(self, predicate, timeout: float = 5.0) -> None:
+        deadline = time.monotonic() + timeout
+        while not predicate():
+            assert time.monotonic() < deadline, "timed out"
+            await asyncio.sleep(0.01)
+
+
+def _run(scenario) -> None:
+    async def main():
+        await asyncio.wait_for(scenario(), 20)
+
+    asyncio.run(main())
+
+
+def test_idle_delivers_new_mail_within_a_second_with_one_fetch_each(server) -> None:
+    old = server.append("alice@example.com", "before-start")
+    harness = _Harness(server, state=imap_idle.MailboxState(uidvalidity=7, last_uid=old))
+
+    async def scenario():
+        task = asyncio.create_task(harness.ingestor.run())
+        await harness.wait_for(lambda: server._idlers)
+        latencies = []
+        for i in range(3):
+            sent = time.monotonic()
+            server.append("bob@example.com", f"news-{i}")
+            await harness.wait_for(lambda: len(harness.messages()) == i + 1)
+            latencies.append(harness.deliveries[-1][0] - sent)
+            await harness.wait_for(lambda: server._idlers)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return latencies
+
+    latencies = asyncio.run(asyncio.wait_for(scenario(), 20))
+
+    assert max(latencies) < 1.0
+    assert [m.subject for m in harness.messages()] == ["news-0", "news-1", "news-2"]
+    assert harness.messages()[0].body == "Hello"
+    assert server.body_fetches() == [2, 3, 4]  # exactly one body fetch per message
+    assert server.logins == 1  # one connection for the whole session
+    assert harness.deliveries[-1][2] == 4
+
+
+def test_bodies_are_fetched_only_for_wanted_senders(server) -> None:
+    harness = _Harness(server, sender_whitelist=["*@company.com"])
+
+    async def scenario():
+        task = asyncio.create_task(harness.ingestor.run())
+        await harness.wait_for(lambda: server._idlers)
+        server.append("no-reply@company.com", "receipt")
+        server.append("stranger@elsewhere.org", "spam")
+        server.append("Boss <boss@company.com>", "task")
+        await harness.wait_for(lambda: harness.messages())
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    _run(scenario)
+
+    assert [m.subject for m in harness.messages()] == ["task"]
+    assert server.body_fetches() == [3]
+    assert harness.ingestor.stats.filtered == 2
+    assert all(m["seen"] for m in server.messages)
+
+
+def test_noop_fallback_without_idle(server) -> None:
+    server.idle = False
+    harness = _Harness(server, poll_interval=lambda: 0.05)
+
+    async def scenario():
+        task = asyncio.create_task(harness.ingestor.run())
+        await harness.wait_for(lambda: harness.ingestor._client is not None)
+        server.append("carol@example.com", "polled")
+        await harness.wait_for(lambda: harness.messages())
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    _run(scenario)
+
+    assert not harness.ingestor.idle_supported
+    assert [m.subject for m in harness.messages()] == ["polled"]
+    assert server.body_fetches() == [1]
+
+
+def test_uidvalidity_change_skips_the_old_generation(server, monkeypatch) -> None:
+    warnings: list[str] = []
+    monkeypatch.setattr(imap_idle.PrintStyle, "warning", lambda *args, **kwargs: warnings.append(args[0]))
+    for i in range(3):
+        server.append("dave@example.com", f"old-{i}")
+    harness = _Harness(server, state=imap_idle.MailboxState(uidvalidity=1, last_uid=1))
+
+    async def scenario():
+        task = asyncio.create_task(harness.ingestor.run())
+        await harness.wait_for(lambda: harness.deliveries)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    _run(scenario)
+
+    # only the state moved on: nothing from the old UID generation is fetched
+    assert harness.messages() == []
+    assert harness.ingestor.state == imap_idle.MailboxState(uidvalidity=7, last_uid=3)
+    assert server.fetches == []
+    assert warnings == ["Email (stub): UIDVALIDITY changed, tracking from UID 3"]
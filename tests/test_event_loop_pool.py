@@ -0,0 +1,143 @@
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from helpers import defer
+
+
+def test_hash_assignment_is_sticky_and_spreads_keys() -> None:
+    pool = defer.EventLoopPool("TestHashPool", size=4)
+
+    names = {key: pool.assign(key) for key in (f"ctx{i}" for i in range(32))}
+
+    assert all(pool.assign(key) == name for key, name in names.items())
+    assert len(set(names.values())) > 1
+    assert set(names.values()) <= {f"TestHashPool-{i}" for i in range(4)}
+
+
+def test_least_load_assignment_fills_emptiest_loop() -> None:
+    pool = defer.EventLoopPool("TestLoadPool", size=3, assignment=defer.ASSIGN_LEAST_LOAD)
+
+    assert [pool.assign(k) for k in ("a", "b", "c", "d")] == [
+        "TestLoadPool-0",
+        "TestLoadPool-1",
+        "TestLoadPool-2",
+        "TestLoadPool-0",
+    ]
+    pool.release("b")
+    assert pool.assign("e") == "TestLoadPool-1"
+
+
+def test_single_loop_pool_keeps_plain_thread_name() -> None:
+    pool = defer.EventLoopPool("AgentContextTest", size=1)
+
+    assert pool.assign("x") == "AgentContextTest"
+
+
+def test_pool_size_and_assignment_come_from_env(monkeypatch) -> None:
+    monkeypatch.setenv(defer.LOOP_POOL_SIZE_ENV, "3")
+    monkeypatch.setenv(defer.LOOP_ASSIGNMENT_ENV, "least_load")
+    monkeypatch.setattr(defer.EventLoopPool, "_instances", {})
+
+    pool = defer.EventLoopPool.get("TestEnvPool")
+
+    assert (pool.size, pool.assignment) == (3, defer.ASSIGN_LEAST_LOAD)
+    assert defer.EventLoopPool.get("TestEnvPool") is pool
+
+
+def test_pool_defaults_to_one_loop(monkeypatch) -> None:
+    monkeypatch.delenv(defer.LOOP_POOL_SIZE_ENV, raising=False)
+    monkeypatch.setattr(defer.EventLoopPool, "_instances", {})
+
+    pool = defer.EventLoopPool.get("TestDefaultPool")
+
+    assert pool.assign("a") == pool.assign("b") == "TestDefaultPool"
+
+
+def test_loop_safe_lock_excludes_across_pool_loops() -> None:
+    pool = defer.EventLoopPool("TestLockPool", size=2, assignment=defer.ASSIGN_LEAST_LOAD)
+    lock = defer.LoopSafeLock()
+    inside: list[int] = []
+    overlaps: list[int] = []
+
+    async def critical(worker: int):
+        for _ in range(20):
+            async with lock:
+                inside.append(worker)
+                if len(inside) > 1:
+                    overlaps.append(worker)
+                await asyncio.sleep(0.001)
+                inside.remove(worker)
+        return worker
+
+    tasks = [defer.DeferredTask(thread_name=pool.assign(f"ctx{i}")) for i in range(2)]
+    try:
+        for index, task in enumerate(tasks):
+            task.start_task(critical, index)
+        assert sorted(task.result_sync(timeout=5) for task in tasks) == [0, 1]
+        assert overlaps == []
+        assert not lock.locked()
+    finally:
+        for task in tasks:
+            task.kill(terminate_thread=True)
+
+
+@pytest.mark.asyncio
+async def test_loop_safe_lock_skips_cancelled_waiters() -> None:
+    lock = defer.LoopSafeLock()
+    await lock.acquire()
+    waiter = asyncio.ensure_future(lock.acquire())
+    await asyncio.sleep(0)
+
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+    lock.release()
+
+    assert not lock.locked()
+    async with lock:
+        assert lock.locked()
+
+
+def test_blocked_loop_does_not_stall_its_neighbour() -> None:
+    pool = defer.EventLoopPool("TestBlockPool", size=2, assignment=defer.ASSIGN_LEAST_LOAD)
+    release = threading.Event()
+
+    async def block():
+        release.wait(5)
+
+    async def quick():
+        return "done"
+
+    blocked = defer.DeferredTask(thread_name=pool.assign("slow"))
+    free = defer.DeferredTask(thread_name=pool.assign("fast"))
+    try:
+        blocked.start_task(block)
+        time.sleep(0.05)
+        assert free.start_task(quick).result_sync(timeout=2) == "done"
+
+        loops = asyncio.run(pool.diagnostics(timeout=0.2))
+        by_name = {loop["name"]: loop for loop in loops}
+        assert by_name["TestBlockPool-0"]["lag_ms"] is None
+        assert by_name["TestBlockPool-0"]["contexts"] == 1
+        assert by_name["TestBlockPool-1"]["lag_ms"] is not None
+    finally:
+        release.set()
+        blocked.kill(terminate_thread=True)
+        free.kill(terminate_thread=True)
+
+
+@pytest.mark.asyncio
+async def test_run_cpu_bound_defaults_to_worker_thread(monkeypatch) -> None:
+    monkeypatch.delenv(defer.CPU_WORKERS_ENV, raising=False)
+
+    name = await defer.run_cpu_bound(lambda: threading.current_thread().name)
+
+    assert name != threading.current_thread().name
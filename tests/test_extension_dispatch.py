@@ -0,0 +1,129 @@
+import gc
+import sys
+import weakref
+from pathlib import Path
+from types import SimpleNamespace
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from helpers import extension
+
+
+def test_empty_extension_points_are_looked_up_once(monkeypatch) -> None:
+    lookups: list[str] = []
+
+    def classes(point, agent=None, **kwargs):
+        lookups.append(point)
+        return []
+
+    monkeypatch.setattr(extension, "_get_extension_classes", classes)
+    extension.cache.clear("*(extensions)*")
+
+    def bare(value: int) -> int:
+        return value + 1
+
+    wrapped = extension.extensible(bare)
+    results = [wrapped(i) for i in range(100)]
+
+    assert results == list(range(1, 101))
+    assert len(lookups) == 2  # the start and end point, then table hits
+    extension.cache.clear("*(extensions)*")
+
+
+def test_only_extension_areas_invalidate_the_tables(monkeypatch) -> None:
+    lookups: list[str] = []
+
+    def classes(point, agent=None, **kwargs):
+        lookups.append(point)
+        return []
+
+    monkeypatch.setattr(extension, "_get_extension_classes", classes)
+    extension.cache.clear("*(extensions)*")
+
+    extension.call_extensions_sync("dispatch_test")
+    extension.cache.add("dispatch_test_area", "old", 1)
+    extension.cache.trim_cache("dispatch_test_area", seconds=-1)
+    extension.cache.clear("*(plugins)*")
+    extension.call_extensions_sync("dispatch_test")
+    assert lookups == ["dispatch_test"]
+
+    extension.cache.clear(extension._CLASSES_CACHE_AREA)
+    extension.call_extensions_sync("dispatch_test")
+    assert lookups == ["dispatch_test", "dispatch_test"]
+    extension.cache.clear("*(extensions)*")
+
+
+def test_instances_are_reused_until_cache_generation_changes(monkeypatch) -> None:
+    created: list[object] = []
+    calls: list[int] = []
+
+    class Counting(extension.Extension):
+        def __init__(self, agent=None, **kwargs):
+            super().__init__(agent, **kwargs)
+            created.append(self)
+
+        def execute(self, value: int = 0, **kwargs):
+            calls.append(value)
+
+    monkeypatch.setattr(
+        extension, "_get_extension_classes", lambda point, agent=None, **kw: [Counting]
+    )
+    extension.cache.clear("*(extensions)*")
+
+    extension.call_extensions_sync("dispatch_test", value=1)
+    extension.call_extensions_sync("dispatch_test", value=2)
+    assert len(created) == 1 and calls == [1, 2]
+
+    extension.cache.clear("*(extensions)*")
+    extension.call_extensions_sync("dispatch_test", value=3)
+    assert len(created) == 2 and calls == [1, 2, 3]
+    extension.cache.clear("*(extensions)*")
+
+
+def test_registered_points_still_wrap_the_function(monkeypatch) -> None:
+    class ShortCircuit(extension.Extension):
+        def execute(self, data: dict, **kwargs):
+            data["result"] = "from extension"
+
+    def classes(point, agent=None, **kwargs):
+        return [ShortCircuit] if point.endswith("start") else []
+
+    monkeypatch.setattr(extension, "_get_extension_classes", classes)
+    extension.cache.clear("*(extensions)*")
+
+    @extension.extensible
+    def hooked() -> str:
+        return "original"
+
+    assert hooked() == "from extension"
+    extension.cache.clear("*(extensions)*")
+
+
+def test_dispatch_tables_do_not_keep_agents_alive(monkeypatch) -> None:
+    class Noop(extension.Extension):
+        def execute(self, **kwargs):
+            pass
+
+    class StubAgent:
+        config = SimpleNamespace(profile="default")
+        context = SimpleNamespace(get_data=lambda key: None)
+
+    monkeypatch.setattr(
+        extension, "_get_extension_classes", lambda point, agent=None, **kw: [Noop]
+    )
+    extension.cache.clear("*(extensions)*")
+
+    agent = StubAgent()
+    extension.call_extensions_sync("dispatch_test", agent=agent)  # type: ignore[arg-type]
+    (instance,) = next(iter(extension._agent_tables[agent].values()))
+    assert instance.agent is agent
+
+    collected = weakref.ref(agent)
+    del agent
+    gc.collect()
+
+    assert collected() is None
+    assert len(extension._agent_tables) == 0
+    extension.cache.clear("*(extensions)*")
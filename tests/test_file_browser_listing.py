@@ -0,0 +1,139 @@
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from helpers import file_browser
+
+
+@pytest.fixture
+def browser(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(file_browser, "_watched_roots", [])
+    file_browser.cache.clear(file_browser.LISTING_CACHE_AREA)
+    instance = file_browser.FileBrowser()
+    instance.base_dir = tmp_path
+    yield instance
+    file_browser.cache.clear(file_browser.LISTING_CACHE_AREA)
+
+
+def _populate(root: Path, files: int = 25, folders: int = 3) -> None:
+    for i in range(folders):
+        (root / f"dir{i}").mkdir()
+    for i in range(files):
+        (root / f"file{i:03d}.txt").write_text("x" * i, encoding="utf-8")
+
+
+def _page_through(browser, limit: int, **params) -> list[str]:
+    names: list[str] = []
+    cursor = None
+    while True:
+        page = browser.get_files("", cursor=cursor, limit=limit, **params)
+        assert len(page["entries"]) <= limit
+        names.extend(entry["name"] for entry in page["entries"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return names
+
+
+def test_listing_matches_entries_with_folders_first(browser, tmp_path: Path) -> None:
+    _populate(tmp_path, files=3, folders=2)
+    (tmp_path / "link.txt").symlink_to(tmp_path / "file002.txt")
+
+    result = browser.get_files("")
+
+    names = [entry["name"] for entry in result["entries"]]
+    assert names == ["dir0", "dir1", "file000.txt", "file001.txt", "file002.txt", "link.txt"]
+    assert result["total"] == 6 and result["next_cursor"] is None
+    link = result["entries"][-1]
+    assert link["is_symlink"] and link["symlink_target"] == str(tmp_path / "file002.txt")
+    assert link["size"] == 2 and link["type"] == "document"
+    assert result["entries"][0] == {
+        "name": "dir0",
+        "path": "dir0",
+        "modified": result["entries"][0]["modified"],
+        "type": "folder",
+        "size": 0,
+        "is_dir": True,
+    }
+
+
+@pytest.mark.parametrize("sort", ["name", "size", "date"])
+@pytest.mark.parametrize("order", ["asc", "desc"])
+def test_pages_cover_the_sorted_listing_once(browser, tmp_path: Path, sort: str, order: str) -> None:
+    _populate(tmp_path)
+    full = [e["name"] for e in browser.get_files("", sort=sort, order=order)["entries"]]
+
+    assert _page_through(browser, 4, sort=sort, order=order) == full
+    assert full[:3] == sorted(full[:3], reverse=order == "desc")  # folders lead
+
+
+def test_cursor_survives_entries_added_between_pages(browser, tmp_path: Path) -> None:
+    _populate(tmp_path, files=10, folders=0)
+    first = browser.get_files("", limit=5)
+    (tmp_path / "file000a.txt").write_text("new", encoding="utf-8")  # sorts into page one
+    (tmp_path / "file999.txt").write_text("new", encoding="utf-8")
+
+    rest = browser.get_files("", cursor=first["next_cursor"], limit=50)
+
+    names = [e["name"] for e in first["entries"] + rest["entries"]]
+    assert names == [f"file{i:03d}.txt" for i in range(10)] + ["file999.txt"]
+
+
+def test_server_side_filter(browser, tmp_path: Path) -> None:
+    _populate(tmp_path, files=12, folders=2)
+
+    result = browser.get_files("", query="FILE01", limit=2)
+
+    assert [e["name"] for e in result["entries"]] == ["file010.txt", "file011.txt"]
+    assert result["total"] == 2 and result["next_cursor"] is None
+    assert [e["name"] for e in browser.get_files("", query="folder")["entries"]] == ["dir0", "dir1"]
+
+
+def test_cached_listing_is_reused_until_invalidated(browser, tmp_path: Path, monkeypatch) -> None:
+    _populate(tmp_path, files=3, folders=0)
+    monkeypatch.setattr(file_browser, "_watched_roots", [str(tmp_path.resolve())])
+    scans: list[Path] = []
+    scan = browser._scan_directory
+    monkeypatch.setattr(browser, "_scan_directory", lambda path: scans.append(path) or scan(path))
+
+    browser.get_files("")
+    browser.get_files("")
+    assert len(scans) == 1
+
+    # content changes keep the directory mtime; the watchdog drops the entry
+    (tmp_path / "file000.txt").write_text("grown", encoding="utf-8")
+    file_browser.invalidate_listing(tmp_path)
+    sizes = {e["name"]: e["size"] for e in browser.get_files("")["entries"]}
+    assert sizes["file000.txt"] == 5 and len(scans) == 2
+
+    # new entries change the directory mtime and force a rescan on their own
+    time.sleep(0.01)
+    (tmp_path / "new.txt").write_text("", encoding="utf-8")
+    os.utime(tmp_path)
+    assert len(browser.get_files("")["entries"]) == 4
+    assert len(scans) == 3
+
+
+def test_unwatched_directories_rescan_each_fresh_listing(browser, tmp_path: Path, monkeypatch) -> None:
+    _populate(tmp_path, files=6, folders=0)
+    scans: list[Path] = []
+    scan = browser._scan_directory
+    monkeypatch.setattr(browser, "_scan_directory", lambda path: scans.append(path) or scan(path))
+
+    first = browser.get_files("", limit=2)
+    browser.get_files("", cursor=first["next_cursor"], limit=2)
+    assert len(scans) == 1
+    browser.get_files("", limit=2)
+    assert len(scans) == 2
+
+
+def test_invalid_cursor_returns_an_empty_listing(browser, tmp_path: Path) -> None:
+    _populate(tmp_path, files=2, folders=0)
+
+    assert browser.get_files("", cursor="not-a-cursor")["entries"] == []
@@ -0,0 +1,77 @@
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+from flask import Flask, request
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from api import file_info, get_work_dir_files
+
+
+def _list(monkeypatch, query: str):
+    calls: list[tuple] = []
+
+    async def call_development_function(func, *args, **kwargs):
+        calls.append((args, kwargs))
+        return {"entries": []}
+
+    monkeypatch.setattr(
+        get_work_dir_files.runtime, "call_development_function", call_development_function
+    )
+    app = Flask("test_get_work_dir_files")
+    handler = get_work_dir_files.GetWorkDirFiles(app, threading.Lock())
+    with app.test_request_context(f"/api/get_work_dir_files?{query}"):
+        return asyncio.run(handler.process({}, request)), calls
+
+
+def test_limit_is_passed_on_as_an_integer(monkeypatch):
+    result, calls = _list(monkeypatch, "path=docs&limit=50&sort=size")
+
+    assert result == {"data": {"entries": []}}
+    assert calls == [(("docs",), {"limit": 50, "sort": "size"})]
+
+
+def test_non_numeric_limit_is_a_bad_request(monkeypatch):
+    response, calls = _list(monkeypatch, "path=docs&limit=ten")
+
+    assert response.status_code == 400
+    assert response.get_data(as_text=True) == "limit must be an integer"
+    assert calls == []
+
+
+def test_listing_runs_off_the_event_loop_thread(monkeypatch):
+    threads: list[int] = []
+
+    class Browser:
+        def get_files(self, path, **params):
+            threads.append(threading.get_ident())
+            return {"entries": [], "current_path": path}
+
+    monkeypatch.setattr(get_work_dir_files, "FileBrowser", Browser)
+
+    result = asyncio.run(get_work_dir_files.get_files("docs", limit=10))
+
+    assert result == {"entries": [], "current_path": "docs"}
+    assert threads and threads[0] != threading.get_ident()
+
+
+def test_file_info_runs_off_the_event_loop_thread(monkeypatch, tmp_path):
+    threads: list[int] = []
+    real_exists = file_info.os.path.exists
+
+    def exists(path):
+        threads.append(threading.get_ident())
+        return real_exists(path)
+
+    target = tmp_path / "notes.txt"
+    target.write_text("hello", encoding="utf-8")
+    monkeypatch.setattr(file_info.os.path, "exists", exists)
+
+    info = asyncio.run(file_info.get_file_info(str(target)))
+
+    assert info["exists"] and info["size"] == 5
+    assert threads and threads[0] != threading.get_ident()
@@ -0,0 +1,92 @@
+import asyncio
+import base64
+import io
+import os
+import sys
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from helpers import images
+
+
+def _png(path: Path, size: tuple[int, int] = (64, 48), color: str = "red") -> Path:
+    Image.new("RGB", size, color).save(path, format="PNG")
+    return path
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    cache = images.ImageEncodingCache()
+    monkeypatch.setattr(images, "_encoding_cache", cache)
+    return cache
+
+
+def test_data_url_is_encoded_once_per_file_version(tmp_path, monkeypatch) -> None:
+    path = _png(tmp_path / "shot.png")
+    reads: list[Path] = []
+    original = Path.read_bytes
+
+    def counting_read(self):
+        reads.append(self)
+        return original(self)
+
+    monkeypatch.setattr(Path, "read_bytes", counting_read)
+
+    first = images.to_data_url(str(path))
+    assert images.to_data_url(str(path)) == first
+    assert len(reads) == 1
+
+    _png(path, color="blue")
+    os.utime(path, ns=(1, 1))
+    assert images.to_data_url(str(path)) != first
+    assert len(reads) == 2
+
+
+def test_compression_params_are_part_of_the_key(tmp_path) -> None:
+    path = _png(tmp_path / "big.png", size=(800, 600))
+
+    raw = images.to_data_url(str(path))
+    small = images.to_data_url(str(path), max_pixels=10_000, quality=40)
+
+    assert raw.startswith("data:image/png;base64,")
+    assert small.startswith("data:image/jpeg;base64,")
+    decoded = Image.open(io.BytesIO(base64.b64decode(small.split(",", 1)[1])))
+    assert decoded.width * decoded.height <= 10_000
+
+
+def test_cache_evicts_least_recently_used_within_budget() -> None:
+    cache = images.ImageEncodingCache(max_bytes=10)
+    cache.put(("a", 0, 0, None, None), "aaaa")
+    cache.put(("b", 0, 0, None, None), "bbbb")
+    assert cache.get(("a", 0, 0, None, None)) == "aaaa"
+
+    cache.put(("c", 0, 0, None, None), "cccc")
+    cache.put(("huge", 0, 0, None, None), "x" * 11)
+
+    assert ("b", 0, 0, None, None) not in cache
+    assert ("a", 0, 0, None, None) in cache
+    assert ("huge", 0, 0, None, None) not in cache
+    assert cache.size == 8
+
+
+def test_preload_warms_cache_for_prepare_content(tmp_path, fresh_cache) -> None:
+    path = _png(tmp_path / "desktop.png")
+    content = [
+        {"type": "text", "text": "screenshot"},
+        {"type": "image_url", "image_url": {"url": str(path)}},
+        {"type": "image_url", "image_url": {"url": str(tmp_path / "missing.png")}},
+    ]
+
+    asyncio.run(images.preload([content]))
+
+    assert fresh_cache.size > 0
+    with pytest.raises(FileNotFoundError):
+        images.prepare_content(content)
+    prepared = images.prepare_content(content[:2])
+    assert prepared[1]["image_url"]["url"].startswith("data:image/png;base64,")
@@ -0,0 +1,166 @@
+import asyncio
+import base64
+import io
+import sys
+import threading
+import time
+import wave
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from helpers import kokoro_tts
+
+
+class _FakePipeline:
+    """Two segments per sentence, ~50 ms of compute per sentence."""
+
+    def __init__(self, seconds_per_sentence: float = 0.05):
+        self.seconds_per_sentence = seconds_per_sentence
+        self.calls: list[str] = []
+
+    def __call__(self, text, voice=None, speed=None):
+        self.calls.append(text)
+        for half in range(2):
+            time.sleep(self.seconds_per_sentence / 2)
+            samples = 100 * len(text) + half
+            yield SimpleNamespace(audio=np.full(samples, 0.25 if half else -2.0, dtype=np.float32))
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    fake = _FakePipeline()
+    monkeypatch.setattr(kokoro_tts, "_pipeline", fake)
+    return fake
+
+
+def _frames(audio_b64: str) -> np.ndarray:
+    with wave.open(io.BytesIO(base64.b64decode(audio_b64))) as wav:
+        assert (wav.getframerate(), wav.getsampwidth(), wav.getnchannels()) == (24000, 2, 1)
+        return np.frombuffer(wav.readframes(wav.getnframes()), dtype="<i2")
+
+
+def test_stream_yields_each_sentence_as_soon_as_it_is_ready(pipeline) -> None:
+    sentences = [f"Sentence number {i}." for i in range(20)]
+
+    async def scenario():
+        started = time.monotonic()
+        arrivals, chunks, lags = [], [], []
+        done = asyncio.Event()
+
+        async def heartbeat():
+            while not done.is_set():
+                before = time.monotonic()
+                await asyncio.sleep(0.01)
+                lags.append(time.monotonic() - before - 0.01)
+
+        beat = asyncio.create_task(heartbeat())
+        async for chunk in kokoro_tts.synthesize_stream(sentences):
+            arrivals.append(time.monotonic() - started)
+            chunks.append(chunk)
+        done.set()
+        await beat
+        return arrivals, chunks, lags
+
+    arrivals, chunks, lags = asyncio.run(scenario())
+
+    assert [c["index"] for c in chunks] == list(range(20))
+    assert [c["text"] for c in chunks] == sentences
+    assert arrivals[0] < arrivals[-1] / 5  # first audio long before the whole reply
+    assert max(lags) < 0.05
+    frames = _frames(chunks[3]["audio"])
+    length = 100 * len(sentences[3])
+    assert len(frames) == 2 * length + 1
+    assert (frames[:length] == -32767).all()  # clipped
+    assert (frames[length:] == round(0.25 * 32767)).all()
+
+
+def test_stopping_playback_stops_synthesis(pipeline) -> None:
+    sentences = [f"Sentence number {i}." for i in range(20)]
+    cancel = threading.Event()
+
+    async def scenario():
+        received = []
+        stream = kokoro_tts.synthesize_stream(sentences, cancel)
+        async for chunk in stream:
+            received.append(chunk)
+            if len(received) == 2:
+                break  # the user interrupted playback
+        await stream.aclose()
+        await asyncio.sleep(0.2)
+        return received
+
+    received = asyncio.run(scenario())
+
+    assert len(received) == 2
+    assert cancel.is_set()
+    assert len(pipeline.calls) <= 4
+
+
+def test_whole_clip_synthesis_matches_the_stream(pipeline) -> None:
+    sentences = ["First one.", "", "Second one."]
+
+    async def scenario():
+        whole = await kokoro_tts.synthesize_sentences(sentences)
+        parts = [chunk["audio"] async for chunk in kokoro_tts.synthesize_stream(sentences)]
+        return whole, parts
+
+    whole, parts = asyncio.run(scenario())
+
+    assert len(parts) == 2
+    assert np.array_equal(_frames(whole), np.concatenate([_frames(p) for p in parts]))
+
+
+def test_ws_handler_streams_audio_events_and_cancels_on_disconnect(pipeline, monkeypatch) -> None:
+    from api import ws_synthesize
+
+    handler = ws_synthesize.WsSynthesize(None, threading.Lock())  # type: ignore[arg-type]
+    sent: list[dict] = []
+
+    async def emit_to(sid, event, data, correlation_id=None):
+        sent.append(data)
+
+    handler.emit_to = emit_to  # type: ignore[method-assign]
+
+    async def scenario():
+        reply = "Hello there. This is a reply.\nIt has three sentences!"
+        started = await handler.process("synthesize_start", {"stream": "a", "text": reply}, "sid1")
+        while not sent or sent[-1]["type"] != "done":
+            await asyncio.sleep(0.01)
+        first = list(sent)
+
+        sent.clear()
+        long_reply = " ".join(f"Sentence number {i}." for i in range(40))
+        await handler.process("synthesize_start", {"stream": "b", "text": long_reply}, "sid1")
+        while not sent:
+            await asyncio.sleep(0.01)
+        await handler.on_disconnect("sid1")
+        await asyncio.sleep(0.2)
+        return started, first
+
+    started, first = asyncio.run(scenario())
+
+    assert started == {"ok": True, "stream": "a"}
+    assert [e["type"] for e in first] == ["audio", "audio", "audio", "done"]
+    assert [e["text"] for e in first[:3]] == ["Hello there.", "This is a reply.", "It has three sentences!"]
+    assert all(e["stream"] == "a" for e in first)
+    assert 1 <= len(sent) <= 3 and all(e["type"] == "audio" for e in sent)
+    assert len(pipeline.calls) < 3 + 10
+    assert not ws_synthesize.WsSynthesize._tasks
+
+
+def test_wav_encoding_rounds_and_leaves_the_parts_untouched() -> None:
+    part = np.array([-1.5, -0.5, 0.0, 0.25, 2.0], dtype=np.float32)
+    original = part.copy()
+
+    wav = kokoro_tts._encode_wav([part, part[:2]])
+
+    frames = _frames(base64.b64encode(wav).decode("utf-8"))
+    assert frames.tolist() == [-32767, -16384, 0, 8192, 32767, -32767, -16384]
+    assert (part == original).all()
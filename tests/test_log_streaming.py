@@ -0,0 +1,114 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from helpers import log as log_module
+from helpers.secrets import SecretsMatcher
+from helpers.state_snapshot import parse_state_request_payload
+
+
+SECRETS = {"API_KEY": "sk-live-123456", "PASSWORD": "hunter22"}
+
+
+@pytest.fixture(autouse=True)
+def fake_secrets(monkeypatch):
+    matcher = SecretsMatcher.for_secrets(SECRETS, 4)
+    manager = SimpleNamespace(
+        get_matcher=lambda min_length=0: matcher,
+        mask_values=lambda text, min_length=4: matcher.mask(text),
+    )
+    monkeypatch.setattr(log_module, "get_secrets_manager", lambda context=None: manager)
+    return matcher
+
+
+def _stream(item, text: str, size: int = 3) -> None:
+    for i in range(0, len(text), size):
+        item.stream(content=text[i : i + size])
+
+
+def test_streamed_content_masks_secrets_across_chunk_boundaries(fake_secrets) -> None:
+    log = log_module.Log()
+    item = log.log(type="agent", heading="working")
+    text = "token sk-live-123456 and hunter22 done " * 5
+
+    _stream(item, text)
+
+    assert item.content == fake_secrets.mask(text)
+    assert "sk-live" not in item.content and "hunter22" not in item.content
+
+
+def test_full_text_updates_are_masked_incrementally(fake_secrets) -> None:
+    log = log_module.Log()
+    item = log.log(type="agent")
+    text = ""
+    for part in ["reply: ", "sk-li", "ve-12", "3456", " ok"]:
+        text += part
+        item.update(content=text, reasoning=text)
+
+    assert item.content == "reply: §§secret(API_KEY) ok"
+    assert item.kvps["reasoning"] == item.content
+
+    item.update(content="replaced hunter22")
+    assert item.content == "replaced §§secret(PASSWORD)"
+
+
+def test_updates_are_coalesced_per_item_between_reads() -> None:
+    log = log_module.Log()
+    item = log.log(type="agent")
+    other = log.log(type="info", content="x")
+
+    _stream(item, "a" * 300)
+    other.update(content="y")
+    assert log.updates == [0, 1]
+
+    start = log.output().end
+    _stream(item, "b" * 30)
+    assert log.updates == [0, 1, 0]
+    assert [i["no"] for i in log.output(start=start).items] == [0]
+
+
+def test_output_sends_content_deltas_to_clients_that_ask() -> None:
+    log = log_module.Log()
+    item = log.log(type="agent", content="hello " * 10)
+    first = log.output()
+    client = {i["no"]: i["content"] for i in first.items}
+
+    _stream(item, " world, sk-live-123456 and more")
+
+    plain = log.output(start=first.end).items[0]
+    delta = log.output(start=first.end, deltas=True).items[0]
+    assert "content_offset" not in plain
+    assert 0 < delta["content_offset"] <= len(client[0])
+    rebuilt = client[0][: delta["content_offset"]] + delta["content"]
+    assert rebuilt == plain["content"] == item.content
+
+    # items created after the client's cursor always go out whole
+    new = log.log(type="info", content="fresh")
+    items = log.output(start=first.end, deltas=True).items
+    assert next(i for i in items if i["no"] == new.no)["content"] == "fresh"
+
+
+def test_truncated_content_is_resent_whole(monkeypatch) -> None:
+    monkeypatch.setattr(log_module, "CONTENT_MAX_LEN", 50)
+    log = log_module.Log()
+    item = log.log(type="agent", content="x" * 40)
+    start = log.output().end
+
+    _stream(item, "y" * 40, size=40)
+
+    out = log.output(start=start, deltas=True).items[0]
+    assert "content_offset" not in out
+    assert "Characters hidden" in out["content"]
+
+
+def test_state_request_accepts_log_deltas_flag() -> None:
+    payload = {"context": None, "log_from": 3, "notifications_from": 0, "timezone": "UTC"}
+
+    assert parse_state_request_payload(payload).log_deltas is False
+    assert parse_state_request_payload({**payload, "log_deltas": True}).log_deltas is True
@@ -0,0 +1,79 @@
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from helpers import loop_monitor
+
+
+@pytest.fixture
+def loop_thread(monkeypatch):
+    monkeypatch.setenv(loop_monitor.STALL_THRESHOLD_ENV, "100")
+    loop_monitor.reset_stats()
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    loop_monitor.watch(loop, "test-loop")
+    yield loop
+    loop_monitor.unwatch(loop)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+    loop_monitor.reset_stats()
+
+
+def _stats_for(name: str) -> dict:
+    return next(l for l in loop_monitor.get_stats()["loops"] if l["name"] == name)
+
+
+def _blocking_parse() -> None:
+    time.sleep(0.4)
+
+
+def test_stall_is_captured_with_stack_and_attribution(loop_thread) -> None:
+    async def tool_run():
+        with loop_monitor.activity(tool="document_query", context="ctx1"):
+            with loop_monitor.activity(extension="tool_execute_before"):
+                _blocking_parse()
+
+    time.sleep(0.25)
+    asyncio.run_coroutine_threadsafe(tool_run(), loop_thread).result(timeout=5)
+    time.sleep(0.25)
+
+    stats = loop_monitor.get_stats()
+    stall = next(s for s in stats["recent"] if s["loop"] == "test-loop")
+    assert stall["duration_ms"] >= 300
+    assert stall["labels"] == {
+        "tool": "document_query",
+        "context": "ctx1",
+        "extension": "tool_execute_before",
+    }
+    assert any("_blocking_parse" in line for line in stall["stack"])
+    assert stats["attribution"]["tool"]["document_query"]["count"] == 1
+    assert _stats_for("test-loop")["stalls"] == 1
+
+
+def test_idle_loop_records_lag_without_stalls(loop_thread) -> None:
+    time.sleep(0.35)
+
+    loop = _stats_for("test-loop")
+    assert loop["beats"] >= 2
+    assert loop["stalls"] == 0
+    assert loop["lag_max_ms"] < 100
+
+
+def test_monitor_can_be_disabled(monkeypatch) -> None:
+    monkeypatch.setenv(loop_monitor.MONITOR_ENV, "off")
+    loop = asyncio.new_event_loop()
+
+    loop_monitor.watch(loop, "disabled-loop")
+
+    assert all(l["name"] != "disabled-loop" for l in loop_monitor.get_stats()["loops"])
+    loop.close()
@@ -829,8 +829,8 @@ def test_official_desktop_session_manager_opens_binary_session(office_state, tmp
     def fake_open_document(self, session, doc):
         session.processes[f"soffice-{doc['file_id']}"] = FakeProcess()
 
-    monkeypatch.setattr(desktop_session.DesktopSessionManager, "_spawn_desktop_locked", fake_spawn)
-    monkeypatch.setattr(desktop_session.DesktopSessionManager, "_open_document_locked", fake_open_document)
+    monkeypatch.setattr(desktop_session.DesktopSessionManager, "_spawn_desktop", fake_spawn)
+    monkeypatch.setattr(desktop_session.DesktopSessionManager, "_open_document", fake_open_document)
 
     doc = document_store.create_document("spreadsheet", "Official Sheet", "ods", "Name,Value\nA,1")
     manager = desktop_session.DesktopSessionManager()
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import json
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from agent import AgentContextType
+from helpers import history, persist_chat
+from helpers.log import Log
+
+
+def _make_context(ctxid: str = "journal1"):
+    agent = SimpleNamespace(number=0, data={}, config=SimpleNamespace(profile="agent0"))
+    agent.history = history.History(agent)
+    log = Log()
+    context = SimpleNamespace(
+        id=ctxid,
+        name="Journal chat",
+        type=AgentContextType.USER,
+        config=SimpleNamespace(profile="agent0"),
+        agent0=agent,
+        streaming_agent=None,
+        created_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        last_message=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        log=log,
+        data={},
+        output_data={},
+    )
+    return context
+
+
+def _frames(ctxid: str) -> list[dict]:
+    return persist_chat._read_frames(persist_chat._get_journal_file_path(ctxid))
+
+
+def _rebuilt_history(data: dict, agent) -> history.History:
+    ag = data["agents"][0]
+    hist = history.deserialize_history(ag["history"], agent=agent)
+    persist_chat._replay_history_ops(hist, ag.get("history_ops", []))
+    return hist
+
+
+@pytest.fixture(autouse=True)
+def chats_folder(tmp_path, monkeypatch):
+    monkeypatch.setattr(persist_chat, "CHATS_FOLDER", str(tmp_path))
+    monkeypatch.setattr(persist_chat, "_journals", {})
+    return tmp_path
+
+
+def test_loop_saves_append_frames_instead_of_rewriting_snapshot(chats_folder) -> None:
+    context = _make_context()
+    context.agent0.history.add_message(False, "hello", tokens=1)
+    persist_chat.save_tmp_chat(context)
+    snapshot = Path(persist_chat._get_chat_file_path(context.id)).read_text()
+
+    context.agent0.history.add_message(True, "hi there", tokens=1)
+    context.log.log(type="agent", heading="thinking", content="step 1")
+    persist_chat.save_tmp_chat(context)
+    context.agent0.history.new_topic()
+    context.agent0.history.add_message(False, "next question", tokens=1)
+    persist_chat.save_tmp_chat(context)
+
+    assert Path(persist_chat._get_chat_file_path(context.id)).read_text() == snapshot
+    frames = _frames(context.id)
+    assert [frame["op"] for frame in frames] == ["history_append", "log_items", "history_append"]
+    assert frames[2]["new_topic"] is True
+
+    data, seq = persist_chat._read_chat(context.id)
+    rebuilt = _rebuilt_history(data, context.agent0)
+    assert seq == 3
+    assert rebuilt.to_dict() == context.agent0.history.to_dict()
+    assert [item["heading"] for item in data["log"]["logs"]] == ["thinking"]
+
+
+def test_restructured_history_and_meta_are_journaled_in_full(chats_folder) -> None:
+    context = _make_context()
+    context.agent0.history.add_message(False, "hello", tokens=1)
+    context.agent0.history.add_message(True, "hi", tokens=1)
+    persist_chat.save_tmp_chat(context)
+
+    context.agent0.history.current.messages[0].set_summary("greeting")
+    context.name = "Renamed"
+    persist_chat.save_tmp_chat(context)
+
+    frames = _frames(context.id)
+    assert [frame["op"] for frame in frames] == ["meta", "history"]
+    data, _seq = persist_chat._read_chat(context.id)
+    assert data["name"] == "Renamed"
+    assert _rebuilt_history(data, context.agent0).to_dict() == context.agent0.history.to_dict()
+
+
+def test_in_place_content_edit_survives_reload(chats_folder) -> None:
+    context = _make_context()
+    capture = {"raw_content": [{"type": "image_url", "image_url": "data:..."}], "preview": "screen 1"}
+    context.agent0.history.add_message(False, capture, tokens=1)
+    persist_chat.save_tmp_chat(context)
+
+    # computer_use_remote supersedes older captures by rewriting them in place
+    message = context.agent0.history.current.messages[0]
+    message.content = "screen 1 [image reference superseded]"
+    context.agent0.history.add_message(False, "screen 2", tokens=1)
+    persist_chat.save_tmp_chat(context)
+    message.content = "screen 1 [dropped]"
+    persist_chat.save_tmp_chat(context)
+
+    assert [frame["op"] for frame in _frames(context.id)] == ["history", "history"]
+    data, _seq = persist_chat._read_chat(context.id)
+    rebuilt = _rebuilt_history(data, context.agent0)
+    assert [m.content for m in rebuilt.current.messages] == ["screen 1 [dropped]", "screen 2"]
+
+
+def test_remove_chat_drops_its_journal_lock(chats_folder) -> None:
+    context = _make_context()
+    persist_chat.save_tmp_chat(context)
+    assert context.id in persist_chat._journal_locks
+
+    persist_chat.remove_chat(context.id)
+
+    assert context.id not in persist_chat._journal_locks
+    assert context.id not in persist_chat._journals
+
+
+def test_replay_skips_compacted_frames_and_torn_tail(chats_folder) -> None:
+    context = _make_context()
+    persist_chat.save_tmp_chat(context)
+    journal_path = Path(persist_chat._get_journal_file_path(context.id))
+    chat_path = Path(persist_chat._get_chat_file_path(context.id))
+
+    snapshot = json.loads(chat_path.read_text())
+    snapshot["journal_seq"] = 1
+    chat_path.write_text(json.dumps(snapshot))
+    journal_path.write_text(
+        json.dumps({"op": "meta", "seq": 1, "name": "stale", "agents": [{"number": 0, "data": {}}]})
+        + "\n"
+        + json.dumps({"op": "meta", "seq": 2, "name": "fresh", "agents": [{"number": 0, "data": {}}]})
+        + "\n"
+        + '{"op": "meta", "seq": 3, "name": "tor'
+    )
+
+    data, seq = persist_chat._read_chat(context.id)
+
+    assert data["name"] == "fresh"
+    assert seq == 2
+
+
+def test_journal_compacts_into_snapshot(chats_folder, monkeypatch) -> None:
+    monkeypatch.setattr(persist_chat, "JOURNAL_COMPACT_MIN_BYTES", 0)
+    context = _make_context()
+    persist_chat.save_tmp_chat(context)
+
+    context.agent0.history.add_message(False, "x" * 4096, tokens=1)
+    persist_chat.save_tmp_chat(context)
+
+    assert Path(persist_chat._get_journal_file_path(context.id)).read_text() == ""
+    snapshot = json.loads(Path(persist_chat._get_chat_file_path(context.id)).read_text())
+    assert snapshot["journal_seq"] == 1
+    assert "x" * 4096 in snapshot["agents"][0]["history"]
+
+
+def test_deferred_history_loads_on_first_access() -> None:
+    source = history.History(SimpleNamespace())
+    source.add_message(False, "persisted", tokens=1)
+    ops = [{"messages": [history.Message(True, "journaled", tokens=1).to_dict()]}]
+    agent_data = {"number": 0, "history": source.serialize(), "history_ops": ops}
+    agent = SimpleNamespace()
+
+    hist = history.History.deferred(agent, persist_chat._history_loader("lazy", agent_data))
+
+    assert not hist.is_loaded()
+    assert [m.content for m in hist.current.messages] == ["persisted", "journaled"]
+    assert hist.is_loaded()
+    assert hist.counter == 2
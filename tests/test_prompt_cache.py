@@ -0,0 +1,155 @@
+import sys
+from pathlib import Path
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import models
+from helpers import prompt_cache
+
+
+def _wrapper(provider: str = "openai", model: str = "test-model") -> models.LiteLLMChatWrapper:
+    return models.LiteLLMChatWrapper(model=model, provider=provider, model_config=None)
+
+
+def _prompt() -> list:
+    return [
+        SystemMessage(content="system"),
+        HumanMessage(content="question"),
+        AIMessage(content="calling tool"),
+        HumanMessage(content="tool result"),
+        prompt_cache.mark_volatile(HumanMessage(content="[EXTRAS] now")),
+    ]
+
+
+class _AsyncChunkStream:
+    def __init__(self, chunks: list[dict]):
+        self._chunks = iter(chunks)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._chunks)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+def test_extras_are_ordered_from_stable_to_volatile():
+    ordered = prompt_cache.order_extras(
+        {"memories": "m", "loaded_skills": "s"},
+        {"current_datetime": "d", "agent_info": "a", "project_file_structure": "p"},
+    )
+
+    assert list(ordered) == [
+        "memories",
+        "loaded_skills",
+        "agent_info",
+        "project_file_structure",
+        "current_datetime",
+    ]
+
+
+def test_breakpoint_sits_on_last_stable_block_before_extras():
+    converted = _wrapper("anthropic", "claude-sonnet-4")._convert_messages(
+        _prompt(), explicit_caching=True
+    )
+
+    assert [m["role"] for m in converted] == ["system", "user", "assistant", "user"]
+    assert converted[0]["cache_control"] == prompt_cache.EPHEMERAL
+    tail = converted[-1]
+    assert "cache_control" not in tail
+    assert tail["content"] == [
+        {"type": "text", "text": "tool result", "cache_control": prompt_cache.EPHEMERAL},
+        {"type": "text", "text": "[EXTRAS] now"},
+    ]
+    assert "cache_control" not in converted[2]
+
+
+def test_plain_text_providers_keep_string_content():
+    converted = _wrapper()._convert_messages(_prompt(), explicit_caching=True)
+
+    assert converted[-1]["content"] == "tool result\n[EXTRAS] now"
+    assert "cache_control" not in converted[-1]
+    assert converted[2]["cache_control"] == prompt_cache.EPHEMERAL
+
+    uncached = _wrapper()._convert_messages(_prompt())
+    assert not any("cache_control" in m for m in uncached)
+
+
+def test_usage_is_read_from_litellm_usage_shapes():
+    openai_usage = prompt_cache.usage_from_response(
+        {"usage": {"prompt_tokens": 1000, "prompt_tokens_details": {"cached_tokens": 900}}}
+    )
+    anthropic_usage = prompt_cache.usage_from_response(
+        {
+            "usage": {
+                "prompt_tokens": 500,
+                "completion_tokens": 20,
+                "cache_read_input_tokens": 300,
+                "cache_creation_input_tokens": 150,
+            }
+        }
+    )
+
+    assert openai_usage == prompt_cache.PromptCacheUsage(1000, 0, 900, 0)
+    assert anthropic_usage == prompt_cache.PromptCacheUsage(500, 20, 300, 150)
+    assert prompt_cache.usage_from_response({"choices": []}) is None
+
+
+@pytest.mark.asyncio
+async def test_unified_call_records_stream_usage_per_model(monkeypatch):
+    # stats live in the module instance models.py is bound to
+    stats_module = models.prompt_cache
+    stats_module.reset_stats()
+    chunks = [
+        {"choices": [{"delta": {"content": "hello"}, "message": {}}]},
+        {
+            "choices": [],
+            "usage": {
+                "prompt_tokens": 2000,
+                "completion_tokens": 5,
+                "prompt_tokens_details": {"cached_tokens": 1800, "cache_creation_tokens": 100},
+            },
+        },
+    ]
+    seen_kwargs: dict = {}
+
+    async def fake_acompletion(*args, **kwargs):
+        seen_kwargs.update(kwargs)
+        return _AsyncChunkStream(chunks)
+
+    async def fake_rate_limiter(*args, **kwargs):
+        return None
+
+    async def response_callback(chunk: str, full: str):
+        return None
+
+    reported: list = []
+
+    async def usage_callback(usage):
+        reported.append(usage)
+
+    monkeypatch.setattr(models, "acompletion", fake_acompletion)
+    monkeypatch.setattr(models, "apply_rate_limiter", fake_rate_limiter)
+
+    response, _reasoning = await _wrapper().unified_call(
+        messages=[HumanMessage(content="hi")],
+        response_callback=response_callback,
+        usage_callback=usage_callback,
+    )
+
+    assert response == "hello"
+    assert seen_kwargs["stream_options"] == {"include_usage": True}
+    assert [usage.to_dict() for usage in reported] == [
+        prompt_cache.PromptCacheUsage(2000, 5, 1800, 100).to_dict()
+    ]
+    stats = stats_module.get_stats()["openai/test-model"]
+    assert stats["calls"] == 1 and stats["calls_with_hits"] == 1
+    assert stats["hit_ratio"] == 0.9
+    stats_module.reset_stats()
@@ -0,0 +1,69 @@
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from helpers import cache, prompt_sections
+
+
+@pytest.fixture(autouse=True)
+def clean_sections():
+    cache.clear(prompt_sections.SECTIONS_CACHE_AREA)
+    prompt_sections.reset_stats()
+    yield
+    cache.clear(prompt_sections.SECTIONS_CACHE_AREA)
+    prompt_sections.reset_stats()
+
+
+def _render(prompt_dir: Path, builds: list[str], extra: object = None) -> str:
+    async def build() -> str:
+        text = "\n".join(
+            path.read_text() for path in sorted(prompt_dir.glob("agent.system.tool.*.md"))
+        )
+        builds.append(text)
+        return text
+
+    inputs = prompt_sections.SectionInputs().files([str(prompt_dir)], "agent.system.tool")
+    inputs.value(extra)
+    return asyncio.run(prompt_sections.memoized("tools", None, inputs, build))
+
+
+def test_section_is_rebuilt_only_when_inputs_change(tmp_path) -> None:
+    tool = tmp_path / "agent.system.tool.a.md"
+    tool.write_text("tool a")
+    (tmp_path / "unrelated.md").write_text("x")
+    builds: list[str] = []
+
+    assert _render(tmp_path, builds) == "tool a"
+    assert _render(tmp_path, builds) == "tool a"
+    (tmp_path / "unrelated.md").write_text("changed")
+    assert _render(tmp_path, builds) == "tool a"
+    assert len(builds) == 1
+
+    tool.write_text("tool a v2")
+    os.utime(tool, ns=(1, 1))
+    assert _render(tmp_path, builds) == "tool a v2"
+
+    (tmp_path / "agent.system.tool.b.md").write_text("tool b")
+    assert _render(tmp_path, builds) == "tool a v2\ntool b"
+
+    assert _render(tmp_path, builds, extra={"vision": True}) == "tool a v2\ntool b"
+    assert len(builds) == 4
+    assert prompt_sections.get_stats() == {"tools": {"builds": 4, "hits": 2}}
+
+
+def test_cache_reset_forces_rebuild(tmp_path) -> None:
+    (tmp_path / "agent.system.tool.a.md").write_text("tool a")
+    builds: list[str] = []
+
+    _render(tmp_path, builds)
+    cache.clear("*(plugins)*")
+    _render(tmp_path, builds)
+
+    assert len(builds) == 2
@@ -0,0 +1,204 @@
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from aiohttp import web
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from helpers import searxng
+
+
+class StandInSearxng:
+    """Local SearXNG replacement answering ``/search`` after a fixed latency."""
+
+    def __init__(self, latency: float = 0.02):
+        self.latency = latency
+        self.requests: list[str] = []
+        self.url = ""
+        self._loop = asyncio.new_event_loop()
+        self._started = threading.Event()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+
+    async def _search(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        query = str(form.get("q", ""))
+        self.requests.append(query)
+        await asyncio.sleep(self.latency)
+        return web.json_response(
+            {
+                "query": query,
+                "results": [
+                    {"title": f"{query} {i}", "url": f"https://example.com/{i}", "content": "..."}
+                    for i in range(3)
+                ],
+            }
+        )
+
+    def _serve(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        app = web.Application()
+        app.router.add_post("/search", self._search)
+        self._runner = web.AppRunner(app)
+        self._loop.run_until_complete(self._runner.setup())
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        self._loop.run_until_complete(site.start())
+        port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+        self.url = f"http://127.0.0.1:{port}/search"
+        self._started.set()
+        self._loop.run_forever()
+
+    def start(self) -> None:
+        self._thread.start()
+        self._started.wait(5)
+
+    def stop(self) -> None:
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(5)
+
+
+@pytest.fixture
+def stand_in(monkeypatch):
+    server = StandInSearxng()
+    server.start()
+    client = searxng.search_client
+    monkeypatch.setattr(searxng, "URL", server.url)
+    monkeypatch.setattr(searxng.runtime, "is_development", lambda: False)
+    client.cache.clear(client.SEARCH_CACHE_AREA)
+    client.reset_stats()
+    yield server
+    client.cache.clear(client.SEARCH_CACHE_AREA)
+    client.reset_stats()
+    server.stop()
+
+
+async def _run(*queries: str) -> list[dict]:
+    try:
+        return await asyncio.gather(*(searxng.search(q) for q in queries))
+    finally:
+        await searxng.search_client.close_session()
+
+
+def test_repeated_and_normalized_queries_hit_the_cache(stand_in) -> None:
+    first, second, third = asyncio.run(
+        _run("Italy AI trends", "  italy   ai TRENDS ", "france ai trends")
+    )
+
+    assert first == second
+    assert third["query"] == "france ai trends"
+    assert sorted(stand_in.requests) == ["Italy AI trends", "france ai trends"]
+    assert asyncio.run(_run("ITALY ai trends")) == [first]
+    assert len(stand_in.requests) == 2
+    stats = searxng.search_client.get_stats()
+    assert stats["misses"] == 2
+    assert stats["hits"] + stats["shared"] == 2
+
+
+def test_concurrent_identical_searches_share_one_request(stand_in) -> None:
+    results = asyncio.run(_run(*["same query"] * 20))
+
+    assert len(stand_in.requests) == 1
+    assert all(r == results[0] for r in results)
+    assert searxng.search_client.get_stats() == {"hits": 0, "misses": 1, "shared": 19}
+
+
+def test_expired_entries_are_fetched_again(stand_in, monkeypatch) -> None:
+    monkeypatch.setenv(searxng.search_client.CACHE_TTL_ENV, "0")
+
+    asyncio.run(_run("no cache"))
+    asyncio.run(_run("no cache"))
+
+    assert stand_in.requests == ["no cache", "no cache"]
+
+
+def test_failed_searches_are_not_cached(stand_in, monkeypatch) -> None:
+    monkeypatch.setattr(searxng, "URL", stand_in.url.replace("/search", "/missing"))
+    with pytest.raises(Exception):
+        asyncio.run(_run("broken"))
+
+    monkeypatch.setattr(searxng, "URL", stand_in.url)
+    assert asyncio.run(_run("broken"))[0]["query"] == "broken"
+
+
+def test_benchmark_throughput_and_hit_rate(stand_in) -> None:
+    # 200 searches over 20 distinct queries, 25 in flight at a time
+    queries = [f"topic {i % 20}" for i in range(200)]
+
+    async def bench() -> float:
+        started = time.perf_counter()
+        try:
+            for i in range(0, len(queries), 25):
+                await asyncio.gather(*(searxng.search(q) for q in queries[i : i + 25]))
+        finally:
+            await searxng.search_client.close_session()
+        return time.perf_counter() - started
+
+    elapsed = asyncio.run(bench())
+    stats = searxng.search_client.get_stats()
+    hit_rate = (stats["hits"] + stats["shared"]) / len(queries)
+    print(
+        f"\n[search cache] {len(queries) / elapsed:.0f} searches/s "
+        f"backend_requests={len(stand_in.requests)} hit_rate={hit_rate:.0%}"
+    )
+    assert len(stand_in.requests) == 20
+    assert hit_rate == 0.9
+
+
+def test_cancelled_owner_hands_the_search_to_its_waiters() -> None:
+    client = searxng.search_client
+    client.cache.clear(client.SEARCH_CACHE_AREA)
+    fetches = []
+
+    async def fetch():
+        fetches.append(asyncio.current_task())
+        await asyncio.sleep(0.05)
+        return {"results": len(fetches)}
+
+    async def scenario():
+        owner = asyncio.create_task(client.cached("test", "cancel me", fetch))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.create_task(client.cached("test", "cancel me", fetch)) for _ in range(3)]
+        leaving = asyncio.create_task(client.cached("test", "cancel me", fetch))
+        await asyncio.sleep(0.01)
+        owner.cancel()
+        leaving.cancel()
+        results = await asyncio.gather(*waiters)
+        with pytest.raises(asyncio.CancelledError):
+            await owner
+        return results, waiters
+
+    results, waiters = asyncio.run(scenario())
+
+    assert results == [{"results": 2}] * 3
+    assert len(fetches) == 2  # one waiter took over, the others shared its search
+    assert not any(waiter.cancelled() for waiter in waiters)
+    assert client._inflight == {}
+    client.cache.clear(client.SEARCH_CACHE_AREA)
+
+
+def test_close_sessions_closes_the_pool_of_every_loop() -> None:
+    client = searxng.search_client
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    async def open_session():
+        return client.get_session()
+
+    session = asyncio.run_coroutine_threadsafe(open_session(), loop).result(5)
+    idle = asyncio.new_event_loop()
+    idle_session = idle.run_until_complete(open_session())
+
+    client.close_sessions()
+
+    assert session.closed and idle_session.closed
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+    loop.close()
+    idle.close()
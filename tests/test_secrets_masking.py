@@ -0,0 +1,136 @@
+import random
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from helpers.secrets import SecretsManager, SecretsMatcher, StreamingSecretsFilter
+
+
+SECRETS = {"SHORT": "abcd", "LONG": "abcdef", "OTHER": "cdx1", "API": "sk-live-123456"}
+
+
+def _manager(secrets: dict[str, str]) -> SecretsManager:
+    manager = SecretsManager("usr/test-secrets-masking.env")
+    manager._secrets_cache = dict(secrets)
+    return manager
+
+
+def _stream(text: str, sizes: list[int], **kwargs) -> str:
+    stream_filter = StreamingSecretsFilter(SECRETS, **kwargs)
+    out = []
+    pos = 0
+    for size in sizes:
+        out.append(stream_filter.process_chunk(text[pos : pos + size]))
+        pos += size
+    out.append(stream_filter.process_chunk(text[pos:]))
+    out.append(stream_filter.finalize())
+    return "".join(out)
+
+
+def test_mask_values_prefers_longest_secret_at_each_position():
+    manager = _manager(SECRETS)
+
+    masked = manager.mask_values("x abcdef y abcd z abcdx1 sk-live-123456!")
+
+    assert masked == "x §§secret(LONG) y §§secret(SHORT) z §§secret(SHORT)x1 §§secret(API)!"
+    assert manager.mask_values("abcd", placeholder="<{key}>") == "<SHORT>"
+    assert manager.mask_values("abc", min_length=4) == "abc"
+
+
+def test_matcher_is_built_once_per_secrets_version():
+    manager = _manager(SECRETS)
+
+    first = manager.get_matcher(4)
+    assert manager.get_matcher(4) is first
+
+    manager.clear_cache()
+    manager._secrets_cache = {"NEW": "fresh-value"}
+
+    assert manager.get_matcher(4) is not first
+    assert manager.mask_values("abcd fresh-value") == "abcd §§secret(NEW)"
+
+
+def test_streaming_filter_masks_secrets_split_across_chunks():
+    text = "pre sk-live-123456 mid abcdef post abcd end sk-li"
+    expected = "pre §§secret(API) mid §§secret(LONG) post §§secret(SHORT) end ***"
+    rng = random.Random(7)
+
+    for _ in range(200):
+        sizes = [rng.randint(1, 6) for _ in range(20)]
+        assert _stream(text, sizes) == expected
+
+
+def test_streaming_filter_flushes_short_unresolved_partials():
+    stream_filter = StreamingSecretsFilter(SECRETS)
+
+    assert stream_filter.process_chunk("hello ab") == "hello "
+    assert stream_filter.finalize() == "ab"
+
+
+def _find_sweep(secrets: dict[str, str], text: str) -> list[tuple[int, int, str]]:
+    # reference: every occurrence of every value, then leftmost-longest
+    value_to_key: dict[str, str] = {}
+    for key, value in secrets.items():
+        value_to_key.setdefault(value, key)
+    found = sorted(
+        (index, -len(value))
+        for value in value_to_key
+        for index in range(len(text))
+        if text.startswith(value, index)
+    )
+    matches, pos = [], 0
+    for start, neg_len in found:
+        if start >= pos:
+            pos = start - neg_len
+            matches.append((start, pos, value_to_key[text[start:pos]]))
+    return matches
+
+
+def test_trie_scan_matches_find_sweep():
+    rng = random.Random(11)
+    for _ in range(200):
+        secrets = {
+            f"K{i}": "".join(rng.choices("abc", k=rng.randint(1, 5))) for i in range(6)
+        }
+        text = "".join(rng.choices("abcx", k=60))
+
+        assert list(SecretsMatcher.for_secrets(secrets).finditer(text)) == _find_sweep(secrets, text)
+
+
+def test_bulk_mask_paths_match_find_sweep(monkeypatch):
+    rng = random.Random(13)
+    find_max = SecretsMatcher.FIND_SCAN_MAX_VALUES
+    for _ in range(200):
+        secrets = {
+            f"K{i}": "".join(rng.choices("abc", k=rng.randint(1, 5))) for i in range(6)
+        }
+        text = "".join(rng.choices("abcx", k=60))
+        expected, pos = [], 0
+        for start, end, key in _find_sweep(secrets, text):
+            expected += [text[pos:start], f"<{key}>"]
+            pos = end
+        expected = "".join(expected) + text[pos:]
+
+        for max_values in (find_max, 0):  # str.find sweeps, then the automaton
+            monkeypatch.setattr(SecretsMatcher, "FIND_SCAN_MAX_VALUES", max_values)
+            matcher = SecretsMatcher.for_secrets(secrets)
+            assert matcher.mask(text, "<{key}>") == expected
+
+
+def test_hold_is_longest_suffix_that_may_grow_into_a_secret():
+    rng = random.Random(5)
+    for _ in range(200):
+        values = {"".join(rng.choices("ab-", k=rng.randint(1, 6))) for _ in range(5)}
+        matcher = SecretsMatcher({value: "K" for value in values})
+        text = "".join(rng.choices("ab-x", k=rng.randint(0, 12)))
+        expected = max(
+            (len(text) - i for i in range(len(text)) if any(v.startswith(text[i:]) for v in values)),
+            default=0,
+        )
+
+        assert matcher.hold(text) == expected
+        matcher._prefix = None  # the path for secrets too long to nest
+        assert matcher.hold(text) == expected
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import gzip
+import sys
+from pathlib import Path
+
+import pytest
+from flask import Flask
+from starlette.responses import PlainTextResponse
+from starlette.testclient import TestClient
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from helpers import static_assets
+from helpers.static_assets import StaticAssetHandler, StaticAssetStore, fingerprint_asset_urls
+
+
+SCRIPT = "export const answer = 42;\n" * 200
+
+
+async def _fallback(scope, receive, send):
+    await PlainTextResponse("fallback", 299)(scope, receive, send)
+
+
+@pytest.fixture
+def webui(tmp_path, monkeypatch):
+    root = tmp_path / "webui"
+    (root / "js").mkdir(parents=True)
+    (root / "js" / "app.js").write_text(SCRIPT, encoding="utf-8")
+    (root / "logo.png").write_bytes(b"\x89PNG" + b"\x00" * 32)
+    plugin_dir = tmp_path / "plugins" / "demo"
+    (plugin_dir / "webui").mkdir(parents=True)
+    (plugin_dir / "webui" / "demo.js").write_text(SCRIPT, encoding="utf-8")
+    monkeypatch.setattr(static_assets, "WEBUI_DIR", str(root))
+    monkeypatch.setattr("helpers.login.get_credentials_hash", lambda: None)
+    return root, plugin_dir
+
+
+@pytest.fixture
+def client(webui):
+    _root, plugin_dir = webui
+    webapp = Flask("test_static_assets")
+    webapp.secret_key = "test-secret"
+    store = StaticAssetStore()
+    handler = StaticAssetHandler(
+        webapp,
+        _fallback,
+        store,
+        resolve_plugin_dir=lambda name: str(plugin_dir) if name == "demo" else None,
+    )
+    return TestClient(handler), store
+
+
+def test_static_assets_serve_precompressed_with_strong_etag(client) -> None:
+    test_client, _store = client
+
+    response = test_client.get("/js/app.js", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["cache-control"] == "no-cache"
+    assert response.headers["etag"].startswith('"') and response.headers["etag"].endswith('-gzip"')
+    assert response.text == SCRIPT
+
+    revalidated = test_client.get(
+        "/js/app.js",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["etag"]},
+    )
+    assert revalidated.status_code == 304
+
+
+def test_static_assets_fingerprinted_urls_are_immutable(client, webui) -> None:
+    test_client, store = client
+    root, _plugin_dir = webui
+    fingerprint = store.fingerprint(str(root / "js" / "app.js"))
+
+    current = test_client.get(f"/js/app.js?v={fingerprint}")
+    stale = test_client.get("/js/app.js?v=outdated")
+
+    assert "immutable" in current.headers["cache-control"]
+    assert stale.headers["cache-control"] == "no-cache"
+
+
+def test_static_assets_pass_unknown_paths_to_fallback(client) -> None:
+    test_client, _store = client
+
+    assert test_client.get("/").status_code == 299
+    assert test_client.get("/missing.js").status_code == 299
+    assert test_client.get("/api/poll").status_code == 299
+    assert test_client.post("/js/app.js").status_code == 299
+
+
+def test_static_assets_serve_plugin_webui_only(client) -> None:
+    test_client, _store = client
+
+    assert test_client.get("/plugins/demo/webui/demo.js").status_code == 200
+    assert test_client.get("/plugins/demo/plugin.yaml").status_code == 299
+    assert test_client.get("/plugins/unknown/webui/demo.js").status_code == 299
+
+
+def test_static_assets_store_recompresses_after_change(webui) -> None:
+    root, _plugin_dir = webui
+    store = StaticAssetStore()
+    path = root / "js" / "app.js"
+    first = store.get(str(path))
+
+    path.write_text(SCRIPT + "export const more = 1;\n", encoding="utf-8")
+    second = store.get(str(path))
+
+    assert first.fingerprint != second.fingerprint
+    assert gzip.decompress(second.variants["gzip"]).endswith(b"more = 1;\n")
+    assert store.get(str(root / "logo.png")).variants == {}
+
+
+def test_index_asset_urls_get_fingerprints(webui) -> None:
+    root, _plugin_dir = webui
+    store = StaticAssetStore()
+    html = (
+        '<script src="js/app.js"></script>'
+        '<link href="https://cdn.example/x.css">'
+        '<img src="missing.png">'
+    )
+
+    rendered = fingerprint_asset_urls(html, store, str(root))
+
+    assert f'src="js/app.js?v={store.fingerprint(str(root / "js" / "app.js"))}"' in rendered
+    assert 'href="https://cdn.example/x.css"' in rendered
+    assert 'src="missing.png"' in rendered
+
+
+def test_module_entry_urls_stay_unversioned(webui) -> None:
+    root, _plugin_dir = webui
+    store = StaticAssetStore()
+    html = (
+        '<script type="module" src="js/app.js"></script>'
+        '<link rel="modulepreload" href="js/app.js">'
+        '<script src="js/app.js"></script>'
+    )
+
+    rendered = fingerprint_asset_urls(html, store, str(root))
+
+    assert '<script type="module" src="js/app.js"></script>' in rendered
+    assert '<link rel="modulepreload" href="js/app.js">' in rendered
+    assert f'<script src="js/app.js?v={store.fingerprint(str(root / "js" / "app.js"))}">' in rendered
+
+
+def test_index_picks_up_changed_assets_without_an_index_change(tmp_path, monkeypatch) -> None:
+    import asyncio
+    import inspect
+    import os
+    from types import ModuleType, SimpleNamespace
+
+    # other test modules stub these out for the whole session
+    for name in ("helpers.ws", "helpers.ws_manager"):
+        if not isinstance(sys.modules.get(name), (ModuleType, type(None))):
+            monkeypatch.delitem(sys.modules, name)
+    from helpers import files, ui_server
+
+    root = tmp_path / "webui"
+    (root / "js").mkdir(parents=True)
+    (root / "index.html").write_text('<script src="js/app.js"></script>', encoding="utf-8")
+    script = root / "js" / "app.js"
+    script.write_text(SCRIPT, encoding="utf-8")
+    monkeypatch.setattr(files, "_base_dir", str(tmp_path))
+    monkeypatch.setattr("helpers.login.get_credentials_hash", lambda: None)
+    store = StaticAssetStore()
+    handlers = ui_server.UiRouteHandlers(SimpleNamespace(asset_store=store))
+    handlers._git_info = {"version": "test", "commit_time": ""}
+    # past the auth and extension wrappers, which need a full app
+    serve_index = inspect.unwrap(ui_server.UiRouteHandlers.serve_index)
+
+    def render() -> str:
+        return asyncio.run(serve_index(handlers)).get_data(as_text=True)
+
+    first = render()
+    script.write_text(SCRIPT + "// changed\n", encoding="utf-8")
+    stat = script.stat()
+    os.utime(script, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    second = render()
+
+    assert f"js/app.js?v={store.fingerprint(str(script))}" in second
+    assert first != second
+    assert len(handlers._index_cache) == 1
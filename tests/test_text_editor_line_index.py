@@ -0,0 +1,157 @@
+import os
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from plugins._text_editor.helpers import file_ops, line_index
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    # Tiny chunks so a few KB exercise many checkpoints
+    monkeypatch.setattr(line_index, "CHUNK_SIZE", 64)
+    monkeypatch.setattr(file_ops.tokens, "count_tokens", lambda text: len(text) // 4)
+    line_index._cache.clear()
+    yield
+    line_index._cache.clear()
+
+
+def _random_text(rng: random.Random, lines: int, trailing_newline: bool) -> str:
+    words = ["alpha", "beta", "", "gamma delta", "é ü", "x" * 150]
+    text = "\n".join(rng.choice(words) for _ in range(lines))
+    return text + "\n" if trailing_newline else text
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_windowed_reads_match_readlines(tmp_path: Path, seed: int) -> None:
+    rng = random.Random(seed)
+    target = tmp_path / "sample.txt"
+    target.write_text(_random_text(rng, 300, seed % 2 == 0), encoding="utf-8")
+    expected = target.read_text(encoding="utf-8").splitlines(keepends=True)
+    index = line_index.get(str(target))
+
+    assert index.total_lines() == len(expected)
+    for _ in range(40):
+        line_from = rng.randint(1, len(expected) + 3)
+        line_to = line_from + rng.randint(0, 30)
+        window = [raw.decode("utf-8") for raw in index.read_lines(line_from, line_to)]
+        assert window == expected[line_from - 1 : line_to]
+        if line_from <= len(expected):
+            offset, _ = index.locate(line_from)
+            assert index.line_of(offset) == line_from
+
+
+def test_read_file_pages_without_reading_whole_file(tmp_path: Path) -> None:
+    target = tmp_path / "log.txt"
+    target.write_text("".join(f"entry {i}\n" for i in range(1, 2001)), encoding="utf-8")
+
+    result = file_ops.read_file(str(target), line_from=1500, line_to=1502)
+
+    assert result["total_lines"] == 2000
+    assert result["content"] == "1500 entry 1500\n1501 entry 1501\n1502 entry 1502"
+    index = line_index.get(str(target))
+    assert len(index.offsets) > 100  # sparse checkpoints, not one per line
+
+
+def test_appended_file_keeps_its_checkpoints(tmp_path: Path) -> None:
+    target = tmp_path / "grow.log"
+    target.write_text("".join(f"line {i}\n" for i in range(500)), encoding="utf-8")
+    index = line_index.get(str(target))
+    assert index.total_lines() == 500
+    checkpoints = len(index.offsets)
+
+    with open(target, "a", encoding="utf-8") as f:
+        f.write("".join(f"line {i}\n" for i in range(500, 600)))
+
+    grown = line_index.get(str(target))
+    assert grown is index
+    assert grown.offsets[:checkpoints] == index.offsets[:checkpoints]
+    assert grown.total_lines() == 600
+    assert grown.read_lines(599, 600) == [b"line 598\n", b"line 599\n"]
+
+    target.write_text("rewritten\n" * 700, encoding="utf-8")
+    rebuilt = line_index.get(str(target))
+    assert rebuilt is not index
+    assert rebuilt.read_lines(1, 1) == [b"rewritten\n"]
+
+
+def _reference_patch(lines: list[str], edits: list[dict]) -> list[str]:
+    out: list[str] = []
+    for edit in edits:
+        if edit["content"] and not edit["content"].endswith("\n"):
+            edit["content"] += "\n"
+    pending = list(edits)
+    for line_no, line in enumerate(lines, start=1):
+        while pending and pending[0]["insert"] and pending[0]["from"] == line_no:
+            out.append(pending.pop(0)["content"])
+        if pending and not pending[0]["insert"] and pending[0]["from"] <= line_no <= pending[0]["to"]:
+            if line_no == pending[0]["from"]:
+                out.append(pending[0]["content"])
+            if line_no == pending[0]["to"]:
+                pending.pop(0)
+            continue
+        out.append(line)
+    out.extend(edit["content"] for edit in pending)
+    return out
+
+
+@pytest.mark.parametrize("in_place", [False, True])
+@pytest.mark.parametrize("seed", range(4))
+def test_patch_matches_full_rewrite(tmp_path: Path, monkeypatch, seed: int, in_place: bool) -> None:
+    if in_place:
+        monkeypatch.setattr(file_ops, "IN_PLACE_MIN_PREFIX", 0)
+    rng = random.Random(seed)
+    target = tmp_path / "source.py"
+    target.write_text(_random_text(rng, 200, True), encoding="utf-8")
+    lines = target.read_text(encoding="utf-8").splitlines(keepends=True)
+    inode = os.stat(target).st_ino
+    edits = [
+        {"from": 120, "to": 122, "content": "replaced"},
+        {"from": 150, "content": "inserted\n"},
+        {"from": 180, "to": 180},
+        {"from": 260, "content": "appended"},
+    ]
+    parsed, err = file_ops.validate_edits(edits)
+    assert not err
+
+    expected = "".join(_reference_patch(lines, [dict(e) for e in parsed]))
+    total = file_ops.apply_patch(str(target), parsed)
+
+    assert target.read_text(encoding="utf-8") == expected
+    assert total == file_ops._count_content_lines(expected)
+    assert (os.stat(target).st_ino == inode) is in_place
+    index = line_index.get(str(target))
+    assert index.total_lines() == total
+    assert b"".join(index.read_lines(1, total)).decode("utf-8") == expected
+
+
+def test_edits_leave_the_prefix_and_its_checkpoints(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(file_ops, "IN_PLACE_MIN_PREFIX", 0)
+    target = tmp_path / "big.txt"
+    target.write_text("".join(f"row {i}\n" for i in range(1, 1001)), encoding="utf-8")
+    index = line_index.get(str(target))
+    assert index.total_lines() == 1000
+
+    result = file_ops.apply_exact_replace_file(str(target), "row 990\n", "row 990 changed\n")
+
+    assert result["line_from"] == 990 and result["total_lines"] == 1000
+    kept = line_index.get(str(target))
+    assert kept.offsets[1:40] == index.offsets[1:40]
+    assert kept.read_lines(989, 991) == [b"row 989\n", b"row 990 changed\n", b"row 991\n"]
+
+
+def test_crlf_files_fall_back_to_text_replace(tmp_path: Path) -> None:
+    target = tmp_path / "dos.txt"
+    target.write_bytes(b"one\r\ntwo\r\nthree\r\n")
+
+    result = file_ops.apply_exact_replace_file(str(target), "two\nthree", "2\n3")
+
+    assert result["line_from"] == 2
+    assert target.read_bytes() == b"one\n2\n3\n"
+    assert file_ops.read_file(str(target))["content"] == "1 one\n2 2\n3 3"
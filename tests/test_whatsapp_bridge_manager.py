@@ -8,34 +8,33 @@ PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
+from helpers.defer import LoopSafeLock
 from plugins._whatsapp_integration.helpers import bridge_manager
 
 
 @pytest.fixture(autouse=True)
 def reset_bridge_manager_state():
-    bridge_manager._bridge_lock = None
-    bridge_manager._bridge_lock_loop = None
+    bridge_manager._bridge_lock = LoopSafeLock()
     bridge_manager._bridge_process = None
     bridge_manager._bridge_config.clear()
     yield
-    bridge_manager._bridge_lock = None
-    bridge_manager._bridge_lock_loop = None
+    bridge_manager._bridge_lock = LoopSafeLock()
     bridge_manager._bridge_process = None
     bridge_manager._bridge_config.clear()
 
 
-def test_get_bridge_lock_recreates_lock_when_loop_marker_changes():
+def test_bridge_lock_is_shared_across_event_loops():
     async def _run():
-        original_lock = asyncio.Lock()
-        bridge_manager._bridge_lock = original_lock
-        bridge_manager._bridge_lock_loop = object()
+        lock = bridge_manager._get_bridge_lock()
+        async with lock:
+            assert lock.locked()
+        return lock
 
-        refreshed_lock = bridge_manager._get_bridge_lock()
+    first = asyncio.run(_run())
+    second = asyncio.run(_run())
 
-        assert refreshed_lock is bridge_manager._bridge_lock
-        assert refreshed_lock is not original_lock
-
-    asyncio.run(_run())
+    assert first is second is bridge_manager._bridge_lock
+    assert not first.locked()
 
 
 def test_ensure_bridge_dependencies_reinstalls_invalid_dependency_tree(monkeypatch):
@@ -0,0 +1,52 @@
+import asyncio
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from plugins._whatsapp_integration.helpers import handler
+
+
+def _patch(monkeypatch, config: dict, enabled: list[str]) -> list[dict]:
+    dispatched: list[dict] = []
+
+    async def dispatch(config, msg):
+        dispatched.append(msg)
+
+    monkeypatch.setattr(handler.plugins, "get_plugin_config", lambda name: config)
+    monkeypatch.setattr(handler.plugins, "get_enabled_plugins", lambda agent: enabled)
+    monkeypatch.setattr(handler, "_dispatch_message", dispatch)
+    return dispatched
+
+
+def test_streamed_batch_is_dropped_once_the_plugin_is_disabled(monkeypatch):
+    config = {"enabled": True}
+    dispatched = _patch(monkeypatch, config, [handler.PLUGIN_NAME])
+
+    asyncio.run(handler.process_messages([{"chatId": "1"}]))
+    config["enabled"] = False
+    asyncio.run(handler.process_messages([{"chatId": "2"}]))
+
+    assert dispatched == [{"chatId": "1"}]
+
+
+def test_batch_is_dropped_when_the_plugin_is_turned_off(monkeypatch):
+    dispatched = _patch(monkeypatch, {"enabled": True}, [])
+
+    asyncio.run(handler.process_messages([{"chatId": "1"}]))
+
+    assert dispatched == []
+
+
+def test_batch_uses_the_current_allowed_numbers(monkeypatch):
+    config = {"enabled": True, "allowed_numbers": "+1 555 0100"}
+    dispatched = _patch(monkeypatch, config, [handler.PLUGIN_NAME])
+
+    asyncio.run(handler.process_messages([
+        {"chatId": "a", "senderNumber": "15550100"},
+        {"chatId": "b", "senderNumber": "15550199"},
+    ]))
+
+    assert [msg["chatId"] for msg in dispatched] == ["a"]
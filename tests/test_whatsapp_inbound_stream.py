@@ -0,0 +1,223 @@
+import asyncio
+import shutil
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import aiohttp
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from plugins._whatsapp_integration.helpers import wa_inbound
+
+FAKE_BRIDGE = PROJECT_ROOT / "plugins" / "_whatsapp_integration" / "whatsapp-bridge" / "fake-bridge.js"
+
+pytestmark = pytest.mark.skipif(not shutil.which("node"), reason="node is not installed")
+
+
+class FakeBridge:
+    def __init__(self, port: int | None = None):
+        if port is None:
+            with socket.socket() as probe:
+                probe.bind(("127.0.0.1", 0))
+                port = probe.getsockname()[1]
+        self.port = port
+        self.url = f"http://127.0.0.1:{port}"
+        self.process = subprocess.Popen(
+            ["node", str(FAKE_BRIDGE), "--port", str(port), "--heartbeat-ms", "200"],
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        assert "listening" in (self.process.stdout.readline() if self.process.stdout else "")
+
+    async def inject(self, body: str) -> dict:
+        async with aiohttp.ClientSession() as session:
+            async with session.post(f"{self.url}/inject", json={"body": body}) as resp:
+                return await resp.json()
+
+    async def stats(self) -> dict:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"{self.url}/stats") as resp:
+                return await resp.json()
+
+    def stop(self) -> None:
+        self.process.terminate()
+        self.process.wait(timeout=5)
+
+
+@pytest.fixture
+def bridge():
+    fake = FakeBridge()
+    yield fake
+    fake.stop()
+
+
+@pytest.fixture(autouse=True)
+def quiet(monkeypatch):
+    notes: list[str] = []
+    for level in ("info", "warning", "error"):
+        monkeypatch.setattr(wa_inbound.PrintStyle, level, lambda *args, **kwargs: notes.append(args[0]))
+    monkeypatch.setattr(wa_inbound, "RECONNECT_DELAYS", (0.05,))
+    return notes
+
+
+class _Receiver:
+    def __init__(self):
+        self.messages: list[dict] = []
+        self.latencies_ms: list[float] = []
+
+    async def __call__(self, messages: list[dict]) -> None:
+        now_ms = time.time() * 1000
+        for message in messages:
+            self.messages.append(message)
+            self.latencies_ms.append(now_ms - message["sentAt"])
+
+    def bodies(self) -> list[str]:
+        return [m["body"] for m in self.messages]
+
+    async def wait_for(self, count: int, timeout: float = 5.0) -> None:
+        deadline = time.monotonic() + timeout
+        while len(self.messages) < count:
+            assert time.monotonic() < deadline, f"got {self.bodies()}"
+            await asyncio.sleep(0.005)
+
+
+async def _wait_streaming(feed: wa_inbound.InboundFeed) -> None:
+    deadline = time.monotonic() + 5
+    while not feed.streaming:
+        assert time.monotonic() < deadline, "stream did not open"
+        await asyncio.sleep(0.005)
+
+
+def test_stream_pushes_messages_without_polling(bridge: FakeBridge) -> None:
+    receiver = _Receiver()
+    feed = wa_inbound.InboundFeed(bridge.url, receiver)
+
+    async def scenario():
+        task = asyncio.create_task(feed.stream())
+        await _wait_streaming(feed)
+        for i in range(5):
+            await bridge.inject(f"hello {i}")
+            await receiver.wait_for(i + 1)
+        await asyncio.sleep(1.0)  # idle: only heartbeats on the open stream
+        stats = await bridge.stats()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return stats
+
+    stats = asyncio.run(scenario())
+
+    assert receiver.bodies() == [f"hello {i}" for i in range(5)]
+    assert max(receiver.latencies_ms) < 250
+    assert stats["requests"]["GET /events"] == 1
+    assert "GET /messages" not in stats["requests"]
+    assert feed.stats.connects == 1 and feed.stats.delivered == 5
+
+
+def test_reconnect_resumes_after_the_last_delivered_message(bridge: FakeBridge) -> None:
+    receiver = _Receiver()
+    feed = wa_inbound.InboundFeed(bridge.url, receiver)
+
+    async def scenario():
+        task = asyncio.create_task(feed.stream())
+        await _wait_streaming(feed)
+        await bridge.inject("before")
+        await receiver.wait_for(1)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+        for i in range(3):
+            await bridge.inject(f"while away {i}")
+        await feed.poll()  # fallback delivers the gap...
+        task = asyncio.create_task(feed.stream())  # ...and the replay skips it
+        await _wait_streaming(feed)
+        await bridge.inject("after")
+        await receiver.wait_for(5)
+        await feed.poll()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(scenario())
+
+    assert receiver.bodies() == ["before", "while away 0", "while away 1", "while away 2", "after"]
+    assert feed.seq == 5
+
+
+def test_restarted_bridge_is_read_from_its_first_message(bridge: FakeBridge, quiet) -> None:
+    receiver = _Receiver()
+    feed = wa_inbound.InboundFeed(bridge.url, receiver)
+
+    async def scenario():
+        task = asyncio.create_task(feed.stream())
+        await _wait_streaming(feed)
+        for i in range(3):
+            await bridge.inject(f"first boot {i}")
+        await receiver.wait_for(3)
+        first_boot = feed.boot
+
+        bridge.stop()
+        restarted = FakeBridge(bridge.port)
+        try:
+            await restarted.inject("second boot 0")  # seq 1, below the old cursor
+            await receiver.wait_for(4)
+            await restarted.inject("second boot 1")
+            await receiver.wait_for(5)
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            restarted.stop()
+        return first_boot
+
+    first_boot = asyncio.run(scenario())
+
+    assert receiver.bodies() == [
+        "first boot 0", "first boot 1", "first boot 2", "second boot 0", "second boot 1",
+    ]
+    assert feed.boot != first_boot and feed.seq == 2
+    assert "WhatsApp: bridge restarted, reading its new messages" in quiet
+
+
+def test_legacy_messages_endpoint_still_drains_the_queue(bridge: FakeBridge) -> None:
+    async def scenario():
+        await bridge.inject("legacy")
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"{bridge.url}/messages") as resp:
+                first = await resp.json()
+            async with session.get(f"{bridge.url}/messages") as resp:
+                second = await resp.json()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert [m["body"] for m in first] == ["legacy"]
+    assert second == []
+
+
+def test_poll_delivers_a_legacy_list_reply_without_touching_the_cursor(monkeypatch) -> None:
+    receiver = _Receiver()
+    feed = wa_inbound.InboundFeed("http://bridge", receiver)
+    feed.boot, feed.seq = "boot-1", 7
+    replies = [
+        [{"body": "legacy 0", "sentAt": 0}, {"body": "legacy 1", "sentAt": 0}],
+        [],
+    ]
+
+    async def poll_events(base_url, boot, after):
+        return replies.pop(0)
+
+    monkeypatch.setattr(wa_inbound.wa_client, "poll_events", poll_events)
+
+    async def scenario():
+        await feed.poll()
+        await feed.poll()
+
+    asyncio.run(scenario())
+
+    assert receiver.bodies() == ["legacy 0", "legacy 1"]
+    assert (feed.boot, feed.seq) == ("boot-1", 7)
+    assert feed.stats.polls == 2 and feed.stats.delivered == 2
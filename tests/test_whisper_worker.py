@@ -0,0 +1,284 @@
+import asyncio
+import base64
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from helpers import whisper_worker
+from helpers.whisper_worker import SAMPLE_RATE, TranscriptionWorker, WorkerBusy
+
+DECODE_SECONDS = 0.05
+
+
+class _FakeModel:
+    """Stands in for a Whisper model inside the worker process."""
+
+    def __init__(self, decode_seconds: float):
+        self.decode_seconds = decode_seconds
+
+    def transcribe(self, audio, **kwargs):
+        time.sleep(self.decode_seconds)  # the CPU cost of a decode
+        return {"text": f" {len(audio) / SAMPLE_RATE:.1f}s", "language": "en"}
+
+
+def _fake_loader(model_name: str):
+    return _FakeModel(DECODE_SECONDS)
+
+
+def _slow_loader(model_name: str):
+    return _FakeModel(0.2)
+
+
+def _speech(seconds: float) -> np.ndarray:
+    rng = np.random.default_rng(int(seconds * 1000))
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (0.2 * np.sin(2 * np.pi * 220 * t) + 0.05 * rng.standard_normal(len(t))).astype(np.float32)
+
+
+def _silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+
+
+def _pcm(audio: np.ndarray) -> bytes:
+    return (np.clip(audio, -1, 1) * 32767).astype("<i2").tobytes()
+
+
+def _chunks(audio: np.ndarray, seconds: float = 0.1):
+    step = int(seconds * SAMPLE_RATE)
+    for i in range(0, len(audio), step):
+        yield _pcm(audio[i:i + step])
+
+
+@pytest.fixture
+def make_worker():
+    workers: list[TranscriptionWorker] = []
+
+    def make(**kwargs) -> TranscriptionWorker:
+        kwargs.setdefault("loader", _fake_loader)
+        workers.append(TranscriptionWorker(**kwargs))
+        return workers[-1]
+
+    yield make
+    for worker in workers:
+        worker.stop()
+
+
+def test_session_cuts_segments_at_silence_and_emits_partials() -> None:
+    events: list[tuple[str, dict]] = []
+    decoded: list[float] = []
+
+    def decode(audio, prompt, language):
+        decoded.append(len(audio) / SAMPLE_RATE)
+        return f"seg{len(decoded)}", "en"
+
+    session = whisper_worker._Session(decode, lambda kind, data: events.append((kind, data)))
+    clip = np.concatenate([
+        _speech(0.1), _silence(0.8),  # a click, too short to decode
+        _speech(1.6), _silence(0.6),
+        _speech(1.2),
+    ])
+    for step in range(0, len(clip), SAMPLE_RATE // 10):
+        session.feed(clip[step:step + SAMPLE_RATE // 10])
+        session.partial()
+    result = session.finish()
+
+    finals = [data for kind, data in events if kind == "final"]
+    partials = [data for kind, data in events if kind == "partial"]
+    assert len(finals) == 2
+    assert finals[0]["start"] == pytest.approx(0.9 - whisper_worker.PREROLL_SECONDS, abs=0.05)
+    assert finals[1]["start"] == pytest.approx(3.1 - whisper_worker.PREROLL_SECONDS, abs=0.05)
+    assert partials and partials[0]["start"] == finals[0]["start"]
+    assert max(decoded) < whisper_worker.MAX_SEGMENT_SECONDS
+    assert result["text"] == " ".join(f["text"] for f in finals)
+    assert result["language"] == "en"
+
+
+def test_whole_files_skip_the_vad_and_streams_follow_the_silence_setting() -> None:
+    quiet = 0.06 * _speech(2.0)  # frame RMS ~0.009, under the default threshold
+    decoded: list[float] = []
+
+    def decode(audio, prompt, language):
+        decoded.append(len(audio) / SAMPLE_RATE)
+        return "quiet words", "en"
+
+    upload = whisper_worker._Session(decode, lambda kind, data: None)
+    upload.feed_whole(quiet)
+    assert upload.finish()["text"] == "quiet words"
+    assert decoded == [2.0]
+
+    default = whisper_worker._Session(decode, lambda kind, data: None)
+    default.feed(quiet)
+    assert default.finish()["text"] == ""
+
+    sensitive = whisper_worker._Session(
+        decode, lambda kind, data: None, vad_threshold=whisper_worker.vad_threshold(0.0)
+    )
+    sensitive.feed(quiet)
+    assert sensitive.finish()["text"] == "quiet words"
+
+    assert whisper_worker.vad_threshold(None) == whisper_worker.VAD_THRESHOLD
+    assert whisper_worker.vad_threshold(0.3) == pytest.approx(0.0302, abs=1e-4)
+    assert whisper_worker.vad_threshold(0.05) < whisper_worker.vad_threshold(0.3)
+
+
+def test_worker_streams_partials_early_without_blocking_the_loop(make_worker) -> None:
+    worker = make_worker()
+    clip = np.concatenate([_speech(2.0), _silence(0.6), _speech(1.4)])
+    clip_seconds = len(clip) / SAMPLE_RATE
+
+    async def scenario():
+        await worker.load("tiny")  # the model stays loaded between streams
+        lags: list[float] = []
+        done = asyncio.Event()
+
+        async def heartbeat():
+            while not done.is_set():
+                before = time.monotonic()
+                await asyncio.sleep(0.01)
+                lags.append(time.monotonic() - before - 0.01)
+
+        beat = asyncio.create_task(heartbeat())
+        stream = await worker.open("tiny")
+        started = time.monotonic()
+        received: list[tuple[float, dict]] = []
+
+        async def collect():
+            async for event in stream.events():
+                received.append((time.monotonic() - started, event))
+
+        collector = asyncio.create_task(collect())
+        for chunk in _chunks(clip):
+            await stream.feed(chunk)
+            await asyncio.sleep(0.1)  # microphone pace
+        await stream.finish()
+        await asyncio.wait_for(collector, 5)
+        done.set()
+        await beat
+        return lags, received
+
+    lags, received = asyncio.run(scenario())
+
+    kinds = [event["type"] for _, event in received]
+    assert kinds[-1] == "done" and kinds.count("final") == 2
+    first_partial = next(at for at, event in received if event["type"] == "partial")
+    assert first_partial < clip_seconds / 3
+    assert max(lags) < 0.05
+    assert worker.active == 0
+
+
+def test_cancel_skips_queued_audio_and_frees_the_slot(make_worker) -> None:
+    worker = make_worker(max_sessions=1, loader=_slow_loader)
+    burst = np.concatenate([_speech(1.0), _silence(0.6)] * 15)
+
+    async def scenario():
+        await worker.load("tiny")
+        first = await worker.open("tiny")
+        with pytest.raises(WorkerBusy):
+            await worker.open("tiny")
+        for chunk in _chunks(burst, seconds=1.0):
+            await first.feed(chunk)  # ~3 s of queued decodes
+        await asyncio.sleep(0.3)
+        first.cancel()
+        assert [event async for event in first.events()] == []
+
+        started = time.monotonic()
+        second = await worker.open("tiny")
+        await second.feed(_pcm(np.concatenate([_speech(1.0), _silence(0.6)])))
+        await second.finish()
+        result = await asyncio.wait_for(second.result(), 5)
+        return result, time.monotonic() - started
+
+    result, elapsed = asyncio.run(scenario())
+
+    assert len(result["segments"]) == 1
+    assert elapsed < 1.5  # not queued behind the cancelled stream
+    assert worker.active == 0
+
+
+def test_ws_handler_cancels_streams_when_the_client_disconnects(make_worker, monkeypatch) -> None:
+    from api import ws_transcribe
+
+    worker = make_worker()
+
+    async def open_stream(model_name, language=None, silence_threshold=None):
+        return await worker.open(
+            model_name,
+            language=language,
+            vad_threshold=whisper_worker.vad_threshold(silence_threshold),
+        )
+
+    monkeypatch.setattr(ws_transcribe.settings, "get_settings", lambda: {"stt_model_size": "tiny"})
+    monkeypatch.setattr(ws_transcribe.whisper, "open_stream", open_stream)
+    handler = ws_transcribe.WsTranscribe(None, threading.Lock())  # type: ignore[arg-type]
+    sent: list[dict] = []
+
+    async def emit_to(sid, event, data, correlation_id=None):
+        sent.append(data)
+
+    handler.emit_to = emit_to  # type: ignore[method-assign]
+
+    async def scenario():
+        started = await handler.process("transcribe_start", {}, "sid1")
+        stream_id = started["stream"]
+        audio = base64.b64encode(_pcm(_speech(1.5))).decode()
+        await handler.process("transcribe_chunk", {"stream": stream_id, "audio": audio}, "sid1")
+        await asyncio.sleep(0.5)
+        active = worker.active
+        await handler.on_disconnect("sid1")
+        await asyncio.sleep(0.05)
+        return active, await handler.process(
+            "transcribe_chunk", {"stream": stream_id, "audio": audio}, "sid1"
+        )
+
+    active, late = asyncio.run(scenario())
+
+    assert active == 1
+    assert worker.active == 0
+    assert late == {"ok": False, "error": "unknown stream"}
+    assert not ws_transcribe.WsTranscribe._streams
+
+
+def test_tiny_model_transcribes_incrementally_off_loop(make_worker) -> None:
+    from helpers import files
+
+    if not Path(files.get_abs_path(whisper_worker.DOWNLOAD_ROOT), "tiny.pt").exists():
+        pytest.skip("whisper tiny model is not downloaded")
+
+    worker = make_worker(loader=whisper_worker.load_whisper)
+    clip = np.concatenate([_speech(3.0), _silence(0.6), _speech(3.0)])
+    clip_seconds = len(clip) / SAMPLE_RATE
+
+    async def scenario():
+        await worker.load("tiny")
+        lags: list[float] = []
+        stream = await worker.open("tiny", language="en")
+        started = time.monotonic()
+        first_partial = None
+
+        async def feed():
+            for chunk in _chunks(clip):
+                await stream.feed(chunk)
+                before = time.monotonic()
+                await asyncio.sleep(0.1)
+                lags.append(time.monotonic() - before - 0.1)
+            await stream.finish()
+
+        feeder = asyncio.create_task(feed())
+        async for event in stream.events():
+            if event["type"] == "partial" and first_partial is None:
+                first_partial = time.monotonic() - started
+        await feeder
+        return lags, first_partial
+
+    lags, first_partial = asyncio.run(scenario())
+
+    assert first_partial is not None and first_partial < clip_seconds / 2
+    assert max(lags) < 0.05
@@ -1,29 +1,36 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Any
+
 from agent import Agent, UserMessage
+from helpers import errors
+from helpers.dotenv import get_dotenv_int
+from helpers.log import LogItem
 from helpers.tool import Tool, Response
 from initialize import initialize_agent
 from extensions.python.hist_add_tool_result import _90_save_tool_call_file as save_tool_call_file
 
+CONCURRENCY_ENV = "A0_SUBORDINATE_CONCURRENCY"
+TOKEN_BUDGET_ENV = "A0_SUBORDINATE_TOKEN_BUDGET"
+
+DEFAULT_CONCURRENCY = 3
+
 
 class Delegation(Tool):
 
     async def execute(self, message="", reset="", **kwargs):
+        tasks = _fan_out_tasks(message, kwargs)
+        if tasks:
+            return await self.execute_fan_out(tasks, **kwargs)
+
         # create subordinate agent using the data object on this agent and set superior agent to his data object
         if (
             self.agent.get_data(Agent.DATA_NAME_SUBORDINATE) is None
             or str(reset).lower().strip() == "true"
         ):
-            # initialize default config
-            config = initialize_agent()
-
             # set subordinate prompt profile if provided, if not, keep original
             agent_profile = kwargs.get("profile", kwargs.get("agent_profile", ""))
-            if agent_profile:
-                config.profile = agent_profile
-
-            # crate agent
-            sub = Agent(self.agent.number + 1, config, self.agent.context)
-            # register superior/subordinate
-            sub.set_data(Agent.DATA_NAME_SUPERIOR, self.agent)
+            sub = self.create_subordinate(agent_profile)
             self.agent.set_data(Agent.DATA_NAME_SUBORDINATE, sub)
 
         # add user message to subordinate agent
@@ -36,15 +43,46 @@ class Delegation(Tool):
         # seal the subordinate's current topic so messages move to `topics` for compression
         subordinate.history.new_topic()
 
+        return Response(message=result, break_loop=False, additional=self.hint(result))
+
+    async def execute_fan_out(self, tasks: list[tuple[str, str]], **kwargs):
+        fan_out = FanOut(
+            self.agent,
+            concurrency=_int_arg(kwargs.get("concurrency")),
+            token_budget=_int_arg(kwargs.get("token_budget")),
+            log=getattr(self, "log", None),
+        )
+        for message, profile in tasks:
+            sub = self.create_subordinate(profile)
+            sub.agent_name = f"{sub.agent_name}.{len(fan_out.siblings) + 1}"
+            fan_out.add(sub, message, profile)
+
+        result = await fan_out.run()
+        return Response(
+            message=result, break_loop=False, additional=self.hint(result, fan_out=True)
+        )
+
+    def create_subordinate(self, profile: str = "") -> Agent:
+        # initialize default config
+        config = initialize_agent()
+        if profile:
+            config.profile = profile
+
+        # crate agent and register its superior
+        sub = Agent(self.agent.number + 1, config, self.agent.context)
+        sub.set_data(Agent.DATA_NAME_SUPERIOR, self.agent)
+        return sub
+
+    def hint(self, result: str, fan_out: bool = False) -> dict | None:
+        hints = []
+        # fan-out options kept out of the system prompt
+        if fan_out:
+            hints.append(self.agent.read_prompt("fw.hint.call_sub_fan_out.md"))
         # hint to use includes for long responses
-        additional = None
         if len(result) >= save_tool_call_file.LEN_MIN:
-            hint = self.agent.read_prompt("fw.hint.call_sub.md")
-            if hint:
-                additional = {"hint": hint}
-
-        # result
-        return Response(message=result, break_loop=False, additional=additional)
+            hints.append(self.agent.read_prompt("fw.hint.call_sub.md"))
+        hint = "\n".join(h for h in hints if h)
+        return {"hint": hint} if hint else None
 
     def get_log_object(self):
         return self.agent.context.log.log(
@@ -53,3 +91,184 @@ class Delegation(Tool):
             content="",
             kvps=self.args,
         )
+
+
+@dataclass
+class Sibling:
+    agent: Agent
+    message: str
+    profile: str = ""
+    log: LogItem | None = None
+    started: bool = False
+    result: str | None = None
+    error: str | None = None
+    tokens: int = 0
+
+    @property
+    def done(self) -> bool:
+        return self.result is not None or self.error is not None
+
+
+class FanOut:
+    """Sibling subordinates of one superior running their monologues concurrently.
+
+    The fan-out is stored on the superior under ``Agent.DATA_NAME_SUBORDINATES``
+    until every sibling has finished, so when a nudge restarts the superior,
+    ``AgentContext._process_chain`` finishes the remaining siblings first.
+    """
+
+    def __init__(
+        self,
+        superior: Agent,
+        concurrency: int = 0,
+        token_budget: int = 0,
+        log: LogItem | None = None,
+    ):
+        self.superior = superior
+        self.concurrency = concurrency or get_dotenv_int(CONCURRENCY_ENV, DEFAULT_CONCURRENCY)
+        self.token_budget = token_budget or get_dotenv_int(TOKEN_BUDGET_ENV, 0)
+        self.tokens_used = 0
+        self.exhausted = False
+        self.log = log
+        self.siblings: list[Sibling] = []
+        self._tasks: dict[int, asyncio.Task] = {}
+        superior.set_data(Agent.DATA_NAME_SUBORDINATES, self)
+
+    @staticmethod
+    def of(agent: Agent) -> "FanOut | None":
+        """The unfinished fan-out ``agent`` is a sibling in, if any."""
+        superior = agent.get_data(Agent.DATA_NAME_SUPERIOR)
+        fan_out = superior.get_data(Agent.DATA_NAME_SUBORDINATES) if superior else None
+        if isinstance(fan_out, FanOut) and fan_out.get(agent):
+            return fan_out
+        return None
+
+    def add(self, agent: Agent, message: str, profile: str = "") -> Sibling:
+        sibling = Sibling(agent=agent, message=message, profile=profile)
+        sibling.log = agent.context.log.log(
+            type="subagent",
+            heading=f"icon://communication {self.superior.agent_name}: Subordinate {agent.agent_name}"
+            + (f" ({profile})" if profile else ""),
+            content="",
+            kvps={"message": message, "profile": profile},
+        )
+        self.siblings.append(sibling)
+        return sibling
+
+    def get(self, agent: Agent) -> Sibling | None:
+        return next((s for s in self.siblings if s.agent is agent), None)
+
+    def charge(self, agent: Agent, tokens: int) -> bool:
+        """Count a sibling's prompt tokens against the shared budget.
+
+        Once the budget is spent every running sibling is cancelled and the
+        ones still queued are skipped; returns False from then on.
+        """
+        sibling = self.get(agent)
+        if sibling:
+            sibling.tokens += tokens
+        self.tokens_used += tokens
+        if self.token_budget and self.tokens_used > self.token_budget and not self.exhausted:
+            self.exhausted = True
+            for task in self._tasks.values():
+                if not task.done():
+                    task.cancel()
+        return not self.exhausted
+
+    async def run(self) -> str:
+        """Run the unfinished siblings, at most ``concurrency`` at a time."""
+        semaphore = asyncio.Semaphore(max(1, self.concurrency))
+        pending = [s for s in self.siblings if not s.done]
+        await asyncio.gather(*(self._run(s, semaphore) for s in pending))
+        if self.superior.get_data(Agent.DATA_NAME_SUBORDINATES) is self:
+            self.superior.data.pop(Agent.DATA_NAME_SUBORDINATES, None)
+        return self.combined()
+
+    def combined(self) -> str:
+        parts = []
+        for sibling in self.siblings:
+            title = sibling.agent.agent_name
+            if sibling.profile:
+                title += f" ({sibling.profile})"
+            if sibling.error is not None:
+                parts.append(f"## {title}\nError: {sibling.error}")
+            else:
+                parts.append(f"## {title}\n{sibling.result or ''}")
+        return "\n\n".join(parts)
+
+    async def _run(self, sibling: Sibling, semaphore: asyncio.Semaphore) -> None:
+        async with semaphore:
+            if self.exhausted:
+                self._finish(sibling, error="skipped, shared token budget exhausted")
+                return
+            if not sibling.started:
+                sibling.agent.hist_add_user_message(
+                    UserMessage(message=sibling.message, attachments=[])
+                )
+                sibling.started = True
+            task = asyncio.create_task(sibling.agent.monologue())
+            self._tasks[id(sibling)] = task
+            try:
+                self._finish(sibling, result=await task)
+            except asyncio.CancelledError:
+                current = asyncio.current_task()
+                if current and current.cancelling():
+                    raise  # the whole fan-out is being cancelled
+                self._finish(sibling, error="stopped, shared token budget exhausted")
+            except Exception as e:
+                self._finish(sibling, error=errors.error_text(e))
+            finally:
+                # a resumed fan-out may already track a newer run of this sibling
+                if self._tasks.get(id(sibling)) is task:
+                    self._tasks.pop(id(sibling), None)
+
+    def _finish(
+        self, sibling: Sibling, result: str | None = None, error: str | None = None
+    ) -> None:
+        sibling.result, sibling.error = result, error
+        if sibling.started:
+            # seal the sibling's topic like a serial subordinate call does
+            sibling.agent.history.new_topic()
+        if sibling.log:
+            sibling.log.update(
+                content=result if error is None else f"Error: {error}",
+                tokens=sibling.tokens,
+            )
+        if self.log:
+            finished = sum(1 for s in self.siblings if s.done)
+            self.log.update(
+                content=f"{finished}/{len(self.siblings)} subordinates finished"
+            )
+
+
+def _fan_out_tasks(message: Any, kwargs: dict) -> list[tuple[str, str]]:
+    """(message, profile) pairs for a fan-out call, empty for a single subordinate.
+
+    ``messages`` lists strings or ``{"message", "profile"}`` objects; ``profiles``
+    sends the same ``message`` to one subordinate per profile.
+    """
+    default_profile = str(kwargs.get("profile", kwargs.get("agent_profile", "")) or "")
+    messages = kwargs.get("messages")
+    profiles = kwargs.get("profiles")
+    tasks: list[tuple[str, str]] = []
+    if isinstance(messages, list) and messages:
+        for item in messages:
+            if isinstance(item, dict):
+                tasks.append(
+                    (
+                        str(item.get("message", "")),
+                        str(item.get("profile", "") or default_profile),
+                    )
+                )
+            else:
+                tasks.append((str(item), default_profile))
+    elif isinstance(profiles, list) and profiles:
+        tasks = [(str(message), str(profile)) for profile in profiles]
+    return tasks
+
+
+def _int_arg(value: Any) -> int:
+    try:
+        return max(0, int(value))
+    except (TypeError, ValueError):
+        return 0
@@ -3,6 +3,17 @@ import { updateChatInput, sendMessage } from "/index.js";
 import { sleep } from "/js/sleep.js";
 import { store as microphoneSettingStore } from "/components/settings/speech/microphone-setting-store.js";
 import * as shortcuts from "/js/shortcuts.js";
+import { getNamespacedClient } from "/js/websocket.js";
+
+// Streaming speech: microphone PCM goes to the server's whisper worker while
+// the user speaks, and Kokoro audio comes back sentence by sentence; the
+// whole-clip /transcribe and /synthesize requests remain the fallback.
+const speechSocket = getNamespacedClient("/ws");
+speechSocket.addHandlers(["ws_transcribe", "ws_synthesize"]);
+const STREAM_SAMPLE_RATE = 16000;
+const STREAM_CHUNK_MS = 250;
+const STREAM_PREROLL_MS = 500;
+const STREAM_RESULT_TIMEOUT_MS = 15000;
 
 const Status = {
   INACTIVE: "inactive",
@@ -423,6 +434,9 @@ const model = {
 
   // Kokoro TTS
   async speakWithKokoro(text, waitForPrevious = false, terminator = null) {
+    if (speechSocket.isConnected()) {
+      return await this.speakWithKokoroStream(text, waitForPrevious, terminator);
+    }
     try {
       // synthesize on the backend
       const response = await sendJsonData("/synthesize", { text });
@@ -454,6 +468,61 @@ const model = {
     }
   },
 
+  // Kokoro TTS streamed per sentence: playback starts with the first one
+  async speakWithKokoroStream(text, waitForPrevious = false, terminator = null) {
+    const streamId = `tts-${Date.now()}-${Math.random().toString(36).slice(2, 8)}`;
+    const parts = [];
+    let done = false;
+    let failure = null;
+    const onEvent = (envelope) => {
+      const data = envelope?.data;
+      if (data?.stream !== streamId) return;
+      if (data.type === "audio") parts.push(data.audio);
+      else if (data.type === "done") done = true;
+      else if (data.type === "error") failure = new Error(data.error);
+    };
+    const stopped = () => terminator && terminator();
+
+    await speechSocket.on("synthesize_event", onEvent);
+    try {
+      const response = await speechSocket.request(
+        "synthesize_start", { stream: streamId, text }, { timeoutMs: 5000 }
+      );
+      if (!response.results.some((r) => r.ok && r.data?.ok)) {
+        throw new Error("Kokoro TTS stream unavailable");
+      }
+
+      let index = 0;
+      while (!stopped()) {
+        if (index < parts.length) {
+          if (index === 0) {
+            // wait for previous to finish if requested
+            while (waitForPrevious && this.isSpeaking) await sleep(25);
+            if (stopped()) break;
+            // stop previous only if not waiting for it
+            if (!waitForPrevious) this.stopAudio();
+          }
+          let ended = false;
+          let playError = null;
+          this.playAudio(parts[index++])
+            .catch((error) => (playError = error))
+            .finally(() => (ended = true));
+          // let the caller move on while the last sentence plays
+          if (done && index === parts.length) return;
+          while (!ended && !stopped()) await sleep(25);
+          if (playError) throw playError;
+          continue;
+        }
+        if (failure) throw failure;
+        if (done) return;
+        await sleep(25);
+      }
+      speechSocket.emit("synthesize_cancel", { stream: streamId }).catch(() => {});
+    } finally {
+      speechSocket.off("synthesize_event", onEvent);
+    }
+  },
+
   // Play base64 audio
   async playAudio(base64Audio) {
     return new Promise((resolve, reject) => {
@@ -628,6 +697,8 @@ const model = {
     this.microphoneInput = new MicrophoneInput(async (text, isFinal) => {
       if (isFinal) {
         this.sendMessage(text);
+      } else {
+        updateChatInput("(voice) " + text);
       }
     });
 
@@ -669,6 +740,9 @@ class MicrophoneInput {
     this.silenceStartTime = null;
     this.hasStartedRecording = false;
     this.analysisFrame = null;
+    this.pcmNode = null;
+    this.pcmPreroll = [];
+    this.stream = null;
   }
 
   get status() {
@@ -721,6 +795,9 @@ class MicrophoneInput {
       };
 
       this.setupAudioAnalysis(stream);
+      await speechSocket
+        .on("transcribe_event", (envelope) => this.handleTranscribeEvent(envelope?.data))
+        .catch((error) => console.warn("Streaming transcription unavailable:", error));
       return true;
     } catch (error) {
       console.error("Microphone initialization error:", error);
@@ -754,6 +831,7 @@ class MicrophoneInput {
   }
 
   handleInactiveState() {
+    this.cancelStream();
     this.stopRecording();
     this.stopAudioAnalysis();
     if (this.waitingTimer) {
@@ -763,6 +841,7 @@ class MicrophoneInput {
   }
 
   handleListeningState() {
+    this.cancelStream();
     this.stopRecording();
     this.audioChunks = [];
     this.hasStartedRecording = false;
@@ -776,6 +855,7 @@ class MicrophoneInput {
     if (!this.hasStartedRecording && this.mediaRecorder.state !== "recording") {
       this.hasStartedRecording = true;
       this.mediaRecorder.start(1000);
+      this.startStream();
       console.log("Speech started");
     }
     if (this.waitingTimer) {
@@ -807,6 +887,97 @@ class MicrophoneInput {
     this.analyserNode.maxDecibels = -10;
     this.analyserNode.smoothingTimeConstant = 0.85;
     this.mediaStreamSource.connect(this.analyserNode);
+
+    this.pcmNode = this.audioContext.createScriptProcessor(4096, 1, 1);
+    this.pcmNode.onaudioprocess = (event) =>
+      this.capturePcm(event.inputBuffer.getChannelData(0));
+    this.mediaStreamSource.connect(this.pcmNode);
+    this.pcmNode.connect(this.audioContext.destination); // outputs silence
+  }
+
+  capturePcm(input) {
+    const pcm = toPcm16(input, this.audioContext.sampleRate);
+    if (this.status === Status.LISTENING) {
+      // keep the speech onset that came before the recording threshold
+      this.pcmPreroll.push(pcm);
+      let samples = this.pcmPreroll.reduce((n, chunk) => n + chunk.length, 0);
+      while (samples - this.pcmPreroll[0].length >= (STREAM_SAMPLE_RATE * STREAM_PREROLL_MS) / 1000) {
+        samples -= this.pcmPreroll.shift().length;
+      }
+    } else if (this.stream && (this.status === Status.RECORDING || this.status === Status.WAITING)) {
+      this.stream.pending.push(pcm);
+      this.flushPcm();
+    }
+  }
+
+  async startStream() {
+    if (this.stream || !speechSocket.isConnected()) return;
+    const stream = { id: null, finals: [], pending: this.pcmPreroll.splice(0), resolve: null };
+    this.stream = stream;
+    try {
+      const response = await speechSocket.request("transcribe_start", {}, { timeoutMs: 5000 });
+      const result = response.results.find((r) => r.ok && r.data?.ok);
+      if (!result) {
+        throw new Error(response.results[0]?.data?.error || "no transcription handler");
+      }
+      stream.id = result.data.stream;
+      if (this.stream === stream) this.flushPcm();
+    } catch (error) {
+      console.warn("Streaming transcription unavailable, uploading instead:", error);
+      if (this.stream === stream) this.stream = null;
+    }
+  }
+
+  flushPcm(force = false) {
+    const stream = this.stream;
+    if (!stream?.id) return;
+    const samples = stream.pending.reduce((n, chunk) => n + chunk.length, 0);
+    if (!samples || (!force && samples < (STREAM_SAMPLE_RATE * STREAM_CHUNK_MS) / 1000)) return;
+    const pcm = new Int16Array(samples);
+    let offset = 0;
+    for (const chunk of stream.pending) {
+      pcm.set(chunk, offset);
+      offset += chunk.length;
+    }
+    stream.pending = [];
+    speechSocket
+      .emit("transcribe_chunk", { stream: stream.id, audio: pcmToBase64(pcm) })
+      .catch((error) => console.error("Transcription chunk error:", error));
+  }
+
+  handleTranscribeEvent(data) {
+    const stream = this.stream;
+    if (!stream || !data || data.stream !== stream.id) return;
+    if (data.type === "final") {
+      stream.finals.push(data.text);
+      this.updateCallback(stream.finals.join(" "), false);
+    } else if (data.type === "partial") {
+      this.updateCallback([...stream.finals, data.text].join(" "), false);
+    } else if (data.type === "done" || data.type === "error") {
+      stream.resolve?.(data);
+    }
+  }
+
+  // Resolves to the server's result, or null when the upload path should run
+  async finishStream(stream) {
+    this.flushPcm(true);
+    const done = new Promise((resolve) => (stream.resolve = resolve));
+    await speechSocket.emit("transcribe_end", { stream: stream.id });
+    const timeout = new Promise((resolve) => setTimeout(() => resolve(null), STREAM_RESULT_TIMEOUT_MS));
+    const result = await Promise.race([done, timeout]);
+    if (result?.type === "done") return result;
+    this.cancelStream();
+    return null;
+  }
+
+  cancelStream() {
+    const stream = this.stream;
+    this.stream = null;
+    if (stream?.id) {
+      speechSocket
+        .emit("transcribe_cancel", { stream: stream.id })
+        .catch(() => {});
+    }
   }
 
   startAudioAnalysis() {
@@ -872,16 +1043,19 @@ class MicrophoneInput {
   }
 
   async process() {
-    if (this.audioChunks.length === 0) {
+    const stream = this.stream?.id ? this.stream : null;
+    if (this.audioChunks.length === 0 && !stream) {
       this.status = Status.LISTENING;
       return;
     }
 
-    const audioBlob = new Blob(this.audioChunks, { type: "audio/wav" });
-    const base64 = await this.convertBlobToBase64Wav(audioBlob);
-
     try {
-      const result = await sendJsonData("/transcribe", { audio: base64 });
+      let result = stream ? await this.finishStream(stream).catch(() => null) : null;
+      if (!result) {
+        const audioBlob = new Blob(this.audioChunks, { type: "audio/wav" });
+        const base64 = await this.convertBlobToBase64Wav(audioBlob);
+        result = await sendJsonData("/transcribe", { audio: base64 });
+      }
       const text = this.filterResult(result.text || "");
 
       if (text) {
@@ -892,6 +1066,7 @@ class MicrophoneInput {
       window.toastFetchError("Transcription error", error);
       console.error("Transcription error:", error);
     } finally {
+      this.stream = null;
       this.audioChunks = [];
       this.status = Status.LISTENING;
     }
@@ -952,6 +1127,28 @@ class MicrophoneInput {
   }
 }
 
+function toPcm16(input, inputRate) {
+  const ratio = inputRate / STREAM_SAMPLE_RATE;
+  const output = new Int16Array(Math.floor(input.length / ratio));
+  for (let i = 0; i < output.length; i++) {
+    const start = Math.floor(i * ratio);
+    const end = Math.max(start + 1, Math.min(input.length, Math.floor((i + 1) * ratio)));
+    let sum = 0;
+    for (let j = start; j < end; j++) sum += input[j];
+    output[i] = Math.max(-1, Math.min(1, sum / (end - start))) * 0x7fff;
+  }
+  return output;
+}
+
+function pcmToBase64(pcm) {
+  const bytes = new Uint8Array(pcm.buffer);
+  let binary = "";
+  for (let i = 0; i < bytes.length; i += 0x8000) {
+    binary += String.fromCharCode(...bytes.subarray(i, i + 0x8000));
+  }
+  return btoa(binary);
+}
+
 export const store = createStore("speech", model);
 
 // Initialize speech store
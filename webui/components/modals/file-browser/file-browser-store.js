@@ -2,6 +2,9 @@ import { createStore } from "/js/AlpineStore.js";
 import { fetchApi } from "/js/api.js";
 import { store as fileEditorStore } from "/components/modals/file-editor/file-editor-store.js";
 
+// Entries per listing request; larger directories stream in page by page
+const LISTING_PAGE_SIZE = 500;
+
 // Model migrated from legacy file_browser.js (lift-and-shift)
 const model = {
   // Reactive state
@@ -13,7 +16,10 @@ const model = {
     parentPath: "",
     sortBy: "name",
     sortDirection: "asc",
+    totalEntries: 0,
+    hasMoreEntries: false,
   },
+  listingLoadId: 0, // bumped to cancel a listing that is still streaming
   history: [], // navigation stack
   initialPath: "", // Store path for open() call
   closePromise: null,
@@ -78,7 +84,9 @@ const model = {
     this.isLoading = false;
     this.history = [];
     this.initialPath = "";
+    this.listingLoadId++;
     this.browser.entries = [];
+    this.browser.hasMoreEntries = false;
     this.openDropdownPath = null;
     this.searchQuery = "";
     this.isBulkBusy = false;
@@ -296,6 +304,7 @@ const model = {
   // --- Navigation ----------------------------------------------------------
   async fetchFiles(path = "") {
     this.isLoading = true;
+    const loadId = ++this.listingLoadId;
     
     // Preserve scroll position if refreshing the same path
     const isSamePath = this.browser.currentPath === path || 
@@ -304,12 +313,15 @@ const model = {
     const selectedPaths = isSamePath
       ? new Set(this.selectedFiles.map((file) => file.path))
       : new Set();
+    const listing = {
+      path,
+      sort: this.browser.sortBy,
+      order: this.browser.sortDirection,
+    };
     
     try {
-      const response = await fetchApi(
-        `/get_work_dir_files?path=${encodeURIComponent(path)}`
-      );
-      const data = await response.json().catch(() => ({}));
+      const { response, data } = await this.fetchListingPage(listing);
+      if (loadId !== this.listingLoadId) return;
 
       if (response.ok && !data.error) {
         if (!isSamePath) this.searchQuery = "";
@@ -319,6 +331,7 @@ const model = {
         );
         this.browser.currentPath = data.data.current_path;
         this.browser.parentPath = data.data.parent_path;
+        this.browser.totalEntries = data.data.total ?? this.browser.entries.length;
         
         // Set isLoading to false BEFORE restoring scroll to avoid reactivity issues
         this.isLoading = false;
@@ -327,6 +340,12 @@ const model = {
         if (scrollPos) {
           this.restoreScrollPosition(scrollPos);
         }
+
+        // Not awaited: the first page is usable while the rest arrives
+        listing.path = data.data.current_path;
+        this.streamRemainingPages(
+          loadId, listing, data.data.next_cursor, selectedPaths
+        );
       } else {
         const msg = data.error || "Error fetching files";
         console.error("Error fetching files:", msg);
@@ -335,6 +354,7 @@ const model = {
         window.toastFrontendError(msg, "File Browser Error");
       }
     } catch (e) {
+      if (loadId !== this.listingLoadId) return;
       window.toastFrontendError(
         "Error fetching files: " + e.message,
         "File Browser Error"
@@ -344,6 +364,45 @@ const model = {
     }
   },
 
+  async fetchListingPage(listing, cursor = null) {
+    const params = new URLSearchParams({
+      path: listing.path,
+      limit: String(LISTING_PAGE_SIZE),
+      sort: listing.sort,
+      order: listing.order,
+    });
+    if (cursor) params.set("cursor", cursor);
+    const response = await fetchApi(`/get_work_dir_files?${params}`);
+    const data = await response.json().catch(() => ({}));
+    return { response, data };
+  },
+
+  // Append the following pages while the listing is still the current one
+  async streamRemainingPages(loadId, listing, cursor, selectedPaths) {
+    this.browser.hasMoreEntries = Boolean(cursor);
+    try {
+      while (cursor && loadId === this.listingLoadId) {
+        const { response, data } = await this.fetchListingPage(listing, cursor);
+        if (loadId !== this.listingLoadId) return;
+        if (!response.ok || data.error) {
+          throw new Error(data.error || "Error fetching files");
+        }
+        this.browser.entries = this.browser.entries.concat(
+          this.decorateEntries(data.data.entries || [], selectedPaths)
+        );
+        cursor = data.data.next_cursor;
+      }
+    } catch (e) {
+      if (loadId === this.listingLoadId) {
+        window.toastFrontendError(
+          "Error fetching files: " + e.message,
+          "File Browser Error"
+        );
+      }
+    }
+    if (loadId === this.listingLoadId) this.browser.hasMoreEntries = false;
+  },
+
   async navigateToFolder(path) {
     if(!path.startsWith("/")) path = "/" + path;
     if (this.browser.currentPath !== path)
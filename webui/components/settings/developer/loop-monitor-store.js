@@ -0,0 +1,51 @@
+import { createStore } from "/js/AlpineStore.js";
+import { callJsonApi } from "/js/api.js";
+
+const REFRESH_MS = 2000;
+
+const model = {
+  stats: null,
+  lastError: null,
+  expanded: null,
+  _timer: null,
+
+  onOpen() {
+    this.refresh();
+    this._timer = setInterval(() => this.refresh(), REFRESH_MS);
+  },
+
+  onClose() {
+    if (this._timer) clearInterval(this._timer);
+    this._timer = null;
+  },
+
+  async refresh(reset = false) {
+    try {
+      this.stats = await callJsonApi("loop_monitor", { reset });
+      this.lastError = null;
+    } catch (error) {
+      this.lastError = error?.message || String(error);
+    }
+  },
+
+  reset() {
+    this.expanded = null;
+    return this.refresh(true);
+  },
+
+  attributionRows(key) {
+    const values = this.stats?.attribution?.[key] || {};
+    return Object.entries(values).map(([label, agg]) => ({ label, ...agg }));
+  },
+
+  recentStalls() {
+    return (this.stats?.recent || []).slice().reverse();
+  },
+
+  toggle(index) {
+    this.expanded = this.expanded === index ? null : index;
+  },
+};
+
+const store = createStore("loopMonitorStore", model);
+export { store };
@@ -294,6 +294,7 @@ export function buildStateRequestPayload(options = {}) {
     log_from: forceFull ? 0 : lastLogVersion,
     notifications_from: forceFull ? 0 : notificationStore.lastNotificationVersion || 0,
     timezone,
+    log_deltas: true,
   };
 }
 
@@ -321,6 +322,10 @@ export async function applySnapshot(snapshot, options = {}) {
     return { updated: false };
   }
 
+  // rebuild full content of log items sent as deltas
+  if (lastLogGuid != snapshot.log_guid) msgs.resetLogContents();
+  snapshot.logs = msgs.applyLogDeltas(snapshot.logs || []);
+
   const snapCtx = {
     snapshot,
     willUpdateMessages: lastLogVersion != snapshot.log_version,
@@ -424,6 +429,7 @@ export async function poll() {
       notifications_from: notificationStore.lastNotificationVersion || 0,
       context: context || null,
       timezone: timezone,
+      log_deltas: true,
     });
 
     const result = await applySnapshot(response, {
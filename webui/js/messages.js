@@ -129,6 +129,29 @@ export async function getMessageHandler(type) {
 }
 
 
+// full content of every log item received for the current log, by item no
+const _logContents = new Map();
+
+export function resetLogContents() {
+  _logContents.clear();
+}
+
+// the backend sends streamed items as { content_offset, content: <text from offset> };
+// rebuild their full content from what was received before
+export function applyLogDeltas(logs) {
+  return logs.map((log) => {
+    let content = log.content ?? "";
+    if (typeof log.content_offset === "number") {
+      const previous = _logContents.get(log.no) ?? "";
+      content = previous.slice(0, log.content_offset) + content;
+      const { content_offset, ...rest } = log;
+      log = { ...rest, content };
+    }
+    _logContents.set(log.no, content);
+    return log;
+  });
+}
+
 // entrypoint called from poll/WS communication, this is how all messages are rendered and updated
 // input is raw log format
 export async function setMessages(messages) {